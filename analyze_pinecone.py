@@ -6,6 +6,8 @@ from dotenv import load_dotenv
 from pinecone import Pinecone
 from collections import Counter
 
+from backend.rag.review_store import open_review_store
+
 load_dotenv()
 
 pc = Pinecone(api_key=os.getenv('PINECONE_API_KEY'))
@@ -13,16 +15,10 @@ index = pc.Index(os.getenv('PINECONE_INDEX', 'courses-dev'))
 
 print("🔍 Pinecone 강의평 데이터 분석\n")
 
-# 모든 데이터 가져오기 (페이징)
+# 모든 데이터 가져오기 (로컬 미러 + ID 기준 증분 동기화)
 all_data = []
 try:
-    # 더미 쿼리로 데이터 가져오기
-    results = index.query(
-        vector=[0.0] * 768,
-        top_k=10000,  # 큰 숫자로 최대한 많이 가져오기
-        include_metadata=True
-    )
-    all_data = results.matches
+    all_data = open_review_store(lambda: index).find()
 except Exception as e:
     print(f"❌ 데이터 조회 실패: {e}")
     exit(1)
@@ -37,10 +33,10 @@ years = Counter()
 semesters = Counter()
 
 for match in all_data:
-    meta = match.metadata
+    meta = match['metadata']
     if meta:
-        course_name = meta.get('course_name', 'Unknown')
-        prof = meta.get('professor', 'Unknown')
+        course_name = meta.get('course_name') or 'Unknown'
+        prof = meta.get('professor') or 'Unknown'
         rating = meta.get('rating')
         year = meta.get('year')
         semester = meta.get('semester', 'Unknown')
@@ -78,7 +74,7 @@ for sem, count in semesters.most_common(5):
 # 샘플 강의평 내용 보기
 print(f"\n📝 샘플 강의평 (3개):")
 for i, match in enumerate(all_data[:3], 1):
-    meta = match.metadata
+    meta = match['metadata']
     print(f"\n  {i}. {meta.get('course_name')} - {meta.get('professor')} ({meta.get('semester')})")
     print(f"     평점: {meta.get('rating')}/5")
     text = meta.get('text', '')
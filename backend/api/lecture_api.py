@@ -6,6 +6,8 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import urllib.parse
+import base64
+import threading
 import time
 import os
 from dotenv import load_dotenv
@@ -14,7 +16,6 @@ import os
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
-import pandas as pd
 try:
     from config.config import Config
 except ImportError:
@@ -23,20 +24,21 @@ except ImportError:
         EVERYTIME_PASSWORD = os.getenv('EVERYTIME_PASSWORD')
         HEADLESS_MODE = os.getenv('HEADLESS_MODE', 'true').lower() == 'true'
 
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_auth_requests
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 import json
 import re
 from backend.api import get_mongo_db
+from backend.rag.resource_registry import ResourceRegistry
+from backend.rag.course_catalog import CourseCatalog
+from backend.rag.review_store import ReviewStore
+from backend.rag.course_aggregates import CourseAggregates, derive_tags, enrichment_summary, rating_key
+from backend.rag.review_summary import (
+    ReviewSummaryCache, build_summary_prompt, generate_summary, record_summary_request, reviews_hash,
+    select_summary_reviews, summary_cache_info, summary_request_counts
+)
+from backend.rag.precompute_job import PrecomputeJob
+from backend.rag.course_suggest import CourseSuggestIndex, CourseSuggestWatcher, SUGGEST_FIELDS
 # from backend.models.course import Course, Review, CourseDetails
 
 # 환경변수 로드
@@ -52,11 +54,96 @@ login_time = None
 SESSION_TIMEOUT = 30 * 60  # 30분 (초 단위)
 cached_search_results = {}  # 검색 결과 캐시
 
-SOFTWARE_COURSES_CACHE = None
-SOFTWARE_COURSES_CACHE_TS = 0
 SOFTWARE_COURSES_SOURCE = Path(__file__).resolve().parents[2] / 'course' / '2025-2.xlsx'
 
-GOOGLE_AUTH_REQUEST = google_auth_requests.Request()
+# ───────────────────────────────────────────────
+# 무거운 모듈은 import 시점이 아니라 사용할 때 로드
+# - selenium/webdriver_manager: 크롤링 함수 안에서 import
+# - pandas: 엑셀 로드 시 import
+# - google-auth: 아래 리소스 레지스트리로 로드 (RESOURCE_PRELOAD, /ready 참고)
+# ───────────────────────────────────────────────
+resources = ResourceRegistry()
+
+
+def _load_google_auth_request():
+    from google.auth.transport import requests as google_auth_requests
+    return google_auth_requests.Request()
+
+
+# 검색 자동완성 인덱스 (courses 컬렉션 변경은 change stream 또는 updated_at 폴링으로 반영)
+SUGGEST_POLL_SECONDS = float(os.getenv('SUGGEST_POLL_SECONDS', 30))
+course_suggest_watcher: Optional[CourseSuggestWatcher] = None
+
+
+def _load_course_suggest_index():
+    global course_suggest_watcher
+    course_suggest_watcher = CourseSuggestWatcher(get_mongo_db().courses, CourseSuggestIndex(), SUGGEST_POLL_SECONDS)
+    index = course_suggest_watcher.load()
+    print(f"✅ 자동완성 인덱스: 강의 {index.course_count}개, 항목 {len(index)}개")
+    return index
+
+
+# 강의평 로컬 미러 (data/review_store, Pinecone과 ID 기준 증분 동기화)
+REVIEW_STORE_SYNC_SECONDS = float(os.getenv('REVIEW_STORE_SYNC_SECONDS', 600))
+
+
+def _pinecone_review_index():
+    from pinecone import Pinecone
+
+    api_key = os.getenv('PINECONE_API_KEY')
+    if not api_key:
+        raise RuntimeError('PINECONE_API_KEY not set')
+    return Pinecone(api_key=api_key).Index(os.getenv('PINECONE_INDEX', 'courses-dev'))
+
+
+def get_course_aggregates() -> CourseAggregates:
+    return CourseAggregates(get_mongo_db())
+
+
+def _apply_review_changes(records, removed_ids):
+    """미러 동기화로 새로 받은/빠진 강의평만 course_aggregates에 반영"""
+    counts = get_course_aggregates().apply(records, removed_ids)
+    print(f"✅ 강의 집계 갱신: +{counts['added']} ~{counts['updated']} -{counts['removed']} "
+          f"(변경 없음 {counts['skipped']})")
+
+
+def _load_review_store():
+    store = ReviewStore(_pinecone_review_index, sync_interval=REVIEW_STORE_SYNC_SECONDS)
+    store.add_listener(_apply_review_changes)
+    store.load()
+    try:
+        aggregates = get_course_aggregates()
+        if len(store.table) and aggregates.is_empty():
+            # 집계가 아직 없으면 미러 전체로 처음 구축 (이후로는 동기화마다 증분 갱신)
+            print(f"✅ 강의 집계 구축: {aggregates.rebuild(store.table.records())}개 강의")
+    except Exception as e:
+        print(f"⚠️ 강의 집계 구축 실패: {e}")
+    return store
+
+
+def get_review_store() -> ReviewStore:
+    """강의평 미러 (동기화 주기가 지났으면 백그라운드로 동기화, 이번 요청은 현재 데이터로 응답)"""
+    store = resources.get("review_store")
+    store.maybe_sync()
+    return store
+
+
+def _safe_rating(value) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+resources.register("google_auth_request", _load_google_auth_request)
+resources.register("course_suggest_index", _load_course_suggest_index, required=False)
+resources.register("review_store", _load_review_store, required=False)
+
+# 강의평 AI 요약 캐시 (review_summaries 컬렉션) + 백그라운드 재생성 중인 강의
+review_summary_cache = ReviewSummaryCache(lambda: get_mongo_db().review_summaries)
+summary_refreshing = set()
+summary_refresh_lock = threading.Lock()
+resources.start()
 
 
 def verify_google_credential(credential: Optional[str]) -> Dict[str, Any]:
@@ -67,10 +154,12 @@ def verify_google_credential(credential: Optional[str]) -> Dict[str, Any]:
     if not Config.GOOGLE_CLIENT_ID:
         raise ValueError("GOOGLE_CLIENT_ID 환경 변수가 설정되지 않았습니다.")
     
+    from google.oauth2 import id_token
+
     try:
         id_info = id_token.verify_oauth2_token(
             credential,
-            GOOGLE_AUTH_REQUEST,
+            resources.get("google_auth_request"),
             Config.GOOGLE_CLIENT_ID
         )
         if id_info.get('aud') != Config.GOOGLE_CLIENT_ID:
@@ -298,110 +387,27 @@ def logout_user():
     return jsonify({"success": True})
 
 
-def _clean_string(value):
-    if pd.isna(value):
-        return ''
-    if isinstance(value, str):
-        return value.strip()
-    if isinstance(value, float):
-        if value.is_integer():
-            return str(int(value))
-        return str(value).strip()
-    return str(value).strip()
-
-
-def _clean_number(value, fallback=0):
-    if pd.isna(value):
-        return fallback
-    try:
-        return int(value)
-    except (ValueError, TypeError):
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return fallback
+def compile_software_courses(source_path: Path):
+    """엑셀 파일에서 소프트웨어학과 과목 데이터를 변환 (카탈로그 컴파일 시에만 호출)"""
+    from backend.rag.course_excel import (
+        filter_department, normalize_timetable, read_timetable, semester_from_path, to_catalog_courses
+    )
 
+    table = filter_department(normalize_timetable(read_timetable(source_path)), '소프트웨어학과')
+    courses = to_catalog_courses(table, semester_from_path(source_path), '소프트웨어학과')
+    print(f"✅ 소프트웨어학과 과목 {len(courses)}개 변환 (엑셀)")
+    return courses
 
-def load_software_courses_from_excel(force_reload: bool = False):
-    """엑셀 파일에서 소프트웨어학과 과목 데이터를 로드"""
-    global SOFTWARE_COURSES_CACHE, SOFTWARE_COURSES_CACHE_TS
-
-    if not force_reload and SOFTWARE_COURSES_CACHE is not None:
-        return SOFTWARE_COURSES_CACHE
-
-    if not SOFTWARE_COURSES_SOURCE.exists():
-        raise FileNotFoundError(f"엑셀 파일을 찾을 수 없습니다: {SOFTWARE_COURSES_SOURCE}")
-
-    df = pd.read_excel(SOFTWARE_COURSES_SOURCE, header=1)
-    if '과목명' not in df.columns:
-        raise ValueError('엑셀 파일 형식이 예상과 다릅니다. (과목명 열이 없음)')
-
-    df = df[df['과목명'].notna()].copy()
-
-    if '소속' in df.columns:
-        df = df[df['소속'] == '소프트웨어학과']
-    elif '개설\n전공' in df.columns:
-        df = df[df['개설\n전공'].fillna('').str.contains('소프트웨어', na=False)]
-
-    df.fillna('', inplace=True)
-
-    courses = []
-    for _, row in df.iterrows():
-        course = {
-            'course_id': _clean_string(row.get('과목\nID') or row.get('수강\n번호')),
-            'course_name': _clean_string(row.get('과목명')),
-            'course_code': _clean_string(row.get('교과목\n코드')),
-            'professor': _clean_string(row.get('담당\n교수')),
-            'department': _clean_string(row.get('소속') or row.get('개설\n전공')),
-            'major': _clean_string(row.get('개설\n전공')),
-            'semester': '2025-2',
-            'credits': _clean_number(row.get('학점'), 0),
-            'hours': _clean_number(row.get('시간'), 0),
-            'course_type': _clean_string(row.get('학수\n구분')),
-            'subject_type': _clean_string(row.get('교과\n구분')),
-            'lecture_time': _clean_string(row.get('강의\n시간명')),
-            'lecture_method': _clean_string(row.get('분반별\n수업\n방식') or row.get('수업\n방식')),
-            'class_method': _clean_string(row.get('수업\n방식')),
-            'class_type': _clean_string(row.get('분반별\n수업\n방법') or row.get('과목\n특성')),
-            'course_characteristics': _clean_string(row.get('과목\n특성')),
-            'course_english_name': _clean_string(row.get('과목\n영문명')),
-            'target_grade': _clean_string(row.get('수강\n대상\n학년')),
-            'average_rating': 0.0,
-            'rating': 0.0,
-            'total_reviews': 0,
-            'reviews': [],
-            'details': {
-                'lecture_method': _clean_string(row.get('분반별\n수업\n방식') or row.get('수업\n방식')),
-                'room': '',
-                'time_slot': _clean_string(row.get('강의\n시간명')),
-                'assignment': '정보 없음',
-                'attendance': '정보 없음',
-                'exam': '정보 없음',
-                'team_project': '정보 없음',
-                'credits': _clean_number(row.get('학점'), 0),
-            },
-            'ai_summary': '',
-            'keywords': list({
-                _clean_string(row.get('과목명')),
-                _clean_string(row.get('담당\n교수')),
-                _clean_string(row.get('교과목\n코드'))
-            } - {''}),
-            'tags': ['2025-2학기', '소프트웨어학과'],
-            'popularity_score': 50.0,
-            'trend_direction': 'stable',
-            'source': 'excel_2025_2'
-        }
 
-        # course_id가 비어 있는 경우 course_code로 대체
-        if not course['course_id']:
-            course['course_id'] = course['course_code'] or course['course_name']
+# 엑셀 원본이 바뀔 때만 다시 컴파일되는 카탈로그 (data/catalog/software-2025-2.catalog.json)
+software_course_catalog = CourseCatalog(SOFTWARE_COURSES_SOURCE, compile_software_courses, name='software-2025-2')
 
-        courses.append(course)
 
-    SOFTWARE_COURSES_CACHE = courses
-    SOFTWARE_COURSES_CACHE_TS = time.time()
-    print(f"✅ 소프트웨어학과 과목 {len(courses)}개 로드 (엑셀)")
-    return SOFTWARE_COURSES_CACHE
+def load_software_courses_from_excel(force_reload: bool = False):
+    """소프트웨어학과 과목 데이터 (컴파일된 카탈로그에서 로드, force_reload면 백그라운드로 다시 컴파일)"""
+    if force_reload:
+        software_course_catalog.reload_in_background(force_compile=True)
+    return software_course_catalog.get().courses
 
 # 샘플 데이터 (실제 크롤링 실패 시 사용)
 SAMPLE_COURSES = [
@@ -554,67 +560,188 @@ def search_courses_by_keyword(keyword):
 
     return results
 
+def course_search_query(keyword):
+    """검색 키워드 → MongoDB 쿼리 (강의명, 교수명, 학과명, 전공, 영문명에서 대소문자 무시 부분 일치)"""
+    if not keyword:
+        # 빈 키워드인 경우 모든 강의
+        return {}
+    return {
+        "$or": [
+            {"course_name": {"$regex": keyword, "$options": "i"}},
+            {"professor": {"$regex": keyword, "$options": "i"}},
+            {"department": {"$regex": keyword, "$options": "i"}},
+            {"major": {"$regex": keyword, "$options": "i"}},
+            {"course_english_name": {"$regex": keyword, "$options": "i"}}
+        ]
+    }
+
+
+def course_doc_to_api(doc):
+    """MongoDB 강의 문서를 API 응답 형식으로 변환"""
+    return {
+        "course_id": doc.get("course_id", ""),
+        "course_name": doc.get("course_name", ""),
+        "professor": doc.get("professor", ""),
+        "department": doc.get("department", ""),
+        "major": doc.get("major", ""),
+        "semester": doc.get("semester", ""),
+        "credits": doc.get("credits", 3),
+        "hours": doc.get("hours", 3),
+        "course_code": doc.get("course_code", ""),
+        "subject_id": doc.get("subject_id", ""),
+        "course_type": doc.get("course_type", ""),
+        "subject_type": doc.get("subject_type", ""),
+        "lecture_time": doc.get("lecture_time", ""),
+        "lecture_method": doc.get("lecture_method", ""),
+        "course_characteristics": doc.get("course_characteristics", ""),
+        "course_english_name": doc.get("course_english_name", ""),
+        "target_grade": doc.get("target_grade", ""),
+        "class_method": doc.get("class_method", ""),
+        "class_type": doc.get("class_type", ""),
+        "rating": doc.get("rating", 0.0),
+        "average_rating": doc.get("average_rating", 0.0),
+        "total_reviews": doc.get("total_reviews", 0),
+        "reviews": doc.get("reviews", []),
+        "details": doc.get("details", {}),
+        "ai_summary": doc.get("ai_summary", ""),
+        "keywords": doc.get("keywords", []),
+        "tags": doc.get("tags", []),
+        "popularity_score": doc.get("popularity_score", 50.0),
+        "trend_direction": doc.get("trend_direction", "stable"),
+        "source": doc.get("source", "database")
+    }
+
+
+def apply_course_ratings(courses):
+    """
+    강의 목록의 평점을 course_aggregates 집계 평점으로 채우기 (강의명 $in 조회 1회)
+    교수명이 있으면 그 교수 강의의 평점, 없을 때만 강의명 전체 평균. 채운 rating_key 집합 반환
+    """
+    try:
+        ratings = get_course_aggregates().ratings_for(
+            (course.get('course_name'), course.get('professor')) for course in courses)
+    except Exception as e:
+        print(f"⚠️ 강의 집계 평점 조회 실패: {e}")
+        return set()
+    for course in courses:
+        rating = ratings.get(rating_key(course.get('course_name'), course.get('professor')))
+        if rating is not None:
+            course['rating'] = round(rating, 1)
+            course['average_rating'] = round(rating, 2)
+    return set(ratings)
+
+
+# 검색 키워드별 전체 개수 캐시 (키워드 → (저장 시각, 개수))
+# 개수를 알고 있으면 페이지 조회만, 모르면 $facet으로 페이지와 개수를 한 번에 조회 → 검색당 MongoDB 왕복 1회
+COURSE_TOTAL_CACHE_TTL = int(os.getenv('COURSE_TOTAL_CACHE_TTL', 60))
+COURSE_TOTAL_CACHE_SIZE = 1024
+course_total_cache: Dict[str, Any] = {}
+course_total_cache_lock = threading.Lock()
+
+
+def _cached_course_total(keyword: str) -> Optional[int]:
+    key = keyword.strip().lower()
+    with course_total_cache_lock:
+        entry = course_total_cache.get(key)
+        if entry and time.time() - entry[0] < COURSE_TOTAL_CACHE_TTL:
+            return entry[1]
+    return None
+
+
+def _store_course_total(keyword: str, total: int) -> None:
+    with course_total_cache_lock:
+        if len(course_total_cache) >= COURSE_TOTAL_CACHE_SIZE:
+            # 가장 오래된 항목부터 정리
+            for stale_key in sorted(course_total_cache, key=lambda k: course_total_cache[k][0])[:COURSE_TOTAL_CACHE_SIZE // 4]:
+                del course_total_cache[stale_key]
+        course_total_cache[keyword.strip().lower()] = (time.time(), total)
+
+
+# 목록 정렬 키 (course_name, _id 복합 인덱스 사용). 키셋 커서는 마지막 문서의 정렬 키를 담음
+COURSE_LIST_SORT = [("course_name", 1), ("_id", 1)]
+
+
+def encode_course_cursor(doc) -> str:
+    """마지막 문서의 정렬 키 → 불투명 커서 문자열"""
+    payload = json.dumps({"n": doc.get("course_name", ""), "i": str(doc["_id"])}, ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_course_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    커서 문자열 → 다음 페이지 조건 (정렬 키가 커서보다 뒤인 문서)
+
+    Raises:
+        ValueError: 형식이 잘못된 커서
+    """
+    from bson import ObjectId
+    from bson.errors import InvalidId
+
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        name, last_id = payload["n"], ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError(f"잘못된 커서입니다: {cursor}") from e
+    return {
+        "$or": [
+            {"course_name": {"$gt": name}},
+            {"course_name": name, "_id": {"$gt": last_id}}
+        ]
+    }
+
+
+def search_courses_page(keyword, limit=50, offset=0, cursor=None):
+    """
+    MongoDB에서 강의 검색 (course_name, _id 순)
+
+    - offset 방식: 페이지 + 전체 개수를 한 번의 왕복으로 ($facet, 개수 캐시가 있으면 find만)
+    - cursor 방식: 이전 페이지의 next_cursor 이후부터 인덱스를 따라 조회 (skip이 없어 깊은 페이지도 첫 페이지와 같은 비용,
+      중간에 데이터가 바뀌어도 페이지가 밀리지 않음). 전체 개수는 캐시에 있을 때만 반환
+
+    Returns:
+        (강의 리스트, 전체 개수 또는 None, 다음 페이지 커서 또는 None)
+
+    Raises:
+        ValueError: 형식이 잘못된 커서
+    """
+    db = get_mongo_db()
+    collection = db.courses
+    query = course_search_query(keyword)
+
+    total_count = _cached_course_total(keyword)
+    if cursor:
+        after = decode_course_cursor(cursor)
+        page_query = {"$and": [query, after]} if query else after
+        # 한 개 더 가져와서 다음 페이지 존재 여부 확인
+        docs = list(collection.find(page_query).sort(COURSE_LIST_SORT).limit(limit + 1))
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+    elif total_count is not None:
+        docs = list(collection.find(query).sort(COURSE_LIST_SORT).skip(offset).limit(limit))
+        has_more = offset + len(docs) < total_count
+    else:
+        facet = list(collection.aggregate([
+            {"$match": query},
+            {"$sort": dict(COURSE_LIST_SORT)},
+            {"$facet": {
+                "page": [{"$skip": offset}, {"$limit": limit}],
+                "total": [{"$count": "count"}]
+            }}
+        ]))
+        docs = facet[0]["page"] if facet else []
+        total_count = facet[0]["total"][0]["count"] if facet and facet[0]["total"] else 0
+        _store_course_total(keyword, total_count)
+        has_more = offset + len(docs) < total_count
+
+    next_cursor = encode_course_cursor(docs[-1]) if docs and has_more else None
+    return [course_doc_to_api(doc) for doc in docs], total_count, next_cursor
+
+
 def search_courses_from_db(keyword, limit=50, offset=0):
     """MongoDB에서 강의 검색"""
     try:
-        db = get_mongo_db()
-        collection = db.courses
-        
-        # 텍스트 검색 쿼리 (강의명, 교수명, 학과명에서 검색)
-        if keyword:
-            query = {
-                "$or": [
-                    {"course_name": {"$regex": keyword, "$options": "i"}},
-                    {"professor": {"$regex": keyword, "$options": "i"}},
-                    {"department": {"$regex": keyword, "$options": "i"}},
-                    {"major": {"$regex": keyword, "$options": "i"}},
-                    {"course_english_name": {"$regex": keyword, "$options": "i"}}
-                ]
-            }
-        else:
-            # 빈 키워드인 경우 모든 강의
-            query = {}
-        
-        # 검색 실행 (페이지네이션 적용)
-        cursor = collection.find(query).skip(offset).limit(limit)
-        results = []
-        
-        for doc in cursor:
-            # MongoDB 문서를 API 응답 형식으로 변환
-            course_data = {
-                "course_id": doc.get("course_id", ""),
-                "course_name": doc.get("course_name", ""),
-                "professor": doc.get("professor", ""),
-                "department": doc.get("department", ""),
-                "major": doc.get("major", ""),
-                "semester": doc.get("semester", ""),
-                "credits": doc.get("credits", 3),
-                "hours": doc.get("hours", 3),
-                "course_code": doc.get("course_code", ""),
-                "subject_id": doc.get("subject_id", ""),
-                "course_type": doc.get("course_type", ""),
-                "subject_type": doc.get("subject_type", ""),
-                "lecture_time": doc.get("lecture_time", ""),
-                "lecture_method": doc.get("lecture_method", ""),
-                "course_characteristics": doc.get("course_characteristics", ""),
-                "course_english_name": doc.get("course_english_name", ""),
-                "target_grade": doc.get("target_grade", ""),
-                "class_method": doc.get("class_method", ""),
-                "class_type": doc.get("class_type", ""),
-                "rating": doc.get("rating", 0.0),
-                "average_rating": doc.get("average_rating", 0.0),
-                "total_reviews": doc.get("total_reviews", 0),
-                "reviews": doc.get("reviews", []),
-                "details": doc.get("details", {}),
-                "ai_summary": doc.get("ai_summary", ""),
-                "keywords": doc.get("keywords", []),
-                "tags": doc.get("tags", []),
-                "popularity_score": doc.get("popularity_score", 50.0),
-                "trend_direction": doc.get("trend_direction", "stable"),
-                "source": doc.get("source", "database")
-            }
-            results.append(course_data)
-        
+        results, _, _ = search_courses_page(keyword, limit, offset)
         print(f"✅ DB에서 {len(results)}개 강의 발견")
         return results
         
@@ -625,49 +752,7 @@ def search_courses_from_db(keyword, limit=50, offset=0):
 def get_all_courses_from_db(limit=50, offset=0):
     """MongoDB에서 모든 강의 가져오기"""
     try:
-        db = get_mongo_db()
-        collection = db.courses
-        
-        # 모든 강의 조회 (페이지네이션 적용)
-        cursor = collection.find({}).skip(offset).limit(limit)
-        results = []
-        
-        for doc in cursor:
-            # MongoDB 문서를 API 응답 형식으로 변환
-            course_data = {
-                "course_id": doc.get("course_id", ""),
-                "course_name": doc.get("course_name", ""),
-                "professor": doc.get("professor", ""),
-                "department": doc.get("department", ""),
-                "major": doc.get("major", ""),
-                "semester": doc.get("semester", ""),
-                "credits": doc.get("credits", 3),
-                "hours": doc.get("hours", 3),
-                "course_code": doc.get("course_code", ""),
-                "subject_id": doc.get("subject_id", ""),
-                "course_type": doc.get("course_type", ""),
-                "subject_type": doc.get("subject_type", ""),
-                "lecture_time": doc.get("lecture_time", ""),
-                "lecture_method": doc.get("lecture_method", ""),
-                "course_characteristics": doc.get("course_characteristics", ""),
-                "course_english_name": doc.get("course_english_name", ""),
-                "target_grade": doc.get("target_grade", ""),
-                "class_method": doc.get("class_method", ""),
-                "class_type": doc.get("class_type", ""),
-                "rating": doc.get("rating", 0.0),
-                "average_rating": doc.get("average_rating", 0.0),
-                "total_reviews": doc.get("total_reviews", 0),
-                "reviews": doc.get("reviews", []),
-                "details": doc.get("details", {}),
-                "ai_summary": doc.get("ai_summary", ""),
-                "keywords": doc.get("keywords", []),
-                "tags": doc.get("tags", []),
-                "popularity_score": doc.get("popularity_score", 50.0),
-                "trend_direction": doc.get("trend_direction", "stable"),
-                "source": doc.get("source", "database")
-            }
-            results.append(course_data)
-        
+        results, _, _ = search_courses_page('', limit, offset)
         print(f"✅ DB에서 전체 {len(results)}개 강의 조회")
         return results
         
@@ -677,6 +762,11 @@ def get_all_courses_from_db(limit=50, offset=0):
 
 def setup_driver():
     """Chrome 웹드라이버 설정 (강력한 봇 감지 우회)"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
     chrome_options = Options()
 
     # 기본 안정성 옵션
@@ -905,6 +995,10 @@ def cleanup_driver():
 
 def login_to_everytime(driver):
     """에브리타임 로그인 (개선된 버전)"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     try:
         print("🔐 에브리타임 로그인 중...")
 
@@ -1084,6 +1178,10 @@ def login_to_everytime(driver):
 
 def search_lecture(driver, keyword):
     """강의 검색 (실제 크롤링)"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     try:
         print(f"🔍 '{keyword}' 검색 중...")
 
@@ -1377,6 +1475,7 @@ def api_search():
     keyword = request.args.get('keyword', '').strip()
     limit = int(request.args.get('limit', 50))  # 기본 50개
     offset = int(request.args.get('offset', 0))  # 기본 0부터 시작
+    cursor = request.args.get('cursor', '').strip() or None  # 이전 응답의 next_cursor (있으면 offset 무시)
 
     # 한글 인코딩 문제 해결
     original_keyword = keyword
@@ -1403,20 +1502,22 @@ def api_search():
 
     if not keyword:
         # 빈 검색어인 경우 모든 강의 반환 (개설과목 현황용)
-        print(f"🔍 전체 강의 목록 요청 (limit={limit}, offset={offset})")
-        results = get_all_courses_from_db(limit, offset)
-        
-        # 전체 개수 조회
-        db = get_mongo_db()
-        collection = db.courses
-        total_count = collection.count_documents({})
+        print(f"🔍 전체 강의 목록 요청 (limit={limit}, offset={offset}, cursor={cursor})")
+        try:
+            results, total_count, next_cursor = search_courses_page('', limit, offset, cursor)
+        except ValueError as e:
+            return jsonify({'error': 'invalid_cursor', 'message': str(e)}), 400
+        except Exception as e:
+            print(f"❌ 전체 강의 조회 오류: {str(e)}")
+            results, total_count, next_cursor = [], 0, None
         
         return jsonify({
             'keyword': '',
             'results': results,
             'count': len(results),
             'total_count': total_count,
-            'has_more': (offset + limit) < total_count,
+            'has_more': next_cursor is not None,
+            'next_cursor': next_cursor,
             'offset': offset,
             'limit': limit
         })
@@ -1428,35 +1529,27 @@ def api_search():
 
     try:
         # 먼저 MongoDB에서 검색
-        print(f"🔍 DB 검색 시작: '{keyword}' (limit={limit}, offset={offset})")
-        results = search_courses_from_db(keyword, limit, offset)
+        print(f"🔍 DB 검색 시작: '{keyword}' (limit={limit}, offset={offset}, cursor={cursor})")
+        try:
+            results, total_count, next_cursor = search_courses_page(keyword, limit, offset, cursor)
+        except ValueError as e:
+            return jsonify({'error': 'invalid_cursor', 'message': str(e)}), 400
+        except Exception as e:
+            print(f"❌ DB 검색 오류: {str(e)}")
+            results, total_count, next_cursor = [], 0, None
         print(f"🔍 DB 검색 결과: {len(results)}개")
         
-        if results:
-            print(f"✅ DB 검색 완료: {len(results)}개 강의 발견")
-            # 전체 검색 결과 개수 조회
-            db = get_mongo_db()
-            collection = db.courses
-            if keyword:
-                query = {
-                    "$or": [
-                        {"course_name": {"$regex": keyword, "$options": "i"}},
-                        {"professor": {"$regex": keyword, "$options": "i"}},
-                        {"department": {"$regex": keyword, "$options": "i"}},
-                        {"major": {"$regex": keyword, "$options": "i"}},
-                        {"course_english_name": {"$regex": keyword, "$options": "i"}}
-                    ]
-                }
-                total_count = collection.count_documents(query)
-            else:
-                total_count = collection.count_documents({})
-            
+        if results or cursor:
+            # 커서로 넘긴 페이지는 비어 있어도 그대로 반환 (마지막 페이지)
+            apply_course_ratings(results)
+            print(f"✅ DB 검색 완료: {len(results)}개 강의 발견 (전체 {total_count}개)")
             return jsonify({
                 'keyword': keyword,
                 'results': results,
                 'count': len(results),
                 'total_count': total_count,
-                'has_more': (offset + limit) < total_count,
+                'has_more': next_cursor is not None,
+                'next_cursor': next_cursor,
                 'offset': offset,
                 'limit': limit
             })
@@ -1487,7 +1580,8 @@ def api_search():
                 }
             }]
         else:
-            # 실제 데이터에 리뷰 정보 추가
+            # 평점은 course_aggregates 집계 값, 집계가 없는 강의만 리뷰 배열로 계산
+            rated = apply_course_ratings(results)
             for lecture in results:
                 if not lecture.get('reviews') or len(lecture['reviews']) == 0:
                     lecture['reviews'] = [
@@ -1498,6 +1592,8 @@ def api_search():
                         }
                     ]
 
+                if rating_key(lecture.get('course_name'), lecture.get('professor')) in rated:
+                    continue
                 if lecture['reviews'] and lecture['reviews'][0]['rating'] > 0:
                     total_rating = sum(review['rating'] for review in lecture['reviews'])
                     lecture['rating'] = round(total_rating / len(lecture['reviews']), 1)
@@ -1516,6 +1612,35 @@ def api_search():
     })
 
 
+@app.route('/api/search/suggest', methods=['GET'])
+def api_search_suggest():
+    """
+    검색어 자동완성 (강의명, 교수명, 학수번호, 영문 강의명)
+    접두사/부분 일치/초성("ㄷㅇㅌㅂㅇㅅ") 매칭, 인기도 순. 메모리 인덱스에서 조회하므로 MongoDB 왕복 없음
+    """
+    query = request.args.get('q', request.args.get('keyword', '')).strip()
+    limit = min(int(request.args.get('limit', 10)), 50)
+    fields = [field for field in request.args.get('fields', '').split(',') if field in SUGGEST_FIELDS] or None
+
+    if not query:
+        return jsonify({'query': '', 'suggestions': [], 'count': 0})
+
+    try:
+        index = resources.get("course_suggest_index")
+    except Exception as e:
+        return jsonify({'error': 'suggest_index_unavailable', 'message': str(e)}), 503
+    course_suggest_watcher.start()
+
+    started = time.perf_counter()
+    suggestions = index.suggest(query, limit=limit, fields=fields)
+    return jsonify({
+        'query': query,
+        'suggestions': suggestions,
+        'count': len(suggestions),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+    })
+
+
 @app.route('/api/software-courses', methods=['GET'])
 def api_software_courses():
     """엑셀에서 소프트웨어학과 과목 목록 반환"""
@@ -1525,7 +1650,10 @@ def api_software_courses():
     force_reload = request.args.get('refresh', 'false').lower() == 'true'
 
     try:
-        courses = load_software_courses_from_excel(force_reload=force_reload)
+        if force_reload:
+            # 다시 컴파일하는 동안에도 현재 카탈로그로 응답
+            software_course_catalog.reload_in_background(force_compile=True)
+        catalog = software_course_catalog.get()
     except FileNotFoundError as e:
         print(f"❌ 소프트웨어 과목 데이터 파일 없음: {e}")
         return jsonify({'error': 'course_file_not_found', 'message': str(e)}), 404
@@ -1533,16 +1661,7 @@ def api_software_courses():
         print(f"❌ 소프트웨어 과목 로드 오류: {e}")
         return jsonify({'error': 'course_load_failed', 'message': str(e)}), 500
 
-    filtered = courses
-    if keyword:
-        keyword_lower = keyword.lower()
-        filtered = [
-            course for course in courses
-            if any(
-                keyword_lower in (course.get(field, '') or '').lower()
-                for field in ('course_name', 'professor', 'course_code', 'course_english_name')
-            )
-        ]
+    filtered = catalog.filter(keyword)
 
     total_count = len(filtered)
     results = filtered[offset:offset + limit]
@@ -1556,7 +1675,8 @@ def api_software_courses():
         'has_more': has_more,
         'offset': offset,
         'limit': limit,
-        'source': 'excel_2025_2'
+        'source': 'excel_2025_2',
+        'reloading': software_course_catalog.reloading
     })
 
 
@@ -1570,9 +1690,16 @@ def index():
     <h2>사용법:</h2>
     <ul>
         <li><code>GET /api/search?keyword=강의명</code> - 강의 검색</li>
+        <li><code>GET /api/search/suggest?q=ㄷㅇㅌ</code> - 검색어 자동완성 (초성 지원)</li>
     </ul>
     '''
 
+@app.route('/ready', methods=['GET'])
+def ready():
+    """준비 상태 확인 (리소스별 로드 시간, 프로세스 메모리 포함). 준비되면 200, 아니면 503"""
+    status = resources.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
 @app.route('/api/health/db', methods=['GET'])
 def health_db():
     """MongoDB 연결 헬스체크"""
@@ -1585,15 +1712,13 @@ def health_db():
 
 @app.route('/api/reviews/from-pinecone', methods=['GET'])
 def get_reviews_from_pinecone():
-    """Pinecone에서 특정 강의의 강의평 목록 가져오기"""
+    """Pinecone 강의평 미러에서 특정 강의의 강의평 목록 가져오기"""
     try:
-        from pinecone import Pinecone
-        
         course_name = request.args.get('course_name', '').strip()
         professor = request.args.get('professor', '').strip()
         limit = int(request.args.get('limit', 100))
         
-        print(f"🔍 Pinecone 강의평 조회 요청: course_name='{course_name}', professor='{professor}', limit={limit}")
+        print(f"🔍 강의평 조회 요청: course_name='{course_name}', professor='{professor}', limit={limit}")
         
         if not course_name:
             return jsonify({
@@ -1601,93 +1726,25 @@ def get_reviews_from_pinecone():
                 'error': 'course_name 파라미터가 필요합니다.'
             }), 400
         
-        PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
-        PINECONE_INDEX = os.getenv('PINECONE_INDEX', 'courses-dev')
+        # 강의명/교수명: 대소문자 무시, 정확 일치 또는 서로 포함 관계
+        matches = get_review_store().find(course_name, professor or None)
         
-        if not PINECONE_API_KEY:
-            return jsonify({'success': False, 'error': 'PINECONE_API_KEY not set'}), 500
-        
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        index = pc.Index(PINECONE_INDEX)
-        
-        # 모든 강의평 벡터 가져오기
-        print(f"📊 Pinecone에서 강의평 조회 중... (index: {PINECONE_INDEX})")
-        results = index.query(
-            vector=[0.0] * 768,
-            top_k=10000,
-            include_metadata=True
-        )
-        print(f"✅ Pinecone에서 {len(results.matches)}개 벡터 조회 완료")
-        
-        # 강의평 목록 생성 및 필터링
         reviews = []
-        normalized_course_name = course_name.strip().lower()
-        normalized_professor = professor.strip().lower() if professor else None
-        
-        print(f"🔍 필터링 기준: course_name='{normalized_course_name}', professor='{normalized_professor}'")
-        
-        matched_count = 0
-        for match in results.matches:
-            meta = match.metadata
-            if not meta:
-                continue
-            
-            # 강의명 필터링 (대소문자 무시, 부분 일치도 허용)
-            meta_course_name = meta.get('course_name', '').strip()
-            if not meta_course_name:
-                continue
-            
-            meta_course_name_lower = meta_course_name.lower()
-            # 정확 일치 또는 서로 포함 관계 확인
-            if (meta_course_name_lower != normalized_course_name and 
-                normalized_course_name not in meta_course_name_lower and
-                meta_course_name_lower not in normalized_course_name):
-                continue
-            
-            # 교수명 필터링 (제공된 경우, 대소문자 무시)
-            if normalized_professor:
-                meta_professor = meta.get('professor', '').strip()
-                if not meta_professor:
-                    continue
-                meta_professor_lower = meta_professor.lower()
-                # 정확 일치 또는 서로 포함 관계 확인
-                if (meta_professor_lower != normalized_professor and
-                    normalized_professor not in meta_professor_lower and
-                    meta_professor_lower not in normalized_professor):
-                    continue
-            
-            matched_count += 1
-            
-            # rating 안전하게 변환
-            rating_value = meta.get('rating', 0)
-            try:
-                if isinstance(rating_value, str):
-                    rating_value = float(rating_value)
-                elif not isinstance(rating_value, (int, float)):
-                    rating_value = 0.0
-                else:
-                    rating_value = float(rating_value)
-            except (ValueError, TypeError):
-                rating_value = 0.0
-            
-            review_data = {
-                'review_id': match.id,
-                'rating': rating_value,
+        for match in matches:
+            meta = match['metadata']
+            reviews.append({
+                'review_id': match['id'],
+                'rating': _safe_rating(meta.get('rating')),
                 'comment': meta.get('text', ''),
                 'text': meta.get('text', ''),
                 'semester': meta.get('semester', ''),
                 'course_name': meta.get('course_name', ''),
                 'professor': meta.get('professor', ''),
                 'department': meta.get('department', ''),
-                'source': meta.get('source', 'pinecone'),
+                'source': meta.get('source') or 'pinecone',
                 'created_at': meta.get('uploaded_at', ''),
-                'year': meta.get('year', None)
-            }
-            reviews.append(review_data)
-            
-            # 첫 3개 강의평의 rating 로깅 (디버깅용)
-            if len(reviews) <= 3:
-                print(f"  📝 Review {len(reviews)}: rating={rating_value} (type={type(rating_value).__name__}), semester={review_data['semester']}")
+                'year': meta.get('year')
+            })
         
         # 최신순 정렬 (semester와 uploaded_at 기준)
         reviews.sort(key=lambda x: (
@@ -1696,6 +1753,7 @@ def get_reviews_from_pinecone():
             x.get('created_at', '')
         ), reverse=True)
         
+        matched_count = len(reviews)
         # limit 적용
         reviews = reviews[:limit]
         
@@ -1719,13 +1777,19 @@ def get_reviews_from_pinecone():
 
 @app.route('/api/reviews/summary', methods=['GET'])
 def get_reviews_summary():
-    """강의평을 기반으로 AI 요약 생성 (강의 특징, 교수 스타일, 장단점)"""
+    """
+    강의평을 기반으로 AI 요약 생성 (강의 특징, 교수 스타일, 장단점)
+    review_summaries 캐시에 요약과 사용한 강의평 ID 해시를 저장해 두고, 해시가 같으면 Gemini 호출 없이 반환
+    새 강의평이 들어와 해시가 바뀌었으면 이전 요약을 바로 반환하고(cache.status="stale") 백그라운드에서 다시 생성
+    (wait=1이면 기다렸다가 새 요약 반환, refresh=1이면 캐시를 무시하고 다시 생성,
+     poll=1이면 화면이 stale 요약을 자동으로 다시 조회한 것이므로 요청 수 집계에서 제외)
+    """
     try:
-        from pinecone import Pinecone
-        import google.generativeai as genai
-        
         course_name = request.args.get('course_name', '').strip()
         professor = request.args.get('professor', '').strip()
+        wait = request.args.get('wait', '').lower() in ('1', 'true')
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true')
+        poll = request.args.get('poll', '').lower() in ('1', 'true')
         
         print(f"📝 강의평 요약 생성 요청: course_name='{course_name}', professor='{professor}'")
         
@@ -1735,58 +1799,16 @@ def get_reviews_summary():
                 'error': 'course_name 파라미터가 필요합니다.'
             }), 400
         
-        # Pinecone에서 강의평 가져오기
-        PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
-        PINECONE_INDEX = os.getenv('PINECONE_INDEX', 'courses-dev')
-        
-        if not PINECONE_API_KEY:
-            return jsonify({'success': False, 'error': 'PINECONE_API_KEY not set'}), 500
-        
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        index = pc.Index(PINECONE_INDEX)
-        
-        # 강의평 조회
-        results = index.query(
-            vector=[0.0] * 768,
-            top_k=10000,
-            include_metadata=True
-        )
-        
-        # 필터링
-        reviews = []
-        normalized_course_name = course_name.strip().lower()
-        normalized_professor = professor.strip().lower() if professor else None
+        # 요청 수 집계 (사전 생성 작업 우선순위, 자동 재조회는 같은 조회로 보고 세지 않음)
+        if not poll:
+            try:
+                record_summary_request(get_mongo_db().review_summary_traffic, course_name, professor)
+            except Exception as e:
+                print(f"⚠️ 요약 요청 수 기록 실패: {e}")
         
-        for match in results.matches:
-            meta = match.metadata
-            if not meta:
-                continue
-            
-            meta_course_name = meta.get('course_name', '').strip()
-            if not meta_course_name:
-                continue
-            
-            meta_course_name_lower = meta_course_name.lower()
-            if (meta_course_name_lower != normalized_course_name and 
-                normalized_course_name not in meta_course_name_lower and
-                meta_course_name_lower not in normalized_course_name):
-                continue
-            
-            if normalized_professor:
-                meta_professor = meta.get('professor', '').strip()
-                if not meta_professor:
-                    continue
-                meta_professor_lower = meta_professor.lower()
-                if (meta_professor_lower != normalized_professor and
-                    normalized_professor not in meta_professor_lower and
-                    meta_professor_lower not in normalized_professor):
-                    continue
-            
-            review_text = meta.get('text', '').strip()
-            if review_text:
-                reviews.append(review_text)
+        selected, digest, review_count = summary_inputs(course_name, professor)
         
-        if not reviews:
+        if not selected:
             return jsonify({
                 'success': True,
                 'summary': '강의평 데이터가 없어 요약을 생성할 수 없습니다.',
@@ -1794,93 +1816,37 @@ def get_reviews_summary():
                 'professor': professor or None
             })
         
-        # AI 요약 생성
-        GEMINI_API_KEY = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_GEMINI_API_KEY')
-        if not GEMINI_API_KEY:
-            return jsonify({'success': False, 'error': 'GEMINI_API_KEY not set'}), 500
+        cached = None
+        if not refresh:
+            try:
+                cached = review_summary_cache.get(course_name, professor)
+            except Exception as e:
+                print(f"⚠️ 강의평 요약 캐시 조회 실패: {e}")
         
-        genai.configure(api_key=GEMINI_API_KEY)
+        if cached and cached.get('reviews_hash') == digest:
+            print(f"✅ 캐시된 요약 반환 (강의평 {cached.get('review_count')}개 기준)")
+            return summary_response(cached, 'fresh', review_count)
         
-        # 최대 20개 강의평만 사용 (토큰 제한 고려)
-        review_texts = reviews[:20]
-        reviews_text = '\n\n'.join([f"강의평 {i+1}: {text}" for i, text in enumerate(review_texts)])
-        
-        prompt = f"""다음은 "{course_name}" 강의의 실제 수강생 강의평입니다. {"교수님은 " + professor + "입니다." if professor else ""}
-
-강의평 목록:
-{reviews_text}
-
-위 강의평들을 바탕으로 다음 형식으로 자연스러운 한국어 문장으로 요약해주세요:
-
-1. 강의 특징 요약
-(강의의 주요 특징, 수업 방식, 커리큘럼 등을 요약)
-
-2. 교수님의 강의 스타일/특징 요약
-(교수님의 강의 방식, 설명 스타일, 학생 대응 등을 요약)
-
-3. 장점/단점 정리
-(강의평에서 언급된 장점과 단점을 정리)
-
-중요한 주의사항:
-- 존재하지 않는 정보는 절대 생성하지 마세요. 강의평에 없는 내용은 작성하지 마세요.
-- JSON 형식이 아닌 자연스러운 한국어 문장으로 작성해주세요.
-- 과도하게 비난적인 내용이나 부정적인 내용은 언급하지 마세요. 교수님이 볼 수도 있다고 생각하고, 객관적이고 건설적인 표현만 사용하세요.
-- 비판적인 내용이 있어도 그것을 건설적인 피드백이나 개선점으로 재구성하여 표현하세요.
-- 각 섹션은 명확하게 구분되어야 합니다.
-
-요약:"""
+        if cached and not wait:
+            regenerating = refresh_summary_in_background(course_name, professor, selected, digest, review_count)
+            print(f"♻️ 새 강의평 반영 전 요약 반환 (백그라운드 재생성: {regenerating})")
+            return summary_response(cached, 'stale', review_count, regenerating)
         
+        # AI 요약 생성
         try:
-            print(f"🤖 AI 요약 생성 시작 (강의평 {len(review_texts)}개 사용)")
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            response = model.generate_content(prompt)
-            summary_text = getattr(response, 'text', None) or str(response)
-            if isinstance(summary_text, str):
-                summary_text = summary_text.strip()
-            else:
-                summary_text = str(summary_text).strip()
-            print(f"✅ AI 요약 생성 완료 (길이: {len(summary_text)} 문자)")
+            doc = create_review_summary(course_name, professor, selected, digest, review_count)
         except Exception as e:
-            print(f"⚠️ Gemini 모델 시도 실패, 대체 모델 사용: {e}")
-            try:
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                response = model.generate_content(prompt)
-                summary_text = getattr(response, 'text', None) or str(response)
-                if isinstance(summary_text, str):
-                    summary_text = summary_text.strip()
-                else:
-                    summary_text = str(summary_text).strip()
-                print(f"✅ 대체 모델로 요약 생성 완료 (길이: {len(summary_text)} 문자)")
-            except Exception as e2:
-                print(f"❌ AI 요약 생성 실패: {e2}")
-                import traceback
-                traceback.print_exc()
-                # 요약 생성 실패 시에도 기본 정보 반환
-                return jsonify({
-                    'success': False,
-                    'error': f'AI 요약 생성 중 오류가 발생했습니다: {str(e2)}',
-                    'review_count': len(reviews),
-                    'course_name': course_name,
-                    'professor': professor or None
-                }), 500
-        
-        if not summary_text or len(summary_text.strip()) == 0:
-            print(f"⚠️ 생성된 요약이 비어있음")
+            print(f"❌ AI 요약 생성 실패: {e}")
+            # 요약 생성 실패 시에도 기본 정보 반환
             return jsonify({
                 'success': False,
-                'error': '요약이 생성되지 않았습니다.',
-                'review_count': len(reviews),
+                'error': str(e),
+                'review_count': review_count,
                 'course_name': course_name,
                 'professor': professor or None
             }), 500
         
-        return jsonify({
-            'success': True,
-            'summary': summary_text,
-            'review_count': len(reviews),
-            'course_name': course_name,
-            'professor': professor or None
-        })
+        return summary_response(doc, 'generated', review_count)
         
     except Exception as e:
         import traceback
@@ -1892,84 +1858,221 @@ def get_reviews_summary():
             'traceback': traceback.format_exc()
         }), 500
 
+
+def summary_inputs(course_name, professor):
+    """
+    강의평 미러에서 해당 강의 강의평만 조회 → 요약에 쓸 최신 강의평 최대 20개
+
+    Returns:
+        ([(ID, 본문)], 사용한 강의평 ID 해시, 본문이 있는 전체 강의평 수)
+    """
+    records = get_review_store().find(course_name, professor or None)
+    selected = select_summary_reviews(records)
+    review_count = sum(1 for record in records if (record['metadata'].get('text') or '').strip())
+    return selected, reviews_hash([review_id for review_id, _ in selected]), review_count
+
+
+def summary_response(doc, status, review_count, regenerating=False):
+    return jsonify({
+        'success': True,
+        'summary': doc['summary'],
+        'review_count': review_count,
+        'course_name': doc['course_name'],
+        'professor': doc.get('professor'),
+        'cache': summary_cache_info(doc, status, review_count, regenerating)
+    })
+
+
+def create_review_summary(course_name, professor, selected, digest, review_count):
+    """Gemini로 요약을 생성해 review_summaries에 저장 (저장 실패해도 요약은 반환)"""
+    api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_GEMINI_API_KEY')
+    if not api_key:
+        raise RuntimeError('GEMINI_API_KEY not set')
+    
+    print(f"🤖 AI 요약 생성 시작 (강의평 {len(selected)}개 사용)")
+    prompt = build_summary_prompt(course_name, professor, [text for _, text in selected])
+    summary, model = generate_summary(prompt, api_key)
+    print(f"✅ AI 요약 생성 완료 ({model}, 길이: {len(summary)} 문자)")
+    
+    try:
+        return review_summary_cache.put(course_name, professor, digest, review_count, summary, model)
+    except Exception as e:
+        print(f"⚠️ 강의평 요약 캐시 저장 실패: {e}")
+        return {'course_name': course_name, 'professor': professor or None, 'reviews_hash': digest,
+                'review_count': review_count, 'summary': summary, 'model': model,
+                'generated_at': datetime.utcnow()}
+
+
+def refresh_summary_in_background(course_name, professor, selected, digest, review_count):
+    """같은 강의의 재생성이 이미 진행 중이 아니면 백그라운드 스레드 시작. 진행 중(이번에 시작 포함)이면 True"""
+    key = review_summary_cache.make_id(course_name, professor)
+    with summary_refresh_lock:
+        if key in summary_refreshing:
+            return True
+        summary_refreshing.add(key)
+    
+    def run():
+        try:
+            create_review_summary(course_name, professor, selected, digest, review_count)
+        except Exception as e:
+            print(f"❌ 강의평 요약 백그라운드 재생성 실패: {e}")
+        finally:
+            with summary_refresh_lock:
+                summary_refreshing.discard(key)
+    
+    threading.Thread(target=run, name="review-summary-refresh", daemon=True).start()
+    return True
+
+
+# ───────────────────────────────────────────────
+# 강의평 요약 사전 생성 (첫 방문자가 LLM 호출을 기다리지 않도록)
+# course_aggregates의 (강의명, 교수명)을 요약 요청 수 → 강의평 수 순으로 처리, 해시가 같은 요약은 건너뜀
+# ───────────────────────────────────────────────
+SUMMARY_PRECOMPUTE_WORKERS = int(os.getenv('SUMMARY_PRECOMPUTE_WORKERS', 4))
+SUMMARY_PRECOMPUTE_RPS = float(os.getenv('SUMMARY_PRECOMPUTE_RPS', 0.5))
+SUMMARY_PRECOMPUTE_ON_START = os.getenv('SUMMARY_PRECOMPUTE_ON_START', 'false').lower() == 'true'
+ADMIN_API_TOKEN = os.getenv('ADMIN_API_TOKEN', '')
+
+
+def summary_precompute_targets():
+    """요약 사전 생성 대상 (요청이 많은 강의 → 강의평이 많은 강의 순)"""
+    traffic = summary_request_counts(get_mongo_db().review_summary_traffic)
+    targets = []
+    for doc in get_course_aggregates().list():
+        professor = '' if doc['professor'] == 'Unknown' else doc['professor']
+        key = ReviewSummaryCache.course_key(doc['course_name'], professor)
+        targets.append({
+            'key': key,
+            'course_name': doc['course_name'],
+            'professor': professor,
+            'hits': traffic.get(key, 0),
+            'review_count': doc.get('review_count', 0)
+        })
+    targets.sort(key=lambda target: (-target['hits'], -target['review_count']))
+    return targets
+
+
+def precompute_review_summary(target):
+    """강의 하나의 요약을 최신 상태로 (결과: generated | skipped | empty)"""
+    course_name, professor = target['course_name'], target['professor']
+    selected, digest, review_count = summary_inputs(course_name, professor)
+    if not selected:
+        return 'empty'
+    cached = review_summary_cache.get(course_name, professor)
+    if cached and cached.get('reviews_hash') == digest:
+        return 'skipped'
+    create_review_summary(course_name, professor, selected, digest, review_count)
+    return 'generated'
+
+
+summary_precompute_job = PrecomputeJob(
+    'review_summary_precompute',
+    summary_precompute_targets,
+    precompute_review_summary,
+    lambda: get_mongo_db().jobs,
+    max_workers=SUMMARY_PRECOMPUTE_WORKERS,
+    rate_per_second=SUMMARY_PRECOMPUTE_RPS
+)
+
+
+def _start_summary_precompute():
+    try:
+        if SUMMARY_PRECOMPUTE_ON_START:
+            summary_precompute_job.start(resume=True)
+        else:
+            summary_precompute_job.resume_if_interrupted()
+    except Exception as e:
+        print(f"⚠️ 강의평 요약 사전 생성 시작 실패: {e}")
+
+
+threading.Thread(target=_start_summary_precompute, name="summary-precompute-start", daemon=True).start()
+
+
+def admin_token_error():
+    """ADMIN_API_TOKEN이 설정되어 있으면 X-Admin-Token 헤더 확인"""
+    if ADMIN_API_TOKEN and request.headers.get('X-Admin-Token') != ADMIN_API_TOKEN:
+        return jsonify({'success': False, 'error': 'unauthorized'}), 401
+    return None
+
+
+@app.route('/api/admin/summaries/precompute', methods=['GET'])
+def get_summary_precompute_status():
+    """요약 사전 생성 진행률/처리량"""
+    error = admin_token_error()
+    if error:
+        return error
+    try:
+        return jsonify({'success': True, 'job': summary_precompute_job.status()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/admin/summaries/precompute', methods=['POST'])
+def start_summary_precompute():
+    """
+    요약 사전 생성 시작
+    {"resume": true}  # 기본값, 중단된 실행을 체크포인트부터 이어서 / false면 처음부터
+    """
+    error = admin_token_error()
+    if error:
+        return error
+    body = request.get_json(silent=True) or {}
+    try:
+        result = summary_precompute_job.start(resume=body.get('resume', True) is not False)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({'success': True, **result, 'job': summary_precompute_job.status()}), 202 if result['started'] else 409
+
+
+@app.route('/api/admin/summaries/precompute/stop', methods=['POST'])
+def stop_summary_precompute():
+    """요약 사전 생성 중지 (진행 중인 청크가 끝나면 멈추고 체크포인트 유지)"""
+    error = admin_token_error()
+    if error:
+        return error
+    return jsonify({'success': True, 'stopping': summary_precompute_job.stop()})
+
+
 @app.route('/api/courses/from-pinecone', methods=['GET'])
 def get_courses_from_pinecone():
     """Pinecone에서 강의 목록 가져오기 (강의평 기반으로 요약)"""
     try:
-        from pinecone import Pinecone
-        from collections import defaultdict
-        
-        PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
-        PINECONE_INDEX = os.getenv('PINECONE_INDEX', 'courses-dev')
-        
-        if not PINECONE_API_KEY:
-            return jsonify({'success': False, 'error': 'PINECONE_API_KEY not set'}), 500
-        
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        index = pc.Index(PINECONE_INDEX)
-        
-        # 모든 강의평 벡터 가져오기
-        results = index.query(
-            vector=[0.0] * 768,
-            top_k=10000,
-            include_metadata=True
-        )
-        
-        # 강의별로 그룹화
-        courses_dict = defaultdict(lambda: {
-            'reviews': [],
-            'ratings': [],
-            'semesters': set(),
-            'professors': set()
-        })
-        
-        for match in results.matches:
-            meta = match.metadata
-            if not meta:
-                continue
-                
-            course_name = meta.get('course_name', 'Unknown')
-            professor = meta.get('professor', 'Unknown')
-            rating = meta.get('rating', 0)
-            semester = meta.get('semester', '')
-            text = meta.get('text', '')
-            
-            key = f"{course_name}_{professor}"
-            courses_dict[key]['course_name'] = course_name
-            courses_dict[key]['professor'] = professor
-            courses_dict[key]['department'] = meta.get('department', '소프트웨어학과')
-            courses_dict[key]['reviews'].append(text)
-            courses_dict[key]['ratings'].append(float(rating))
-            courses_dict[key]['semesters'].add(semester)
-            courses_dict[key]['professors'].add(professor)
+        # 강의평 미러 동기화가 course_aggregates를 증분 갱신 (미러가 아직 없으면 백그라운드 로드만 시작)
+        aggregates = get_course_aggregates()
+        if resources.is_loaded("review_store"):
+            get_review_store()
+        elif aggregates.is_empty():
+            # 콜드 스타트: 집계가 비어 있으면 빈 목록 대신 미러를 지금 로드 (로드하면서 집계를 처음 구축)
+            try:
+                store = get_review_store()
+            except Exception as e:
+                print(f"⚠️ 강의평 미러 로드 실패: {e}")
+                store = None
+            if store is None or (len(store.table) and aggregates.is_empty()):
+                response = jsonify({
+                    'success': False,
+                    'error': 'warming_up',
+                    'message': '강의 목록을 준비하는 중입니다. 잠시 후 다시 시도해주세요.'
+                })
+                response.headers['Retry-After'] = '10'
+                return response, 503
+        else:
+            resources.load_in_background("review_store")
         
-        # 강의 목록 생성
+        # 강의별 집계를 평점 높은 순으로 한 번에 읽기 (인덱스 정렬)
         courses = []
-        for idx, (key, data) in enumerate(courses_dict.items(), 1):
-            avg_rating = sum(data['ratings']) / len(data['ratings']) if data['ratings'] else 0
-            review_count = len(data['reviews'])
+        for idx, data in enumerate(aggregates.list(), 1):
+            avg_rating = data.get('average_rating', 0) or 0
+            review_count = data.get('review_count', 0)
             
-            # 최근 강의평 3개로 AI 요약 생성
-            recent_reviews = data['reviews'][:3]
+            # 최근 강의평으로 AI 요약 생성
+            recent_reviews = data.get('sample_reviews', [])
             ai_summary = ' '.join(recent_reviews[:2])[:150] + '...' if recent_reviews else '강의평 정보 없음'
             
-            # 태그 추출 (간단한 키워드 기반)
-            tags = []
-            all_text = ' '.join(data['reviews'])
-            if '팀플' in all_text or '팀프로젝트' in all_text:
-                if '없' in all_text or '노팀플' in all_text:
-                    tags.append('노팀플')
-                else:
-                    tags.append('팀플있음')
-            if '과제' in all_text:
-                if '많' in all_text:
-                    tags.append('과제많음')
-                else:
-                    tags.append('적당한과제')
-            if '꿀강' in all_text or '쉬' in all_text:
-                tags.append('쉬움')
-            if '성적' in all_text and '잘' in all_text:
-                tags.append('성적잘줌')
+            # 태그/감정/난이도/과제량 (업로드 시 분석한 강의평 필드의 집계, 본문을 다시 훑지 않음)
+            tags = derive_tags(data)
+            enrichment = enrichment_summary(data)
+            sentiment = enrichment['sentiment']
             
             courses.append({
                 'id': idx,
@@ -1982,22 +2085,19 @@ def get_courses_from_pinecone():
                 'reviewCount': review_count,
                 'popularity': min(100, review_count * 3),
                 'tags': tags[:4] if tags else ['강의평있음'],
-                'semester': max(data['semesters']) if data['semesters'] else '2024-2',
+                'semester': data.get('latest_semester', '2024-2'),
                 'timeSlot': '-',
                 'room': '-',
                 'aiSummary': ai_summary,
-                'sentiment': int(avg_rating * 20),
-                'difficulty': 3,
-                'workload': 3,
+                'sentiment': int((sentiment + 1) * 50) if sentiment is not None else int(avg_rating * 20),
+                'difficulty': round(enrichment['difficulty']) if enrichment['difficulty'] is not None else 3,
+                'workload': round(enrichment['workload']) if enrichment['workload'] is not None else 3,
                 'gradeGenerosity': int(avg_rating),
                 'bookmarked': False,
                 'trend': 'up' if avg_rating >= 4.0 else 'down',
                 'keywords': []
             })
         
-        # 평점 높은 순으로 정렬
-        courses.sort(key=lambda x: x['rating'], reverse=True)
-        
         return jsonify({
             'success': True,
             'courses': courses,
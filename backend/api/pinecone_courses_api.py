@@ -8,6 +8,8 @@ from dotenv import load_dotenv
 from pinecone import Pinecone
 from collections import defaultdict
 
+from backend.rag.review_store import ReviewStore
+
 load_dotenv()
 
 app = Flask(__name__)
@@ -17,19 +19,20 @@ CORS(app)
 PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
 PINECONE_INDEX = os.getenv('PINECONE_INDEX', 'courses-dev')
 
+# 강의평 로컬 미러 (lecture_api.py와 같은 data/review_store 스냅샷 공유)
+review_store = ReviewStore(
+    lambda: Pinecone(api_key=PINECONE_API_KEY).Index(PINECONE_INDEX),
+    sync_interval=float(os.getenv('REVIEW_STORE_SYNC_SECONDS', 600))
+)
+
 @app.route('/api/courses/from-pinecone', methods=['GET'])
 def get_courses_from_pinecone():
     """Pinecone에서 강의 목록 가져오기 (강의평 기반으로 요약)"""
     try:
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        index = pc.Index(PINECONE_INDEX)
-        
-        # 모든 강의평 벡터 가져오기
-        results = index.query(
-            vector=[0.0] * 768,
-            top_k=10000,
-            include_metadata=True
-        )
+        if review_store.synced_at is None:
+            review_store.load()
+        else:
+            review_store.maybe_sync()
         
         # 강의별로 그룹화
         courses_dict = defaultdict(lambda: {
@@ -39,21 +42,19 @@ def get_courses_from_pinecone():
             'professors': set()
         })
         
-        for match in results.matches:
-            meta = match.metadata
-            if not meta:
-                continue
+        for match in review_store.find():
+            meta = match['metadata']
                 
-            course_name = meta.get('course_name', 'Unknown')
-            professor = meta.get('professor', 'Unknown')
-            rating = meta.get('rating', 0)
+            course_name = meta.get('course_name') or 'Unknown'
+            professor = meta.get('professor') or 'Unknown'
+            rating = meta.get('rating') or 0
             semester = meta.get('semester', '')
             text = meta.get('text', '')
             
             key = f"{course_name}_{professor}"
             courses_dict[key]['course_name'] = course_name
             courses_dict[key]['professor'] = professor
-            courses_dict[key]['department'] = meta.get('department', '소프트웨어학과')
+            courses_dict[key]['department'] = meta.get('department') or '소프트웨어학과'
             courses_dict[key]['reviews'].append(text)
             courses_dict[key]['ratings'].append(float(rating))
             courses_dict[key]['semesters'].add(semester)
@@ -1,17 +1,18 @@
 #!/usr/bin/env python3
 """Pinecone 강의 데이터 API"""
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 import os
 import json
 import sys
+import time
+import queue
+import threading
 from dotenv import load_dotenv
 from pinecone import Pinecone
 from collections import defaultdict
-from sentence_transformers import SentenceTransformer
-from langchain_pinecone import PineconeVectorStore
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
 import google.generativeai as genai
 
@@ -19,6 +20,23 @@ import google.generativeai as genai
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from backend.api import get_mongo_db
+from backend.rag.stage_executor import StageExecutor, get_fanout_pool
+from backend.rag.query_utils import normalize_query, query_similarity
+from backend.rag.embedding_cache import get_embedding_cache
+from backend.rag.onnx_embedder import embedding_cache_name, load_embedding_model
+from backend.rag.intent_cache import IntentCache, prompt_version
+from backend.rag.answer_cache import AnswerCache, record_review_upload
+from backend.rag.local_vector_index import LocalVectorIndex
+from backend.rag.lexical_index import get_lexical_index, reciprocal_rank_fusion
+from backend.rag.pinecone_scan import fetch_all_records
+from backend.rag.resource_registry import ResourceRegistry
+from backend.rag.course_aggregates import CourseAggregates, rating_key
+from backend.rag.course_lookup import (
+    COURSE_FILTER_PROJECTION, LOOKUP_FIELD, build_course_query, explain_course_query, has_prefix_filter
+)
+from backend.rag.batch_runner import RateLimiter, chunked, parse_json_array, run_bounded, strip_code_fence
+from backend.rag.context_packer import CONTEXT_FORMAT_VERSION, PackedContext, pack_context
+from backend.rag.local_intent import Gazetteer, LocalIntentClassifier, mongo_gazetteer_loader
 
 # LangChain Embeddings import (버전에 따라 경로가 다를 수 있음)
 try:
@@ -38,6 +56,12 @@ app = Flask(__name__)
 app.config['JSON_AS_ASCII'] = False
 CORS(app)
 
+# ───────────────────────────────────────────────
+# 무거운 리소스 레지스트리 (임베딩 모델, 벡터 인덱스 등은 import 시점이 아니라
+# RESOURCE_PRELOAD 설정에 따라 미리/처음 사용할 때 로드, /ready에서 상태 확인)
+# ───────────────────────────────────────────────
+resources = ResourceRegistry()
+
 # ───────────────────────────────────────────────
 # Pinecone 연결
 # ───────────────────────────────────────────────
@@ -46,11 +70,119 @@ PINECONE_INDEX = os.getenv('PINECONE_INDEX', 'courses-dev')
 
 pc = Pinecone(api_key=PINECONE_API_KEY)
 
+# ───────────────────────────────────────────────
+# 벡터 검색 백엔드 선택
+# VECTOR_BACKEND=local이면 스냅샷(scripts/build_local_vector_index.py로 생성)을 불러와
+# Pinecone 대신 프로세스 내에서 검색 (스냅샷이 없거나 로드 실패 시 Pinecone 사용)
+# ───────────────────────────────────────────────
+VECTOR_BACKEND = os.getenv('VECTOR_BACKEND', 'pinecone').lower()
+LOCAL_VECTOR_SNAPSHOT = os.getenv('LOCAL_VECTOR_SNAPSHOT', os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'vector_index'))
+
+def load_local_vector_index() -> Optional[LocalVectorIndex]:
+    if VECTOR_BACKEND != 'local':
+        return None
+    try:
+        return LocalVectorIndex.load_snapshot(
+            LOCAL_VECTOR_SNAPSHOT,
+            mode=os.getenv('LOCAL_VECTOR_MODE', 'auto'),
+            quantize=os.getenv('LOCAL_VECTOR_QUANTIZE', 'false').lower() == 'true',
+            exact_threshold=int(os.getenv('LOCAL_VECTOR_EXACT_THRESHOLD', 20000)),
+            ef_search=int(os.getenv('LOCAL_VECTOR_EF_SEARCH', 64))
+        )
+    except Exception as e:
+        print(f"⚠️ 로컬 벡터 인덱스 로드 실패 (Pinecone 사용): {e}")
+        return None
+
+def get_local_vector_index() -> Optional[LocalVectorIndex]:
+    return resources.get("local_vector_index")
+
+def get_vector_index():
+    """검색에 사용할 인덱스 (로컬 인덱스 또는 Pinecone Index, query() 인터페이스 동일)"""
+    local_vector_index = get_local_vector_index()
+    if local_vector_index is not None:
+        return local_vector_index
+    return resources.get("pinecone_index")
+
+# ───────────────────────────────────────────────
+# 키워드(BM25) 인덱스 - 의미 검색과 동시에 실행해 RRF로 결합
+# 서버 시작 시 백그라운드에서 강의평 text로 색인 (완료 전에는 의미 검색만 사용)
+# 업로드 스크립트는 다른 프로세스이므로, 검색 시 LEXICAL_INDEX_SYNC_SECONDS마다 Pinecone과 ID 기준 증분 동기화
+# ───────────────────────────────────────────────
+HYBRID_SEARCH_ENABLED = os.getenv('HYBRID_SEARCH_ENABLED', 'true').lower() == 'true'
+HYBRID_RRF_K = int(os.getenv('HYBRID_RRF_K', 60))
+LEXICAL_INDEX_SYNC_SECONDS = float(os.getenv('LEXICAL_INDEX_SYNC_SECONDS', 600))
+
+lexical_index = get_lexical_index()
+lexical_synced_at = 0.0
+lexical_sync_lock = threading.Lock()
+
+def load_lexical_index() -> None:
+    """로컬 벡터 인덱스(있으면) 또는 Pinecone 전체 metadata로 키워드 인덱스 적재"""
+    global lexical_synced_at
+    try:
+        local_vector_index = get_local_vector_index()
+        if local_vector_index is not None:
+            records = [
+                {"id": vector_id, "metadata": metadata}
+                for vector_id, metadata in zip(local_vector_index.ids, local_vector_index.metadata)
+            ]
+        else:
+            records = fetch_all_records(pc.Index(PINECONE_INDEX), include_values=False)
+        count = lexical_index.load(records)
+        print(f"✅ 키워드 인덱스 적재 완료: {count}개 강의평")
+        if local_vector_index is not None:
+            # 스냅샷 이후 업로드된 강의평 반영
+            sync_lexical_index()
+    except Exception as e:
+        print(f"⚠️ 키워드 인덱스 적재 실패 (의미 검색만 사용): {e}")
+    lexical_synced_at = time.time()
+
+def sync_lexical_index() -> None:
+    """Pinecone에 새로 올라온/삭제된 강의평만 키워드 인덱스에 반영"""
+    global lexical_synced_at
+    if not lexical_sync_lock.acquire(blocking=False):
+        return
+    try:
+        result = lexical_index.sync(pc.Index(PINECONE_INDEX))
+        print(f"✅ 키워드 인덱스 동기화: +{result['added']} -{result['removed']} → {result['total']}개")
+    except Exception as e:
+        print(f"⚠️ 키워드 인덱스 동기화 실패: {e}")
+    finally:
+        lexical_synced_at = time.time()
+        lexical_sync_lock.release()
+
+def maybe_sync_lexical_index() -> None:
+    """마지막 동기화 후 LEXICAL_INDEX_SYNC_SECONDS가 지났으면 백그라운드 동기화 시작"""
+    if LEXICAL_INDEX_SYNC_SECONDS <= 0 or time.time() - lexical_synced_at < LEXICAL_INDEX_SYNC_SECONDS:
+        return
+    if lexical_sync_lock.locked():
+        return
+    threading.Thread(target=sync_lexical_index, name="lexical-index-sync", daemon=True).start()
+
+def _load_lexical_index_resource():
+    load_lexical_index()
+    return lexical_index
+
 # ───────────────────────────────────────────────
 # Embedding 모델 - multilingual-e5-base
 # ───────────────────────────────────────────────
 # embedding_model = SentenceTransformer("intfloat/multilingual-e5-base")
-embedding_model = SentenceTransformer("jhgan/ko-sroberta-multitask")
+EMBEDDING_MODEL_NAME = "jhgan/ko-sroberta-multitask"
+
+def get_embedding_model():
+    """임베딩 모델 (EMBEDDING_BACKEND=onnx면 scripts/export_onnx_embedder.py로 만든 ONNX Runtime 모델)"""
+    return resources.get("embedding_model")
+
+def get_embedding_cache_name() -> str:
+    """캐시 키용 모델명 (ONNX/PyTorch 결과 구분)"""
+    return embedding_cache_name(EMBEDDING_MODEL_NAME, get_embedding_model())
+
+def warmup_embedding_model(model) -> None:
+    """첫 요청 지연을 없애기 위한 더미 인코딩"""
+    model.encode(["query: 워밍업", "passage: 워밍업 문장"], normalize_embeddings=True)
+
+# 쿼리 임베딩 캐시 (vector_store.py와 공유)
+embedding_cache = get_embedding_cache()
 
 # ───────────────────────────────────────────────
 # LangChain Embeddings 인터페이스 구현
@@ -58,8 +190,9 @@ embedding_model = SentenceTransformer("jhgan/ko-sroberta-multitask")
 class SentenceTransformerEmbeddings(Embeddings):
     """SentenceTransformer를 LangChain Embeddings 인터페이스로 래핑"""
     
-    def __init__(self, model: SentenceTransformer):
+    def __init__(self, model: Any, model_name: Optional[str] = None):
         self.model = model
+        self.model_name = model_name or embedding_cache_name(EMBEDDING_MODEL_NAME, model)
     
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """문서 임베딩 (passage 프리픽스 사용)"""
@@ -72,28 +205,39 @@ class SentenceTransformerEmbeddings(Embeddings):
         """쿼리 임베딩 (query 프리픽스 사용)"""
         # E5 모델은 query 프리픽스 사용
         formatted = f"query: {text}"
-        embedding = self.model.encode([formatted], normalize_embeddings=True)
-        return embedding[0].tolist()
+        return embedding_cache.encode(self.model, self.model_name, [formatted])[0]
 
 # ───────────────────────────────────────────────
 # VectorStore 초기화 함수
 # ───────────────────────────────────────────────
-def init_vectorstore() -> PineconeVectorStore:
+def init_vectorstore() -> "PineconeVectorStore":
     """
     Pinecone VectorStore 초기화
     upsert와 동일한 구조로 생성
     """
-    embeddings = SentenceTransformerEmbeddings(embedding_model)
+    from langchain_pinecone import PineconeVectorStore
+
+    embeddings = SentenceTransformerEmbeddings(get_embedding_model())
     vectorstore = PineconeVectorStore(
         index_name=PINECONE_INDEX,
         embedding=embeddings
     )
     return vectorstore
 
+def get_vectorstore() -> "PineconeVectorStore":
+    """LangChain Pinecone VectorStore (처음 사용할 때 생성)"""
+    return resources.get("vectorstore")
+
 # ───────────────────────────────────────────────
-# LangChain Pinecone VectorStore (전역 인스턴스)
+# 리소스 등록 (등록 순서 = 미리 로드 순서)
+# Pinecone 클라이언트/VectorStore는 fork 전에 연결을 만들지 않도록 사용할 때 생성
 # ───────────────────────────────────────────────
-vectorstore = init_vectorstore()
+resources.register("embedding_model", lambda: load_embedding_model(EMBEDDING_MODEL_NAME), warmup=warmup_embedding_model)
+resources.register("local_vector_index", load_local_vector_index)
+resources.register("pinecone_index", lambda: pc.Index(PINECONE_INDEX), preload=False)
+resources.register("lexical_index", _load_lexical_index_resource, required=False, preload=HYBRID_SEARCH_ENABLED)
+resources.register("vectorstore", init_vectorstore, required=False, preload=False)
+resources.start()
 
 # ───────────────────────────────────────────────
 # Gemini LLM 호출
@@ -107,6 +251,21 @@ def call_gemini(prompt):
     response = model.generate_content(prompt)
     return response.text
 
+# ───────────────────────────────────────────────
+# 파이프라인 단계별 타임아웃 (초)
+# ───────────────────────────────────────────────
+STAGE_TIMEOUT_MONGO = float(os.getenv('RAG_TIMEOUT_MONGO', 5))
+STAGE_TIMEOUT_EMBED = float(os.getenv('RAG_TIMEOUT_EMBED', 10))
+STAGE_TIMEOUT_PINECONE = float(os.getenv('RAG_TIMEOUT_PINECONE', 10))
+STAGE_TIMEOUT_LLM = float(os.getenv('RAG_TIMEOUT_LLM', 60))
+
+# ───────────────────────────────────────────────
+# 추측(speculative) 검색 설정
+# intent 분석(Gemini)이 끝나기 전에 원본 질문으로 Pinecone 검색을 미리 시작
+# ───────────────────────────────────────────────
+RAG_SPECULATIVE_RETRIEVAL = os.getenv('RAG_SPECULATIVE_RETRIEVAL', 'true').lower() == 'true'
+RAG_SPECULATIVE_MIN_SIMILARITY = float(os.getenv('RAG_SPECULATIVE_MIN_SIMILARITY', 0.85))
+
 # ───────────────────────────────────────────────
 # Intent 클래스 (질문 의도 분석 결과)
 # ───────────────────────────────────────────────
@@ -116,6 +275,8 @@ class QueryIntent(BaseModel):
     filters: Dict[str, Any]
     semantic_query: str
     comparison_targets: Optional[Dict[str, Any]] = None  # 비교 대상 정보
+    source: Optional[str] = None  # 분석 경로: "local" | "llm" | "cache" | "fallback"
+    confidence: Optional[float] = None  # 로컬 규칙 분석 신뢰도 (0.0~1.0)
     # comparison_targets 구조:
     # {
     #   "course_names": List[str],  # 비교 대상 강의명 리스트
@@ -126,20 +287,10 @@ class QueryIntent(BaseModel):
 # ───────────────────────────────────────────────
 # Helper 함수들
 # ───────────────────────────────────────────────
-def classify_query_intent(user_query: str) -> QueryIntent:
-    """
-    질문 의도 분석 (Structured / Semantic 분리)
-    Gemini를 사용하여 사용자 질문을 분석하고 구조적 필터와 의미 검색 쿼리를 분리
-    
-    Args:
-        user_query: 사용자 질문
-        
-    Returns:
-        QueryIntent: 분석된 의도 정보
-    """
-    try:
-        # Gemini 프롬프트 구성
-        prompt = f"""사용자 질문을 분석하여 다음 정보를 JSON 형식으로 반환해주세요:
+# ───────────────────────────────────────────────
+# 질문 의도 분석 프롬프트 (템플릿이 바뀌면 INTENT_PROMPT_VERSION이 바뀌어 캐시가 무효화됨)
+# ───────────────────────────────────────────────
+INTENT_PROMPT_TEMPLATE = """사용자 질문을 분석하여 다음 정보를 JSON 형식으로 반환해주세요:
 
 1. 구조적 필터 필요 여부 (needs_structured_filter):
    - MongoDB course에 있는 필드로 필터링이 필요한지 판단
@@ -198,73 +349,344 @@ def classify_query_intent(user_query: str) -> QueryIntent:
     }}
 }}"""
 
-        # Gemini 모델 호출
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # JSON 파싱 (마크다운 코드 블록 제거)
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
+INTENT_PROMPT_VERSION = prompt_version(INTENT_PROMPT_TEMPLATE)
+
+# 여러 질문을 한 번에 분석하는 프롬프트 (분석 기준은 INTENT_PROMPT_TEMPLATE과 동일, 응답은 JSON 배열)
+INTENT_BATCH_PROMPT_TEMPLATE = INTENT_PROMPT_TEMPLATE.split('사용자 질문: "{user_query}"')[0] + """각 질문을 서로 독립적으로 위 기준에 따라 분석하세요.
+
+사용자 질문 목록 (번호: 질문):
+{numbered_queries}
+
+반드시 질문 수({count}개)와 같은 길이의 JSON 배열로만 응답하세요 (추가 설명 없이).
+각 원소의 index는 질문 번호와 같아야 합니다:
+[
+    {{
+        "index": 0,
+        "needs_structured_filter": true/false,
+        "filters": {{}},
+        "semantic_query": "정제된 질문",
+        "comparison_targets": {{
+            "course_names": [],
+            "professors": [],
+            "comparison_type": null
+        }}
+    }}
+]"""
+
+def _intent_cache_collection():
+    return get_mongo_db().intent_cache
+
+intent_cache = IntentCache(
+    version=INTENT_PROMPT_VERSION,
+    max_entries=int(os.getenv('INTENT_CACHE_SIZE', 1024)),
+    ttl_seconds=int(os.getenv('INTENT_CACHE_TTL', 7 * 24 * 3600)),
+    collection_getter=_intent_cache_collection if os.getenv('INTENT_CACHE_MONGO', 'true').lower() == 'true' else None
+)
+
+# 최종 답변 캐시 (질문 + intent + 검색 결과 ID + 최근 대화 기준)
+# answer_cache 객체는 버전에 답변 프롬프트/컨텍스트 형식을 넣기 위해 build_answer_prompt() 아래에서 생성
+ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', 'true').lower() == 'true'
+
+# ───────────────────────────────────────────────
+# 로컬 규칙 기반 의도 분석 (신뢰도가 높으면 Gemini 호출 생략)
+# ───────────────────────────────────────────────
+INTENT_LOCAL_ENABLED = os.getenv('INTENT_LOCAL_ENABLED', 'true').lower() == 'true'
+INTENT_LOCAL_MIN_CONFIDENCE = float(os.getenv('INTENT_LOCAL_MIN_CONFIDENCE', 0.75))
+
+local_intent_classifier = LocalIntentClassifier(
+    Gazetteer(
+        mongo_gazetteer_loader(get_mongo_db),
+        refresh_seconds=int(os.getenv('INTENT_GAZETTEER_REFRESH', 3600))
+    )
+)
+
+def classify_query_intent_locally(user_query: str) -> Optional[QueryIntent]:
+    """로컬 규칙으로 의도 분석. 신뢰도가 기준 미만이면 None"""
+    try:
+        intent_data, confidence, signals = local_intent_classifier.classify(user_query)
+    except Exception as e:
+        print(f"⚠️ 로컬 의도 분석 오류: {e}")
+        return None
+    if confidence < INTENT_LOCAL_MIN_CONFIDENCE:
+        print(f"🔀 로컬 의도 분석 신뢰도 낮음 ({confidence:.2f}, {signals}) → Gemini 사용")
+        return None
+    print(f"⚡ 로컬 의도 분석 사용 ({confidence:.2f}, {signals})")
+    return QueryIntent(**intent_data, source="local", confidence=confidence)
+
+def default_intent(user_query: str) -> QueryIntent:
+    """의도 분석 실패 시 사용하는 기본값 (구조적 필터 없음, 원본 질문 그대로)"""
+    return QueryIntent(
+        needs_structured_filter=False,
+        filters={},
+        semantic_query=user_query,
+        comparison_targets={
+            "course_names": [],
+            "professors": [],
+            "comparison_type": None
+        },
+        source="fallback"
+    )
+
+def classify_query_intent_with_llm(user_query: str) -> QueryIntent:
+    """
+    Gemini를 사용하여 사용자 질문을 분석하고 구조적 필터와 의미 검색 쿼리를 분리
+    (캐시를 거치지 않음, 실패 시 예외 발생)
+    
+    Args:
+        user_query: 사용자 질문
         
-        # JSON 파싱
+    Returns:
+        QueryIntent: 분석된 의도 정보
+    """
+    # Gemini 프롬프트 구성
+    prompt = INTENT_PROMPT_TEMPLATE.format(user_query=user_query)
+
+    # Gemini 모델 호출
+    model = genai.GenerativeModel("gemini-2.5-flash")
+    response = model.generate_content(prompt)
+    
+    # JSON 파싱 (마크다운 코드 블록 제거)
+    response_text = strip_code_fence(response.text)
+    try:
         intent_data = json.loads(response_text)
+    except json.JSONDecodeError:
+        print(f"   Gemini 응답: {response_text}")
+        raise
+    
+    return intent_from_llm_data(intent_data, user_query)
+
+def intent_from_llm_data(intent_data: Dict[str, Any], user_query: str, source: str = "llm") -> QueryIntent:
+    """Gemini가 반환한 intent JSON(dict)으로 QueryIntent 생성"""
+    comparison_targets = intent_data.get("comparison_targets")
+    if comparison_targets is None:
+        comparison_targets = {
+            "course_names": [],
+            "professors": [],
+            "comparison_type": None
+        }
+    
+    return QueryIntent(
+        needs_structured_filter=intent_data.get("needs_structured_filter", False),
+        filters=intent_data.get("filters") or {},
+        semantic_query=intent_data.get("semantic_query") or user_query,
+        comparison_targets=comparison_targets,
+        source=source
+    )
+
+def classify_query_intent(user_query: str) -> QueryIntent:
+    """
+    질문 의도 분석 (Structured / Semantic 분리)
+    1) 같은 질문(공백/대소문자 무시)은 intent 캐시에서 바로 반환
+    2) 로컬 규칙 분석의 신뢰도가 충분하면 그대로 사용
+    3) 그 외에는 Gemini로 분석
+    
+    Args:
+        user_query: 사용자 질문
         
-        # QueryIntent 객체 생성
-        comparison_targets = intent_data.get("comparison_targets")
-        if comparison_targets is None:
-            comparison_targets = {
-                "course_names": [],
-                "professors": [],
-                "comparison_type": None
-            }
-        
-        return QueryIntent(
-            needs_structured_filter=intent_data.get("needs_structured_filter", False),
-            filters=intent_data.get("filters", {}),
-            semantic_query=intent_data.get("semantic_query", user_query),
-            comparison_targets=comparison_targets
-        )
+    Returns:
+        QueryIntent: 분석된 의도 정보
+    """
+    cached = intent_cache.get(user_query)
+    if cached is not None:
+        return QueryIntent(**{**cached, "source": "cache"})
+    
+    if INTENT_LOCAL_ENABLED:
+        local_intent = classify_query_intent_locally(user_query)
+        if local_intent is not None:
+            return local_intent
+    
+    try:
+        intent = classify_query_intent_with_llm(user_query)
+        # 정상적으로 파싱된 결과만 캐시 (실패 시 기본값은 캐시하지 않음)
+        intent_cache.put(user_query, intent.model_dump())
+        return intent
         
     except json.JSONDecodeError as e:
         print(f"⚠️ JSON 파싱 오류: {e}")
-        print(f"   Gemini 응답: {response_text if 'response_text' in locals() else 'N/A'}")
         # 파싱 실패 시 기본값 반환
-        return QueryIntent(
-            needs_structured_filter=False,
-            filters={},
-            semantic_query=user_query,
-            comparison_targets={
-                "course_names": [],
-                "professors": [],
-                "comparison_type": None
-            }
-        )
+        return default_intent(user_query)
     except Exception as e:
         print(f"❌ 질문 의도 분석 오류: {e}")
         import traceback
         traceback.print_exc()
         # 에러 발생 시 기본값 반환
-        return QueryIntent(
-            needs_structured_filter=False,
-            filters={},
-            semantic_query=user_query,
-            comparison_targets={
-                "course_names": [],
-                "professors": [],
-                "comparison_type": None
-            }
-        )
+        return default_intent(user_query)
+
+# ───────────────────────────────────────────────
+# 대량 의도 분석 (프롬프트 회귀 테스트용 /api/v2/rag/test/intent/batch)
+# - concurrent: 질문별 Gemini 호출을 동시 실행 수/초당 호출 수 제한 하에 병렬 실행
+# - batch: 질문 여러 개를 한 프롬프트로 묶어 JSON 배열로 분석 (응답에서 빠진 질문만 개별 호출)
+# ───────────────────────────────────────────────
+INTENT_BATCH_SIZE = int(os.getenv('INTENT_BATCH_SIZE', 20))
+INTENT_BATCH_MAX_WORKERS = int(os.getenv('INTENT_BATCH_MAX_WORKERS', 8))
+INTENT_BATCH_MAX_QUERIES = int(os.getenv('INTENT_BATCH_MAX_QUERIES', 500))
+
+# 의도 분석용 Gemini 호출 속도 제한 (프로세스 전체 공유)
+intent_llm_rate_limiter = RateLimiter(float(os.getenv('INTENT_LLM_RPS', 5)))
+
+def classify_query_intents_with_llm_batch(queries: List[str]) -> List[Optional[QueryIntent]]:
+    """
+    한 번의 Gemini 호출로 여러 질문 의도 분석
+    
+    Returns:
+        질문 순서대로 QueryIntent 리스트 (응답에서 빠졌거나 형식이 잘못된 항목은 None)
+    """
+    numbered_queries = "\n".join(
+        f"{i}: {json.dumps(query, ensure_ascii=False)}" for i, query in enumerate(queries)
+    )
+    prompt = INTENT_BATCH_PROMPT_TEMPLATE.format(numbered_queries=numbered_queries, count=len(queries))
+    model = genai.GenerativeModel("gemini-2.5-flash")
+    response = model.generate_content(prompt)
+    items = parse_json_array(response.text)
+    
+    intents: List[Optional[QueryIntent]] = [None] * len(queries)
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        index = item.get("index", position)
+        if not isinstance(index, int) or not 0 <= index < len(queries) or intents[index] is not None:
+            continue
+        try:
+            intents[index] = intent_from_llm_data(item, queries[index], source="llm_batch")
+        except Exception as e:
+            print(f"⚠️ 배치 intent 항목 파싱 실패 ({index}): {e}")
+    return intents
+
+def classify_query_intents(queries: List[str], mode: str = "concurrent", batch_size: int = INTENT_BATCH_SIZE,
+                           max_workers: int = INTENT_BATCH_MAX_WORKERS, llm_only: bool = False) -> Dict[str, Any]:
+    """
+    여러 질문 의도 분석
+    
+    Args:
+        queries: 질문 리스트 (정규화 기준 중복 질문은 한 번만 분석)
+        mode: "concurrent" (질문별 호출 병렬 실행) | "batch" (여러 질문을 한 프롬프트로)
+        batch_size: batch 모드에서 프롬프트 하나에 넣을 질문 수
+        max_workers: 동시에 실행할 Gemini 호출 수
+        llm_only: True면 캐시/로컬 분석을 건너뛰고 모두 Gemini로 분석 (프롬프트 회귀 테스트용)
+        
+    Returns:
+        {"results": [{query, intent | error, success}], "stats": {...}}
+    """
+    started = time.perf_counter()
+    unique: Dict[str, str] = {}
+    for query in queries:
+        unique.setdefault(normalize_query(query), query)
+    
+    resolved: Dict[str, QueryIntent] = {}
+    errors: Dict[str, str] = {}
+    
+    # 1) 캐시/로컬 규칙으로 바로 처리 가능한 질문
+    pending: List[str] = []
+    for key, query in unique.items():
+        if not llm_only:
+            cached = intent_cache.get(query)
+            if cached is not None:
+                resolved[key] = QueryIntent(**{**cached, "source": "cache"})
+                continue
+            if INTENT_LOCAL_ENABLED:
+                local_intent = classify_query_intent_locally(query)
+                if local_intent is not None:
+                    resolved[key] = local_intent
+                    continue
+        pending.append(query)
+    
+    llm_calls = 0
+    batch_missing = 0
+    
+    # 2) batch 모드: 질문 묶음 단위로 호출, 응답에서 빠진 질문은 개별 호출로 넘김
+    if mode == "batch" and pending:
+        chunks = chunked(pending, batch_size)
+        outcomes = run_bounded(chunks, classify_query_intents_with_llm_batch,
+                               max_workers=max_workers, rate_limiter=intent_llm_rate_limiter)
+        llm_calls += sum(outcome["attempts"] for outcome in outcomes)
+        remaining = []
+        for chunk, outcome in zip(chunks, outcomes):
+            intents = outcome["value"] if outcome["success"] else [None] * len(chunk)
+            for query, intent in zip(chunk, intents):
+                if intent is None:
+                    remaining.append(query)
+                else:
+                    resolved[normalize_query(query)] = intent
+        batch_missing = len(remaining)
+        pending = remaining
+    
+    # 3) 질문별 호출 (concurrent 모드 또는 batch 응답에서 빠진 질문)
+    if pending:
+        outcomes = run_bounded(pending, classify_query_intent_with_llm,
+                               max_workers=max_workers, rate_limiter=intent_llm_rate_limiter)
+        llm_calls += sum(outcome["attempts"] for outcome in outcomes)
+        for query, outcome in zip(pending, outcomes):
+            key = normalize_query(query)
+            if outcome["success"]:
+                resolved[key] = outcome["value"]
+                # 단건 프롬프트 결과만 캐시 (배치 프롬프트 결과는 캐시하지 않음)
+                intent_cache.put(query, outcome["value"].model_dump())
+            else:
+                errors[key] = outcome["error"]
+    
+    results = []
+    sources: Dict[str, int] = defaultdict(int)
+    for query in queries:
+        key = normalize_query(query)
+        if key in resolved:
+            intent = resolved[key]
+            sources[intent.source or "unknown"] += 1
+            results.append({"query": query, "intent": intent.model_dump(), "success": True})
+        else:
+            sources["error"] += 1
+            results.append({"query": query, "error": errors.get(key, "분석 실패"), "success": False})
+    
+    return {
+        "results": results,
+        "stats": {
+            "mode": mode,
+            "unique_queries": len(unique),
+            "llm_calls": llm_calls,
+            "batch_missing": batch_missing,
+            "sources": dict(sources),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    }
+
+# lookup 필드(scripts/backfill_course_lookup.py)가 채워졌는지 여부 (채워지기 전에는 기존 $regex 쿼리 사용)
+COURSE_LOOKUP_RECHECK_SECONDS = 300
+_course_lookup_state = {"ready": False, "checked_at": 0.0}
 
-def filter_from_mongodb(filters: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+def course_lookup_ready(collection) -> bool:
+    """모든 강의 문서에 lookup 필드가 있는지 (한 번 준비되면 다시 확인하지 않음)"""
+    if _course_lookup_state["ready"]:
+        return True
+    if time.time() - _course_lookup_state["checked_at"] < COURSE_LOOKUP_RECHECK_SECONDS:
+        return False
+    _course_lookup_state["checked_at"] = time.time()
+    ready = collection.find_one({LOOKUP_FIELD: {"$exists": False}}, {"_id": 1}) is None
+    if not ready:
+        print("⚠️ lookup 필드가 없는 강의 문서가 있어 $regex 필터 사용 (scripts/backfill_course_lookup.py 실행 필요)")
+    _course_lookup_state["ready"] = ready
+    return ready
+
+def legacy_course_query(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """lookup 필드가 없을 때의 기존 쿼리 (대소문자 무시 부분 일치, 인덱스 사용 불가)"""
+    query = {}
+    for field in ("department", "course_name", "professor", "course_type", "subject_type", "lecture_time", "lecture_method"):
+        if field in filters:
+            query[field] = {"$regex": filters[field], "$options": "i"}
+    for field in ("semester", "credits"):
+        if field in filters:
+            query[field] = filters[field]
+    return query
+
+def filter_from_mongodb(filters: Dict[str, Any], explain: bool = False) -> Optional[List[Dict[str, Any]]]:
     """
     MongoDB에서 구조적 필터로 강의 검색
+    정규화된 lookup 필드에 정확 일치/접두사 일치로 조회해 인덱스를 사용하고,
+    반환하는 13개 필드만 가져옴 (reviews 배열 제외)
+    강의명/교수명/학과명은 접두사 일치 결과가 없으면 부분 일치로 한 번 더 조회
     
     Args:
         filters: 필터 딕셔너리 (department, course_name, professor, 
                 semester, credits, course_type, subject_type, lecture_time, lecture_method 등)
+        explain: True면 실행한 쿼리의 실행 계획을 출력 (IXSCAN/COLLSCAN 확인용)
         
     Returns:
         List[Dict]: 강의 정보 리스트 (course_name, professor, department 등 포함)
@@ -277,52 +699,27 @@ def filter_from_mongodb(filters: Dict[str, Any]) -> Optional[List[Dict[str, Any]
         collection = db.courses
         
         # 동적 쿼리 구성
-        query = {}
-        
-        # department 필터
-        if "department" in filters:
-            query["department"] = {"$regex": filters["department"], "$options": "i"}
-        
-        # course_name 필터
-        if "course_name" in filters:
-            query["course_name"] = {"$regex": filters["course_name"], "$options": "i"}
-        
-        # professor 필터
-        if "professor" in filters:
-            query["professor"] = {"$regex": filters["professor"], "$options": "i"}
-        
-        # semester 필터 (year와 별도)
-        if "semester" in filters:
-            query["semester"] = filters["semester"]
-        
-        # credits 필터
-        if "credits" in filters:
-            query["credits"] = filters["credits"]
-        
-        # course_type 필터 (전필, 전선 등)
-        if "course_type" in filters:
-            query["course_type"] = {"$regex": filters["course_type"], "$options": "i"}
-        
-        # subject_type 필터
-        if "subject_type" in filters:
-            query["subject_type"] = {"$regex": filters["subject_type"], "$options": "i"}
-        
-        # lecture_time 필터
-        if "lecture_time" in filters:
-            query["lecture_time"] = {"$regex": filters["lecture_time"], "$options": "i"}
-        
-        # lecture_method 필터 (비대면, 대면 등)
-        if "lecture_method" in filters:
-            query["lecture_method"] = {"$regex": filters["lecture_method"], "$options": "i"}
+        if course_lookup_ready(collection):
+            queries = [build_course_query(filters)]
+            if has_prefix_filter(filters):
+                queries.append(build_course_query(filters, partial=True))
+        else:
+            queries = [legacy_course_query(filters)]
         
-        if not query:
+        if not queries[0]:
             return None
         
-        # MongoDB 검색 실행
-        cursor = collection.find(query).limit(100)  # 최대 100개
-        results = []
+        # MongoDB 검색 실행 (최대 100개)
+        docs: List[Dict[str, Any]] = []
+        for query in queries:
+            if explain:
+                print(f"🔎 실행 계획: {explain_course_query(collection, query)} (쿼리: {query})")
+            docs = list(collection.find(query, COURSE_FILTER_PROJECTION).limit(100))
+            if docs:
+                break
         
-        for doc in cursor:
+        results = []
+        for doc in docs:
             course_data = {
                 "course_name": doc.get("course_name", ""),
                 "professor": doc.get("professor", ""),
@@ -349,20 +746,205 @@ def filter_from_mongodb(filters: Dict[str, Any]) -> Optional[List[Dict[str, Any]
         traceback.print_exc()
         return None
 
-def semantic_search_pinecone(query: str, candidates: Optional[List[Dict[str, Any]]] = None, top_k: int = 5, comparison_targets: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+def embed_query(query: str) -> List[float]:
+    """검색 쿼리 임베딩 생성 (query 프리픽스, 정규화, 캐시 사용)"""
+    return embedding_cache.encode(get_embedding_model(), get_embedding_cache_name(), [f"query: {query}"])[0]
+
+# 비교 대상 묶음 검색에서 대상 하나당 가져올 결과 수 (교수별 그룹화에 충분하도록)
+COMPARISON_HITS_PER_TARGET = int(os.getenv('RAG_COMPARISON_HITS_PER_TARGET', 10))
+
+def _query_results(index, query_embedding: List[float], pinecone_filter: Dict[str, Any], top_k: int) -> List[Dict[str, Any]]:
+    """필터 검색 1회 → id, text, metadata, values 리스트 (점수 순)"""
+    response = index.query(
+        vector=query_embedding,
+        top_k=top_k,
+        include_metadata=True,
+        include_values=True,  # 컨텍스트 패킹(MMR)용 강의평 임베딩
+        filter=pinecone_filter
+    )
+    return [
+        {
+            "id": match.id,
+            "text": match.metadata.get("text", ""),
+            "metadata": match.metadata,
+            "values": list(match.values or [])
+        }
+        for match in response.matches
+    ]
+
+def _run_queries_concurrently(index, query_embedding: List[float], queries: Dict[str, tuple]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    여러 필터 검색을 동시에 실행
+    
+    Args:
+        queries: 이름 → (filter, top_k)
+    
+    Returns:
+        이름 → 결과 리스트 (오류 시 빈 리스트)
+    """
+    # 단계 풀에서 실행 중인 단계가 호출하므로 하위 검색은 별도 풀에서 실행 (단계 풀 고갈 방지)
+    pool = get_fanout_pool()
+    futures = {
+        name: pool.submit(_query_results, index, query_embedding, pinecone_filter, top_k)
+        for name, (pinecone_filter, top_k) in queries.items()
+    }
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=STAGE_TIMEOUT_PINECONE)
+        except Exception as e:
+            print(f"⚠️ 비교 대상 검색 오류 ({name}): {e}")
+            results[name] = []
+    return results
+
+def search_comparison_targets(query_embedding: List[float], comparison_targets: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    비교 대상 보장 검색 (강의명/교수명별로 최소 1개씩)
+    MongoDB 후보와 무관하므로 구조적 필터링과 동시에 실행할 수 있음
+    
+    대상별로 따로 검색하지 않고 강의명 $in / 교수명 $in 묶음 검색(최대 2회, 동시 실행) 후
+    (course_name, professor)별로 나눠 대상마다 최소 1개를 보장.
+    묶음 결과에서 빠진 대상만 대상별 검색으로 한 번 더 보충
+    
+    Args:
+        query_embedding: 쿼리 임베딩
+        comparison_targets: 비교 대상 정보 (course_names, professors, comparison_type)
+    
+    Returns:
+        List[Dict]: 보장된 검색 결과 리스트 (id, text, metadata, values)
+    """
+    guaranteed_results = []
+    guaranteed_keys = set()  # 중복 제거용: (course_name, professor) 튜플
+    
+    if not comparison_targets:
+        return guaranteed_results
+    
+    course_names = [name for name in comparison_targets.get("course_names", []) if name]
+    professors = comparison_targets.get("professors", []) or []
+    comparison_type = comparison_targets.get("comparison_type")
+    
+    if comparison_type not in ["course", "professor", "both"]:
+        return guaranteed_results
+    
+    professors = [name for name in professors if name] if comparison_type in ["professor", "both"] else []
+    # course_names는 있지만 professors가 없는 교수 비교 → 강의별 모든 교수를 1개씩
+    enumerate_professors = comparison_type in ["professor", "both"] and course_names and not professors
+    
+    index = get_vector_index()
+    print(f"🔍 비교 대상 보장 검색: course_names={course_names}, professors={professors}, type={comparison_type}")
+    
+    # 1) 묶음 검색 (강의명 $in, 교수명 $in) - 동시 실행
+    grouped_queries = {}
+    if course_names:
+        grouped_queries["course_name"] = (
+            {"course_name": {"$in": course_names}},
+            COMPARISON_HITS_PER_TARGET * len(course_names)
+        )
+    if professors:
+        grouped_queries["professor"] = (
+            {"professor": {"$in": professors}},
+            COMPARISON_HITS_PER_TARGET * len(professors)
+        )
+    grouped = _run_queries_concurrently(index, query_embedding, grouped_queries)
+    
+    # 2) 대상별 최고 점수 결과 찾기 (묶음 결과는 점수 순이므로 처음 나온 것이 최고)
+    def first_hit(results: List[Dict[str, Any]], field: str, value: str) -> Optional[Dict[str, Any]]:
+        return next((result for result in results if result["metadata"].get(field) == value), None)
+    
+    best_by_target = {}
+    for course_name in course_names:
+        best_by_target[("course_name", course_name)] = first_hit(grouped.get("course_name", []), "course_name", course_name)
+    for professor in professors:
+        best_by_target[("professor", professor)] = first_hit(grouped.get("professor", []), "professor", professor)
+    
+    # 3) 묶음 결과에서 빠진 대상만 대상별 검색으로 보충 (동시 실행)
+    missing = [target for target, hit in best_by_target.items() if hit is None]
+    if missing:
+        print(f"🔁 묶음 검색에서 빠진 비교 대상 보충 검색: {[value for _, value in missing]}")
+        fallback = _run_queries_concurrently(index, query_embedding, {
+            f"{field}:{value}": ({field: {"$eq": value}}, COMPARISON_HITS_PER_TARGET if field == "course_name" and enumerate_professors else 1)
+            for field, value in missing
+        })
+        for field, value in missing:
+            results = fallback.get(f"{field}:{value}", [])
+            best_by_target[(field, value)] = results[0] if results else None
+            grouped.setdefault(field, []).extend(results)
+    
+    def add(result: Optional[Dict[str, Any]]) -> None:
+        if result is None:
+            return
+        meta = result["metadata"]
+        key = (meta.get("course_name", ""), meta.get("professor", ""))
+        if key not in guaranteed_keys:
+            guaranteed_results.append(result)
+            guaranteed_keys.add(key)
+    
+    # 각 강의명별로 최소 1개씩
+    for course_name in course_names:
+        add(best_by_target[("course_name", course_name)])
+    
+    # 각 교수명별로 최소 1개씩 (교수 비교인 경우)
+    for professor in professors:
+        add(best_by_target[("professor", professor)])
+    
+    # 강의+교수 조합별로 최소 1개씩 (교수 목록 없이 강의만 주어진 교수 비교)
+    if enumerate_professors:
+        for course_name in course_names:
+            professors_found = set()
+            for result in grouped.get("course_name", []):
+                meta = result["metadata"]
+                prof_name = meta.get("professor", "")
+                if meta.get("course_name") == course_name and prof_name and prof_name not in professors_found:
+                    professors_found.add(prof_name)
+                    add(result)
+    
+    round_trips = (1 if grouped_queries else 0) + (1 if missing else 0)
+    print(f"✅ 비교 대상 보장 결과 {len(guaranteed_results)}개 (검색 {len(grouped_queries) + len(missing)}회, 왕복 {round_trips}회)")
+    return guaranteed_results
+
+def fuse_search_results(dense_results: List[Dict[str, Any]], lexical_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    Pinecone 의미 기반 검색 (metadata 필터 지원, 비교 대상 보장)
+    의미 검색과 키워드 검색 결과를 reciprocal rank fusion으로 합치기
+    
+    Returns:
+        List[Dict]: id, text, metadata (RRF 점수 순)
+    """
+    if not lexical_results:
+        return dense_results
+    results_by_id = {result["id"]: result for result in lexical_results}
+    results_by_id.update({result["id"]: result for result in dense_results})
+    fused = reciprocal_rank_fusion(
+        [[result["id"] for result in dense_results], [result["id"] for result in lexical_results]],
+        k=HYBRID_RRF_K
+    )
+    return [
+        {
+            "id": doc_id,
+            "text": results_by_id[doc_id].get("text", ""),
+            "metadata": results_by_id[doc_id]["metadata"],
+            "values": results_by_id[doc_id].get("values") or []  # 키워드 검색 결과에는 임베딩 없음
+        }
+        for doc_id, _ in fused
+    ]
+
+def semantic_search_pinecone(query: str, candidates: Optional[List[Dict[str, Any]]] = None, top_k: int = 5, comparison_targets: Optional[Dict[str, Any]] = None,
+                             query_embedding: Optional[List[float]] = None, guaranteed_results: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Pinecone 의미 기반 검색 + 키워드(BM25) 검색 RRF 결합 (metadata 필터 지원, 비교 대상 보장)
     
     Args:
         query: 검색할 쿼리 텍스트
         candidates: MongoDB 후보 목록 (course_name 리스트로 변환하여 필터링에 사용)
         top_k: 반환할 최대 결과 수
         comparison_targets: 비교 대상 정보 (course_names, professors, comparison_type)
+        query_embedding: 미리 계산된 쿼리 임베딩 (없으면 여기서 생성)
+        guaranteed_results: 미리 실행한 search_comparison_targets() 결과 (없으면 여기서 실행)
     
     Returns:
-        List[Dict]: metadata, text를 포함한 검색 결과 리스트
+        List[Dict]: id, metadata, text를 포함한 검색 결과 리스트
         [
             {
+                "id": "Pinecone 벡터 ID",
                 "text": "문서 내용",
                 "metadata": {...}
             },
@@ -371,110 +953,18 @@ def semantic_search_pinecone(query: str, candidates: Optional[List[Dict[str, Any
     """
     try:
         # 쿼리 임베딩 생성
-        query_embedding = embedding_model.encode([f"query: {query}"], normalize_embeddings=True)[0].tolist()
+        if query_embedding is None:
+            query_embedding = embed_query(query)
         
-        index = pc.Index(PINECONE_INDEX)
+        index = get_vector_index()
         
         # 비교 대상 보장 검색 결과
-        guaranteed_results = []
-        guaranteed_keys = set()  # 중복 제거용: (course_name, professor) 튜플
-        
-        if comparison_targets:
-            course_names = comparison_targets.get("course_names", [])
-            professors = comparison_targets.get("professors", [])
-            comparison_type = comparison_targets.get("comparison_type")
-            
-            if comparison_type in ["course", "professor", "both"]:
-                print(f"🔍 비교 대상 보장 검색: course_names={course_names}, professors={professors}, type={comparison_type}")
-                
-                # 각 강의명별로 최소 1개씩 검색
-                for course_name in course_names:
-                    if not course_name:
-                        continue
-                    
-                    course_filter = {"course_name": {"$eq": course_name}}
-                    try:
-                        course_response = index.query(
-                            vector=query_embedding,
-                            top_k=1,
-                            include_metadata=True,
-                            filter=course_filter
-                        )
-                        
-                        for match in course_response.matches:
-                            meta = match.metadata
-                            key = (meta.get("course_name", ""), meta.get("professor", ""))
-                            if key not in guaranteed_keys:
-                                guaranteed_results.append({
-                                    "text": meta.get("text", ""),
-                                    "metadata": meta
-                                })
-                                guaranteed_keys.add(key)
-                    except Exception as e:
-                        print(f"⚠️ 강의명 '{course_name}' 검색 오류: {e}")
-                
-                # 각 교수명별로 최소 1개씩 검색 (교수 비교인 경우)
-                if comparison_type in ["professor", "both"]:
-                    for professor in professors:
-                        if not professor:
-                            continue
-                        
-                        professor_filter = {"professor": {"$eq": professor}}
-                        try:
-                            professor_response = index.query(
-                                vector=query_embedding,
-                                top_k=1,
-                                include_metadata=True,
-                                filter=professor_filter
-                            )
-                            
-                            for match in professor_response.matches:
-                                meta = match.metadata
-                                key = (meta.get("course_name", ""), meta.get("professor", ""))
-                                if key not in guaranteed_keys:
-                                    guaranteed_results.append({
-                                        "text": meta.get("text", ""),
-                                        "metadata": meta
-                                    })
-                                    guaranteed_keys.add(key)
-                        except Exception as e:
-                            print(f"⚠️ 교수명 '{professor}' 검색 오류: {e}")
-                    
-                    # 강의+교수 조합별로 최소 1개씩 검색 (교수 비교인 경우)
-                    if course_names and not professors:
-                        # course_names는 있지만 professors가 없는 경우, 해당 강의의 모든 교수에 대해 검색
-                        for course_name in course_names:
-                            if not course_name:
-                                continue
-                            
-                            # 해당 강의의 교수들을 찾기 위해 먼저 검색
-                            course_filter = {"course_name": {"$eq": course_name}}
-                            try:
-                                course_response = index.query(
-                                    vector=query_embedding,
-                                    top_k=10,  # 여러 교수 찾기 위해 더 많이 가져옴
-                                    include_metadata=True,
-                                    filter=course_filter
-                                )
-                                
-                                # 교수별로 그룹화하여 각 교수당 최소 1개씩
-                                professors_found = {}
-                                for match in course_response.matches:
-                                    meta = match.metadata
-                                    prof_name = meta.get("professor", "")
-                                    if prof_name and prof_name not in professors_found:
-                                        key = (meta.get("course_name", ""), prof_name)
-                                        if key not in guaranteed_keys:
-                                            professors_found[prof_name] = {
-                                                "text": meta.get("text", ""),
-                                                "metadata": meta
-                                            }
-                                            guaranteed_keys.add(key)
-                                
-                                for prof_result in professors_found.values():
-                                    guaranteed_results.append(prof_result)
-                            except Exception as e:
-                                print(f"⚠️ 강의 '{course_name}' 교수별 검색 오류: {e}")
+        if guaranteed_results is None:
+            guaranteed_results = search_comparison_targets(query_embedding, comparison_targets)
+        guaranteed_keys = {
+            (result["metadata"].get("course_name", ""), result["metadata"].get("professor", ""))
+            for result in guaranteed_results
+        }
         
         # 일반 의미 기반 검색 (보장된 결과와 병합)
         pinecone_filter = {}
@@ -502,30 +992,52 @@ def semantic_search_pinecone(query: str, candidates: Optional[List[Dict[str, Any
         query_kwargs = {
             "vector": query_embedding,
             "top_k": query_top_k,
-            "include_metadata": True
+            "include_metadata": True,
+            "include_values": True  # 컨텍스트 패킹(MMR)용 강의평 임베딩
         }
         if pinecone_filter:
             query_kwargs["filter"] = pinecone_filter
         
+        # 키워드(BM25) 검색을 의미 검색과 동시에 실행 (같은 필터 적용)
+        lexical_future = None
+        if HYBRID_SEARCH_ENABLED and not lexical_index.ready:
+            resources.load_in_background("lexical_index")  # lazy 모드: 첫 검색 때 적재 시작
+        if HYBRID_SEARCH_ENABLED and lexical_index.ready:
+            maybe_sync_lexical_index()
+            lexical_future = get_fanout_pool().submit(lexical_index.search, query, query_top_k, pinecone_filter or None)
+        
         query_response = index.query(**query_kwargs)
+        dense_results = [
+            {
+                "id": match.id,
+                "text": match.metadata.get("text", ""),
+                "metadata": match.metadata,
+                "values": list(match.values or [])
+            }
+            for match in query_response.matches
+        ]
+        
+        lexical_results = []
+        if lexical_future is not None:
+            try:
+                lexical_results = lexical_future.result(timeout=STAGE_TIMEOUT_PINECONE)
+            except Exception as e:
+                print(f"⚠️ 키워드 검색 오류 (의미 검색 결과만 사용): {e}")
         
-        # 일반 검색 결과 추가 (중복 제거)
+        # 일반 검색 결과 추가 (RRF 순위, 중복 제거)
         semantic_results = []
-        for match in query_response.matches:
-            meta = match.metadata
+        for result in fuse_search_results(dense_results, lexical_results):
+            meta = result["metadata"]
             key = (meta.get("course_name", ""), meta.get("professor", ""))
             if key not in guaranteed_keys:
-                semantic_results.append({
-                    "text": meta.get("text", ""),
-                    "metadata": meta
-                })
+                semantic_results.append(result)
                 guaranteed_keys.add(key)
         
         # 보장된 결과 + 일반 검색 결과 병합 (최대 top_k개)
         all_results = guaranteed_results + semantic_results
         final_results = all_results[:top_k]
         
-        print(f"✅ Pinecone에서 {len(final_results)}개 강의평 발견 (보장: {len(guaranteed_results)}, 일반: {len(semantic_results)})")
+        print(f"✅ Pinecone에서 {len(final_results)}개 강의평 발견 (보장: {len(guaranteed_results)}, 일반: {len(semantic_results)}, 키워드: {len(lexical_results)})")
         return final_results
         
     except Exception as e:
@@ -534,17 +1046,33 @@ def semantic_search_pinecone(query: str, candidates: Optional[List[Dict[str, Any
         traceback.print_exc()
         return []
 
-def merge_results(mongo_candidates: Optional[List[Dict[str, Any]]], pinecone_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+def course_ratings_for(mongo_candidates: Optional[List[Dict[str, Any]]],
+                       pinecone_results: List[Dict[str, Any]]) -> Dict[Tuple[str, str], float]:
+    """merge 대상 (강의명, 교수명)의 집계 평점 (course_aggregates, 조회 1회). 실패하면 빈 딕셔너리"""
+    courses = [(course.get("course_name", ""), course.get("professor")) for course in mongo_candidates or []]
+    courses += [(review.get("metadata", {}).get("course_name", ""), review.get("metadata", {}).get("professor"))
+                for review in pinecone_results]
+    try:
+        return CourseAggregates(get_mongo_db()).ratings_for(courses)
+    except Exception as e:
+        print(f"⚠️ 강의 집계 평점 조회 실패: {e}")
+        return {}
+
+def merge_results(mongo_candidates: Optional[List[Dict[str, Any]]], pinecone_results: List[Dict[str, Any]],
+                  course_ratings: Optional[Dict[Tuple[str, str], float]] = None) -> Dict[str, Any]:
     """
     두 결과를 merge → 강의 정보 + 리뷰 정보 통합
     
     Args:
         mongo_candidates: MongoDB에서 검색된 강의 정보 리스트
         pinecone_results: Pinecone에서 검색된 강의평 리스트
+        course_ratings: rating_key(강의명, 교수명) → 집계 평점 (course_ratings_for(), 있으면 rating에 우선 사용)
         
     Returns:
         Dict: 병합된 강의 정보 (course_name별로 그룹화, 리뷰 포함)
     """
+    course_ratings = course_ratings or {}
+    
     # course_name별로 강의평 그룹화
     reviews_by_course = defaultdict(list)
     
@@ -556,7 +1084,8 @@ def merge_results(mongo_candidates: Optional[List[Dict[str, Any]]], pinecone_res
             review_data = {
                 "text": review.get("text", ""),
                 "review_id": metadata.get("original_id", ""),
-                "sentiment": None  # 향후 감정 분석 추가 가능
+                "sentiment": metadata.get("sentiment_score"),  # 업로드 시 분석 (review_enrichment)
+                "embedding": review.get("values") or None  # 컨텍스트 패킹(MMR)용
             }
             reviews_by_course[course_name].append(review_data)
     
@@ -572,7 +1101,8 @@ def merge_results(mongo_candidates: Optional[List[Dict[str, Any]]], pinecone_res
                 "course_name": course_name,
                 "professor": mongo_course.get("professor", ""),
                 "department": mongo_course.get("department", ""),
-                "rating": mongo_course.get("rating", 0.0) or mongo_course.get("average_rating", 0.0),
+                "rating": course_ratings.get(rating_key(course_name, mongo_course.get("professor")))
+                          or mongo_course.get("rating", 0.0) or mongo_course.get("average_rating", 0.0),
                 "review_count": len(reviews),
                 "reviews": reviews
             }
@@ -586,7 +1116,8 @@ def merge_results(mongo_candidates: Optional[List[Dict[str, Any]]], pinecone_res
                     "course_name": course_name,
                     "professor": course.get("professor", ""),
                     "department": course.get("department", ""),
-                    "rating": course.get("rating", 0.0) or course.get("average_rating", 0.0),
+                    "rating": course_ratings.get(rating_key(course_name, course.get("professor")))
+                              or course.get("rating", 0.0) or course.get("average_rating", 0.0),
                     "review_count": 0,
                     "reviews": []
                 }
@@ -614,7 +1145,8 @@ def merge_results(mongo_candidates: Optional[List[Dict[str, Any]]], pinecone_res
                 "course_name": course_name,
                 "professor": info.get("professor", ""),
                 "department": info.get("department", ""),
-                "rating": float(info.get("rating", 0.0)) if info.get("rating") else 0.0,
+                "rating": course_ratings.get(rating_key(course_name, info.get("professor")))
+                          or (float(info.get("rating", 0.0)) if info.get("rating") else 0.0),
                 "review_count": len(reviews),
                 "reviews": reviews
             }
@@ -624,83 +1156,43 @@ def merge_results(mongo_candidates: Optional[List[Dict[str, Any]]], pinecone_res
         "courses": courses
     }
 
-def normalize_context(merged_context: Dict[str, Any]) -> Dict[str, Any]:
+# 프롬프트에 넣을 강의 컨텍스트 토큰 예산
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv('RAG_CONTEXT_TOKEN_BUDGET', 1500))
+RAG_CONTEXT_MMR_LAMBDA = float(os.getenv('RAG_CONTEXT_MMR_LAMBDA', 0.7))
+
+def pack_answer_context(merged_context: Dict[str, Any], query_embedding: Optional[List[float]] = None) -> PackedContext:
     """
-    병합된 컨텍스트를 정규화하여 LLM 프롬프트에 안전하게 사용할 수 있도록 처리
-    
-    Args:
-        merged_context: merge_results()의 출력
-        
-    Returns:
-        Dict: 정규화된 컨텍스트 (모든 필수 필드 보장, 리뷰 텍스트 길이 제한)
+    merge_results() 결과를 토큰 예산에 맞춰 줄 단위 컨텍스트로 변환
+    임베딩이 없는 강의평(키워드 검색으로만 찾은 경우)은 MMR 계산을 위해 임베딩 생성 (캐시 사용)
     """
-    normalized = {
-        "courses": []
-    }
+    missing = [
+        review
+        for course in merged_context.get("courses", [])
+        for review in course.get("reviews", [])
+        if review.get("embedding") is None and review.get("text")
+    ]
+    if missing and query_embedding is not None:
+        try:
+            embeddings = embedding_cache.encode(
+                get_embedding_model(), get_embedding_cache_name(), [f"passage: {review['text']}" for review in missing]
+            )
+            for review, embedding in zip(missing, embeddings):
+                review["embedding"] = embedding
+        except Exception as e:
+            print(f"⚠️ 강의평 임베딩 생성 실패 (검색 순위로 대체): {e}")
     
-    for course in merged_context.get("courses", []):
-        # 필수 필드 보장
-        normalized_course = {
-            "course_name": course.get("course_name", ""),
-            "professor": course.get("professor", ""),
-            "department": course.get("department", ""),
-            "rating": float(course.get("rating", 0.0)),
-            "review_count": int(course.get("review_count", 0)),
-            "reviews": []
-        }
-        
-        # 리뷰 정규화 (텍스트 길이 제한)
-        reviews = course.get("reviews", [])
-        for review in reviews:
-            review_text = review.get("text", "")
-            # 리뷰 텍스트가 너무 길면 첫 200자만 사용
-            if len(review_text) > 200:
-                review_text = review_text[:200] + "..."
-            
-            normalized_review = {
-                "text": review_text,
-                "review_id": review.get("review_id", ""),
-                "sentiment": review.get("sentiment")
-            }
-            normalized_course["reviews"].append(normalized_review)
-        
-        # review_count를 실제 리뷰 개수로 업데이트
-        normalized_course["review_count"] = len(normalized_course["reviews"])
-        
-        normalized["courses"].append(normalized_course)
-    
-    return normalized
+    packed = pack_context(
+        merged_context,
+        budget_tokens=RAG_CONTEXT_TOKEN_BUDGET,
+        query_embedding=query_embedding,
+        lambda_mult=RAG_CONTEXT_MMR_LAMBDA
+    )
+    print(f"📦 컨텍스트 패킹: {packed.included_reviews}/{packed.total_reviews}개 강의평, 약 {packed.token_count}토큰 (예산 {packed.budget})")
+    return packed
 
-def synthesize_answer_with_llm(user_query: str, merged_context: Dict[str, Any], conversation_history: list = None) -> str:
-    """
-    LLM 최종 응답 생성 (Gemini)
-    
-    Args:
-        user_query: 사용자 질문
-        merged_context: merge_results()의 출력
-        conversation_history: 대화 히스토리 (선택적)
-        
-    Returns:
-        str: Gemini가 생성한 최종 답변
-    """
-    try:
-        # 컨텍스트 정규화
-        normalized_context = normalize_context(merged_context)
-        
-        # 대화 히스토리 텍스트 생성 (최근 5개만)
-        history_text = ""
-        if conversation_history:
-            history_items = []
-            for hist in conversation_history[-5:]:
-                user_msg = hist.get("user", "").strip()
-                assistant_msg = hist.get("assistant", "").strip()
-                if user_msg and assistant_msg:
-                    history_items.append(f"사용자: {user_msg}\n어시스턴트: {assistant_msg}")
-            if history_items:
-                history_text = "\n\n이전 대화(있으면):\n" + "\n\n".join(history_items) + "\n"
-        
-        # 프롬프트 구성
-        prompt = f"""{history_text}사용자 질문:
+# 최종 답변 생성 모델/프롬프트 (synthesize_answer_with_llm, stream_answer_with_llm 공용)
+ANSWER_MODEL = "gemini-2.5-flash"
+ANSWER_PROMPT_TEMPLATE = """{history_text}사용자 질문:
 {user_query}
 
 아래는 데이터베이스에서 검색된 강의 정보 및 강의평 리뷰 데이터입니다.
@@ -720,12 +1212,97 @@ def synthesize_answer_with_llm(user_query: str, merged_context: Dict[str, Any],
    - 여러 항목 나열 시 줄바꿈 활용
    - 단, 과도한 포맷팅은 피하고 자연스러운 문장을 유지하세요
 
-강의 데이터(JSON):
-{json.dumps(normalized_context, ensure_ascii=False, indent=2)}"""
+강의 데이터 ([번호] 강의명 | 교수 | 학과 | 평점 | 포함된 강의평 수/검색된 강의평 수, 그 아래 "- " 줄은 강의평):
+{context}"""
+
+def build_answer_prompt(user_query: str, merged_context: Dict[str, Any], conversation_history: list = None,
+                        packed_context: Optional[PackedContext] = None) -> str:
+    """
+    최종 답변 생성용 프롬프트 구성 (synthesize_answer_with_llm, stream_answer_with_llm 공용)
+    
+    Args:
+        user_query: 사용자 질문
+        merged_context: merge_results()의 출력
+        conversation_history: 대화 히스토리 (선택적)
+        packed_context: 미리 만든 pack_answer_context() 결과 (없으면 여기서 생성)
+    """
+    if packed_context is None:
+        packed_context = pack_answer_context(merged_context)
+    
+    # 대화 히스토리 텍스트 생성 (최근 5개만)
+    history_text = ""
+    if conversation_history:
+        history_items = []
+        for hist in conversation_history[-5:]:
+            user_msg = hist.get("user", "").strip()
+            assistant_msg = hist.get("assistant", "").strip()
+            if user_msg and assistant_msg:
+                history_items.append(f"사용자: {user_msg}\n어시스턴트: {assistant_msg}")
+        if history_items:
+            history_text = "\n\n이전 대화(있으면):\n" + "\n\n".join(history_items) + "\n"
+    
+    # 프롬프트 구성
+    return ANSWER_PROMPT_TEMPLATE.format(history_text=history_text, user_query=user_query,
+                                         context=packed_context.text)
+
+# 답변 캐시 버전: 답변 프롬프트/모델/컨텍스트 형식·예산/intent 프롬프트 중 하나라도 바뀌면 이전 답변은 조회되지 않음
+ANSWER_PROMPT_VERSION = prompt_version("\n".join([
+    ANSWER_PROMPT_TEMPLATE, ANSWER_MODEL, CONTEXT_FORMAT_VERSION,
+    str(RAG_CONTEXT_TOKEN_BUDGET), str(RAG_CONTEXT_MMR_LAMBDA), INTENT_PROMPT_VERSION,
+]))
+
+def _answer_cache_collection():
+    return get_mongo_db().answer_cache
+
+def _review_uploads_collection():
+    return get_mongo_db().review_uploads
+
+answer_cache = AnswerCache(
+    version=ANSWER_PROMPT_VERSION,
+    max_entries=int(os.getenv('ANSWER_CACHE_SIZE', 512)),
+    ttl_seconds=int(os.getenv('ANSWER_CACHE_TTL', 6 * 3600)),
+    collection_getter=_answer_cache_collection if os.getenv('ANSWER_CACHE_MONGO', 'true').lower() == 'true' else None,
+    uploads_collection_getter=_review_uploads_collection
+)
+
+# finish_reason (1=STOP 정상, 2=MAX_TOKENS, 3=SAFETY, 4=RECITATION) → 사용자 안내 메시지
+FINISH_REASON_NAMES = {1: "STOP", 2: "MAX_TOKENS", 3: "SAFETY", 4: "RECITATION"}
+FINISH_REASON_MESSAGES = {
+    2: "답변이 너무 길어서 일부가 잘렸습니다.",
+    3: "죄송합니다. 안전 필터로 인해 답변을 생성할 수 없습니다. 다른 질문을 시도해주세요.",
+    4: "인용 문제로 인해 답변을 생성할 수 없습니다.",
+}
+
+def _finish_reason_code(finish_reason: Any) -> Optional[int]:
+    """finish_reason(enum 또는 int)을 정수 코드로 변환"""
+    if finish_reason is None:
+        return None
+    try:
+        return int(getattr(finish_reason, 'value', finish_reason))
+    except (TypeError, ValueError):
+        return None
+
+def synthesize_answer_with_llm(user_query: str, merged_context: Dict[str, Any], conversation_history: list = None,
+                               packed_context: Optional[PackedContext] = None) -> str:
+    """
+    LLM 최종 응답 생성 (Gemini)
+    
+    Args:
+        user_query: 사용자 질문
+        merged_context: merge_results()의 출력
+        conversation_history: 대화 히스토리 (선택적)
+        packed_context: pack_answer_context() 결과 (선택적)
+        
+    Returns:
+        str: Gemini가 생성한 최종 답변
+    """
+    try:
+        prompt = build_answer_prompt(user_query, merged_context, conversation_history, packed_context)
 
         # Gemini 모델 호출
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
+        model = genai.GenerativeModel(ANSWER_MODEL)
+        # 단계 타임아웃이 지나도 작업 스레드가 HTTP 응답을 무한정 기다리지 않도록 요청 자체에도 타임아웃
+        response = model.generate_content(prompt, request_options={"timeout": STAGE_TIMEOUT_LLM})
         
         # 응답 안전하게 처리 (ai_api.py의 generate_gemini_response와 동일한 방식)
         # getattr로 안전하게 접근하고, 실패 시 str(response)로 fallback
@@ -736,15 +1313,11 @@ def synthesize_answer_with_llm(user_query: str, merged_context: Dict[str, Any],
             # candidates에서 직접 추출 시도
             if response.candidates and len(response.candidates) > 0:
                 candidate = response.candidates[0]
-                finish_reason = getattr(candidate, 'finish_reason', None)
+                finish_reason = _finish_reason_code(getattr(candidate, 'finish_reason', None))
                 
-                # finish_reason 확인 (1=STOP 정상, 2=MAX_TOKENS, 3=SAFETY, 4=RECITATION)
-                if finish_reason == 3:  # SAFETY - 안전 필터에 걸림
-                    return "죄송합니다. 안전 필터로 인해 답변을 생성할 수 없습니다. 다른 질문을 시도해주세요."
-                elif finish_reason == 2:  # MAX_TOKENS - 토큰 제한
-                    return "답변이 너무 길어서 일부가 잘렸습니다."
-                elif finish_reason == 4:  # RECITATION - 인용 문제
-                    return "인용 문제로 인해 답변을 생성할 수 없습니다."
+                # SAFETY(안전 필터) / MAX_TOKENS(토큰 제한) / RECITATION(인용 문제)
+                if finish_reason in FINISH_REASON_MESSAGES:
+                    return FINISH_REASON_MESSAGES[finish_reason]
                 
                 # parts에서 텍스트 추출
                 if hasattr(candidate, 'content') and candidate.content:
@@ -766,6 +1339,297 @@ def synthesize_answer_with_llm(user_query: str, merged_context: Dict[str, Any],
         traceback.print_exc()
         return f"답변 생성 중 오류가 발생했습니다: {str(e)}"
 
+# 스트리밍 청크를 받는 스레드 → 응답 generator 사이 큐 크기 (소비가 멈추면 받는 쪽도 멈춤)
+STREAM_QUEUE_SIZE = 64
+_STREAM_END = object()
+
+def _iterate_with_deadline(iterable, deadline: float):
+    """
+    iterable을 별도 스레드에서 읽어 deadline(perf_counter 기준)까지만 전달
+    청크 사이에서만 시간을 재면 첫 청크/다음 청크가 오지 않는 동안 무한정 기다리므로 queue.get(timeout)으로 대기
+
+    Raises:
+        TimeoutError: deadline까지 다음 청크가 오지 않음
+        iterable이 던진 예외는 그대로 다시 던짐
+    """
+    chunks = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                chunks.put(item, timeout=1.0)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def reader():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_STREAM_END)
+        except BaseException as e:
+            put(e)
+
+    # 공유 단계 풀이 아닌 전용 daemon 스레드 (멈춘 스트림이 풀 워커를 잡고 있지 않도록)
+    threading.Thread(target=reader, name="llm-stream-reader", daemon=True).start()
+    try:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise TimeoutError
+            try:
+                item = chunks.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError
+            if item is _STREAM_END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+
+def stream_answer_with_llm(user_query: str, merged_context: Dict[str, Any], conversation_history: list = None,
+                           packed_context: Optional[PackedContext] = None, timeout: float = STAGE_TIMEOUT_LLM):
+    """
+    LLM 최종 응답을 스트리밍으로 생성 (Gemini stream=True)
+    timeout(초) 안에 끝나지 않으면 다음 청크를 기다리는 중이어도 바로 error로 종료
+    
+    Yields:
+        Tuple[str, Dict]: ("token", {"text": ...}) 조각이 도착할 때마다,
+                          마지막에 종료 이벤트 한 번
+                          - ("done", {"finish_reason": "STOP"})
+                          - ("truncated", {"finish_reason": "MAX_TOKENS", "message": ...})
+                          - ("blocked", {"finish_reason": "SAFETY" | "RECITATION", "message": ...})
+                          - ("error", {"message": ...})
+    """
+    try:
+        deadline = time.perf_counter() + timeout
+        prompt = build_answer_prompt(user_query, merged_context, conversation_history, packed_context)
+        model = genai.GenerativeModel(ANSWER_MODEL)
+        response = model.generate_content(prompt, stream=True, request_options={"timeout": timeout})
+        
+        finish_reason = None
+        emitted = False
+        for chunk in _iterate_with_deadline(response, deadline):
+            if chunk.candidates:
+                candidate = chunk.candidates[0]
+                finish_reason = _finish_reason_code(getattr(candidate, 'finish_reason', None)) or finish_reason
+                # chunk.text는 parts가 없으면(안전 필터 등) 예외를 던지므로 parts에서 직접 추출
+                parts = getattr(getattr(candidate, 'content', None), 'parts', None) or []
+                text = ''.join(part.text for part in parts if getattr(part, 'text', None))
+                if text:
+                    emitted = True
+                    yield "token", {"text": text}
+        
+        if finish_reason in (3, 4):  # SAFETY / RECITATION
+            yield "blocked", {"finish_reason": FINISH_REASON_NAMES[finish_reason], "message": FINISH_REASON_MESSAGES[finish_reason]}
+        elif finish_reason == 2:  # MAX_TOKENS - 이미 보낸 토큰은 유지
+            yield "truncated", {"finish_reason": "MAX_TOKENS", "message": FINISH_REASON_MESSAGES[2]}
+        elif not emitted:
+            yield "error", {"message": "답변을 생성할 수 없습니다. 다시 시도해주세요."}
+        else:
+            yield "done", {"finish_reason": FINISH_REASON_NAMES.get(finish_reason, "STOP")}
+        
+    except TimeoutError:
+        print(f"⏰ 스트리밍 답변 타임아웃 ({timeout}s)")
+        yield "error", {"message": "답변 생성 시간이 초과되었습니다. 다시 시도해주세요."}
+    except Exception as e:
+        print(f"❌ LLM 스트리밍 답변 생성 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        yield "error", {"message": f"답변 생성 중 오류가 발생했습니다: {str(e)}"}
+
+def format_top_reviews(pinecone_results: List[Dict[str, Any]], limit: int = 5) -> List[Dict[str, Any]]:
+    """
+    Pinecone 결과를 응답용 top_reviews 형식으로 변환
+    
+    Args:
+        pinecone_results: semantic_search_pinecone()의 출력
+        limit: 최대 개수
+        
+    Returns:
+        List[Dict]: course_name, professor, text, rating을 포함한 리스트
+    """
+    top_reviews = []
+    for result in pinecone_results[:limit]:
+        metadata = result.get("metadata", {})
+        review_text = result.get("text", "")  # 강의평 텍스트
+        review_rating = metadata.get("rating", None)
+        
+        # rating이 숫자면 float로 변환, 아니면 None
+        if review_rating is not None:
+            try:
+                review_rating = float(review_rating)
+            except (ValueError, TypeError):
+                review_rating = None
+        
+        review_item = {
+            "course_name": metadata.get("course_name", ""),
+            "professor": metadata.get("professor", ""),
+            "text": review_text,  # 강의평 텍스트
+            "rating": review_rating,  # 강의평의 rating
+        }
+        top_reviews.append(review_item)
+    return top_reviews
+
+def speculative_search(query_embedding: Optional[List[float]], user_query: str, top_k: int = 5) -> Optional[Dict[str, Any]]:
+    """
+    원본 질문으로 필터 없는 Pinecone 검색을 미리 실행 (intent 분석과 동시에 실행)
+    "speculative_embed" 단계가 끝나면 submit_after()로 시작되므로, 임베딩 단계를 기다리며 워커를 잡지 않고
+    검색 결과를 버리더라도 임베딩만 따로 재사용할 수 있음
+    
+    Returns:
+        Dict: {"embedding": 쿼리 임베딩, "results": 검색 결과} (임베딩 실패 시 None)
+    """
+    if query_embedding is None:
+        return None
+    results = semantic_search_pinecone(
+        query=user_query,
+        top_k=top_k,
+        query_embedding=query_embedding,
+        guaranteed_results=[]
+    )
+    return {
+        "embedding": query_embedding,
+        "results": results
+    }
+
+def can_reuse_speculative(intent: QueryIntent, user_query: str) -> bool:
+    """
+    추측 검색 결과를 그대로 쓸 수 있는지 판단
+    - 구조적 필터가 없고 (MongoDB 후보 필터가 걸리지 않음)
+    - 비교 질의가 아니며 (보장 검색 불필요)
+    - semantic_query가 원본 질문과 충분히 비슷한 경우
+    """
+    if intent.needs_structured_filter and intent.filters:
+        return False
+    comparison_type = (intent.comparison_targets or {}).get("comparison_type")
+    if comparison_type in ["course", "professor", "both"]:
+        return False
+    return query_similarity(intent.semantic_query, user_query) >= RAG_SPECULATIVE_MIN_SIMILARITY
+
+# 실패/안내 메시지는 답변 캐시에 저장하지 않음
+ANSWER_FAILURE_PREFIXES = (
+    "답변 생성 중 오류가 발생했습니다",
+    "답변 생성 시간이 초과되었습니다",
+    "답변을 생성할 수 없습니다",
+)
+
+def is_cacheable_answer(answer: Optional[str]) -> bool:
+    """정상적으로 생성된 답변인지 확인"""
+    if not answer or not answer.strip():
+        return False
+    if answer in FINISH_REASON_MESSAGES.values():
+        return False
+    return not answer.startswith(ANSWER_FAILURE_PREFIXES)
+
+def answer_cache_key(user_query: str, retrieval: Dict[str, Any], conversation_history: list = None) -> str:
+    """검색 결과(intent + Pinecone 결과 ID 순서)까지 반영한 답변 캐시 키"""
+    # source/confidence는 분석 경로 정보일 뿐이므로 키에서 제외
+    intent_data = retrieval["intent"].model_dump(exclude={"source", "confidence"})
+    match_ids = [result.get("id", "") for result in retrieval["pinecone_results"]]
+    return answer_cache.make_key(user_query, intent_data, match_ids, conversation_history)
+
+def store_answer(user_query: str, retrieval: Dict[str, Any], conversation_history: list,
+                 answer: str, top_reviews: List[Dict[str, Any]]) -> None:
+    """정상 답변을 답변 캐시에 저장 (관련 강의명 기록 → 강의평 재업로드 시 무효화)"""
+    if not ANSWER_CACHE_ENABLED or not is_cacheable_answer(answer):
+        return
+    course_names = [course.get("course_name", "") for course in retrieval["merged_context"].get("courses", [])]
+    answer_cache.put(
+        answer_cache_key(user_query, retrieval, conversation_history),
+        answer_cache.make_query_key(user_query, conversation_history),
+        answer,
+        top_reviews,
+        course_names,
+        [result.get("id", "") for result in retrieval["pinecone_results"]]
+    )
+
+def retrieve_rag_context(user_query: str, stages: StageExecutor) -> Dict[str, Any]:
+    """
+    RAG 검색 단계 (Step 0~5: 의도 분석 → MongoDB 필터/임베딩 → Pinecone 검색 → merge)
+    rag_chat()과 스트리밍 엔드포인트가 공유
+    
+    Returns:
+        Dict: intent, mongo_candidates, pinecone_results, merged_context, query_embedding, speculative_status
+    """
+    # Step 0: intent 분석과 동시에 원본 질문으로 추측 검색 시작
+    if RAG_SPECULATIVE_RETRIEVAL:
+        stages.submit("speculative_embed", embed_query, user_query,
+                      timeout=STAGE_TIMEOUT_EMBED, default=None)
+        stages.submit_after("speculative_search", "speculative_embed", speculative_search, user_query,
+                            timeout=STAGE_TIMEOUT_EMBED + STAGE_TIMEOUT_PINECONE, default=None)
+    
+    # Step 1: 질문 분석 (Structured / Semantic 분리)
+    intent = stages.run("intent", classify_query_intent, user_query)
+    comparison_targets = intent.comparison_targets
+    
+    speculative = None
+    speculative_status = "disabled"
+    if stages.has("speculative_search"):
+        if can_reuse_speculative(intent, user_query):
+            speculative = stages.result("speculative_search")
+            speculative_status = "reused" if speculative else "failed"
+        else:
+            # 필터/비교 검색이 필요하면 추측 결과는 버림 (임베딩은 질문이 같을 때만 재사용)
+            speculative_status = "discarded"
+    
+    if speculative:
+        # 추측 검색 결과 재사용 → MongoDB/Pinecone 단계 생략
+        mongo_candidates = None
+        pinecone_results = speculative["results"]
+        query_embedding = speculative["embedding"]
+    else:
+        # Step 2: 구조적 필터(MongoDB)와 쿼리 임베딩을 동시에 실행
+        if intent.needs_structured_filter:
+            stages.submit("mongo_filter", filter_from_mongodb, intent.filters,
+                          timeout=STAGE_TIMEOUT_MONGO, default=None)
+        if speculative_status == "discarded" and normalize_query(intent.semantic_query) == normalize_query(user_query):
+            query_embedding = stages.result("speculative_embed")
+        else:
+            stages.submit("embed", embed_query, intent.semantic_query,
+                          timeout=STAGE_TIMEOUT_EMBED, default=None)
+            query_embedding = stages.result("embed")
+    
+        # Step 3: 비교 대상 보장 검색은 MongoDB 결과와 무관하므로 필터링과 겹쳐서 실행
+        if query_embedding is not None:
+            stages.submit("comparison_search", search_comparison_targets, query_embedding, comparison_targets,
+                          timeout=STAGE_TIMEOUT_PINECONE, default=[])
+        mongo_candidates = stages.result("mongo_filter")
+        guaranteed_results = stages.result("comparison_search", default=[])
+    
+        # Step 4: Pinecone 의미 기반 검색 (MongoDB 후보 필터 적용)
+        stages.submit("pinecone_search", semantic_search_pinecone,
+                      query=intent.semantic_query,
+                      candidates=mongo_candidates,
+                      comparison_targets=comparison_targets,
+                      query_embedding=query_embedding,
+                      guaranteed_results=guaranteed_results,
+                      timeout=STAGE_TIMEOUT_PINECONE, default=[])
+        pinecone_results = stages.result("pinecone_search")
+    
+    # Step 5: 두 결과를 merge → 강의 정보 + 리뷰 정보 통합
+    stages.submit("course_ratings", course_ratings_for, mongo_candidates, pinecone_results,
+                  timeout=STAGE_TIMEOUT_MONGO, default={})
+    merged_context = merge_results(
+        mongo_candidates,
+        pinecone_results,
+        stages.result("course_ratings")
+    )
+    
+    return {
+        "intent": intent,
+        "mongo_candidates": mongo_candidates,
+        "pinecone_results": pinecone_results,
+        "merged_context": merged_context,
+        "query_embedding": query_embedding,
+        "speculative_status": speculative_status
+    }
+
 # ───────────────────────────────────────────────
 # RAG Chat API 엔드포인트
 # ───────────────────────────────────────────────
@@ -796,6 +1660,15 @@ def synthesize_answer_with_llm(user_query: str, merged_context: Dict[str, Any],
 #     "pinecone_hits": 0
 #   }
 # }
+@app.route("/ready", methods=["GET"])
+def ready():
+    """
+    준비 상태 확인 (로드 밸런서/배포 헬스체크용)
+    필수 리소스가 준비되면 200, 아니면 503. 리소스별 로드 시간과 프로세스 메모리 포함
+    """
+    status = resources.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
 @app.route("/api/v2/rag/chat", methods=["POST"])
 def rag_chat():
     """RAG 기반 챗봇 API"""
@@ -807,57 +1680,44 @@ def rag_chat():
         if not user_query:
             return jsonify({"error": "query 파라미터가 필요합니다."}), 400
         
-        # Step 1: 질문 분석 (Structured / Semantic 분리)
-        intent = classify_query_intent(user_query)
-        
-        # Step 2: 구조적 필터 필요 여부 확인
-        if intent.needs_structured_filter:
-            mongo_candidates = filter_from_mongodb(intent.filters)
-        else:
-            mongo_candidates = None
-        
-        # Step 3: Pinecone 의미 기반 검색 (비교 대상 보장)
-        comparison_targets = intent.comparison_targets
-        pinecone_results = semantic_search_pinecone(
-            query=intent.semantic_query,
-            candidates=mongo_candidates,
-            comparison_targets=comparison_targets
-        )
-        
-        # Step 4: 두 결과를 merge → 강의 정보 + 리뷰 정보 통합
-        merged_context = merge_results(
-            mongo_candidates,
-            pinecone_results
-        )
+        use_cache = ANSWER_CACHE_ENABLED and body.get("use_cache", True)
+        stages = StageExecutor()
+        
+        # 같은 질문(+ 최근 대화)의 답변이 캐시에 있으면 검색/생성 모두 생략
+        if use_cache:
+            cached = stages.run("answer_cache", answer_cache.get_by_query, user_query, conversation_history)
+            if cached is not None:
+                return jsonify({
+                    "answer": cached["answer"],
+                    "top_reviews": cached["top_reviews"],
+                    "provider": "rag-v2",
+                    "debug": cached_debug_info(cached, "query", stages)
+                })
         
-        # Step 5: Pinecone 결과를 top_reviews 형식으로 변환
-        top_reviews = []
-        for result in pinecone_results[:5]:  # 상위 5개만
-            metadata = result.get("metadata", {})
-            review_text = result.get("text", "")  # 강의평 텍스트
-            review_rating = metadata.get("rating", None)
-            
-            # rating이 숫자면 float로 변환, 아니면 None
-            if review_rating is not None:
-                try:
-                    review_rating = float(review_rating)
-                except (ValueError, TypeError):
-                    review_rating = None
-            
-            review_item = {
-                "course_name": metadata.get("course_name", ""),
-                "professor": metadata.get("professor", ""),
-                "text": review_text,  # 강의평 텍스트
-                "rating": review_rating,  # 강의평의 rating
-            }
-            top_reviews.append(review_item)
+        retrieval = retrieve_rag_context(user_query, stages)
+        
+        # 검색 결과까지 같으면 LLM 생성만 생략
+        if use_cache:
+            cached = answer_cache.get(answer_cache_key(user_query, retrieval, conversation_history))
+            if cached is not None:
+                return jsonify({
+                    "answer": cached["answer"],
+                    "top_reviews": cached["top_reviews"],
+                    "provider": "rag-v2",
+                    "debug": {**build_debug_info(retrieval, stages), "answer_cache": "hit", "answer_cache_lookup": "evidence"}
+                })
         
-        # Step 6: LLM 최종 응답 생성 (Gemini)
-        final_answer = synthesize_answer_with_llm(
-            user_query,
-            merged_context,
-            conversation_history
-        )
+        # Step 6: 토큰 예산 안에서 컨텍스트 구성 → LLM 최종 응답 생성 (Gemini) - 생성하는 동안 top_reviews 변환
+        packed_context = stages.run("pack_context", pack_answer_context,
+                                    retrieval["merged_context"], retrieval["query_embedding"])
+        stages.submit("synthesize", synthesize_answer_with_llm,
+                      user_query, retrieval["merged_context"], conversation_history, packed_context,
+                      timeout=STAGE_TIMEOUT_LLM,
+                      default="답변 생성 시간이 초과되었습니다. 다시 시도해주세요.")
+        top_reviews = format_top_reviews(retrieval["pinecone_results"])
+        final_answer = stages.result("synthesize")
+        if use_cache:
+            store_answer(user_query, retrieval, conversation_history, final_answer, top_reviews)
         
         # Step 7: 응답 반환
         return jsonify({
@@ -865,18 +1725,152 @@ def rag_chat():
             "top_reviews": top_reviews,
             "provider": "rag-v2",
             "debug": {
-                "intent": intent.model_dump(),  # Pydantic BaseModel을 dict로 변환
-                "mongo_candidates": len(mongo_candidates) if mongo_candidates else 0,
-                "pinecone_hits": len(pinecone_results)
+                **build_debug_info(retrieval, stages),
+                "answer_cache": "miss" if use_cache else "bypass",
+                "context": packed_context.stats()
             }
         })
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def build_debug_info(retrieval: Dict[str, Any], stages: StageExecutor) -> Dict[str, Any]:
+    """응답의 debug 블록 구성"""
+    mongo_candidates = retrieval["mongo_candidates"]
+    return {
+        "intent": retrieval["intent"].model_dump(),  # Pydantic BaseModel을 dict로 변환
+        "mongo_candidates": len(mongo_candidates) if mongo_candidates else 0,
+        "pinecone_hits": len(retrieval["pinecone_results"]),
+        "speculative": retrieval["speculative_status"],
+        "stages": stages.timings,
+        "total_ms": stages.total_ms()
+    }
+
+def cached_debug_info(cached: Dict[str, Any], lookup: str, stages: StageExecutor) -> Dict[str, Any]:
+    """답변 캐시 적중 시 debug 블록 (검색 단계를 건너뛰었으므로 intent 정보 없음)"""
+    return {
+        "answer_cache": "hit",
+        "answer_cache_lookup": lookup,  # "query": 질문 키 적중, "evidence": 검색 결과 키 적중
+        "cached_at": cached["created_at"].isoformat() if hasattr(cached["created_at"], "isoformat") else cached["created_at"],
+        "pinecone_hits": len(cached["match_ids"]),
+        "stages": stages.timings,
+        "total_ms": stages.total_ms()
+    }
+
+# ───────────────────────────────────────────────
+# RAG Chat 스트리밍 엔드포인트
+# ───────────────────────────────────────────────
+#
+# POST /api/v2/rag/chat/stream   (요청 본문은 /api/v2/rag/chat과 동일)
+# 형식: 기본은 SSE(text/event-stream), ?format=ndjson 또는 "format": "ndjson"이면 줄 단위 JSON
+#
+# 이벤트 순서:
+#   1) retrieval  - 검색이 끝나는 즉시 {"top_reviews": [...], "provider": "rag-v2", "debug": {...}}
+#   2) token      - Gemini 응답 조각이 도착할 때마다 {"text": "..."}
+#   3) 종료 이벤트 중 하나
+#      done       {"finish_reason": "STOP", "total_ms": ...}
+#      truncated  {"finish_reason": "MAX_TOKENS", "message": ...}   (이미 보낸 토큰은 유효)
+#      blocked    {"finish_reason": "SAFETY" | "RECITATION", "message": ...}
+#      error      {"message": ...}
+#
+# SSE 예시:
+#   event: token
+#   data: {"text": "데이터베이스 강의로는"}
+
+def format_stream_event(event: str, data: Dict[str, Any], stream_format: str) -> str:
+    """이벤트를 SSE 또는 NDJSON 한 줄로 직렬화"""
+    if stream_format == "ndjson":
+        return json.dumps({"event": event, **data}, ensure_ascii=False) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route("/api/v2/rag/chat/stream", methods=["POST"])
+def rag_chat_stream():
+    """RAG 기반 챗봇 API (스트리밍)"""
+    body = request.get_json(silent=True) or {}
+    user_query = body.get("query", "").strip()
+    conversation_history = body.get("history", [])  # 대화 히스토리 (선택적)
+    stream_format = (request.args.get("format") or body.get("format") or "sse").lower()
+    if stream_format not in ["sse", "ndjson"]:
+        return jsonify({"error": "format은 sse 또는 ndjson이어야 합니다."}), 400
+    
+    if not user_query:
+        return jsonify({"error": "query 파라미터가 필요합니다."}), 400
+    
+    use_cache = ANSWER_CACHE_ENABLED and body.get("use_cache", True)
+    
+    def replay_cached(cached: Dict[str, Any], debug: Dict[str, Any], stages: StageExecutor):
+        """캐시된 답변을 스트리밍 이벤트 형식 그대로 한 번에 전송"""
+        yield format_stream_event("retrieval", {
+            "top_reviews": cached["top_reviews"],
+            "provider": "rag-v2",
+            "debug": debug
+        }, stream_format)
+        yield format_stream_event("token", {"text": cached["answer"]}, stream_format)
+        yield format_stream_event("done", {"finish_reason": "STOP", "total_ms": stages.total_ms()}, stream_format)
+    
+    def generate():
+        stages = StageExecutor()
+        try:
+            if use_cache:
+                cached = stages.run("answer_cache", answer_cache.get_by_query, user_query, conversation_history)
+                if cached is not None:
+                    yield from replay_cached(cached, cached_debug_info(cached, "query", stages), stages)
+                    return
+            
+            # Step 0~5: 검색 → 끝나는 즉시 top_reviews/debug 전송
+            retrieval = retrieve_rag_context(user_query, stages)
+            if use_cache:
+                cached = answer_cache.get(answer_cache_key(user_query, retrieval, conversation_history))
+                if cached is not None:
+                    debug = {**build_debug_info(retrieval, stages), "answer_cache": "hit", "answer_cache_lookup": "evidence"}
+                    yield from replay_cached(cached, debug, stages)
+                    return
+            
+            top_reviews = format_top_reviews(retrieval["pinecone_results"])
+            packed_context = stages.run("pack_context", pack_answer_context,
+                                        retrieval["merged_context"], retrieval["query_embedding"])
+            yield format_stream_event("retrieval", {
+                "top_reviews": top_reviews,
+                "provider": "rag-v2",
+                "debug": {
+                    **build_debug_info(retrieval, stages),
+                    "answer_cache": "miss" if use_cache else "bypass",
+                    "context": packed_context.stats()
+                }
+            }, stream_format)
+            
+            # Step 6: Gemini 응답 토큰 스트리밍 (STAGE_TIMEOUT_LLM 초과 시 stream_answer_with_llm이 error로 종료)
+            answer_parts = []
+            for event, data in stream_answer_with_llm(user_query, retrieval["merged_context"], conversation_history, packed_context):
+                if event == "token":
+                    answer_parts.append(data["text"])
+                if event == "done":
+                    data = {**data, "total_ms": stages.total_ms()}
+                    # 정상 종료(STOP)된 답변만 캐시
+                    if use_cache:
+                        store_answer(user_query, retrieval, conversation_history, ''.join(answer_parts), top_reviews)
+                yield format_stream_event(event, data, stream_format)
+        except Exception as e:
+            print(f"❌ RAG 스트리밍 오류: {e}")
+            yield format_stream_event("error", {"message": str(e)}, stream_format)
+    
+    mimetype = "application/x-ndjson" if stream_format == "ndjson" else "text/event-stream"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # nginx 프록시 버퍼링 비활성화
+        }
+    )
+
 # ───────────────────────────────────────────────
 # 테스트 엔드포인트
 # ───────────────────────────────────────────────
+def without_vectors(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """응답 JSON에서 임베딩 벡터(values, embedding) 제외"""
+    return [{key: value for key, value in item.items() if key not in ("values", "embedding")} for item in items]
+
 @app.route("/api/v2/rag/test/intent", methods=["POST"])
 def test_classify_intent():
     """
@@ -923,7 +1917,7 @@ def test_classify_intent():
 @app.route("/api/v2/rag/test/intent/batch", methods=["POST"])
 def test_classify_intent_batch():
     """
-    여러 질문을 한번에 테스트하는 엔드포인트
+    여러 질문을 한번에 테스트하는 엔드포인트 (프롬프트 회귀 테스트용, 수백 개 질문 지원)
     
     요청 예시:
     POST /api/v2/rag/test/intent/batch
@@ -934,7 +1928,11 @@ def test_classify_intent_batch():
         "이번 학기에 열리는 데이터베이스 강의 추천해줘",
         "손경아 교수님 어때?",
         "과제 별로 없는 강의 추천해줘"
-      ]
+      ],
+      "mode": "concurrent",   # 선택: "concurrent"(기본, 질문별 병렬 호출) | "batch"(여러 질문을 한 프롬프트로)
+      "batch_size": 20,        # 선택: batch 모드에서 프롬프트당 질문 수
+      "max_workers": 8,        # 선택: 동시 Gemini 호출 수 (INTENT_BATCH_MAX_WORKERS 이하)
+      "llm_only": false        # 선택: true면 캐시/로컬 분석 없이 모두 Gemini로 분석
     }
     """
     try:
@@ -943,26 +1941,26 @@ def test_classify_intent_batch():
         
         if not queries or not isinstance(queries, list):
             return jsonify({"error": "queries 파라미터가 필요합니다. (배열)"}), 400
-        
-        results = []
-        for query in queries:
-            try:
-                intent = classify_query_intent(query)
-                results.append({
-                    "query": query,
-                    "intent": intent.model_dump(),
-                    "success": True
-                })
-            except Exception as e:
-                results.append({
-                    "query": query,
-                    "error": str(e),
-                    "success": False
-                })
+        if len(queries) > INTENT_BATCH_MAX_QUERIES:
+            return jsonify({"error": f"queries는 최대 {INTENT_BATCH_MAX_QUERIES}개까지 가능합니다."}), 400
+        queries = [str(query) for query in queries]
+        
+        mode = body.get("mode", "concurrent")
+        if mode not in ("concurrent", "batch"):
+            return jsonify({"error": "mode는 concurrent 또는 batch만 가능합니다."}), 400
+        
+        outcome = classify_query_intents(
+            queries,
+            mode=mode,
+            batch_size=max(1, int(body.get("batch_size", INTENT_BATCH_SIZE))),
+            max_workers=max(1, min(int(body.get("max_workers", INTENT_BATCH_MAX_WORKERS)), INTENT_BATCH_MAX_WORKERS)),
+            llm_only=bool(body.get("llm_only", False))
+        )
         
         return jsonify({
             "total": len(queries),
-            "results": results
+            "results": outcome["results"],
+            "stats": outcome["stats"]
         })
         
     except Exception as e:
@@ -977,7 +1975,8 @@ def test_mongodb_filter():
     POST /api/v2/rag/test/mongodb
     Content-Type: application/json
     {
-      "query": "소프트웨어학과 전공 필수(전필) 과목 추천해줘"
+      "query": "소프트웨어학과 전공 필수(전필) 과목 추천해줘",
+      "explain": true   # 선택: 실행 계획(IXSCAN/COLLSCAN) 포함
     }
     """
     try:
@@ -1005,13 +2004,21 @@ def test_mongodb_filter():
         # MongoDB 필터링 실행
         results = filter_from_mongodb(filters)
         
-        return jsonify({
+        response = {
             "query": user_query,
             "intent": intent.model_dump(),
             "filters": filters,
             "count": len(results) if results else 0,
             "results": results or []
-        })
+        }
+        
+        # 실행 계획 확인 (IXSCAN 사용 여부)
+        if body.get("explain"):
+            collection = get_mongo_db().courses
+            mongo_query = build_course_query(filters) if course_lookup_ready(collection) else legacy_course_query(filters)
+            response["explain"] = explain_course_query(collection, mongo_query) if mongo_query else None
+        
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1050,7 +2057,7 @@ def test_pinecone_search():
             "candidates_count": len(candidates) if candidates else 0,
             "top_k": top_k,
             "results_count": len(results),
-            "results": results
+            "results": without_vectors(results)
         })
         
     except Exception as e:
@@ -1089,8 +2096,9 @@ def test_full_rag_pipeline():
             candidates=mongo_candidates
         )
         
-        # Step 4: 결과 병합
+        # Step 4: 결과 병합 → 토큰 예산 안에서 컨텍스트 구성
         merged_context = merge_results(mongo_candidates, pinecone_results)
+        packed_context = pack_answer_context(merged_context, embed_query(intent.semantic_query))
         
         return jsonify({
             "query": user_query,
@@ -1101,13 +2109,87 @@ def test_full_rag_pipeline():
             },
             "pinecone_results": {
                 "count": len(pinecone_results),
-                "reviews": pinecone_results[:5]  # 최대 5개만 표시
+                "reviews": without_vectors(pinecone_results[:5])  # 최대 5개만 표시
+            },
+            "merged_context": {
+                "courses": [
+                    {**course, "reviews": without_vectors(course.get("reviews", []))}
+                    for course in merged_context.get("courses", [])
+                ]
             },
-            "merged_context": merged_context
+            "packed_context": {
+                "text": packed_context.text,
+                **packed_context.stats()
+            }
         })
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/v2/rag/stats/cache", methods=["GET"])
+def rag_cache_stats():
+    """캐시 적중률 등 통계 조회"""
+    return jsonify({
+        "embedding_cache": embedding_cache.stats(),
+        "embedding_model": {"name": EMBEDDING_MODEL_NAME, "backend": getattr(resources.get("embedding_model"), "backend_name", "torch")
+                            if resources.is_loaded("embedding_model") else None},
+        "intent_cache": intent_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "lexical_index": lexical_index.stats(),
+        "vector_index": {"backend": "local", **get_local_vector_index().describe_index_stats()}
+                        if get_local_vector_index() is not None else {"backend": "pinecone", "index": PINECONE_INDEX}
+    })
+
+@app.route("/api/v2/rag/cache/intent/invalidate", methods=["POST"])
+def invalidate_intent_cache():
+    """
+    intent 캐시 무효화
+    
+    요청 예시:
+    POST /api/v2/rag/cache/intent/invalidate
+    {"query": "손경아 교수님 어때?"}   # 생략하면 현재 프롬프트 버전 전체 삭제
+    """
+    body = request.get_json(silent=True) or {}
+    query = (body.get("query") or "").strip() or None
+    deleted = intent_cache.invalidate(query)
+    return jsonify({
+        "prompt_version": INTENT_PROMPT_VERSION,
+        "query": query,
+        "deleted": deleted
+    })
+
+@app.route("/api/v2/rag/cache/answer/invalidate", methods=["POST"])
+def invalidate_answer_cache():
+    """
+    답변 캐시 무효화 (강의평 재업로드 시 호출)
+    
+    요청 예시:
+    POST /api/v2/rag/cache/answer/invalidate
+    {"course_names": ["데이터베이스", "운영체제"]}   # 생략하면 전체 삭제
+    """
+    body = request.get_json(silent=True) or {}
+    course_names = [name for name in body.get("course_names", []) if isinstance(name, str) and name.strip()]
+    if not course_names:
+        return jsonify({"course_names": [], "deleted": answer_cache.clear()})
+    
+    # 다른 서버 프로세스의 메모리 캐시도 무효 처리되도록 업로드 기록 남김
+    try:
+        record_review_upload(get_mongo_db(), course_names)
+    except Exception as e:
+        print(f"⚠️ 강의평 업로드 기록 실패: {e}")
+    deleted = answer_cache.invalidate_courses(course_names)
+    return jsonify({
+        "course_names": course_names,
+        "deleted": deleted
+    })
+
+@app.route("/api/v2/rag/index/lexical/reload", methods=["POST"])
+def reload_lexical_index():
+    """키워드 인덱스 전체 재적재 (다른 프로세스에서 강의평을 업로드한 경우, 백그라운드 실행)"""
+    if not HYBRID_SEARCH_ENABLED:
+        return jsonify({"error": "HYBRID_SEARCH_ENABLED=false"}), 400
+    threading.Thread(target=load_lexical_index, name="lexical-index-load", daemon=True).start()
+    return jsonify({"status": "reloading", "lexical_index": lexical_index.stats()}), 202
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5005, debug=True)
\ No newline at end of file
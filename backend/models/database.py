@@ -10,6 +10,9 @@ from pymongo.collection import Collection
 from config.config import Config
 from loguru import logger
 
+from backend.rag.course_lookup import ensure_lookup_indexes
+from backend.rag.course_aggregates import CourseAggregates
+
 
 class DatabaseManager:
     """MongoDB 데이터베이스 관리자"""
@@ -47,12 +50,18 @@ class DatabaseManager:
             courses_collection = self.get_collection("courses")
             courses_collection.create_index("course_id", unique=True)
             courses_collection.create_index("course_name")
+            # /api/search 정렬 및 키셋 커서 페이지네이션 (course_name, _id)
+            courses_collection.create_index([("course_name", 1), ("_id", 1)])
             courses_collection.create_index("professor")
             courses_collection.create_index("department")
             courses_collection.create_index("semester")
             courses_collection.create_index("average_rating")
             courses_collection.create_index("created_at")
             courses_collection.create_index([("course_name", "text"), ("professor", "text")])
+            # 구조적 필터용 정규화 필드 (lookup.course_name 등, backend/rag/course_lookup.py)
+            ensure_lookup_indexes(courses_collection)
+            # 강의(강의명, 교수명)별 강의평 집계 (backend/rag/course_aggregates.py)
+            CourseAggregates(self.db).ensure_indexes()
             
             # 대화 컬렉션 인덱스
             conversations_collection = self.get_collection("conversations")
@@ -87,6 +96,17 @@ class DatabaseManager:
             system_metrics_collection = self.get_collection("system_metrics")
             system_metrics_collection.create_index("timestamp")
             
+            # RAG intent 캐시 컬렉션 인덱스 (expires_at 경과 시 자동 삭제)
+            intent_cache_collection = self.get_collection("intent_cache")
+            intent_cache_collection.create_index("expires_at", expireAfterSeconds=0)
+            intent_cache_collection.create_index("prompt_version")
+            
+            # RAG 답변 캐시 컬렉션 인덱스 (강의평 재업로드 시 course_names로 무효화)
+            answer_cache_collection = self.get_collection("answer_cache")
+            answer_cache_collection.create_index("expires_at", expireAfterSeconds=0)
+            answer_cache_collection.create_index("query_key")
+            answer_cache_collection.create_index("course_names")
+            
             logger.success("MongoDB 인덱스 생성 완료")
             
         except Exception as e:
@@ -125,3 +145,6 @@ class Collections:
     COURSE_ANALYTICS = "course_analytics"
     CHAT_ANALYTICS = "chat_analytics"
     SYSTEM_METRICS = "system_metrics"
+    INTENT_CACHE = "intent_cache"
+    ANSWER_CACHE = "answer_cache"
+    REVIEW_UPLOADS = "review_uploads"
@@ -6,10 +6,12 @@ Pinecone 벡터 스토어 모델
 import os
 from typing import List, Dict, Any, Optional
 from pinecone import Pinecone
-from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
 import hashlib
 
+from backend.rag.embedding_cache import get_embedding_cache
+from backend.rag.onnx_embedder import embedding_cache_name, load_embedding_model
+
 # 환경변수 로드
 load_dotenv()
 
@@ -26,7 +28,11 @@ class VectorStore:
         # 기본값: intfloat/multilingual-e5-base (768차원) - Pinecone 인덱스와 일치
         model_name = os.environ.get("EMBEDDING_MODEL", "intfloat/multilingual-e5-base")
         print(f"🧠 임베딩 모델 로딩 중... ({model_name})")
-        self.embedder = SentenceTransformer(model_name)
+        self.model_name = model_name
+        # EMBEDDING_BACKEND=onnx면 ONNX Runtime 모델 사용 (없으면 PyTorch)
+        self.embedder = load_embedding_model(model_name)
+        self.cache_name = embedding_cache_name(model_name, self.embedder)
+        self.embedding_cache = get_embedding_cache()
         print(f"✅ VectorStore 초기화 완료 - 인덱스: {self.index_name}, 모델: {model_name}")
 
     def embed_texts(self, texts: List[str], is_query: bool = False) -> List[List[float]]:
@@ -48,6 +54,10 @@ class VectorStore:
         else:
             prefixed_texts = texts
         
+        # 쿼리는 반복되는 경우가 많으므로 캐시 사용 (업서트용 패시지는 캐시하지 않음)
+        if is_query:
+            return self.embedding_cache.encode(self.embedder, self.cache_name, prefixed_texts)
+        
         embeddings = self.embedder.encode(prefixed_texts, normalize_embeddings=True)
         return embeddings.tolist()
 
@@ -0,0 +1 @@
+# Makes backend.rag a Python package
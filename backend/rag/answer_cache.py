@@ -0,0 +1,363 @@
+"""
+RAG 최종 답변 캐시
+(정규화된 질문, QueryIntent, Pinecone 검색 결과 ID 순서, 최근 N개 대화)의 해시를 키로
+Gemini가 생성한 답변과 top_reviews를 저장
+- 1차: 프로세스 내 LRU (TTL 적용)
+- 2차: MongoDB answer_cache 컬렉션 (expires_at TTL 인덱스)
+- 질문 키(정규화된 질문 + 최근 대화)로도 조회할 수 있어 검색 단계 전에 바로 응답 가능
+강의평이 다시 업로드되면 review_uploads 컬렉션에 기록되고(record_review_upload),
+- 답변 키 조회: 해당 강의가 포함된 항목만 업로드 시각 이후 무효로 취급 (검색 결과 ID가 키에 들어 있음)
+- 질문 키 조회: 검색을 건너뛰므로 새 강의평이 검색 결과를 바꿨는지 알 수 없음
+  → 어느 강의든 항목 저장 이후 업로드가 있었으면 질문 키로는 적중시키지 않음 (검색 후 답변 키로 다시 확인)
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from backend.rag.query_utils import normalize_query
+
+
+def _history_tail(history: Optional[list], turns: int) -> List[List[str]]:
+    """최근 N개 대화만 (user, assistant) 정규화된 쌍으로 추출"""
+    if turns <= 0:
+        return []
+    tail = []
+    for item in (history or [])[-turns:]:
+        if isinstance(item, dict):
+            tail.append([normalize_query(item.get("user", "")), normalize_query(item.get("assistant", ""))])
+    return tail
+
+
+def _hash(payload: Any) -> str:
+    serialized = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+class AnswerCache:
+    """2단계(메모리 LRU + MongoDB) 답변 캐시"""
+
+    def __init__(self, version: str, max_entries: int = 512, ttl_seconds: int = 6 * 3600, history_turns: int = 5,
+                 collection_getter: Optional[Callable[[], Any]] = None,
+                 uploads_collection_getter: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            version: 캐시 버전 (프롬프트가 바뀌면 달라지도록 intent 프롬프트 버전 등을 사용)
+            max_entries: 메모리 캐시 최대 항목 수
+            ttl_seconds: 항목 유효 시간(초)
+            history_turns: 키에 포함할 최근 대화 수 (synthesize_answer_with_llm과 동일하게 5)
+            collection_getter: answer_cache 컬렉션을 돌려주는 함수 (None이면 메모리 캐시만 사용)
+            uploads_collection_getter: review_uploads 컬렉션을 돌려주는 함수 (재업로드 무효화 확인용)
+        """
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.history_turns = history_turns
+        self.collection_getter = collection_getter
+        self.uploads_collection_getter = uploads_collection_getter
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._query_keys: "OrderedDict[str, str]" = OrderedDict()  # 질문 키 → 답변 키
+        self._lock = threading.Lock()
+        self._indexes_ready = False
+        self.hits = 0
+        self.query_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    # ───────────────────────────────────────────────
+    # 키
+    # ───────────────────────────────────────────────
+    def make_key(self, user_query: str, intent: Dict[str, Any], match_ids: List[str], history: Optional[list] = None) -> str:
+        """답변 키: (버전, 정규화된 질문, intent, 검색 결과 ID 순서, 최근 대화)"""
+        return _hash([
+            self.version,
+            normalize_query(user_query),
+            intent,
+            list(match_ids),
+            _history_tail(history, self.history_turns),
+        ])
+
+    def make_query_key(self, user_query: str, history: Optional[list] = None) -> str:
+        """질문 키: (버전, 정규화된 질문, 최근 대화) - 검색 전에 조회할 때 사용"""
+        return _hash([self.version, normalize_query(user_query), _history_tail(history, self.history_turns)])
+
+    # ───────────────────────────────────────────────
+    # MongoDB
+    # ───────────────────────────────────────────────
+    def _collection(self):
+        if self.collection_getter is None:
+            return None
+        try:
+            collection = self.collection_getter()
+            if not self._indexes_ready:
+                # expires_at이 지나면 MongoDB가 자동 삭제
+                collection.create_index("expires_at", expireAfterSeconds=0)
+                collection.create_index("query_key")
+                collection.create_index("course_names")
+                self._indexes_ready = True
+            return collection
+        except Exception as e:
+            print(f"⚠️ 답변 캐시 컬렉션 연결 실패 (메모리 캐시만 사용): {e}")
+            return None
+
+    def _is_stale(self, entry: Dict[str, Any]) -> bool:
+        """항목 저장 이후 관련 강의의 강의평이 다시 업로드되었는지 확인"""
+        course_names = entry.get("course_names") or []
+        if not course_names or self.uploads_collection_getter is None:
+            return False
+        try:
+            uploads = self.uploads_collection_getter()
+            return uploads.find_one(
+                {"_id": {"$in": course_names}, "uploaded_at": {"$gt": entry["created_at"]}},
+                {"_id": 1}
+            ) is not None
+        except Exception as e:
+            print(f"⚠️ 강의평 업로드 기록 조회 오류: {e}")
+            return False
+
+    def _uploaded_since(self, created_at: datetime) -> bool:
+        """항목 저장 이후 어느 강의든 강의평 업로드가 있었는지 (확인할 수 없으면 True)"""
+        if self.uploads_collection_getter is None:
+            return True
+        try:
+            uploads = self.uploads_collection_getter()
+            return uploads.find_one({"uploaded_at": {"$gt": created_at}}, {"_id": 1}) is not None
+        except Exception as e:
+            print(f"⚠️ 강의평 업로드 기록 조회 오류 (질문 키 적중 생략): {e}")
+            return True
+
+    # ───────────────────────────────────────────────
+    # 조회/저장
+    # ───────────────────────────────────────────────
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """답변 키로 조회. {"answer", "top_reviews", "course_names", "match_ids", "created_at"} 또는 None"""
+        entry = self._get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def get_by_query(self, user_query: str, history: Optional[list] = None) -> Optional[Dict[str, Any]]:
+        """
+        질문 키로 조회 (검색 단계 생략용). 미스는 통계에 넣지 않음 (이후 get()에서 집계)
+        항목 저장 이후 강의평 업로드가 하나라도 있었으면 None (검색 결과가 달라졌을 수 있으므로 답변 키로 다시 확인)
+        """
+        query_key = self.make_query_key(user_query, history)
+        with self._lock:
+            key = self._query_keys.get(query_key)
+            if key is not None:
+                self._query_keys.move_to_end(query_key)
+
+        if key is None:
+            collection = self._collection()
+            if collection is not None:
+                try:
+                    doc = collection.find_one(
+                        {"query_key": query_key, "expires_at": {"$gt": datetime.utcnow()}},
+                        {"_id": 1},
+                        sort=[("created_at", -1)]
+                    )
+                except Exception as e:
+                    print(f"⚠️ 답변 캐시 조회 오류: {e}")
+                    doc = None
+                key = doc["_id"] if doc else None
+        if key is None:
+            return None
+
+        entry = self._get(key)
+        if entry is None or self._uploaded_since(entry["created_at"]):
+            return None
+        with self._lock:
+            self.hits += 1
+            self.query_hits += 1
+        return entry
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached["expires_at"] <= now:
+                del self._entries[key]
+                cached = None
+            if cached is not None:
+                self._entries.move_to_end(key)
+
+        from_mongo = False
+        if cached is None:
+            collection = self._collection()
+            if collection is None:
+                return None
+            try:
+                doc = collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+            except Exception as e:
+                print(f"⚠️ 답변 캐시 조회 오류: {e}")
+                return None
+            if not doc:
+                return None
+            remaining = (doc["expires_at"] - datetime.utcnow()).total_seconds()
+            cached = {
+                "entry": {
+                    "answer": doc["answer"],
+                    "top_reviews": doc.get("top_reviews", []),
+                    "course_names": doc.get("course_names", []),
+                    "match_ids": doc.get("match_ids", []),
+                    "created_at": doc["created_at"],
+                },
+                "query_key": doc.get("query_key"),
+                "expires_at": now + max(0.0, remaining),
+            }
+            from_mongo = True
+
+        if self._is_stale(cached["entry"]):
+            with self._lock:
+                self.stale += 1
+            self._delete_keys([key])
+            return None
+
+        if from_mongo:
+            with self._lock:
+                self.mongo_hits += 1
+                self._insert(key, cached)
+        return cached["entry"]
+
+    def put(self, key: str, query_key: str, answer: str, top_reviews: List[Dict[str, Any]],
+            course_names: Iterable[str], match_ids: List[str]) -> None:
+        created_at = datetime.utcnow()
+        entry = {
+            "answer": answer,
+            "top_reviews": top_reviews,
+            "course_names": sorted({name for name in course_names if name}),
+            "match_ids": list(match_ids),
+            "created_at": created_at,
+        }
+        with self._lock:
+            self._insert(key, {"entry": entry, "query_key": query_key, "expires_at": time.time() + self.ttl_seconds})
+
+        collection = self._collection()
+        if collection is not None:
+            try:
+                collection.replace_one(
+                    {"_id": key},
+                    {
+                        "_id": key,
+                        "version": self.version,
+                        "query_key": query_key,
+                        **entry,
+                        "expires_at": created_at + timedelta(seconds=self.ttl_seconds),
+                    },
+                    upsert=True
+                )
+            except Exception as e:
+                print(f"⚠️ 답변 캐시 저장 오류: {e}")
+
+    def _insert(self, key: str, cached: Dict[str, Any]) -> None:
+        """lock을 잡은 상태에서 호출"""
+        self._entries[key] = cached
+        self._entries.move_to_end(key)
+        if cached.get("query_key"):
+            self._query_keys[cached["query_key"]] = key
+            self._query_keys.move_to_end(cached["query_key"])
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        while len(self._query_keys) > self.max_entries:
+            self._query_keys.popitem(last=False)
+
+    # ───────────────────────────────────────────────
+    # 무효화
+    # ───────────────────────────────────────────────
+    def _delete_keys(self, keys: List[str]) -> None:
+        keys = set(keys)
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+            for query_key in [q for q, k in self._query_keys.items() if k in keys]:
+                del self._query_keys[query_key]
+        collection = self._collection()
+        if collection is not None and keys:
+            try:
+                collection.delete_many({"_id": {"$in": list(keys)}})
+            except Exception as e:
+                print(f"⚠️ 답변 캐시 삭제 오류: {e}")
+
+    def invalidate_courses(self, course_names: Iterable[str]) -> int:
+        """해당 강의가 포함된 항목 삭제. 삭제된 항목 수(메모리 + MongoDB) 반환"""
+        targets = {name for name in course_names if name}
+        if not targets:
+            return 0
+        with self._lock:
+            keys = [key for key, cached in self._entries.items() if targets & set(cached["entry"]["course_names"])]
+        removed = len(keys)
+        self._delete_keys(keys)
+
+        collection = self._collection()
+        if collection is not None:
+            try:
+                removed += collection.delete_many({"course_names": {"$in": list(targets)}}).deleted_count
+            except Exception as e:
+                print(f"⚠️ 답변 캐시 삭제 오류: {e}")
+        return removed
+
+    def clear(self) -> int:
+        """전체 항목 삭제. 삭제된 MongoDB 문서 수 반환"""
+        with self._lock:
+            self._entries.clear()
+            self._query_keys.clear()
+        collection = self._collection()
+        if collection is None:
+            return 0
+        try:
+            return collection.delete_many({}).deleted_count
+        except Exception as e:
+            print(f"⚠️ 답변 캐시 삭제 오류: {e}")
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "version": self.version,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "history_turns": self.history_turns,
+                "hits": self.hits,
+                "query_hits": self.query_hits,
+                "mongo_hits": self.mongo_hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "mongo_enabled": self.collection_getter is not None,
+            }
+
+
+def record_review_upload(db: Any, course_names: Iterable[str]) -> int:
+    """
+    강의평 (재)업로드 기록 + 관련 답변 캐시 삭제
+    업로드 스크립트처럼 API 서버와 다른 프로세스에서도 호출할 수 있도록 MongoDB만 사용
+    (API 서버의 메모리 캐시는 조회 시 review_uploads를 확인해 무효 처리)
+
+    Args:
+        db: MongoDB 데이터베이스 객체
+        course_names: 강의평이 업로드된 강의명 목록
+
+    Returns:
+        int: 삭제된 answer_cache 문서 수
+    """
+    targets = sorted({name for name in course_names if name})
+    if not targets:
+        return 0
+    now = datetime.utcnow()
+    for course_name in targets:
+        db.review_uploads.update_one(
+            {"_id": course_name},
+            {"$set": {"uploaded_at": now}},
+            upsert=True
+        )
+    return db.answer_cache.delete_many({"course_names": {"$in": targets}}).deleted_count
@@ -0,0 +1,123 @@
+"""
+대량 LLM 호출용 배치 실행기
+- RateLimiter: 초당 호출 수 제한 (토큰 버킷, 스레드 안전)
+- run_bounded(): 동시 실행 수를 제한한 스레드 풀에서 항목별 함수 실행 (입력 순서대로 결과 반환, 실패 시 재시도)
+- parse_json_array(): 여러 질문을 한 프롬프트로 보낸 응답(JSON 배열) 파싱
+/api/v2/rag/test/intent/batch 같은 프롬프트 회귀 테스트에서 수백 개 질문을 처리할 때 사용
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+
+class RateLimiter:
+    """토큰 버킷 방식 호출 제한 (rate_per_second가 0 이하면 제한 없음)"""
+
+    def __init__(self, rate_per_second: float, burst: Optional[int] = None):
+        self.rate = rate_per_second
+        self.capacity = float(burst or max(1, int(rate_per_second)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """토큰 하나를 얻을 때까지 대기. 대기한 시간(초) 반환"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def chunked(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_bounded(items: Iterable[Any], fn: Callable[[Any], Any], max_workers: int = 8,
+                rate_limiter: Optional[RateLimiter] = None, retries: int = 2,
+                backoff_seconds: float = 1.0) -> List[Dict[str, Any]]:
+    """
+    동시 실행 수와 호출 속도를 제한해 fn(item) 실행
+
+    Args:
+        items: 입력 항목
+        fn: 항목 하나를 처리하는 함수
+        max_workers: 최대 동시 실행 수
+        rate_limiter: 호출(재시도 포함) 전마다 acquire
+        retries: 예외 발생 시 재시도 횟수 (429 등 일시적 오류 대비, 지수 백오프)
+        backoff_seconds: 첫 재시도 대기 시간
+
+    Returns:
+        입력 순서대로 {"success", "value" | "error", "attempts", "elapsed_ms"} 리스트
+    """
+    items = list(items)
+
+    def run_one(item: Any) -> Dict[str, Any]:
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            try:
+                value = fn(item)
+                return {"success": True, "value": value, "attempts": attempt,
+                        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+            except Exception as e:
+                if attempt > retries:
+                    return {"success": False, "error": str(e), "attempts": attempt,
+                            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+                time.sleep(backoff_seconds * (2 ** (attempt - 1)))
+
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))), thread_name_prefix="batch") as pool:
+        return list(pool.map(run_one, items))
+
+
+def strip_code_fence(text: str) -> str:
+    """```json ... ``` 마크다운 코드 블록 제거"""
+    text = (text or "").strip()
+    if "```json" in text:
+        return text.split("```json")[1].split("```")[0].strip()
+    if "```" in text:
+        return text.split("```")[1].split("```")[0].strip()
+    return text
+
+
+def parse_json_array(text: str) -> List[Any]:
+    """
+    LLM 응답에서 JSON 배열 파싱 (코드 블록/앞뒤 설명 허용)
+
+    Raises:
+        json.JSONDecodeError: 배열을 찾지 못한 경우
+    """
+    text = strip_code_fence(text)
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        start, end = text.find("["), text.rfind("]")
+        if start < 0 or end <= start:
+            raise
+        parsed = json.loads(text[start:end + 1])
+    if isinstance(parsed, dict):
+        # {"results": [...]} 형태로 감싸서 응답한 경우
+        for value in parsed.values():
+            if isinstance(value, list):
+                return value
+    if not isinstance(parsed, list):
+        raise json.JSONDecodeError("JSON 배열이 아닙니다", text, 0)
+    return parsed
@@ -0,0 +1,237 @@
+"""
+LLM 프롬프트용 강의 컨텍스트 패커
+토큰 예산 안에서 강의별로 관련도와 다양성(MMR)을 고려해 강의평을 고르고,
+JSON 대신 줄 단위의 짧은 형식으로 출력하면서 사용한 토큰 수를 함께 반환
+
+출력 형식 예:
+    [1] 데이터베이스 | 교수 홍길동 | 소프트웨어학과 | 평점 4.2 | 강의평 2/5
+    - 팀플 없고 과제가 적당해요. 시험은 족보 위주
+    - 설명이 자세하지만 진도가 빠름
+    [2] 운영체제 | 교수 김철수 | 강의평 0/0
+    (그 외 강의 37개는 예산 초과로 생략)
+"""
+
+import math
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# 출력 형식/선택 규칙을 바꾸면 올림 (답변 캐시 버전에 포함되어 이전 답변이 조회되지 않음)
+CONTEXT_FORMAT_VERSION = "2"
+
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+SENTENCE_END_PATTERN = re.compile(r"[.!?。…~]|다\s|요\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Gemini 토큰 수 추정 (API 호출 없이)
+    한글은 대략 글자당 1토큰, 그 외 문자는 4글자당 1토큰으로 계산
+    """
+    if not text:
+        return 0
+    hangul = len(HANGUL_PATTERN.findall(text))
+    others = len(text) - hangul
+    return hangul + math.ceil(others / 4)
+
+
+def _clean_text(text: str, max_chars: int) -> str:
+    """공백 정리 후 max_chars 이하로 자르기 (가능하면 문장 경계에서)"""
+    text = WHITESPACE_PATTERN.sub(" ", text or "").strip()
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundaries = [m.end() for m in SENTENCE_END_PATTERN.finditer(cut)]
+    if boundaries and boundaries[-1] >= max_chars // 2:
+        cut = cut[:boundaries[-1]]
+    return cut.rstrip() + "…"
+
+
+def _unit(vector: Optional[Sequence[float]]) -> Optional[np.ndarray]:
+    if vector is None or len(vector) == 0:
+        return None
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm > 0 else None
+
+
+def mmr_order(relevance: Sequence[float], vectors: Sequence[Optional[np.ndarray]], lambda_mult: float = 0.7) -> List[int]:
+    """
+    MMR(Maximal Marginal Relevance) 순서 계산
+    score = λ·관련도 - (1-λ)·이미 고른 항목과의 최대 유사도
+
+    Args:
+        relevance: 항목별 관련도
+        vectors: 항목별 정규화 벡터 (None이면 다양성 계산에서 제외)
+        lambda_mult: 관련도 가중치 (1이면 관련도 순)
+
+    Returns:
+        선택 순서대로의 인덱스 리스트
+    """
+    remaining = list(range(len(relevance)))
+    order: List[int] = []
+    max_similarity = [0.0] * len(relevance)
+    while remaining:
+        best = max(remaining, key=lambda i: lambda_mult * relevance[i] - (1 - lambda_mult) * max_similarity[i])
+        order.append(best)
+        remaining.remove(best)
+        if vectors[best] is None:
+            continue
+        for i in remaining:
+            if vectors[i] is not None:
+                max_similarity[i] = max(max_similarity[i], float(vectors[i] @ vectors[best]))
+    return order
+
+
+class PackedContext:
+    """pack_context() 결과"""
+
+    def __init__(self, text: str, token_count: int, budget: int, included_reviews: int, total_reviews: int, courses: int):
+        self.text = text
+        self.token_count = token_count
+        self.budget = budget
+        self.included_reviews = included_reviews
+        self.total_reviews = total_reviews
+        self.courses = courses
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.token_count,
+            "budget": self.budget,
+            "courses": self.courses,
+            "reviews": self.included_reviews,
+            "reviews_total": self.total_reviews,
+        }
+
+
+def _course_header(number: int, course: Dict[str, Any], shown: int, total: int) -> str:
+    parts = [f"[{number}] {course.get('course_name', '')}"]
+    if course.get("professor"):
+        parts.append(f"교수 {course['professor']}")
+    if course.get("department"):
+        parts.append(course["department"])
+    try:
+        rating = float(course.get("rating") or 0.0)
+    except (TypeError, ValueError):
+        rating = 0.0
+    if rating > 0:
+        parts.append(f"평점 {rating:.1f}")
+    parts.append(f"강의평 {shown}/{total}")
+    return " | ".join(parts)
+
+
+def _omitted_line(count: int) -> str:
+    return f"(그 외 강의 {count}개는 예산 초과로 생략)"
+
+
+def pack_context(merged_context: Dict[str, Any], budget_tokens: int = 1500,
+                 query_embedding: Optional[Sequence[float]] = None, lambda_mult: float = 0.7,
+                 max_review_chars: int = 300, min_review_chars: int = 60,
+                 token_counter: Callable[[str], int] = estimate_tokens) -> PackedContext:
+    """
+    merge_results() 결과를 토큰 예산에 맞춰 줄 단위 텍스트로 변환
+
+    Args:
+        merged_context: {"courses": [{course_name, professor, department, rating, reviews: [{text, embedding?, ...}]}]}
+        budget_tokens: 컨텍스트에 쓸 최대 토큰 수
+        query_embedding: 쿼리 임베딩 (있으면 강의평 임베딩과의 코사인 유사도를 관련도로 사용)
+        lambda_mult: MMR 관련도 가중치
+        max_review_chars: 강의평 한 개 최대 글자 수
+        min_review_chars: 예산이 모자랄 때 이보다 짧게는 자르지 않음
+        token_counter: 토큰 수 계산 함수
+
+    Returns:
+        PackedContext: text, token_count 등 (token_count는 항상 budget_tokens 이하)
+        강의평이 들어간 강의가 먼저, 남은 예산으로 나머지 강의 헤더, 그래도 남는 강의는 한 줄로 생략 안내
+    """
+    courses = merged_context.get("courses", [])
+    query_vector = _unit(query_embedding)
+
+    # 강의별 MMR 순서로 후보 강의평 정렬
+    ranked: List[List[Dict[str, Any]]] = []
+    course_relevance: List[float] = []
+    total_reviews = 0
+    for course in courses:
+        reviews = [review for review in course.get("reviews", []) if (review.get("text") or "").strip()]
+        total_reviews += len(reviews)
+        vectors = [_unit(review.get("embedding")) for review in reviews]
+        relevance = []
+        for rank, vector in enumerate(vectors):
+            if query_vector is not None and vector is not None:
+                relevance.append(float(vector @ query_vector))
+            else:
+                # 임베딩이 없으면 검색 순위로 관련도 대신
+                relevance.append(1.0 / (1 + rank))
+        order = mmr_order(relevance, vectors, lambda_mult) if reviews else []
+        ranked.append([reviews[i] for i in order])
+        course_relevance.append(max(relevance) if relevance else 0.0)
+
+    # 헤더도 예산에 포함: 강의평을 처음 넣을 때 그 강의의 헤더 비용을 함께 계산
+    # (헤더의 강의평 수는 최종 값 이하이므로 total로 계산하면 실제 비용 이상)
+    selected: Dict[int, List[str]] = {}
+    placed: List[int] = []
+    used = 0
+
+    def header_cost(course_index: int) -> int:
+        course = courses[course_index]
+        return token_counter(_course_header(len(placed) + 1, course, len(ranked[course_index]),
+                                            len(course.get("reviews", [])))) + 1
+
+    # 관련도 높은 강의부터 한 개씩 돌아가며 강의평 추가 (강의 간 균형 유지)
+    course_order = sorted((i for i in range(len(courses)) if ranked[i]), key=lambda i: -course_relevance[i])
+    depth = 0
+    while used < budget_tokens and any(depth < len(ranked[i]) for i in course_order):
+        for course_index in course_order:
+            if depth >= len(ranked[course_index]) or (depth > 0 and course_index not in selected):
+                continue
+            extra = 0 if course_index in selected else header_cost(course_index)
+            line = "- " + _clean_text(ranked[course_index][depth].get("text", ""), max_review_chars)
+            cost = token_counter(line) + 1
+            if used + extra + cost > budget_tokens:
+                # 남은 예산에 맞게 줄여서라도 넣기 (너무 짧아지면 생략)
+                remaining_chars = int(len(line) * (budget_tokens - used - extra - 1) / cost) - 3
+                if remaining_chars < min_review_chars:
+                    continue
+                line = "- " + _clean_text(ranked[course_index][depth].get("text", ""), remaining_chars)
+                cost = token_counter(line) + 1
+                if used + extra + cost > budget_tokens:
+                    continue
+            if course_index not in selected:
+                selected[course_index] = []
+                placed.append(course_index)
+            selected[course_index].append(line)
+            used += extra + cost
+        depth += 1
+
+    # 강의평이 들어간 강의 다음에, 남은 예산으로 나머지 강의 헤더만 (검색 순서대로)
+    rest = [i for i in range(len(courses)) if i not in selected]
+    for position, course_index in enumerate(rest):
+        cost = header_cost(course_index)
+        omitted = len(rest) - position - 1
+        # 다음 헤더를 못 넣게 되더라도 생략 안내 줄은 들어가도록 여유 확보
+        summary_cost = token_counter(_omitted_line(omitted)) + 1 if omitted else 0
+        if used + cost + summary_cost > budget_tokens:
+            break
+        selected[course_index] = []
+        placed.append(course_index)
+        used += cost
+
+    lines: List[str] = []
+    for number, course_index in enumerate(placed, 1):
+        course = courses[course_index]
+        lines.append(_course_header(number, course, len(selected[course_index]), len(course.get("reviews", []))))
+        lines.extend(selected[course_index])
+    omitted = len(courses) - len(placed)
+    if omitted and used + token_counter(_omitted_line(omitted)) + 1 <= budget_tokens:
+        lines.append(_omitted_line(omitted))
+    text = "\n".join(lines)
+    return PackedContext(
+        text=text,
+        token_count=token_counter(text),
+        budget=budget_tokens,
+        included_reviews=sum(len(reviews) for reviews in selected.values()),
+        total_reviews=total_reviews,
+        courses=len(placed)
+    )
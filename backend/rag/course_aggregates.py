@@ -0,0 +1,352 @@
+"""
+강의(강의명, 교수명)별 강의평 집계 컬렉션 (course_aggregates)
+강의 목록 API가 요청마다 전체 강의평을 묶어 평균/개수/학기/태그를 다시 계산하던 것을,
+강의평이 추가/수정/삭제될 때마다 해당 강의 문서만 증분 갱신해 두고 인덱스로 바로 읽도록 함
+
+course_aggregates 문서:
+    _id: "강의명::교수명"
+    course_name, professor, department
+    review_count, rating_sum, average_rating (= rating_sum / review_count, 평점 없는 강의평은 0점으로 계산)
+    rating_histogram: {"1": n, ..., "5": n}  (반올림한 평점별 강의평 수)
+    tag_counts: {"팀플": n, "과제": n, ...}   (키워드가 들어간 강의평 수, 분석 필드가 없는 강의의 태그 판단용)
+    sentiment_sum/sentiment_count, difficulty_sum/difficulty_count, workload_sum/workload_count,
+    team_project: {"yes": n, "no": n}        (업로드 시 분석 필드 합계 → enrichment_summary(), derive_tags())
+    semesters, latest_semester, sample_reviews(처음 들어온 강의평 3개), updated_at
+
+course_aggregate_reviews 문서 (적용 기록, 같은 강의평을 두 번 더하지 않도록):
+    _id: 강의평 ID, key, contribution(그 강의평이 더한 값,
+    Review 모델과 같은 이름의 분석 필드 sentiment_score/has_team_project/difficulty_level/workload_level 포함)
+
+강의평이 수정/삭제되면 합계/개수/히스토그램/태그 카운트는 이전 값을 빼서 정확히 맞추지만,
+semesters/latest_semester/sample_reviews는 줄이지 않음 (rebuild()로 정리)
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backend.rag.review_enrichment import ENRICHMENT_FIELDS, enrich_review, needs_enrichment
+
+AGGREGATES_COLLECTION = "course_aggregates"
+LEDGER_COLLECTION = "course_aggregate_reviews"
+
+SAMPLE_REVIEW_COUNT = 3
+DEFAULT_DEPARTMENT = "소프트웨어학과"
+
+# 태그 판단에 쓰는 키워드 (강의평 본문에 들어 있으면 1씩 셈)
+TAG_TERMS = ("팀플", "팀프로젝트", "노팀플", "없", "과제", "많", "꿀강", "쉬", "성적", "잘")
+
+LIST_PROJECTION = {"rating_sum": 0}
+LIST_SORT = [("average_rating", -1), ("_id", 1)]
+
+
+def aggregate_key(course_name: str, professor: str) -> str:
+    return f"{course_name}::{professor}"
+
+
+def rating_key(course_name: str, professor: Optional[str]) -> Tuple[str, str]:
+    """ratings_for() 결과 키 (교수명을 모르면 "", 강의평 metadata의 "Unknown"도 모르는 것으로 취급)"""
+    professor = (professor or "").strip()
+    return (course_name or "").strip(), "" if professor == "Unknown" else professor
+
+
+def review_terms(text: str) -> List[str]:
+    return [term for term in TAG_TERMS if term in text]
+
+
+def _average(doc: Dict[str, Any], name: str) -> Optional[float]:
+    count = doc.get(f"{name}_count", 0)
+    return doc.get(f"{name}_sum", 0) / count if count else None
+
+
+def enrichment_summary(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    집계 문서 → 강의 단위 분석 값 (근거가 된 강의평이 없으면 None)
+
+    Returns:
+        {"sentiment": -1~1 평균, "difficulty": 1~5 평균, "workload": 1~5 평균,
+         "has_team_project": 팀플 있음/없음 언급이 더 많은 쪽}
+    """
+    team = doc.get("team_project") or {}
+    yes, no = team.get("yes", 0), team.get("no", 0)
+    return {
+        "sentiment": _average(doc, "sentiment"),
+        "difficulty": _average(doc, "difficulty"),
+        "workload": _average(doc, "workload"),
+        "has_team_project": yes > no if yes or no else None,
+    }
+
+
+def derive_tags(doc: Dict[str, Any]) -> List[str]:
+    """
+    집계 문서 → 태그 (분석 필드 합계로 판단, 분석 필드가 없는 강의는 키워드 카운트 규칙)
+    키워드 규칙은 기존 강의 목록 API의 전체 본문 키워드 규칙과 같은 결과
+    ("본문 전체에 X가 있다" == "X가 들어간 강의평이 1개 이상")
+    """
+    tag_counts = doc.get("tag_counts") or {}
+    has = lambda term: tag_counts.get(term, 0) > 0
+    summary = enrichment_summary(doc)
+    tags = []
+    if summary["has_team_project"] is not None:
+        tags.append("팀플있음" if summary["has_team_project"] else "노팀플")
+    elif has("팀플") or has("팀프로젝트"):
+        tags.append("노팀플" if has("없") or has("노팀플") else "팀플있음")
+    if summary["workload"] is not None:
+        workload = summary["workload"]
+        tags.append("과제많음" if workload >= 3.5 else "적당한과제" if workload >= 2.5 else "과제적음")
+    elif has("과제"):
+        tags.append("과제많음" if has("많") else "적당한과제")
+    if summary["difficulty"] is not None:
+        if summary["difficulty"] <= 2.5:
+            tags.append("쉬움")
+    elif has("꿀강") or has("쉬"):
+        tags.append("쉬움")
+    if has("성적") and has("잘"):
+        tags.append("성적잘줌")
+    return tags
+
+
+def _rating(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def review_contribution(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """강의평 metadata → 집계에 더할 값"""
+    course_name = metadata.get("course_name") or "Unknown"
+    professor = metadata.get("professor") or "Unknown"
+    rating = _rating(metadata.get("rating"))
+    text = metadata.get("text") or ""
+    # 업로드 때 계산한 분석 필드 사용 (아직 분석 전이거나 규칙 버전이 다르면 여기서 한 번 계산)
+    enrichment = (enrich_review(text, metadata.get("rating")) if needs_enrichment(metadata)
+                  else {field: metadata.get(field) for field in ENRICHMENT_FIELDS})
+    return {
+        "key": aggregate_key(course_name, professor),
+        "course_name": course_name,
+        "professor": professor,
+        "department": metadata.get("department") or DEFAULT_DEPARTMENT,
+        "rating": rating or 0.0,
+        "bucket": str(min(5, max(1, int(rating + 0.5)))) if rating else None,
+        "terms": review_terms(text),
+        "semester": metadata.get("semester") or "",
+        "text": text,
+        **enrichment,
+    }
+
+
+def _enrichment_counters(contribution: Dict[str, Any]) -> List[Tuple[str, float]]:
+    """분석 필드 → 집계 문서에 더할 (필드 경로, 값)"""
+    counters: List[Tuple[str, float]] = []
+    if contribution.get("sentiment_score") is not None:
+        counters += [("sentiment_sum", contribution["sentiment_score"]), ("sentiment_count", 1)]
+    if contribution.get("has_team_project") is not None:
+        counters.append(("team_project.yes" if contribution["has_team_project"] else "team_project.no", 1))
+    for name in ("difficulty", "workload"):
+        level = contribution.get(f"{name}_level")
+        if level:
+            counters += [(f"{name}_sum", level), (f"{name}_count", 1)]
+    return counters
+
+
+def _field(path: str, default: Any = 0) -> Dict[str, Any]:
+    return {"$ifNull": [f"${path}", default]}
+
+
+def _update_pipeline(contribution: Dict[str, Any], sign: int) -> List[Dict[str, Any]]:
+    """
+    집계 문서 한 개를 갱신하는 업데이트 파이프라인 (sign=1 더하기, -1 빼기)
+    평균까지 같은 update 안에서 다시 계산 → 강의평 한 건당 MongoDB 쓰기 1회
+    """
+    fields: Dict[str, Any] = {
+        "course_name": {"$ifNull": ["$course_name", {"$literal": contribution["course_name"]}]},
+        "professor": {"$ifNull": ["$professor", {"$literal": contribution["professor"]}]},
+        "department": {"$ifNull": ["$department", {"$literal": contribution["department"]}]},
+        "review_count": {"$add": [_field("review_count"), sign]},
+        "rating_sum": {"$add": [_field("rating_sum"), sign * contribution["rating"]]},
+        "updated_at": "$$NOW",
+    }
+    if contribution["bucket"]:
+        path = f"rating_histogram.{contribution['bucket']}"
+        fields[path] = {"$add": [_field(path), sign]}
+    for term in contribution["terms"]:
+        path = f"tag_counts.{term}"
+        fields[path] = {"$add": [_field(path), sign]}
+    for path, value in _enrichment_counters(contribution):
+        fields[path] = {"$add": [_field(path), sign * value]}
+    if sign > 0:
+        semester = {"$literal": contribution["semester"]}
+        fields["semesters"] = {"$setUnion": [_field("semesters", []), [semester]]}
+        fields["latest_semester"] = {"$max": [_field("latest_semester", ""), semester]}
+        if contribution["text"]:
+            fields["sample_reviews"] = {"$slice": [
+                {"$concatArrays": [_field("sample_reviews", []), [{"$literal": contribution["text"]}]]},
+                SAMPLE_REVIEW_COUNT,
+            ]}
+    return [
+        {"$set": fields},
+        {"$set": {"average_rating": {"$cond": [
+            {"$gt": ["$review_count", 0]},
+            {"$divide": ["$rating_sum", "$review_count"]},
+            0.0,
+        ]}}},
+    ]
+
+
+def _same(old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+    return all(old.get(field) == new.get(field) for field in new)
+
+
+class CourseAggregates:
+    """
+    course_aggregates 증분 갱신/조회
+
+    Args:
+        db: MongoDB 데이터베이스 객체
+    """
+
+    def __init__(self, db: Any):
+        self.collection = db[AGGREGATES_COLLECTION]
+        self.ledger = db[LEDGER_COLLECTION]
+
+    def ensure_indexes(self) -> None:
+        # 강의 목록: 평점 내림차순 정렬 + review_count > 0 조건을 인덱스 스캔 안에서 처리
+        self.collection.create_index(LIST_SORT + [("review_count", 1)])
+        self.collection.create_index([("course_name", 1)])
+        self.ledger.create_index([("key", 1)])
+
+    def is_empty(self) -> bool:
+        return self.ledger.find_one({}, {"_id": 1}) is None
+
+    def apply(self, records: Iterable[Dict[str, Any]], removed_ids: Sequence[str] = ()) -> Dict[str, int]:
+        """
+        강의평 추가/수정/삭제 반영 (이미 같은 내용으로 반영된 강의평은 건너뜀, 여러 프로세스가 동시에 불러도 안전)
+
+        Args:
+            records: [{"id", "metadata"}] (Pinecone 업서트 항목, ReviewStore 동기화 결과)
+            removed_ids: 삭제된 강의평 ID
+
+        Returns:
+            {"added", "updated", "removed", "skipped"}
+        """
+        counts = {"added": 0, "updated": 0, "removed": 0, "skipped": 0}
+        for record in records:
+            contribution = review_contribution(record.get("metadata") or {})
+            # 적용 기록 교체와 이전 값 조회를 한 번에 (원자적) → 두 프로세스가 같은 강의평을 중복으로 더하지 않음
+            old = self.ledger.find_one_and_replace(
+                {"_id": record["id"]},
+                {"key": contribution["key"], "contribution": contribution},
+                upsert=True,
+            )
+            if old is not None and _same(old.get("contribution", {}), contribution):
+                counts["skipped"] += 1
+                continue
+            if old is not None:
+                self._update(old["contribution"], -1)
+                counts["updated"] += 1
+            else:
+                counts["added"] += 1
+            self._update(contribution, 1)
+
+        for review_id in removed_ids:
+            old = self.ledger.find_one_and_delete({"_id": review_id})
+            if old is not None:
+                self._update(old["contribution"], -1)
+                counts["removed"] += 1
+        return counts
+
+    def _update(self, contribution: Dict[str, Any], sign: int) -> None:
+        self.collection.update_one({"_id": contribution["key"]}, _update_pipeline(contribution, sign),
+                                   upsert=sign > 0)
+
+    def rebuild(self, records: Iterable[Dict[str, Any]]) -> int:
+        """전체 강의평으로 두 컬렉션을 다시 만들기 (최초 구축/복구용). 집계 문서 수 반환"""
+        aggregates: Dict[str, Dict[str, Any]] = {}
+        ledger = []
+        for record in records:
+            contribution = review_contribution(record.get("metadata") or {})
+            ledger.append({"_id": record["id"], "key": contribution["key"], "contribution": contribution})
+            doc = aggregates.setdefault(contribution["key"], {
+                "_id": contribution["key"],
+                "course_name": contribution["course_name"],
+                "professor": contribution["professor"],
+                "department": contribution["department"],
+                "review_count": 0,
+                "rating_sum": 0.0,
+                "rating_histogram": {},
+                "tag_counts": {},
+                "semesters": set(),
+                "sample_reviews": [],
+            })
+            doc["review_count"] += 1
+            doc["rating_sum"] += contribution["rating"]
+            if contribution["bucket"]:
+                doc["rating_histogram"][contribution["bucket"]] = doc["rating_histogram"].get(contribution["bucket"], 0) + 1
+            for term in contribution["terms"]:
+                doc["tag_counts"][term] = doc["tag_counts"].get(term, 0) + 1
+            for path, value in _enrichment_counters(contribution):
+                target = doc
+                *parents, name = path.split(".")
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[name] = target.get(name, 0) + value
+            doc["semesters"].add(contribution["semester"])
+            if contribution["text"] and len(doc["sample_reviews"]) < SAMPLE_REVIEW_COUNT:
+                doc["sample_reviews"].append(contribution["text"])
+
+        now = datetime.utcnow()
+        for doc in aggregates.values():
+            doc["average_rating"] = doc["rating_sum"] / doc["review_count"]
+            doc["latest_semester"] = max(doc["semesters"])
+            doc["semesters"] = sorted(doc["semesters"])
+            doc["updated_at"] = now
+
+        self.collection.delete_many({})
+        self.ledger.delete_many({})
+        if aggregates:
+            self.collection.insert_many(list(aggregates.values()), ordered=False)
+        if ledger:
+            self.ledger.insert_many(ledger, ordered=False)
+        self.ensure_indexes()
+        return len(aggregates)
+
+    def list(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """강의평이 있는 강의 집계 (평점 높은 순, 인덱스 한 번 읽기)"""
+        cursor = self.collection.find({"review_count": {"$gt": 0}}, LIST_PROJECTION).sort(LIST_SORT)
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+    def ratings_for(self, courses: Iterable[Tuple[str, Optional[str]]]) -> Dict[Tuple[str, str], float]:
+        """
+        (강의명, 교수명) → 평균 평점 (강의명 $in 조회 1회)
+        교수명이 있으면 그 교수 강의의 집계만 사용 (없으면 결과에서 빠짐, 다른 교수 평점을 섞지 않음)
+        교수명이 없을 때만 강의명 전체(교수별 집계를 강의평 수로 가중 평균)
+
+        Returns:
+            rating_key(강의명, 교수명) → 평점 (평점을 찾은 항목만)
+        """
+        keys = {rating_key(course_name, professor) for course_name, professor in courses if course_name}
+        if not keys:
+            return {}
+        by_professor: Dict[Tuple[str, str], float] = {}
+        totals: Dict[str, List[float]] = {}
+        for doc in self.collection.find({"course_name": {"$in": sorted({name for name, _ in keys})},
+                                         "review_count": {"$gt": 0}},
+                                        {"course_name": 1, "professor": 1, "rating_sum": 1, "review_count": 1}):
+            by_professor[rating_key(doc["course_name"], doc.get("professor"))] = doc["rating_sum"] / doc["review_count"]
+            total = totals.setdefault(doc["course_name"], [0.0, 0])
+            total[0] += doc["rating_sum"]
+            total[1] += doc["review_count"]
+
+        ratings = {}
+        for key in keys:
+            course_name, professor = key
+            if professor:
+                rating = by_professor.get(key)
+            else:
+                rating_sum, count = totals.get(course_name, (0.0, 0))
+                rating = rating_sum / count if count else None
+            if rating is not None:
+                ratings[key] = rating
+        return ratings
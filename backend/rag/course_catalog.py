@@ -0,0 +1,211 @@
+"""
+개설과목 카탈로그 캐시 (/api/software-courses)
+요청 때마다 엑셀을 pandas로 파싱하지 않고, 변환 결과를 컴파일된 파일(data/catalog/*.catalog.json)로 저장해 두고 읽음
+
+- 원본 엑셀의 크기/수정 시각이 바뀌면 SHA-256을 비교해 내용이 달라졌을 때만 다시 컴파일
+- 강의명/교수명/학수번호/영문명의 문자 1-gram·2-gram 역색인을 함께 저장해 키워드 필터를 전체 순회 없이 처리
+- 다시 로드는 백그라운드 스레드에서 하고, 끝나면 스냅샷을 통째로 교체 (진행 중인 요청은 이전 스냅샷을 계속 사용)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+CATALOG_FORMAT_VERSION = 1
+CATALOG_DIR = Path(__file__).resolve().parents[2] / "data" / "catalog"
+
+# 키워드 필터 대상 필드 (기존 /api/software-courses와 동일)
+CATALOG_SEARCH_FIELDS = ("course_name", "professor", "course_code", "course_english_name")
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _grams(text: str) -> set:
+    """소문자 문자열의 1-gram, 2-gram 집합"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def build_token_index(courses: Sequence[Dict[str, Any]],
+                      fields: Sequence[str] = CATALOG_SEARCH_FIELDS) -> Dict[str, List[int]]:
+    """문자 n-gram → 강의 행 번호 목록 (오름차순)"""
+    postings: Dict[str, List[int]] = {}
+    for row, course in enumerate(courses):
+        grams = set()
+        for field in fields:
+            grams |= _grams((course.get(field) or "").lower())
+        for gram in grams:
+            postings.setdefault(gram, []).append(row)
+    return postings
+
+
+class CatalogSnapshot:
+    """컴파일된 카탈로그 한 벌 (읽기 전용)"""
+
+    def __init__(self, courses: List[Dict[str, Any]], token_index: Dict[str, List[int]],
+                 source: Dict[str, Any], fields: Sequence[str] = CATALOG_SEARCH_FIELDS):
+        self.courses = courses
+        self.token_index = token_index
+        self.source = source
+        self.fields = tuple(fields)
+        self.loaded_at = time.time()
+
+    def filter(self, keyword: str) -> List[Dict[str, Any]]:
+        """
+        키워드 부분 일치 필터 (대소문자 무시)
+        질의의 2-gram(한 글자면 1-gram) 역색인 교집합으로 후보를 줄인 뒤 실제 부분 일치만 확인
+        """
+        keyword = (keyword or "").lower()
+        if not keyword:
+            return self.courses
+        grams = [keyword] if len(keyword) == 1 else [keyword[i:i + 2] for i in range(len(keyword) - 1)]
+        postings = []
+        for gram in set(grams):
+            rows = self.token_index.get(gram)
+            if not rows:
+                return []
+            postings.append(rows)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for rows in postings[1:]:
+            candidates.intersection_update(rows)
+            if not candidates:
+                return []
+        return [
+            self.courses[row] for row in sorted(candidates)
+            if any(keyword in (self.courses[row].get(field) or "").lower() for field in self.fields)
+        ]
+
+
+class CourseCatalog:
+    """
+    엑셀 원본 + 컴파일 결과 캐시
+
+    Args:
+        source_path: 원본 엑셀 경로
+        compiler: 엑셀 경로 → 강의 딕셔너리 리스트 (pandas 파싱/변환)
+        name: 컴파일 파일 이름 (data/catalog/<name>.catalog.json)
+        catalog_dir: 컴파일 파일 디렉터리
+    """
+
+    def __init__(self, source_path: Path, compiler: Callable[[Path], List[Dict[str, Any]]], name: str,
+                 catalog_dir: Path = CATALOG_DIR):
+        self.source_path = Path(source_path)
+        self.compiler = compiler
+        self.artifact_path = Path(catalog_dir) / f"{name}.catalog.json"
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+
+    def _source_stat(self) -> Dict[str, Any]:
+        if not self.source_path.exists():
+            raise FileNotFoundError(f"엑셀 파일을 찾을 수 없습니다: {self.source_path}")
+        stat = self.source_path.stat()
+        return {"path": str(self.source_path), "mtime": stat.st_mtime, "size": stat.st_size}
+
+    def _read_artifact(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.artifact_path, "r", encoding="utf-8") as f:
+                artifact = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if artifact.get("version") != CATALOG_FORMAT_VERSION:
+            return None
+        return artifact
+
+    def _write_artifact(self, artifact: Dict[str, Any]) -> None:
+        self.artifact_path.parent.mkdir(parents=True, exist_ok=True)
+        # 여러 워커가 동시에 컴파일해도 서로의 임시 파일을 덮어쓰지 않도록 pid/스레드별 임시 파일
+        tmp_path = self.artifact_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.artifact_path)
+
+    def _load(self, force_compile: bool = False) -> CatalogSnapshot:
+        """컴파일 파일이 최신이면 읽고, 아니면 엑셀을 컴파일해 저장"""
+        stat = self._source_stat()
+        artifact = None if force_compile else self._read_artifact()
+
+        if artifact is not None:
+            source = artifact["source"]
+            if source["mtime"] != stat["mtime"] or source["size"] != stat["size"]:
+                # 수정 시각만 바뀌고 내용이 같으면(복사/체크아웃 등) 다시 컴파일하지 않음
+                sha256 = file_sha256(self.source_path)
+                if sha256 == source.get("sha256"):
+                    artifact["source"] = dict(stat, sha256=sha256)
+                    self._write_artifact(artifact)
+                else:
+                    artifact = None
+
+        if artifact is None:
+            started = time.perf_counter()
+            courses = self.compiler(self.source_path)
+            artifact = {
+                "version": CATALOG_FORMAT_VERSION,
+                "source": dict(stat, sha256=file_sha256(self.source_path)),
+                "compiled_at": time.time(),
+                "courses": courses,
+                "token_index": build_token_index(courses),
+            }
+            self._write_artifact(artifact)
+            print(f"✅ 카탈로그 컴파일: {self.source_path.name} → {self.artifact_path.name} "
+                  f"({len(courses)}개, {time.perf_counter() - started:.2f}s)")
+
+        return CatalogSnapshot(artifact["courses"], artifact["token_index"], artifact["source"])
+
+    def get(self) -> CatalogSnapshot:
+        """
+        현재 스냅샷 (처음 한 번만 동기 로드)
+        원본이 바뀐 것이 보이면 백그라운드 재로드를 시작하고 이번 요청은 기존 스냅샷으로 응답
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                return self._snapshot
+        try:
+            stat = self._source_stat()
+            if stat["mtime"] != snapshot.source["mtime"] or stat["size"] != snapshot.source["size"]:
+                self.reload_in_background()
+        except FileNotFoundError:
+            pass  # 원본이 사라져도 마지막 스냅샷으로 계속 응답
+        return snapshot
+
+    def reload_in_background(self, force_compile: bool = False) -> bool:
+        """백그라운드 재로드 시작. 이미 진행 중이거나 아직 첫 로드 전이면(get()이 로드) False"""
+        with self._lock:
+            if self._snapshot is None:
+                return False
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return False
+            self._reload_thread = threading.Thread(target=self._reload, args=(force_compile,),
+                                                   name="catalog-reload", daemon=True)
+            self._reload_thread.start()
+            return True
+
+    def _reload(self, force_compile: bool) -> None:
+        try:
+            snapshot = self._load(force_compile=force_compile)
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ 카탈로그 재로드 실패: {e}")
+            return
+        self._snapshot = snapshot
+        self.last_error = None
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_thread is not None and self._reload_thread.is_alive()
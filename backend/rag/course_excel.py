@@ -0,0 +1,269 @@
+"""
+학기 시간표 엑셀(course/<학기>.xlsx) → 강의 딕셔너리 공통 변환기
+lecture_api.py(개설과목 카탈로그), scripts/import_excel_data.py(MongoDB 저장),
+scripts/export_software_courses.py(프론트엔드 JSON)가 같은 변환을 사용
+
+- read_timetable(): openpyxl 읽기 전용 모드로 행을 스트리밍해서 읽고, "과목명"이 있는 행을 찾아 헤더로 사용
+  (제목 행/빈 행 개수가 파일마다 달라도 동작, 열 이름의 줄바꿈 제거)
+- normalize_timetable(): 열 단위(pandas 벡터 연산) 정리 → 표준 열 이름의 DataFrame
+- to_catalog_courses() / to_db_courses(): 용도별 강의 딕셔너리 리스트
+- load_timetables(): 여러 학기 파일을 프로세스 풀에서 병렬로 읽기
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+HEADER_MARKER = "과목명"
+
+# 엑셀 열 이름(줄바꿈 제거) → 표준 열 이름
+COLUMN_MAP = {
+    "순번": "seq",
+    "개설학부": "faculty",
+    "개설전공": "major",
+    "과목명": "course_name",
+    "학점": "credits",
+    "시간": "hours",
+    "수강번호": "class_number",
+    "학수구분": "course_type",
+    "교과구분": "subject_type",
+    "영어강의": "english_lecture",
+    "영어강의등급": "english_grade",
+    "유학생전용": "international_only",
+    "윤강여부": "intensive_course",
+    "소속": "affiliation",
+    "담당교수": "professor",
+    "강의시간명": "lecture_time",
+    "수업방식": "lecture_method",
+    "과목특성": "course_characteristics",
+    "과목영문명": "course_english_name",
+    "과목ID": "subject_id",
+    "교과목코드": "course_code",
+    "수강대상학년": "target_grade",
+    "분반별수업방식": "class_method",
+    "분반별수업방법": "class_type",
+}
+NUMBER_COLUMNS = ("seq", "credits", "hours")
+TRAILING_ZERO_PATTERN = r"^(-?\d+)\.0$"
+SEMESTER_PATTERN = re.compile(r"\d{4}-[12SsWw]")
+
+DEFAULT_DETAILS = {
+    "assignment": "정보 없음",
+    "attendance": "정보 없음",
+    "exam": "정보 없음",
+    "team_project": "정보 없음",
+}
+
+
+def semester_from_path(path: Path) -> str:
+    """파일 이름에서 학기 추출 ("course/2025-2.xlsx" → "2025-2")"""
+    match = SEMESTER_PATTERN.search(Path(path).stem)
+    return match.group(0) if match else Path(path).stem
+
+
+def source_name(semester: str) -> str:
+    """source 필드 값 ("2025-2" → "excel_2025_2")"""
+    return f"excel_{semester.replace('-', '_')}"
+
+
+def read_timetable(path: Path):
+    """
+    시간표 엑셀 읽기 (openpyxl read_only 스트리밍, 셀 서식/스타일은 읽지 않음)
+
+    Returns:
+        원본 열 이름(줄바꿈 제거)을 가진 DataFrame
+
+    Raises:
+        FileNotFoundError: 파일이 없음
+        ValueError: "과목명" 헤더 행을 찾지 못함
+    """
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"엑셀 파일을 찾을 수 없습니다: {path}")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = None
+        for values in rows:
+            if values and HEADER_MARKER in values:
+                header = [str(value).replace("\n", "") if value is not None else "" for value in values]
+                break
+        if header is None:
+            raise ValueError(f"엑셀 파일 형식이 예상과 다릅니다. ({HEADER_MARKER} 열이 없음): {path}")
+        df = pd.DataFrame.from_records(list(rows), columns=header)
+    finally:
+        workbook.close()
+    return df.loc[:, [column for column in df.columns if column]]
+
+
+def _text(series):
+    """문자열 열 정리 (결측 → "", 3.0 → "3", 앞뒤 공백 제거)"""
+    return (series.astype("string")
+            .str.replace(TRAILING_ZERO_PATTERN, r"\1", regex=True)
+            .str.strip()
+            .fillna("")
+            .astype(object))
+
+
+def _number(series, default):
+    """숫자 열 정리 (숫자가 아니거나 결측 → default, 기존 int(value)처럼 소수점 이하 버림)"""
+    import pandas as pd
+
+    return pd.to_numeric(series, errors="coerce").fillna(default).astype("int64")
+
+
+def normalize_timetable(df, required: Sequence[str] = ("course_name",), number_default: int = 0):
+    """
+    원본 시간표 → 표준 열 이름으로 정리한 DataFrame (모든 열이 존재, 행 단위 반복 없음)
+
+    Args:
+        df: read_timetable() 결과
+        required: 비어 있으면 행을 버릴 표준 열
+        number_default: 학점/시간이 비어 있을 때 값
+    """
+    import pandas as pd
+
+    renamed = df.rename(columns=COLUMN_MAP)
+    table = pd.DataFrame(index=renamed.index)
+    for column in COLUMN_MAP.values():
+        source = renamed[column] if column in renamed.columns else pd.Series(None, index=renamed.index, dtype=object)
+        table[column] = _number(source, number_default) if column in NUMBER_COLUMNS else _text(source)
+
+    keep = pd.Series(True, index=table.index)
+    for column in required:
+        keep &= table[column] != ""
+    return table[keep].reset_index(drop=True)
+
+
+def filter_department(table, department: str):
+    """소속이 department인 강의 (소속 열이 비어 있는 파일은 개설전공 부분 일치)"""
+    if (table["affiliation"] != "").any():
+        return table[table["affiliation"] == department].reset_index(drop=True)
+    keyword = department.replace("학과", "")
+    return table[table["major"].str.contains(keyword, regex=False)].reset_index(drop=True)
+
+
+def _first_non_empty(*columns):
+    """열 여러 개 중 행마다 처음으로 비어 있지 않은 값 (row.get(a) or row.get(b))"""
+    result = columns[-1]
+    for column in reversed(columns[:-1]):
+        result = column.where(column != "", result)
+    return result
+
+
+def _records(table, columns: Sequence[str]) -> List[Dict[str, Any]]:
+    """DataFrame → 파이썬 기본 타입 딕셔너리 리스트 (numpy 정수 제거)"""
+    return [dict(zip(columns, values)) for values in zip(*(table[column].tolist() for column in columns))]
+
+
+def to_catalog_courses(table, semester: str, department: str) -> List[Dict[str, Any]]:
+    """개설과목 카탈로그(/api/software-courses, 프론트엔드 JSON)용 강의 리스트"""
+    out = table.copy()
+    out["course_id"] = _first_non_empty(out["subject_id"], out["class_number"], out["course_code"], out["course_name"])
+    out["department"] = _first_non_empty(out["affiliation"], out["major"])
+    # 카탈로그의 class_method는 원본 "수업방식", lecture_method는 "분반별수업방식"을 우선
+    out["class_method"] = table["lecture_method"]
+    out["lecture_method"] = _first_non_empty(table["class_method"], table["lecture_method"])
+    out["class_type"] = _first_non_empty(out["class_type"], out["course_characteristics"])
+    columns = [
+        "course_id", "course_name", "course_code", "professor", "department", "major", "credits", "hours",
+        "course_type", "subject_type", "lecture_time", "lecture_method", "class_method", "class_type",
+        "course_characteristics", "course_english_name", "target_grade", "subject_id",
+    ]
+    source = source_name(semester)
+    tags = [f"{semester}학기", department]
+    courses = []
+    for course in _records(out, columns):
+        course.update({
+            "semester": semester,
+            "average_rating": 0.0,
+            "rating": 0.0,
+            "total_reviews": 0,
+            "reviews": [],
+            "details": dict(DEFAULT_DETAILS, lecture_method=course["lecture_method"], room="",
+                            time_slot=course["lecture_time"], credits=course["credits"]),
+            "ai_summary": "",
+            "keywords": list(dict.fromkeys(value for value in (
+                course["course_name"], course["professor"], course["course_code"]) if value)),
+            "tags": list(tags),
+            "popularity_score": 50.0,
+            "trend_direction": "stable",
+            "source": source,
+        })
+        courses.append(course)
+    return courses
+
+
+def to_db_courses(table, semester: str, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """MongoDB courses 컬렉션 스키마 강의 리스트 (lookup 필드 포함)"""
+    from backend.rag.course_lookup import build_lookup
+
+    now = now or datetime.now()
+    out = table.copy()
+    out["course_id"] = semester + "-" + out["seq"].astype(str).str.zfill(4)
+    out["department"] = out["faculty"]
+    for column in ("english_lecture", "international_only", "intensive_course"):
+        out[column] = out[column].where(out[column] != "", "N")
+    out["ai_summary"] = (out["course_name"] + " 강의입니다. " + out["professor"] + " 교수님이 담당하시며, "
+                         + out["credits"].astype(str) + "학점 과목입니다.")
+    columns = [
+        "course_id", "course_name", "professor", "department", "major", "credits", "hours", "course_code",
+        "subject_id", "course_type", "subject_type", "english_lecture", "english_grade", "international_only",
+        "intensive_course", "affiliation", "lecture_time", "lecture_method", "course_characteristics",
+        "course_english_name", "target_grade", "class_method", "class_type", "ai_summary",
+    ]
+    source = source_name(semester)
+    courses = []
+    for course in _records(out, columns):
+        course.update({
+            "semester": semester,
+            "rating": 0.0,
+            "average_rating": 0.0,
+            "total_reviews": 0,
+            "reviews": [],
+            "details": dict(DEFAULT_DETAILS, credits=course["credits"], time_slot=course["lecture_time"],
+                            room="정보 없음", lecture_method=course["lecture_method"]),
+            "keywords": [course["course_name"], course["professor"]],
+            "tags": [f"{semester}학기", course["department"]],
+            "popularity_score": 50.0,
+            "trend_direction": "stable",
+            "created_at": now,
+            "updated_at": now,
+            "last_crawled_at": now,
+            "source": source,
+        })
+        # 구조적 필터용 정규화 필드 (rag_api.py filter_from_mongodb에서 인덱스로 조회)
+        course["lookup"] = build_lookup(course)
+        courses.append(course)
+    return courses
+
+
+def _read_normalized(args: Tuple[str, Sequence[str], int]):
+    path, required, number_default = args
+    return normalize_timetable(read_timetable(Path(path)), required=required, number_default=number_default)
+
+
+def load_timetables(paths: Iterable[Path], required: Sequence[str] = ("course_name",), number_default: int = 0,
+                    max_workers: Optional[int] = None) -> List[Tuple[str, Any]]:
+    """
+    여러 학기 파일을 병렬로 읽어 정리 (엑셀 파싱은 CPU 작업이라 스레드 대신 프로세스 풀)
+
+    Returns:
+        입력 순서대로 [(학기, 정리된 DataFrame)]
+    """
+    paths = [Path(path) for path in paths]
+    jobs = [(str(path), tuple(required), number_default) for path in paths]
+    if len(jobs) <= 1:
+        tables = [_read_normalized(job) for job in jobs]
+    else:
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            tables = list(pool.map(_read_normalized, jobs))
+    return [(semester_from_path(path), table) for path, table in zip(paths, tables)]
@@ -0,0 +1,216 @@
+"""
+courses 컬렉션 구조적 필터용 정규화 조회 필드
+대소문자 무시/부분 일치 $regex는 인덱스를 쓰지 못하므로, 저장 시 정규화한 값을 lookup 하위 문서에 두고
+정확 일치/접두사 일치(^...)로 조회해 인덱스(IXSCAN)를 사용
+
+lookup 필드:
+    course_name, professor, department, subject_type: 공백/구분 기호 제거 + 소문자
+    course_type: 전필/전선/교필/교선 등 약칭으로 통일
+    lecture_method: 대면/비대면/혼합으로 통일
+    weekdays: lecture_time("화D(혜210) 목C(혜210)")에서 뽑은 요일 배열
+기존 문서는 scripts/backfill_course_lookup.py로 채움
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+LOOKUP_FIELD = "lookup"
+
+# filter_from_mongodb()가 반환하는 필드만 가져오기 (reviews 배열 등 제외)
+COURSE_FILTER_PROJECTION = {
+    "_id": 0,
+    "course_name": 1,
+    "professor": 1,
+    "department": 1,
+    "semester": 1,
+    "credits": 1,
+    "course_type": 1,
+    "subject_type": 1,
+    "lecture_time": 1,
+    "lecture_method": 1,
+    "course_id": 1,
+    "rating": 1,
+    "average_rating": 1,
+    "total_reviews": 1,
+}
+
+# DatabaseManager.create_indexes(), scripts/backfill_course_lookup.py에서 생성
+LOOKUP_INDEXES = [
+    [(f"{LOOKUP_FIELD}.course_name", 1)],
+    [(f"{LOOKUP_FIELD}.professor", 1)],
+    [(f"{LOOKUP_FIELD}.department", 1), (f"{LOOKUP_FIELD}.course_type", 1)],
+    [(f"{LOOKUP_FIELD}.course_type", 1)],
+    [(f"{LOOKUP_FIELD}.subject_type", 1)],
+    [(f"{LOOKUP_FIELD}.lecture_method", 1)],
+    [(f"{LOOKUP_FIELD}.weekdays", 1)],
+]
+
+# 접두사 일치로 찾는 필드 (결과가 없으면 부분 일치로 한 번 더)
+PREFIX_FIELDS = ("course_name", "professor", "department")
+
+WEEKDAYS = "월화수목금토일"
+SEPARATOR_PATTERN = re.compile(r"[\s()\[\]{}·•,./\-_:]+")
+PARENTHESIS_PATTERN = re.compile(r"\([^)]*\)")
+LECTURE_SLOT_PATTERN = re.compile(rf"([{WEEKDAYS}])\s*(?=[A-Za-z0-9])")
+FILTER_WEEKDAY_PATTERN = re.compile(rf"[{WEEKDAYS}]")
+
+COURSE_TYPE_ALIASES = {
+    "전공필수": "전필",
+    "전공선택": "전선",
+    "교양필수": "교필",
+    "교양선택": "교선",
+    "기초교양": "기교",
+}
+
+
+def normalize_name(value: Any) -> str:
+    """강의명/교수명/학과명 정규화 (NFKC, 소문자, 공백/구분 기호 제거)"""
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFKC", str(value)).lower()
+    return SEPARATOR_PATTERN.sub("", text)
+
+
+def canonical_course_type(value: Any) -> str:
+    """이수구분 통일 ("전공 필수", "전필(전공필수)" → "전필")"""
+    text = normalize_name(value)
+    for alias, canonical in COURSE_TYPE_ALIASES.items():
+        text = text.replace(alias, canonical)
+    for canonical in set(COURSE_TYPE_ALIASES.values()):
+        if text.startswith(canonical):
+            return canonical
+    return text
+
+
+def canonical_lecture_method(value: Any) -> str:
+    """수업방식 통일 (온라인/원격/동영상/cyber 강좌 → 비대면, 블렌디드 → 혼합)"""
+    text = normalize_name(value)
+    if not text:
+        return ""
+    if "혼합" in text or "블렌디드" in text or "blended" in text:
+        return "혼합"
+    if any(keyword in text for keyword in ("비대면", "온라인", "원격", "녹화", "동영상", "사이버", "cyber", "online")):
+        return "비대면"
+    if "대면" in text or "오프라인" in text:
+        return "대면"
+    return text
+
+
+def parse_weekdays(lecture_time: Any) -> List[str]:
+    """강의시간 문자열에서 요일 추출 ("화D(혜210) 목C(혜210)" → ["화", "목"], 강의실 괄호 안은 무시)"""
+    if not lecture_time:
+        return []
+    text = PARENTHESIS_PATTERN.sub(" ", str(lecture_time))
+    days = set(LECTURE_SLOT_PATTERN.findall(text))
+    return [day for day in WEEKDAYS if day in days]
+
+
+def parse_filter_weekdays(value: Any) -> List[str]:
+    """필터 값의 요일 ("월", "월요일", "월,수" → ["월", "수"])"""
+    text = str(value or "").replace("요일", "")  # "월요일"의 "일"을 일요일로 읽지 않도록
+    days = set(FILTER_WEEKDAY_PATTERN.findall(text))
+    return [day for day in WEEKDAYS if day in days]
+
+
+def build_lookup(course: Dict[str, Any]) -> Dict[str, Any]:
+    """강의 문서로 lookup 하위 문서 생성 (저장/백필 시 사용)"""
+    return {
+        "course_name": normalize_name(course.get("course_name")),
+        "professor": normalize_name(course.get("professor")),
+        "department": normalize_name(course.get("department")),
+        "subject_type": normalize_name(course.get("subject_type")),
+        "course_type": canonical_course_type(course.get("course_type")),
+        "lecture_method": canonical_lecture_method(course.get("lecture_method")),
+        "weekdays": parse_weekdays(course.get("lecture_time")),
+    }
+
+
+def build_course_query(filters: Dict[str, Any], partial: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    구조적 필터 → lookup 필드 기반 MongoDB 쿼리
+
+    Args:
+        filters: intent 필터 (course_name, professor, department, semester, credits,
+                 course_type, subject_type, lecture_time, lecture_method)
+        partial: True면 강의명/교수명/학과명을 부분 일치로 조회 (접두사 일치 결과가 없을 때 재시도용,
+                 정규화된 인덱스 키만 훑으므로 원본 필드 $regex보다 훨씬 가벼움)
+
+    Returns:
+        쿼리 딕셔너리 (조건이 없으면 None)
+    """
+    query: Dict[str, Any] = {}
+
+    for field in PREFIX_FIELDS:
+        if filters.get(field):
+            value = re.escape(normalize_name(filters[field]))
+            if value:
+                query[f"{LOOKUP_FIELD}.{field}"] = {"$regex": value if partial else f"^{value}"}
+
+    if filters.get("course_type"):
+        query[f"{LOOKUP_FIELD}.course_type"] = canonical_course_type(filters["course_type"])
+
+    if filters.get("subject_type"):
+        query[f"{LOOKUP_FIELD}.subject_type"] = normalize_name(filters["subject_type"])
+
+    if filters.get("lecture_method"):
+        query[f"{LOOKUP_FIELD}.lecture_method"] = canonical_lecture_method(filters["lecture_method"])
+
+    if filters.get("lecture_time"):
+        weekdays = parse_filter_weekdays(filters["lecture_time"])
+        if weekdays:
+            query[f"{LOOKUP_FIELD}.weekdays"] = {"$all": weekdays}
+
+    if "semester" in filters:
+        query["semester"] = filters["semester"]
+
+    if "credits" in filters:
+        query["credits"] = filters["credits"]
+
+    return query or None
+
+
+def has_prefix_filter(filters: Dict[str, Any]) -> bool:
+    return any(filters.get(field) for field in PREFIX_FIELDS)
+
+
+def ensure_lookup_indexes(collection) -> None:
+    for keys in LOOKUP_INDEXES:
+        collection.create_index(keys)
+
+
+def _winning_plan_nodes(explain: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """explain() 결과의 winningPlan 단계 노드 (위에서 아래 순서)"""
+    plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+    # 슬롯 기반 실행 엔진(SBE)은 queryPlan 아래에 단계가 있음
+    plan = plan.get("queryPlan", plan)
+    nodes = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        nodes.append(node)
+        if "inputStage" in node:
+            stack.append(node["inputStage"])
+        stack.extend(node.get("inputStages", []))
+    return nodes
+
+
+def explain_course_query(collection, query: Dict[str, Any], limit: int = 100) -> Dict[str, Any]:
+    """
+    쿼리 실행 계획 확인
+
+    Returns:
+        {"stages": ["LIMIT", "PROJECTION_SIMPLE", "FETCH", "IXSCAN"], "uses_index": IXSCAN 여부,
+         "collscan": COLLSCAN 여부, "index_names": [...]}
+    """
+    explain = collection.find(query, COURSE_FILTER_PROJECTION).limit(limit).explain()
+    nodes = _winning_plan_nodes(explain)
+    stages = [node["stage"] for node in nodes if node.get("stage")]
+    return {
+        "stages": stages,
+        "uses_index": "IXSCAN" in stages,
+        "collscan": "COLLSCAN" in stages,
+        "index_names": [node["indexName"] for node in nodes if node.get("indexName")],
+    }
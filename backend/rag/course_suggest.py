@@ -0,0 +1,445 @@
+"""
+강의 검색 자동완성 인덱스 (/api/search/suggest)
+키 입력마다 다섯 필드 $regex를 MongoDB로 보내지 않고, 메모리 인덱스에서 바로 후보를 찾음
+
+- 대상 필드: course_name, professor, course_code, course_english_name
+- 매칭: 접두사("데이터" → 데이터베이스), 부분 일치("베이스" → 데이터베이스),
+  초성("ㄷㅇㅌㅂㅇㅅ" → 데이터베이스, "데ㅇㅌ"처럼 완성 글자와 섞어도 됨)
+- 순위: 매칭 종류(정확 > 접두사 > 부분 > 초성 접두사 > 초성 부분) → 인기도(리뷰 수, popularity_score) → 짧은 문자열
+- 조회: 변경 후 첫 조회 때 불변 스냅샷을 만들고(잠금 안), 접두사는 정렬된 key/초성에서 bisect,
+  부분 일치는 접두사로 limit개를 못 채웠을 때만 이어 붙인 문자열에서 str.find
+- 갱신: 강의 문서 단위로 upsert/remove (change stream 또는 updated_at 폴링, CourseSuggestWatcher)
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from backend.rag.course_lookup import normalize_name
+
+SUGGEST_FIELDS = ("course_name", "professor", "course_code", "course_english_name")
+
+# 인덱스를 만들 때 가져오는 필드
+SUGGEST_PROJECTION = {
+    "_id": 0,
+    "course_id": 1,
+    "course_name": 1,
+    "professor": 1,
+    "course_code": 1,
+    "course_english_name": 1,
+    "department": 1,
+    "total_reviews": 1,
+    "popularity_score": 1,
+    "updated_at": 1,
+}
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+CHOSEONG_SET = frozenset(CHOSEONG)
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+JUNGSEONG_JONGSEONG_COUNT = 21 * 28
+# NFKC 정규화(normalize_name)는 호환 자모 "ㄷ"(U+3137)를 첫가끝 초성(U+1103)으로 바꾸므로 다시 되돌림
+CONJOINING_CHOSEONG = {chr(0x1100 + i): ch for i, ch in enumerate(CHOSEONG)}
+
+MATCH_RANK = {"exact": 0, "prefix": 1, "infix": 2, "chosung_prefix": 3, "chosung": 4}
+
+# 부분 일치 검색용으로 key를 이어 붙일 때 구분자 (정규화된 key에는 나오지 않음)
+BLOB_SEPARATOR = "\x00"
+# 접두사 범위의 상한 (bisect_left(prefix + 이 문자) = 접두사로 시작하는 마지막 항목 다음)
+PREFIX_UPPER_BOUND = "\U0010ffff"
+
+
+def to_chosung(text: str) -> str:
+    """완성형 한글 → 초성 ("데이터" → "ㄷㅇㅌ"), 그 외 문자는 그대로"""
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            chars.append(CHOSEONG[(code - HANGUL_BASE) // JUNGSEONG_JONGSEONG_COUNT])
+        else:
+            chars.append(ch)
+    return "".join(chars)
+
+
+def normalize_query(text: str) -> str:
+    """질의 정규화 (normalize_name + 초성 자모를 호환 자모로)"""
+    return "".join(CONJOINING_CHOSEONG.get(ch, ch) for ch in normalize_name(text))
+
+
+def has_chosung(text: str) -> bool:
+    return any(ch in CHOSEONG_SET for ch in text)
+
+
+def popularity(course: Dict[str, Any]) -> float:
+    """리뷰 수(로그) + popularity_score"""
+    reviews = course.get("total_reviews") or 0
+    score = course.get("popularity_score") or 0.0
+    try:
+        return round(10.0 * math.log1p(float(reviews)) + float(score), 3)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class _SnapshotEntry(NamedTuple):
+    """조회용 불변 항목 (_Entry를 만들 때 한 번 계산)"""
+    field: str
+    text: str
+    key: str
+    chosung: str
+    popularity: float
+    course: Dict[str, Any]
+    course_count: int
+
+
+class _Entry:
+    """
+    (필드, 표시 문자열) 하나. 같은 강의명이 여러 분반이면 하나로 묶음
+    인덱스에 들어간 뒤에는 수정하지 않음 (강의가 바뀌면 새 _Entry로 교체, copy-on-write)
+    """
+
+    __slots__ = ("field", "text", "key", "courses", "view")
+
+    def __init__(self, field: str, text: str, key: str, courses: Dict[str, Tuple[float, Dict[str, Any]]]):
+        self.field = field
+        self.text = text
+        self.key = key
+        self.courses = courses
+        # 가장 인기 있는 분반 기준 조회용 항목 (강의 요약 dict는 _add에서 강의마다 새로 만들고 수정하지 않음)
+        score, summary = max(courses.values(), key=lambda item: item[0])
+        self.view = _SnapshotEntry(field, text, key, to_chosung(key), score, summary, len(courses))
+
+
+class _Snapshot:
+    """
+    조회용 불변 스냅샷
+    - entries: 인기도 높은 순 → 짧은 문자열 순 (순번 = 순위)
+    - 정확/접두사, 초성 접두사: 정렬된 key/초성 목록에서 bisect
+    - 부분 일치: 순위 순으로 이어 붙인 문자열에서 str.find (파이썬 루프 없이 C 수준 검색)
+    """
+
+    __slots__ = ("entries", "keys", "key_ranks", "chosungs", "chosung_ranks",
+                 "key_blob", "key_offsets", "chosung_blob", "chosung_offsets")
+
+    def __init__(self, entries: Tuple[_SnapshotEntry, ...]):
+        self.entries = entries
+        by_key = sorted(range(len(entries)), key=lambda rank: entries[rank].key)
+        self.keys = [entries[rank].key for rank in by_key]
+        self.key_ranks = by_key
+        by_chosung = sorted(range(len(entries)), key=lambda rank: entries[rank].chosung)
+        self.chosungs = [entries[rank].chosung for rank in by_chosung]
+        self.chosung_ranks = by_chosung
+        self.key_blob, self.key_offsets = self._blob([entry.key for entry in entries])
+        self.chosung_blob, self.chosung_offsets = self._blob([entry.chosung for entry in entries])
+
+    @staticmethod
+    def _blob(values: List[str]) -> Tuple[str, List[int]]:
+        offsets = []
+        position = 0
+        for value in values:
+            offsets.append(position)
+            position += len(value) + 1
+        return BLOB_SEPARATOR.join(values), offsets
+
+    @staticmethod
+    def _prefix_ranks(sorted_values: List[str], ranks: List[int], prefix: str) -> List[int]:
+        low = bisect.bisect_left(sorted_values, prefix)
+        high = bisect.bisect_left(sorted_values, prefix + PREFIX_UPPER_BOUND, low)
+        return ranks[low:high]
+
+    def key_prefix(self, prefix: str) -> List[int]:
+        return self._prefix_ranks(self.keys, self.key_ranks, prefix)
+
+    def chosung_prefix(self, prefix: str) -> List[int]:
+        return self._prefix_ranks(self.chosungs, self.chosung_ranks, prefix)
+
+    @staticmethod
+    def _infix_ranks(blob: str, offsets: List[int], needle: str) -> Set[int]:
+        """needle이 들어 있는 항목 순위 (항목 중간에서 시작하는 것만, 접두사는 bisect로 이미 찾음)"""
+        ranks = set()
+        position = blob.find(needle)
+        while position != -1:
+            rank = bisect.bisect_right(offsets, position) - 1
+            if offsets[rank] != position:
+                ranks.add(rank)
+            position = blob.find(needle, position + 1)
+        return ranks
+
+    def key_infix(self, needle: str) -> Set[int]:
+        return self._infix_ranks(self.key_blob, self.key_offsets, needle)
+
+    def chosung_infix(self, needle: str) -> Set[int]:
+        return self._infix_ranks(self.chosung_blob, self.chosung_offsets, needle)
+
+
+class CourseSuggestIndex:
+    """강의 자동완성 메모리 인덱스 (스레드 안전, 강의 단위 증분 갱신)"""
+
+    def __init__(self, fields: Iterable[str] = SUGGEST_FIELDS):
+        self.fields = tuple(fields)
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._course_keys: Dict[str, List[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None  # 조회용 불변 스냅샷 (변경 시 무효화)
+        self.built_at: Optional[float] = None
+        self.updated_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def course_count(self) -> int:
+        return len(self._course_keys)
+
+    def build(self, courses: Iterable[Dict[str, Any]]) -> "CourseSuggestIndex":
+        """전체 재구성"""
+        with self._lock:
+            self._entries = {}
+            self._course_keys = {}
+            for course in courses:
+                self._add(course)
+            self.built_at = self.updated_at = time.time()
+            self._snapshot = None
+        return self
+
+    def upsert(self, course: Dict[str, Any]) -> None:
+        """강의 하나 추가/갱신"""
+        with self._lock:
+            self._remove(self._course_id(course))
+            self._add(course)
+            self.updated_at = time.time()
+            self._snapshot = None
+
+    def remove(self, course_id: str) -> None:
+        with self._lock:
+            self._remove(course_id)
+            self.updated_at = time.time()
+            self._snapshot = None
+
+    @staticmethod
+    def _course_id(course: Dict[str, Any]) -> str:
+        return str(course.get("course_id") or course.get("_id") or "")
+
+    def _add(self, course: Dict[str, Any]) -> None:
+        course_id = self._course_id(course)
+        if not course_id:
+            return
+        score = popularity(course)
+        summary = {
+            "course_id": course_id,
+            "course_name": course.get("course_name", ""),
+            "professor": course.get("professor", ""),
+            "course_code": course.get("course_code", ""),
+            "department": course.get("department", ""),
+        }
+        keys = []
+        for field in self.fields:
+            text = str(course.get(field) or "").strip()
+            key = normalize_name(text)
+            if not key:
+                continue
+            entry = self._entries.get((field, key))
+            courses = dict(entry.courses) if entry is not None else {}
+            courses[course_id] = (score, summary)
+            self._entries[(field, key)] = _Entry(field, entry.text if entry is not None else text, key, courses)
+            keys.append((field, key))
+        self._course_keys[course_id] = keys
+
+    def _remove(self, course_id: str) -> None:
+        for entry_key in self._course_keys.pop(course_id, []):
+            entry = self._entries.get(entry_key)
+            if entry is None or course_id not in entry.courses:
+                continue
+            courses = {other: value for other, value in entry.courses.items() if other != course_id}
+            if courses:
+                self._entries[entry_key] = _Entry(entry.field, entry.text, entry.key, courses)
+            else:
+                del self._entries[entry_key]
+
+    @staticmethod
+    def _match(entry: _SnapshotEntry, query: str, query_chosung: Optional[str]) -> Optional[str]:
+        """매칭 종류 (exact/prefix/infix/chosung_prefix/chosung) 또는 None"""
+        key = entry.key
+        if query_chosung is None:
+            if key == query:
+                return "exact"
+            if key.startswith(query):
+                return "prefix"
+            if query in key:
+                return "infix"
+            return None
+
+        # 초성이 섞인 질의: 초성 문자열에서 위치를 찾고, 완성 글자는 원문과 같은지 확인
+        start = entry.chosung.find(query_chosung)
+        if start >= 0 and query == query_chosung:
+            # 초성만으로 된 질의는 확인할 완성 글자가 없음
+            return "chosung_prefix" if start == 0 else "chosung"
+        while start >= 0:
+            if all(q == k or q in CHOSEONG_SET and to_chosung(k) == q
+                   for q, k in zip(query, key[start:start + len(query)])):
+                return "chosung_prefix" if start == 0 else "chosung"
+            start = entry.chosung.find(query_chosung, start + 1)
+        return None
+
+    def suggest(self, query: str, limit: int = 10, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        자동완성 후보
+
+        Args:
+            query: 입력 문자열 (공백/대소문자 무시)
+            limit: 최대 후보 수
+            fields: 특정 필드만 (기본 전체)
+
+        Returns:
+            [{"text", "field", "match", "popularity", "course_count", "course": {...}}] (순위 순)
+        """
+        key = normalize_query(query)
+        if not key or limit <= 0:
+            return []
+        query_chosung = to_chosung(key) if has_chosung(key) else None
+        allowed = set(fields) if fields else None
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._build_snapshot()
+        entries = snapshot.entries
+
+        # 매칭 종류별 후보 순위 (접두사는 bisect, 부분 일치는 앞 단계로 limit개를 못 채웠을 때만 검색)
+        results: List[Dict[str, Any]] = []
+        seen: Set[Tuple[str, str]] = set()
+
+        def take(ranks: Iterable[int], match_of) -> None:
+            # 순위(인기도) 순으로 limit까지. 같은 강의의 같은 문자열이 여러 필드에 있으면 한 번만
+            for rank in sorted(ranks):
+                if len(results) >= limit:
+                    return
+                entry = entries[rank]
+                if allowed is not None and entry.field not in allowed:
+                    continue
+                match = match_of(entry)
+                if match is None:
+                    continue
+                dedupe_key = (entry.course["course_id"], entry.key)
+                if dedupe_key in seen:
+                    continue
+                seen.add(dedupe_key)
+                results.append({
+                    "text": entry.text,
+                    "field": entry.field,
+                    "match": match,
+                    "popularity": entry.popularity,
+                    "course_count": entry.course_count,
+                    "course": entry.course,
+                })
+
+        if query_chosung is None:
+            prefix = snapshot.key_prefix(key)
+            take(prefix, lambda entry: "exact" if entry.key == key else None)
+            take(prefix, lambda entry: "prefix" if entry.key != key else None)
+            if len(results) < limit:
+                take(snapshot.key_infix(key), lambda entry: "infix")
+        else:
+            take(snapshot.chosung_prefix(query_chosung),
+                 lambda entry: "chosung_prefix" if self._match(entry, key, query_chosung) == "chosung_prefix" else None)
+            if len(results) < limit:
+                take(snapshot.chosung_infix(query_chosung),
+                     lambda entry: "chosung" if self._match(entry, key, query_chosung) == "chosung" else None)
+        return results
+
+    def _build_snapshot(self) -> _Snapshot:
+        """조회용 불변 스냅샷 (인기도 높은 순 → 짧은 문자열 순, 잠금 안에서 _Entry.view만 모아 정렬)"""
+        with self._lock:
+            if self._snapshot is None:
+                entries = sorted((entry.view for entry in self._entries.values()),
+                                 key=lambda entry: (-entry.popularity, len(entry.key), entry.text))
+                self._snapshot = _Snapshot(tuple(entries))
+            return self._snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "courses": self.course_count,
+            "built_at": self.built_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class CourseSuggestWatcher:
+    """
+    courses 컬렉션 변경을 인덱스에 반영하는 백그라운드 스레드
+    - 레플리카셋/Atlas: change stream으로 문서 단위 반영
+    - 단독 서버(change stream 미지원): poll_seconds마다 updated_at이 바뀐 문서만 반영,
+      문서 수가 줄었으면(삭제) 전체 재구성
+    """
+
+    def __init__(self, collection, index: CourseSuggestIndex, poll_seconds: float = 30.0):
+        self.collection = collection
+        self.index = index
+        self.poll_seconds = poll_seconds
+        self.mode: Optional[str] = None
+        self._last_updated: Any = None
+        self._last_count = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self) -> CourseSuggestIndex:
+        """전체 로드 후 인덱스 반환"""
+        courses = list(self.collection.find({}, SUGGEST_PROJECTION))
+        self.index.build(courses)
+        self._last_count = len(courses)
+        self._last_updated = max((c["updated_at"] for c in courses if c.get("updated_at") is not None),
+                                 default=None, key=str)
+        return self.index
+
+    def start(self) -> None:
+        """감시 스레드 시작 (이미 실행 중이면 무시. fork된 워커에서는 스레드가 없으므로 다시 시작)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="course-suggest-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            self._watch_change_stream()
+        except Exception as e:
+            print(f"⚠️ 자동완성 change stream 사용 불가, 폴링으로 전환: {e}")
+        self.mode = "poll"
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"⚠️ 자동완성 인덱스 갱신 실패: {e}")
+
+    def _watch_change_stream(self) -> None:
+        with self.collection.watch(full_document="updateLookup") as stream:
+            self.mode = "change_stream"
+            print("✅ 자동완성 인덱스: change stream 감시 시작")
+            for change in stream:
+                operation = change.get("operationType")
+                document = change.get("fullDocument")
+                if operation in ("insert", "update", "replace") and document:
+                    self.index.upsert(document)
+                elif operation == "delete":
+                    # 삭제 이벤트에는 _id만 있으므로 전체 재구성 (드묾)
+                    self.load()
+                elif operation in ("drop", "invalidate"):
+                    self.load()
+                    return
+
+    def poll_once(self) -> int:
+        """변경된 문서 반영. 반영한 문서 수 반환"""
+        count = self.collection.estimated_document_count()
+        if count < self._last_count or (self._last_updated is None and count != self._last_count):
+            # 삭제됐거나, updated_at이 없어 변경분만 고를 수 없는 경우
+            self.load()
+            return count
+        if self._last_updated is None:
+            return 0
+        changed = list(self.collection.find({"updated_at": {"$gt": self._last_updated}}, SUGGEST_PROJECTION))
+        for course in changed:
+            self.index.upsert(course)
+            if course.get("updated_at") is not None and str(course["updated_at"]) > str(self._last_updated):
+                self._last_updated = course["updated_at"]
+        self._last_count = count
+        return len(changed)
@@ -0,0 +1,162 @@
+"""
+쿼리 임베딩 LRU 캐시
+(모델명 + 정규화된 텍스트)를 키로 SentenceTransformer 인코딩 결과를 재사용
+- 메모리: 크기 제한 LRU (스레드 안전)
+- 디스크(선택): LRU에서 밀려난 항목을 SQLite 파일에 보관해 재시작 후에도 재사용
+"""
+
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from backend.rag.query_utils import normalize_query
+
+
+class EmbeddingCache:
+    """스레드 안전 임베딩 LRU 캐시 (디스크 spill 선택)"""
+
+    def __init__(self, max_entries: int = 2048, spill_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.spill_path = spill_path
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._spill_conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        self.spill_hits = 0
+
+        if spill_path:
+            spill_dir = os.path.dirname(spill_path)
+            if spill_dir:
+                os.makedirs(spill_dir, exist_ok=True)
+            self._spill_conn = sqlite3.connect(spill_path, check_same_thread=False)
+            self._spill_conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+            self._spill_conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """캐시 키 생성 (공백/대소문자 차이는 같은 키로 취급)"""
+        return f"{model_name}\x00{normalize_query(text)}"
+
+    # ───────────────────────────────────────────────
+    # 디스크 spill
+    # ───────────────────────────────────────────────
+    def _spill_get(self, key: str) -> Optional[List[float]]:
+        if self._spill_conn is None:
+            return None
+        row = self._spill_conn.execute(
+            "SELECT vector FROM embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+        vector = array('f')
+        vector.frombytes(row[0])
+        return vector.tolist()
+
+    def _spill_put(self, key: str, embedding: List[float]) -> None:
+        if self._spill_conn is None:
+            return
+        self._spill_conn.execute(
+            "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+            (key, array('f', embedding).tobytes())
+        )
+        self._spill_conn.commit()
+
+    # ───────────────────────────────────────────────
+    # 조회/저장
+    # ───────────────────────────────────────────────
+    def get(self, model_name: str, text: str) -> Optional[List[float]]:
+        key = self.make_key(model_name, text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding
+
+            embedding = self._spill_get(key)
+            if embedding is not None:
+                self.hits += 1
+                self.spill_hits += 1
+                self._insert(key, embedding)
+                return embedding
+
+            self.misses += 1
+            return None
+
+    def put(self, model_name: str, text: str, embedding: List[float]) -> None:
+        key = self.make_key(model_name, text)
+        with self._lock:
+            self._insert(key, embedding)
+
+    def _insert(self, key: str, embedding: List[float]) -> None:
+        """lock을 잡은 상태에서 호출"""
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._spill_put(evicted_key, evicted)
+
+    def encode(self, model: Any, model_name: str, texts: List[str]) -> List[List[float]]:
+        """
+        캐시를 거쳐 텍스트 리스트 인코딩 (캐시에 없는 텍스트만 한 번에 encode)
+
+        Args:
+            model: encode(texts, normalize_embeddings=True)를 지원하는 임베딩 모델
+            model_name: 캐시 키에 사용할 모델명
+            texts: 프리픽스까지 적용된 최종 입력 텍스트
+        """
+        results: List[Optional[List[float]]] = [self.get(model_name, text) for text in texts]
+        missing = [i for i, embedding in enumerate(results) if embedding is None]
+        if missing:
+            encoded = model.encode([texts[i] for i in missing], normalize_embeddings=True)
+            for i, embedding in zip(missing, encoded):
+                vector = embedding.tolist() if hasattr(embedding, 'tolist') else list(embedding)
+                self.put(model_name, texts[i], vector)
+                results[i] = vector
+        return results
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._spill_conn is not None:
+                self._spill_conn.execute("DELETE FROM embeddings")
+                self._spill_conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "spill_hits": self.spill_hits,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "spill_path": self.spill_path,
+            }
+
+
+# ───────────────────────────────────────────────
+# 프로세스 전역 캐시 (rag_api.py, vector_store.py 공유)
+# ───────────────────────────────────────────────
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """전역 임베딩 캐시 가져오기 (EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_SPILL_PATH 환경변수 사용)"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache(
+                    max_entries=int(os.getenv('EMBEDDING_CACHE_SIZE', 2048)),
+                    spill_path=os.getenv('EMBEDDING_CACHE_SPILL_PATH') or None
+                )
+    return _embedding_cache
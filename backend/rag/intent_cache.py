@@ -0,0 +1,185 @@
+"""
+질문 의도(intent) 분석 결과 캐시
+(프롬프트 버전 + 정규화된 질문)을 키로 파싱된 QueryIntent(dict)를 저장
+- 1차: 프로세스 내 LRU (TTL 적용)
+- 2차: MongoDB intent_cache 컬렉션 (expires_at TTL 인덱스)
+프롬프트 템플릿이 바뀌면 버전 해시가 달라지므로 이전 항목은 조회되지 않으며,
+MongoDB 최초 연결 시 이전 버전 항목을 삭제
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from backend.rag.query_utils import normalize_query
+
+
+def prompt_version(template: str) -> str:
+    """프롬프트 템플릿 내용으로 버전 해시 생성"""
+    return hashlib.sha1(template.encode('utf-8')).hexdigest()[:12]
+
+
+class IntentCache:
+    """2단계(메모리 LRU + MongoDB) intent 캐시"""
+
+    def __init__(self, version: str, max_entries: int = 1024, ttl_seconds: int = 7 * 24 * 3600,
+                 collection_getter: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            version: 프롬프트 버전 (prompt_version() 결과)
+            max_entries: 메모리 캐시 최대 항목 수
+            ttl_seconds: 항목 유효 시간(초)
+            collection_getter: MongoDB 컬렉션을 돌려주는 함수 (None이면 메모리 캐시만 사용)
+        """
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.collection_getter = collection_getter
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._indexes_ready = False
+        self.hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+
+    def make_key(self, user_query: str) -> str:
+        return f"{self.version}:{normalize_query(user_query)}"
+
+    def _collection(self):
+        if self.collection_getter is None:
+            return None
+        try:
+            collection = self.collection_getter()
+            if not self._indexes_ready:
+                # expires_at이 지나면 MongoDB가 자동 삭제
+                collection.create_index("expires_at", expireAfterSeconds=0)
+                collection.create_index("prompt_version")
+                self._indexes_ready = True
+                # 프롬프트 템플릿이 바뀌었으면 이전 버전 항목 정리
+                self._delete_other_versions(collection)
+            return collection
+        except Exception as e:
+            print(f"⚠️ intent 캐시 컬렉션 연결 실패 (메모리 캐시만 사용): {e}")
+            return None
+
+    # ───────────────────────────────────────────────
+    # 조회/저장
+    # ───────────────────────────────────────────────
+    def get(self, user_query: str) -> Optional[Dict[str, Any]]:
+        key = self.make_key(user_query)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry["expires_at"] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry["intent"]
+                del self._entries[key]
+
+        collection = self._collection()
+        if collection is not None:
+            try:
+                doc = collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+            except Exception as e:
+                print(f"⚠️ intent 캐시 조회 오류: {e}")
+                doc = None
+            if doc:
+                expires_at = doc["expires_at"]
+                remaining = (expires_at - datetime.utcnow()).total_seconds()
+                with self._lock:
+                    self.hits += 1
+                    self.mongo_hits += 1
+                    self._insert(key, doc["intent"], now + max(0.0, remaining))
+                return doc["intent"]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, user_query: str, intent: Dict[str, Any]) -> None:
+        key = self.make_key(user_query)
+        with self._lock:
+            self._insert(key, intent, time.time() + self.ttl_seconds)
+
+        collection = self._collection()
+        if collection is not None:
+            now = datetime.utcnow()
+            try:
+                collection.replace_one(
+                    {"_id": key},
+                    {
+                        "_id": key,
+                        "prompt_version": self.version,
+                        "query": user_query,
+                        "intent": intent,
+                        "created_at": now,
+                        "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                    },
+                    upsert=True
+                )
+            except Exception as e:
+                print(f"⚠️ intent 캐시 저장 오류: {e}")
+
+    def _insert(self, key: str, intent: Dict[str, Any], expires_at: float) -> None:
+        """lock을 잡은 상태에서 호출"""
+        self._entries[key] = {"intent": intent, "expires_at": expires_at}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ───────────────────────────────────────────────
+    # 무효화
+    # ───────────────────────────────────────────────
+    def invalidate(self, user_query: Optional[str] = None) -> int:
+        """특정 질문(없으면 현재 버전 전체) 캐시 삭제. 삭제된 MongoDB 문서 수 반환"""
+        with self._lock:
+            if user_query is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self.make_key(user_query), None)
+
+        collection = self._collection()
+        if collection is None:
+            return 0
+        query = {"prompt_version": self.version} if user_query is None else {"_id": self.make_key(user_query)}
+        try:
+            return collection.delete_many(query).deleted_count
+        except Exception as e:
+            print(f"⚠️ intent 캐시 삭제 오류: {e}")
+            return 0
+
+    def invalidate_other_versions(self) -> int:
+        """현재 프롬프트 버전이 아닌 항목 삭제 (프롬프트 템플릿 변경 시)"""
+        collection = self._collection()
+        if collection is None:
+            return 0
+        return self._delete_other_versions(collection)
+
+    def _delete_other_versions(self, collection) -> int:
+        try:
+            deleted = collection.delete_many({"prompt_version": {"$ne": self.version}}).deleted_count
+            if deleted:
+                print(f"🗑️ 이전 프롬프트 버전 intent 캐시 {deleted}개 삭제")
+            return deleted
+        except Exception as e:
+            print(f"⚠️ intent 캐시 정리 오류: {e}")
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "prompt_version": self.version,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "mongo_hits": self.mongo_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "mongo_enabled": self.collection_getter is not None,
+            }
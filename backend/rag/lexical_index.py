@@ -0,0 +1,233 @@
+"""
+강의평 키워드 검색 인덱스 (BM25)
+Pinecone metadata의 text 필드로 만든 메모리 역색인
+- 한글은 단어별 문자 2-gram으로 쪼개 "노팀플" ↔ "팀플", "출튀" 같은 표현도 부분 일치
+- 영문/숫자는 단어 그대로 (학수번호 등)
+- sync()로 Pinecone에 새로 올라온/삭제된 강의평만 문서 단위로 추가/삭제 (전체 재색인 불필요)
+의미 검색(Pinecone) 결과와 reciprocal_rank_fusion()으로 합쳐서 사용
+"""
+
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backend.rag.local_vector_index import metadata_matches
+from backend.rag.pinecone_scan import fetch_records, list_all_ids
+
+TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """한글 문자 2-gram + 영문/숫자 단어 토큰"""
+    if not isinstance(text, str) or not text:
+        return []
+    text = unicodedata.normalize("NFKC", text).lower()
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text):
+        if "가" <= word[0] <= "힣":
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60,
+                           weights: Optional[Sequence[float]] = None) -> List[Tuple[str, float]]:
+    """
+    여러 검색 결과 순위를 RRF로 합치기: score(d) = Σ weight / (k + rank)
+
+    Args:
+        rankings: 각 검색기의 문서 ID 리스트 (순위 순)
+        k: RRF 상수 (클수록 하위 순위 영향이 커짐)
+        weights: 검색기별 가중치 (기본 모두 1.0)
+
+    Returns:
+        (문서 ID, RRF 점수) 리스트 (점수 내림차순, 동점이면 먼저 나온 검색기 순서 유지)
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+class LexicalIndex:
+    """BM25 역색인 (스레드 안전)"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[str, Dict[str, Any]] = {}  # id → {"text", "metadata", "length", "terms"}
+        self._postings: Dict[str, Dict[str, int]] = {}  # term → {id: tf}
+        self._total_length = 0
+        self._lock = threading.Lock()
+        self.ready = False  # 전체 적재(load) 완료 여부
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ───────────────────────────────────────────────
+    # 추가/삭제
+    # ───────────────────────────────────────────────
+    def add(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """문서 추가 (같은 ID가 있으면 교체)"""
+        with self._lock:
+            self._add(doc_id, text, metadata)
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        여러 문서 추가
+
+        Args:
+            records: {"id", "metadata", "text"(없으면 metadata["text"])} 리스트
+        """
+        count = 0
+        with self._lock:
+            for record in records:
+                metadata = record.get("metadata") or {}
+                text = record.get("text") or metadata.get("text", "")
+                if record.get("id") and text:
+                    self._add(record["id"], text, metadata)
+                    count += 1
+        return count
+
+    def _add(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]]) -> None:
+        """lock을 잡은 상태에서 호출"""
+        self._remove(doc_id)
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+        self._docs[doc_id] = {"text": text, "metadata": metadata or {}, "length": length, "terms": terms}
+        self._total_length += length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        """lock을 잡은 상태에서 호출"""
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self._total_length -= doc["length"]
+        for term in doc["terms"]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def load(self, records: Iterable[Dict[str, Any]]) -> int:
+        """전체 문서 적재 (기존 내용 교체)"""
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            self._total_length = 0
+        count = self.add_many(records)
+        self.ready = True
+        return count
+
+    def sync(self, index, namespace: Optional[str] = None) -> Dict[str, int]:
+        """
+        Pinecone과 ID 기준 증분 동기화 (업로드 스크립트는 다른 프로세스라 이 인덱스를 직접 갱신할 수 없음)
+        새 ID만 fetch해서 추가하고 Pinecone에서 사라진 ID는 삭제
+
+        Returns:
+            {"added", "removed", "total"}
+        """
+        remote_ids = list_all_ids(index, namespace)
+        remote_set = set(remote_ids)
+        with self._lock:
+            known = set(self._docs)
+        new_ids = [doc_id for doc_id in remote_ids if doc_id not in known]
+        added = self.add_many(fetch_records(index, new_ids, namespace, include_values=False))
+        removed = known - remote_set
+        with self._lock:
+            for doc_id in removed:
+                self._remove(doc_id)
+        return {"added": added, "removed": len(removed), "total": len(self)}
+
+    # ───────────────────────────────────────────────
+    # 검색
+    # ───────────────────────────────────────────────
+    def search(self, query: str, top_k: int = 10, filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        BM25 검색
+
+        Args:
+            query: 검색어
+            top_k: 최대 결과 수
+            filter: Pinecone 형식 metadata 필터 ($eq, $in)
+
+        Returns:
+            List[Dict]: id, score, text, metadata (점수 내림차순)
+        """
+        terms = set(tokenize(query))
+        if not terms or top_k <= 0:
+            return []
+
+        with self._lock:
+            doc_count = len(self._docs)
+            if doc_count == 0:
+                return []
+            avg_length = self._total_length / doc_count or 1.0
+            allowed: Dict[str, bool] = {}
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    if filter:
+                        if doc_id not in allowed:
+                            allowed[doc_id] = metadata_matches(self._docs[doc_id]["metadata"], filter)
+                        if not allowed[doc_id]:
+                            continue
+                    length = self._docs[doc_id]["length"]
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+
+            top = sorted(scores.items(), key=lambda item: -item[1])[:top_k]
+            return [
+                {
+                    "id": doc_id,
+                    "score": score,
+                    "text": self._docs[doc_id]["text"],
+                    "metadata": self._docs[doc_id]["metadata"],
+                }
+                for doc_id, score in top
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "documents": len(self._docs),
+                "terms": len(self._postings),
+                "avg_length": round(self._total_length / len(self._docs), 1) if self._docs else 0.0,
+            }
+
+
+# ───────────────────────────────────────────────
+# 프로세스 전역 인덱스 (rag_api.py 검색 + 주기적 Pinecone 동기화)
+# ───────────────────────────────────────────────
+_lexical_index: Optional[LexicalIndex] = None
+_lexical_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> LexicalIndex:
+    global _lexical_index
+    if _lexical_index is None:
+        with _lexical_index_lock:
+            if _lexical_index is None:
+                _lexical_index = LexicalIndex()
+    return _lexical_index
@@ -0,0 +1,345 @@
+"""
+규칙 기반 로컬 질문 의도 분석기
+Gemini 호출 없이 courses 컬렉션에서 불러온 강의명/교수명 사전(gazetteer)과
+키워드 패턴(요일, 전필/전선, 비대면, 비교 표현 등)으로 QueryIntent를 만들고 신뢰도를 함께 반환
+신뢰도가 낮으면 호출 측에서 Gemini로 넘김
+"""
+
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Pattern, Tuple
+
+DEPARTMENT_NAME = "소프트웨어학과"
+
+# ───────────────────────────────────────────────
+# 키워드 패턴
+# ───────────────────────────────────────────────
+DEPARTMENT_PATTERN = re.compile(r"소프트웨어\s*학과|소웨\s*과?|소프트웨어\s*전공")
+
+COURSE_TYPE_PATTERNS = [
+    ("전필", re.compile(r"전공\s*필수|전필")),
+    ("전선", re.compile(r"전공\s*선택|전선")),
+]
+
+# "월" 단독은 모호하므로 요일 표현만 인식 (월요일, 월수 수업, (화) 등)
+WEEKDAY_PATTERN = re.compile(r"([월화수목금])\s*요일|\(([월화수목금])\)|([월화수목금])(?=[월화수목금]\s*(?:수업|강의))")
+
+LECTURE_METHOD_PATTERNS = [
+    ("비대면", re.compile(r"비대면|온라인|원격|녹화\s*강의|인강")),
+    ("대면", re.compile(r"(?<!비)대면\s*(?:수업|강의)|오프라인")),
+]
+
+COMPARISON_PATTERN = re.compile(r"차이|비교|vs|VS|중에\s*(?:뭐|어느|어떤)|어느\s*(?:게|것|쪽)|뭐가\s*(?:더|나아)|나을까")
+PROFESSOR_COMPARISON_PATTERN = re.compile(r"교수님?\s*(?:별|마다|들)|어느\s*교수|어떤\s*교수|교수님?\s*(?:비교|차이)|분반\s*별")
+PROFESSOR_MENTION_PATTERN = re.compile(r"교수")
+NEGATION_AFTER_PATTERN = re.compile(r"^\s*(?:수업|강의)?\s*(?:없|빼고|제외|말고|아닌)")
+SEMESTER_PATTERN = re.compile(r"이번\s*학기|다음\s*학기|\d{4}\s*-\s*[12]|\d\s*학기")
+
+# 사전에 없는 강의명이 들어 있을 가능성이 높은 토큰 (예: "SW캡스톤디자인", "운영체제론")
+COURSE_LIKE_SUFFIX = re.compile(r"(?:개론|이론|설계|실습|프로그래밍|디자인|공학|시스템|구조|수학|통계|학개론|론)$")
+LATIN_TOKEN = re.compile(r"[A-Za-z]{2,}")
+
+# semantic_query가 이 정도로 짧거나 모호한 평가 질문이면 의미를 확장 (추천 요청은 그대로 유지)
+VAGUE_REMAINDER = re.compile(r"^(?:강의|과목|수업)?(?:어때|어때요|어떤가요|어떰|들을까말까|들을만해|괜찮아|괜찮나요)?\??$")
+RECOMMEND_PATTERN = re.compile(r"추천")
+LECTURE_NOUN_PATTERN = re.compile(r"강의|과목|수업")
+
+# 질문 의도(추천/평가/비교/정보 요청)를 드러내는 표현. 하나도 없으면 필터만 있는 질문이라 의도를 Gemini에 맡김
+INTENT_CUE_PATTERN = re.compile(
+    r"추천|알려|찾아|정리|장단점|후기|평가|리뷰|강의평|어때|어떤|어떰|어떻|괜찮|들을까|들을만|뭐|무슨|있[어나니을]"
+    r"|[까니냐나]\s*[?요]?\s*$|\?"
+)
+
+PARTICLES = ("은", "는", "이", "가", "을", "를", "의", "과", "와", "랑", "이랑", "하고", "에서", "에")
+
+# 제거하는 필터 표현 바로 뒤에 붙은 조사 (함께 지워야 "에 듣기 좋은"처럼 조사만 남지 않음)
+_PARTICLE_ALTERNATION = r"에\s*대(?:해서?|한)|에서|에는|에|은|는|이|가|을|를|의|과|와|이랑|랑|하고|도|만|으로|로|중에?"
+ATTACHED_PARTICLE = rf"(?:(?:{_PARTICLE_ALTERNATION})(?=[\s?!.,~)]|$))?"
+
+# 사전 이름은 단어 경계에서만 인정 ("이정도면"의 "이정", "이산수학"의 "수학" 제외)
+_WORD_CHAR = r"[가-힣A-Za-z0-9]"
+ENTITY_START_BOUNDARY = re.compile(rf"(?<!{_WORD_CHAR})$")
+ENTITY_END_BOUNDARY = re.compile(rf"^(?:(?:{_PARTICLE_ALTERNATION})?(?!{_WORD_CHAR})|\s*(?:교수|강의|과목|수업|분반))")
+# 이름 바로 뒤에 붙으면 그 이름이 강의명/교수명임이 분명한 명사
+LECTURE_SUFFIXES = ("강의", "과목", "수업", "분반")
+PROFESSOR_SUFFIX = "교수"
+# 이보다 짧은 교수명은 "교수"가 뒤따를 때만 인정 (두 글자 이름은 일반 단어와 겹치기 쉬움)
+PROFESSOR_MIN_LEN_WITHOUT_SUFFIX = 3
+# 이 길이 이하 강의명은 "강의/과목/수업"이 뒤따르지 않으면 주제어일 수 있어 신뢰도를 낮춤 ("수학 잘 못하는데")
+SHORT_COURSE_NAME_LEN = 2
+
+
+def _normalize(text: str) -> str:
+    return ''.join(text.split()).lower()
+
+
+def _remove(pattern: Pattern[str], text: str, flags: int = 0) -> str:
+    """필터로 옮긴 표현을 뒤에 붙은 조사와 함께 제거"""
+    return re.sub(f"(?:{pattern.pattern}){ATTACHED_PARTICLE}", " ", text, flags=pattern.flags | flags)
+
+
+class Gazetteer:
+    """강의명/교수명 사전 (MongoDB에서 주기적으로 다시 불러옴)"""
+
+    def __init__(self, loader: Callable[[], Tuple[List[str], List[str]]], refresh_seconds: int = 3600):
+        """
+        Args:
+            loader: (course_names, professors)를 반환하는 함수
+            refresh_seconds: 사전 갱신 주기(초)
+        """
+        self.loader = loader
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self.course_names: List[Tuple[str, str]] = []  # (정규화, 원본), 긴 이름 우선
+        self.professors: List[Tuple[str, str]] = []
+
+    def ensure_loaded(self) -> None:
+        if self._loaded_at and time.time() - self._loaded_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if self._loaded_at and time.time() - self._loaded_at < self.refresh_seconds:
+                return
+            try:
+                course_names, professors = self.loader()
+            except Exception as e:
+                print(f"⚠️ 강의명/교수명 사전 로드 실패: {e}")
+                # 실패해도 잠시 후 재시도하도록 짧게 기록
+                self._loaded_at = time.time() - self.refresh_seconds + 60
+                return
+            self.course_names = self._prepare(course_names, min_len=2)
+            self.professors = self._prepare(self._split_professors(professors), min_len=2)
+            self._loaded_at = time.time()
+            print(f"✅ 로컬 intent 사전 로드: 강의 {len(self.course_names)}개, 교수 {len(self.professors)}명")
+
+    @staticmethod
+    def _split_professors(professors: List[str]) -> List[str]:
+        names = []
+        for value in professors:
+            for name in re.split(r"[,/·]", value or ""):
+                name = name.strip()
+                if name:
+                    names.append(name)
+        return names
+
+    @staticmethod
+    def _prepare(values: List[str], min_len: int) -> List[Tuple[str, str]]:
+        seen = {}
+        for value in values:
+            if not isinstance(value, str):
+                continue
+            normalized = _normalize(value)
+            if len(normalized) >= min_len and normalized not in seen:
+                seen[normalized] = value.strip()
+        return sorted(seen.items(), key=lambda item: len(item[0]), reverse=True)
+
+
+def _at_word_boundary(query: str, positions: List[int], span: Tuple[int, int]) -> bool:
+    """
+    정규화 질문의 span이 원문에서 단어 경계에 걸치는지 (앞은 단어 시작, 뒤는 공백/문장부호/조사/강의·교수 명사)
+
+    Args:
+        positions: 정규화 질문 글자 i → 원문 위치 (공백 제외 글자 위치)
+    """
+    start, end = positions[span[0]], positions[span[1] - 1] + 1
+    return bool(ENTITY_START_BOUNDARY.search(query[:start]) and ENTITY_END_BOUNDARY.match(query[end:]))
+
+
+def _find_entities(query: str, normalized_query: str, entries: List[Tuple[str, str]], taken: List[Tuple[int, int]],
+                   min_len_without_suffix: int = 0) -> Tuple[List[Tuple[str, Tuple[int, int]]], List[str]]:
+    """
+    정규화된 질문에서 긴 이름부터 겹치지 않게 찾기 (단어 경계에 걸친 것만)
+
+    Args:
+        min_len_without_suffix: 이보다 짧은 이름은 바로 뒤에 "교수"가 올 때만 인정
+
+    Returns:
+        (찾은 이름과 span, 단어 안쪽에서만 보인 이름 목록)
+    """
+    positions = [i for i, ch in enumerate(query) if not ch.isspace()]
+    found = []
+    inner = []
+    for normalized, original in entries:
+        start = normalized_query.find(normalized)
+        inner_only = False
+        while start != -1:
+            span = (start, start + len(normalized))
+            if len(normalized) < min_len_without_suffix and not normalized_query.startswith(PROFESSOR_SUFFIX, span[1]):
+                pass
+            elif all(span[1] <= s or span[0] >= e for s, e in taken):
+                if _at_word_boundary(query, positions, span):
+                    taken.append(span)
+                    found.append((original, span))
+                    inner_only = False
+                    break
+                inner_only = True
+            start = normalized_query.find(normalized, start + 1)
+        if inner_only:
+            inner.append(original)
+    found.sort(key=lambda item: item[1][0])
+    return found, inner
+
+
+class LocalIntentClassifier:
+    """규칙 기반 질문 의도 분석기"""
+
+    def __init__(self, gazetteer: Gazetteer):
+        self.gazetteer = gazetteer
+
+    def classify(self, user_query: str) -> Tuple[Dict[str, Any], float, List[str]]:
+        """
+        Returns:
+            (intent dict, 신뢰도 0.0~1.0, 판단 근거 목록)
+            intent dict는 QueryIntent와 같은 필드(needs_structured_filter, filters, semantic_query, comparison_targets)
+        """
+        self.gazetteer.ensure_loaded()
+
+        signals: List[str] = []
+        confidence = 0.9
+        filters: Dict[str, Any] = {}
+        remainder = user_query
+
+        # 학과
+        if DEPARTMENT_PATTERN.search(user_query):
+            filters["department"] = DEPARTMENT_NAME
+            remainder = _remove(DEPARTMENT_PATTERN, remainder)
+            signals.append("department")
+
+        # 전필/전선
+        for course_type, pattern in COURSE_TYPE_PATTERNS:
+            if pattern.search(user_query):
+                filters["course_type"] = course_type
+                remainder = re.sub(r"\(\s*(?:전필|전선)\s*\)", " ", remainder)
+                remainder = _remove(pattern, remainder)
+                signals.append(f"course_type:{course_type}")
+                break
+
+        # 요일
+        weekday_match = WEEKDAY_PATTERN.search(user_query)
+        if weekday_match:
+            filters["lecture_time"] = next(group for group in weekday_match.groups() if group)
+            remainder = _remove(WEEKDAY_PATTERN, remainder)
+            signals.append(f"lecture_time:{filters['lecture_time']}")
+            # "월요일 수업 없는"처럼 부정 조건이면 규칙으로 처리하지 않음
+            if NEGATION_AFTER_PATTERN.search(user_query[weekday_match.end():]):
+                confidence = min(confidence, 0.3)
+                signals.append("negated_weekday")
+
+        # 수업 방식
+        for method, pattern in LECTURE_METHOD_PATTERNS:
+            if pattern.search(user_query):
+                filters["lecture_method"] = method
+                remainder = _remove(pattern, remainder)
+                signals.append(f"lecture_method:{method}")
+                break
+
+        # 강의명/교수명 (사전 매칭)
+        normalized_query = _normalize(user_query)
+        taken: List[Tuple[int, int]] = []
+        course_matches, inner_courses = _find_entities(user_query, normalized_query, self.gazetteer.course_names, taken)
+        professor_matches, inner_professors = _find_entities(user_query, normalized_query, self.gazetteer.professors,
+                                                             taken, PROFESSOR_MIN_LEN_WITHOUT_SUFFIX)
+        course_names = [name for name, _ in course_matches]
+        professors = [name for name, _ in professor_matches]
+        # "운영체제론"처럼 사전 이름이 단어 안쪽에만 있으면 다른 이름일 수 있으므로 규칙으로 정하지 않음
+        if inner_courses or inner_professors:
+            confidence = min(confidence, 0.5)
+            signals.append(f"inner_word_entity:{inner_courses + inner_professors}")
+        for name, span in course_matches:
+            if span[1] - span[0] <= SHORT_COURSE_NAME_LEN and not normalized_query.startswith(LECTURE_SUFFIXES, span[1]):
+                confidence = min(confidence, 0.5)
+                signals.append(f"short_course_name:{name}")
+        for name in course_names + professors:
+            remainder = _remove(re.compile(r"\s*".join(map(re.escape, _normalize(name)))), remainder, flags=re.IGNORECASE)
+        if professors:
+            remainder = _remove(re.compile(r"교수님?"), remainder)
+
+        if len(course_names) == 1:
+            filters["course_name"] = course_names[0]
+        if len(professors) == 1:
+            filters["professor"] = professors[0]
+        if course_names:
+            signals.append(f"course_names:{course_names}")
+        if professors:
+            signals.append(f"professors:{professors}")
+
+        # 비교 질의
+        comparison_type = None
+        professor_comparison = bool(PROFESSOR_COMPARISON_PATTERN.search(user_query))
+        if professor_comparison and course_names:
+            comparison_type = "both" if len(course_names) > 1 else "professor"
+        elif len(professors) > 1:
+            comparison_type = "professor"
+        elif len(course_names) > 1:
+            comparison_type = "course"
+        if comparison_type:
+            signals.append(f"comparison:{comparison_type}")
+        elif COMPARISON_PATTERN.search(user_query) or professor_comparison:
+            # 비교 표현은 있는데 비교 대상을 찾지 못함 → 사전에 없는 이름일 가능성
+            confidence = min(confidence, 0.3)
+            signals.append("unresolved_comparison")
+
+        # 신뢰도 낮추는 신호들
+        if PROFESSOR_MENTION_PATTERN.search(user_query) and not professors and not professor_comparison:
+            confidence = min(confidence, 0.3)
+            signals.append("unresolved_professor")
+        if not INTENT_CUE_PATTERN.search(user_query):
+            # "화요일 전선"처럼 무엇을 원하는지(추천/평가/비교) 드러나지 않으면 규칙으로 정하지 않음
+            confidence = min(confidence, 0.6)
+            signals.append("no_intent_cue")
+        if SEMESTER_PATTERN.search(user_query):
+            confidence = min(confidence, 0.5)
+            signals.append("semester_mention")
+        for token in remainder.split():
+            stripped = token.rstrip("?!.,~")
+            for particle in PARTICLES:
+                if stripped.endswith(particle) and len(stripped) > len(particle) + 1:
+                    stripped = stripped[:-len(particle)]
+                    break
+            if LATIN_TOKEN.search(stripped) or (len(stripped) >= 3 and COURSE_LIKE_SUFFIX.search(stripped)):
+                confidence = min(confidence, 0.4)
+                signals.append(f"unknown_entity:{stripped}")
+                break
+
+        needs_structured_filter = bool(filters)
+
+        # 의미 검색 쿼리 정제
+        if needs_structured_filter:
+            remainder = re.sub(r"\(\s*\)", " ", remainder)
+            semantic_query = " ".join(remainder.split()).strip(" ,")
+            recommend = RECOMMEND_PATTERN.search(semantic_query)
+            if recommend and not LECTURE_NOUN_PATTERN.search(semantic_query):
+                # "화요일에 듣기 좋은 전선 추천" → "듣기 좋은 강의 추천" (필터로 빠진 명사 자리 채우기)
+                semantic_query = f"{semantic_query[:recommend.start()]}강의 {semantic_query[recommend.start():]}".strip()
+            if (len(_normalize(semantic_query)) < 4 and not recommend) or VAGUE_REMAINDER.match(_normalize(semantic_query)):
+                if professors and not course_names:
+                    semantic_query = "교수님 강의 어때"
+                elif course_names:
+                    semantic_query = "강의 장단점 정리해줘"
+                else:
+                    semantic_query = "강의 추천해줘"
+        else:
+            semantic_query = user_query
+
+        intent = {
+            "needs_structured_filter": needs_structured_filter,
+            "filters": filters,
+            "semantic_query": semantic_query,
+            "comparison_targets": {
+                "course_names": course_names if comparison_type else [],
+                "professors": professors if comparison_type else [],
+                "comparison_type": comparison_type
+            }
+        }
+        return intent, confidence, signals
+
+
+def mongo_gazetteer_loader(get_db: Callable[[], Any]) -> Callable[[], Tuple[List[str], List[str]]]:
+    """courses 컬렉션에서 강의명/교수명 목록을 읽는 loader 생성"""
+    def loader():
+        collection = get_db().courses
+        course_names = [name for name in collection.distinct("course_name") if name]
+        professors = [name for name in collection.distinct("professor") if name]
+        return course_names, professors
+    return loader
@@ -0,0 +1,515 @@
+"""
+프로세스 내 벡터 검색 엔진 (Pinecone index.query 대체용)
+강의평 벡터(수천 개, 768차원)를 스냅샷 파일에서 메모리 매핑으로 불러와 로컬에서 검색
+- exact: NumPy 행렬곱으로 전체 벡터와 코사인 유사도 계산 (작은 데이터셋)
+- hnsw: HNSW 그래프 탐색 (큰 데이터셋)
+- int8 양자화(선택): 후보는 int8 벡터로 고르고 float32 원본으로 다시 점수 계산(rescoring)
+- metadata 필터: Pinecone과 같은 형식의 $eq, $in (필드 값이 리스트면 원소 중 하나와 일치)
+
+스냅샷 디렉터리 구성 (save_snapshot / scripts/build_local_vector_index.py로 생성):
+    vectors.npy       float32 (N, D) 정규화된 벡터 (np.load mmap_mode='r')
+    vectors_int8.npy  int8 (N, D) 양자화 벡터
+    scales.npy        float32 (N,) 양자화 스케일
+    meta.json         ids, metadata, dimension, created_at
+    hnsw.npz          HNSW 그래프 (선택)
+"""
+
+import heapq
+import json
+import math
+import os
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+SUPPORTED_FILTER_OPERATORS = ("$eq", "$in")
+
+
+def metadata_matches(metadata: Optional[Dict[str, Any]], filter: Optional[Dict[str, Any]]) -> bool:
+    """metadata 한 건이 Pinecone 형식 필터($eq, $in, $and)를 만족하는지 확인"""
+    if not filter:
+        return True
+    metadata = metadata or {}
+    for field, condition in filter.items():
+        if field == "$and":
+            if not all(metadata_matches(metadata, sub_filter) for sub_filter in condition):
+                return False
+            continue
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        value = metadata.get(field)
+        values = value if isinstance(value, list) else [value]
+        for operator, operand in condition.items():
+            if operator == "$eq":
+                allowed = [operand]
+            elif operator == "$in":
+                allowed = list(operand)
+            else:
+                raise ValueError(f"지원하지 않는 필터 연산자입니다: {operator} (지원: {', '.join(SUPPORTED_FILTER_OPERATORS)})")
+            if not any(item in allowed for item in values if item is not None):
+                return False
+    return True
+
+
+class LocalMatch:
+    """Pinecone ScoredVector와 같은 형태의 검색 결과 (속성/딕셔너리 접근 모두 지원)"""
+
+    __slots__ = ("id", "score", "metadata", "values")
+
+    def __init__(self, id: str, score: float, metadata: Optional[Dict[str, Any]] = None, values: Optional[List[float]] = None):
+        self.id = id
+        self.score = score
+        self.metadata = metadata
+        self.values = values
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+class LocalQueryResponse:
+    """Pinecone QueryResponse와 같은 형태 (response.matches / response['matches'])"""
+
+    def __init__(self, matches: List[LocalMatch], namespace: str = ""):
+        self.matches = matches
+        self.namespace = namespace
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+# ───────────────────────────────────────────────
+# HNSW 그래프
+# ───────────────────────────────────────────────
+class HNSWGraph:
+    """코사인 유사도(정규화 벡터 내적) 기반 HNSW 그래프"""
+
+    def __init__(self, m: int = 16, ef_construction: int = 100, seed: int = 42):
+        self.m = m
+        self.m0 = m * 2  # 0층은 이웃을 두 배까지 허용
+        self.ef_construction = ef_construction
+        self.seed = seed
+        self.entry_point = -1
+        self.max_level = -1
+        self.levels: Optional[np.ndarray] = None
+        # links[level][node] = 이웃 노드 배열
+        self.links: List[Dict[int, Any]] = []
+
+    # 거리 계산은 호출 측이 넘긴 scorer(nodes, query) → 유사도 배열로 처리
+    # (float32 원본 또는 int8 역양자화 벡터 어느 쪽이든 사용 가능)
+    def _neighbors(self, node: int, level: int):
+        return self.links[level].get(node, ())
+
+    def _search_layer(self, query, entry_points: List[int], ef: int, level: int, scorer,
+                      allowed: Optional[np.ndarray] = None) -> List[tuple]:
+        """한 층에서 ef개 후보 탐색. (유사도, 노드) 리스트 반환 (allowed가 있으면 허용 노드만 결과에 포함)"""
+        visited = set(entry_points)
+        entry_scores = scorer(entry_points, query)
+        candidates = []  # 최대 힙 (유사도 음수)
+        results = []     # 최소 힙 (크기 ef)
+        for score, node in zip(entry_scores.tolist(), entry_points):
+            heapq.heappush(candidates, (-score, node))
+            if allowed is None or allowed[node]:
+                heapq.heappush(results, (score, node))
+        lower_bound = results[0][0] if results else -math.inf
+
+        while candidates:
+            neg_score, node = heapq.heappop(candidates)
+            if len(results) >= ef and -neg_score < lower_bound:
+                break
+            neighbors = [n for n in self._neighbors(node, level) if n not in visited]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+            scores = scorer(neighbors, query)
+            for score, neighbor in zip(scores.tolist(), neighbors):
+                if len(results) < ef or score > lower_bound:
+                    heapq.heappush(candidates, (-score, neighbor))
+                    if allowed is None or allowed[neighbor]:
+                        heapq.heappush(results, (score, neighbor))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+                    if results:
+                        lower_bound = results[0][0]
+        return results
+
+    @staticmethod
+    def _select_neighbors(vectors: np.ndarray, candidates: List[tuple], max_links: int) -> List[int]:
+        """
+        이웃 선택 휴리스틱: 이미 고른 이웃보다 질의 노드에 더 가까운 후보를 우선 선택해
+        한 군집에 이웃이 몰리지 않게 하고, 남는 자리는 유사도 순으로 채움
+        (candidates는 유사도 내림차순 (유사도, 노드) 리스트)
+        """
+        selected: List[int] = []
+        skipped: List[int] = []
+        for score, node in candidates:
+            if len(selected) >= max_links:
+                break
+            if selected and float(np.max(vectors[selected] @ vectors[node])) > score:
+                skipped.append(node)
+            else:
+                selected.append(node)
+        return selected + skipped[:max_links - len(selected)]
+
+    def build(self, vectors: np.ndarray) -> "HNSWGraph":
+        """정규화된 float32 벡터로 그래프 생성"""
+        count = len(vectors)
+        rng = random.Random(self.seed)
+        level_mult = 1 / math.log(self.m)
+        self.levels = np.zeros(count, dtype=np.int32)
+        self.links = [dict()]
+
+        def scorer(nodes, query):
+            return vectors[nodes] @ query
+
+        for node in range(count):
+            level = int(-math.log(1.0 - rng.random()) * level_mult)
+            self.levels[node] = level
+            while len(self.links) <= level:
+                self.links.append(dict())
+            for l in range(level + 1):
+                self.links[l][node] = []
+
+            if self.entry_point < 0:
+                self.entry_point = node
+                self.max_level = level
+                continue
+
+            query = vectors[node]
+            entry = [self.entry_point]
+            for l in range(self.max_level, level, -1):
+                best = self._search_layer(query, entry, 1, l, scorer)
+                entry = [max(best)[1]]
+            for l in range(min(level, self.max_level), -1, -1):
+                found = self._search_layer(query, entry, self.ef_construction, l, scorer)
+                max_links = self.m0 if l == 0 else self.m
+                selected = self._select_neighbors(vectors, heapq.nlargest(len(found), found), max_links)
+                self.links[l][node] = selected
+                for neighbor in selected:
+                    neighbor_links = self.links[l][neighbor]
+                    neighbor_links.append(node)
+                    if len(neighbor_links) > max_links:
+                        # 이웃 수가 넘치면 유사도 높은 순으로 정리
+                        scores = vectors[neighbor_links] @ vectors[neighbor]
+                        keep = np.argsort(-scores)[:max_links]
+                        self.links[l][neighbor] = [neighbor_links[i] for i in keep]
+                entry = [n for _, n in found]
+
+            if level > self.max_level:
+                self.max_level = level
+                self.entry_point = node
+        return self
+
+    def search(self, query: np.ndarray, k: int, ef: int, scorer, allowed: Optional[np.ndarray] = None) -> List[tuple]:
+        """상위 k개 (유사도, 노드)를 유사도 내림차순으로 반환"""
+        if self.entry_point < 0:
+            return []
+        entry = [self.entry_point]
+        for l in range(self.max_level, 0, -1):
+            best = self._search_layer(query, entry, 1, l, scorer)
+            entry = [max(best)[1]]
+        found = self._search_layer(query, entry, max(ef, k), 0, scorer, allowed=allowed)
+        return heapq.nlargest(k, found)
+
+    # ───────────────────────────────────────────────
+    # 저장/불러오기 (층별 노드 목록 + -1로 채운 이웃 행렬)
+    # ───────────────────────────────────────────────
+    def save(self, path: str) -> None:
+        arrays = {
+            "params": np.array([self.m, self.ef_construction, self.entry_point, self.max_level], dtype=np.int64),
+            "levels": self.levels,
+        }
+        for l, layer in enumerate(self.links):
+            nodes = np.array(sorted(layer), dtype=np.int32)
+            width = self.m0 if l == 0 else self.m
+            neighbors = np.full((len(nodes), width), -1, dtype=np.int32)
+            for row, node in enumerate(nodes.tolist()):
+                node_links = layer[node][:width]
+                neighbors[row, :len(node_links)] = node_links
+            arrays[f"nodes_{l}"] = nodes
+            arrays[f"neighbors_{l}"] = neighbors
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "HNSWGraph":
+        data = np.load(path)
+        m, ef_construction, entry_point, max_level = data["params"].tolist()
+        graph = cls(m=m, ef_construction=ef_construction)
+        graph.entry_point = entry_point
+        graph.max_level = max_level
+        graph.levels = data["levels"]
+        graph.links = []
+        for l in range(max_level + 1):
+            nodes = data[f"nodes_{l}"].tolist()
+            neighbors = data[f"neighbors_{l}"]
+            graph.links.append({
+                node: [n for n in row if n >= 0]
+                for node, row in zip(nodes, neighbors.tolist())
+            })
+        return graph
+
+
+# ───────────────────────────────────────────────
+# 로컬 인덱스
+# ───────────────────────────────────────────────
+class LocalVectorIndex:
+    """
+    Pinecone Index.query()와 같은 인터페이스의 로컬 벡터 인덱스
+
+    사용 예:
+        index = LocalVectorIndex.load_snapshot("data/vector_index")
+        response = index.query(vector=embedding, top_k=5, include_metadata=True,
+                               filter={"course_name": {"$in": ["데이터베이스", "운영체제"]}})
+        for match in response.matches:
+            print(match.id, match.score, match.metadata)
+    """
+
+    def __init__(self, ids: Sequence[str], metadata: Sequence[Dict[str, Any]], vectors: np.ndarray,
+                 mode: str = "auto", quantize: bool = False, exact_threshold: int = 20000,
+                 ef_search: int = 64, rescore_factor: int = 4, graph: Optional[HNSWGraph] = None,
+                 int8_vectors: Optional[np.ndarray] = None, scales: Optional[np.ndarray] = None):
+        """
+        Args:
+            ids, metadata, vectors: 같은 순서의 벡터 ID / metadata / float32 벡터 (정규화 가정)
+            mode: "exact" | "hnsw" | "auto" (auto: exact_threshold개 이하면 exact)
+            quantize: True면 int8 벡터로 후보를 고르고 float32로 rescoring
+            ef_search: HNSW 탐색 후보 수
+            rescore_factor: 양자화 사용 시 top_k * rescore_factor개를 다시 점수 계산
+            graph: 미리 만든 HNSW 그래프 (hnsw 모드인데 없으면 생성)
+        """
+        if mode not in ("auto", "exact", "hnsw"):
+            raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+        self.ids = list(ids)
+        self.metadata = list(metadata)
+        self.vectors = vectors
+        self.dimension = vectors.shape[1] if vectors.ndim == 2 else 0
+        self.ef_search = ef_search
+        self.rescore_factor = rescore_factor
+        self.mode = ("exact" if len(self.ids) <= exact_threshold else "hnsw") if mode == "auto" else mode
+
+        self.quantize = quantize
+        self.int8_vectors = int8_vectors
+        self.scales = scales
+        if quantize and (int8_vectors is None or scales is None):
+            self.int8_vectors, self.scales = quantize_int8(np.asarray(vectors))
+
+        self.graph = graph
+        if self.mode == "hnsw" and self.graph is None and len(self.ids):
+            started = time.time()
+            self.graph = HNSWGraph().build(np.asarray(vectors, dtype=np.float32))
+            print(f"🕸️ HNSW 그래프 생성 완료: {len(self.ids)}개 ({time.time() - started:.1f}s)")
+
+        # metadata 필드별 값 → 행 번호 (필터 최초 사용 시 생성)
+        self._field_index: Dict[str, Dict[Any, np.ndarray]] = {}
+
+    # ───────────────────────────────────────────────
+    # metadata 필터
+    # ───────────────────────────────────────────────
+    def _field_rows(self, field: str) -> Dict[Any, np.ndarray]:
+        rows = self._field_index.get(field)
+        if rows is None:
+            collected: Dict[Any, List[int]] = {}
+            for row, meta in enumerate(self.metadata):
+                value = (meta or {}).get(field)
+                values = value if isinstance(value, list) else [value]
+                for item in values:
+                    if item is not None:
+                        collected.setdefault(item, []).append(row)
+            rows = {value: np.array(items, dtype=np.int64) for value, items in collected.items()}
+            self._field_index[field] = rows
+        return rows
+
+    def _filter_mask(self, filter: Dict[str, Any]) -> np.ndarray:
+        """Pinecone 필터 → 허용 행 bool 마스크 (필드끼리는 AND)"""
+        mask = np.ones(len(self.ids), dtype=bool)
+        for field, condition in filter.items():
+            if field == "$and":
+                for sub_filter in condition:
+                    mask &= self._filter_mask(sub_filter)
+                continue
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            field_rows = self._field_rows(field)
+            for operator, operand in condition.items():
+                if operator == "$eq":
+                    values = [operand]
+                elif operator == "$in":
+                    values = list(operand)
+                else:
+                    raise ValueError(f"지원하지 않는 필터 연산자입니다: {operator} (지원: {', '.join(SUPPORTED_FILTER_OPERATORS)})")
+                field_mask = np.zeros(len(self.ids), dtype=bool)
+                for value in values:
+                    rows = field_rows.get(value)
+                    if rows is not None:
+                        field_mask[rows] = True
+                mask &= field_mask
+        return mask
+
+    # ───────────────────────────────────────────────
+    # 점수 계산
+    # ───────────────────────────────────────────────
+    def _float_scores(self, rows, query: np.ndarray) -> np.ndarray:
+        return np.asarray(self.vectors[rows], dtype=np.float32) @ query
+
+    def _int8_scores(self, rows, query: np.ndarray) -> np.ndarray:
+        return (self.int8_vectors[rows].astype(np.float32) @ query) * self.scales[rows]
+
+    def _exact_search(self, query: np.ndarray, k: int, rows: Optional[np.ndarray]) -> List[tuple]:
+        if rows is None:
+            rows = np.arange(len(self.ids))
+        if len(rows) == 0:
+            return []
+        scorer = self._int8_scores if self.quantize else self._float_scores
+        # 큰 행렬은 잘라서 계산 (양자화 시 float 변환 임시 메모리 제한)
+        chunk = 8192
+        scores = np.concatenate([scorer(rows[i:i + chunk], query) for i in range(0, len(rows), chunk)])
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [(float(scores[i]), int(rows[i])) for i in top]
+
+    def _search(self, query: np.ndarray, top_k: int, filter: Optional[Dict[str, Any]]) -> List[tuple]:
+        candidate_k = top_k * self.rescore_factor if self.quantize else top_k
+        mask = self._filter_mask(filter) if filter else None
+        allowed_count = int(mask.sum()) if mask is not None else len(self.ids)
+        if allowed_count == 0:
+            return []
+
+        # 필터로 후보가 적게 남으면 그래프보다 전체 계산이 빠르고 정확함
+        if self.mode == "exact" or allowed_count <= max(candidate_k * 50, 2000):
+            rows = np.flatnonzero(mask) if mask is not None else None
+            found = self._exact_search(query, candidate_k, rows)
+        else:
+            scorer = self._int8_scores if self.quantize else self._float_scores
+            # 허용 비율이 낮을수록 탐색 폭을 넓힘
+            ef = max(self.ef_search, candidate_k)
+            if mask is not None:
+                ef = min(len(self.ids), int(ef * len(self.ids) / allowed_count))
+            found = self.graph.search(query, candidate_k, ef, scorer, allowed=mask)
+
+        if self.quantize and found:
+            rows = np.array([node for _, node in found], dtype=np.int64)
+            scores = self._float_scores(rows, query)
+            found = list(zip(scores.tolist(), rows.tolist()))
+        found.sort(key=lambda item: -item[0])
+        return found[:top_k]
+
+    def query(self, vector: Sequence[float] = None, top_k: int = 10, include_metadata: bool = False,
+              include_values: bool = False, filter: Optional[Dict[str, Any]] = None, namespace: Optional[str] = None,
+              **kwargs) -> LocalQueryResponse:
+        """Pinecone Index.query()와 같은 인자/결과 형식"""
+        if vector is None:
+            raise ValueError("vector 파라미터가 필요합니다.")
+        query = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm > 0:
+            query = query / norm
+        if not self.ids or top_k <= 0:
+            return LocalQueryResponse([], namespace or "")
+
+        matches = []
+        for score, row in self._search(query, top_k, filter):
+            matches.append(LocalMatch(
+                id=self.ids[row],
+                score=score,
+                metadata=self.metadata[row] if include_metadata else None,
+                values=np.asarray(self.vectors[row], dtype=np.float32).tolist() if include_values else None
+            ))
+        return LocalQueryResponse(matches, namespace or "")
+
+    def describe_index_stats(self, **kwargs) -> Dict[str, Any]:
+        return {
+            "dimension": self.dimension,
+            "total_vector_count": len(self.ids),
+            "mode": self.mode,
+            "quantize": self.quantize,
+        }
+
+    # ───────────────────────────────────────────────
+    # 스냅샷
+    # ───────────────────────────────────────────────
+    def save_snapshot(self, path: str) -> None:
+        save_snapshot(path, self.ids, self.metadata, np.asarray(self.vectors), graph=self.graph)
+
+    @classmethod
+    def load_snapshot(cls, path: str, mode: str = "auto", quantize: bool = False, **kwargs) -> "LocalVectorIndex":
+        """
+        스냅샷 디렉터리에서 불러오기 (float32 벡터는 메모리 매핑)
+
+        Args:
+            path: save_snapshot()으로 만든 디렉터리
+            mode: "exact" | "hnsw" | "auto"
+            quantize: int8 양자화 검색 사용 여부
+        """
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+
+        int8_vectors = scales = None
+        if quantize and os.path.exists(os.path.join(path, "vectors_int8.npy")):
+            int8_vectors = np.load(os.path.join(path, "vectors_int8.npy"))
+            scales = np.load(os.path.join(path, "scales.npy"))
+
+        graph = None
+        graph_path = os.path.join(path, "hnsw.npz")
+        if mode != "exact" and os.path.exists(graph_path):
+            graph = HNSWGraph.load(graph_path)
+
+        index = cls(meta["ids"], meta["metadata"], vectors, mode=mode, quantize=quantize,
+                    graph=graph, int8_vectors=int8_vectors, scales=scales, **kwargs)
+        print(f"✅ 로컬 벡터 인덱스 로드: {len(index.ids)}개, {index.dimension}차원 "
+              f"(mode={index.mode}, int8={'on' if quantize else 'off'}, 생성: {meta.get('created_at', '-')})")
+        return index
+
+
+def quantize_int8(vectors: np.ndarray):
+    """행 단위 대칭 int8 양자화. (int8 벡터, 스케일) 반환 - 원래 값 ≈ int8 * 스케일"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    max_abs = np.abs(vectors).max(axis=1) if len(vectors) else np.zeros(0, dtype=np.float32)
+    scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+    int8_vectors = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return int8_vectors, scales
+
+
+def save_snapshot(path: str, ids: Sequence[str], metadata: Sequence[Dict[str, Any]], vectors: np.ndarray,
+                  graph: Optional[HNSWGraph] = None, build_graph: bool = False) -> None:
+    """
+    스냅샷 디렉터리 저장 (벡터는 정규화해서 저장)
+
+    Args:
+        build_graph: True면 HNSW 그래프를 생성해 함께 저장 (graph가 없을 때)
+    """
+    os.makedirs(path, exist_ok=True)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms > 0, norms, 1.0)
+
+    np.save(os.path.join(path, "vectors.npy"), vectors)
+    int8_vectors, scales = quantize_int8(vectors)
+    np.save(os.path.join(path, "vectors_int8.npy"), int8_vectors)
+    np.save(os.path.join(path, "scales.npy"), scales)
+
+    if graph is None and build_graph and len(vectors):
+        started = time.time()
+        graph = HNSWGraph().build(vectors)
+        print(f"🕸️ HNSW 그래프 생성 완료: {len(vectors)}개 ({time.time() - started:.1f}s)")
+    graph_path = os.path.join(path, "hnsw.npz")
+    if graph is not None:
+        graph.save(graph_path)
+    elif os.path.exists(graph_path):
+        os.remove(graph_path)
+
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "ids": list(ids),
+            "metadata": list(metadata),
+            "dimension": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+            "created_at": datetime.now().isoformat(),
+        }, f, ensure_ascii=False)
@@ -0,0 +1,320 @@
+"""
+ONNX Runtime 임베딩 백엔드 (CPU 전용 서버용)
+SentenceTransformer(PyTorch fp32) 대신 ONNX로 내보낸 모델(선택: 동적 int8 양자화)로 인코딩
+- 추론 시 torch/sentence_transformers를 import하지 않아 워커당 메모리가 크게 줄어듦
+- encode(texts, normalize_embeddings=True) 인터페이스가 SentenceTransformer와 같아
+  embedding_cache.encode()와 기존 호출부를 그대로 사용
+- 내보내기 시 PyTorch 출력과의 코사인 일치도를 검증해 embedder.json에 기록,
+  검증을 통과한 모델만 로드 (실패하면 PyTorch 백엔드로 대체)
+
+백엔드 선택: EMBEDDING_BACKEND=torch(기본) | onnx
+모델 디렉터리: ONNX_MODEL_DIR (기본 data/onnx/<모델명>)
+내보내기: python scripts/export_onnx_embedder.py --model jhgan/ko-sroberta-multitask
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_ONNX_ROOT = os.path.join(PROJECT_ROOT, 'data', 'onnx')
+METADATA_FILE = "embedder.json"
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+
+# 코사인 일치도 검증용 고정 문장 (실제 질의/강의평 형태)
+AGREEMENT_FIXTURES = [
+    "query: 팀플 없는 전공 과목 추천해줘",
+    "query: 데이터베이스 김교수님 시험 어때?",
+    "query: 과제 적고 학점 잘 주는 교양",
+    "query: 운영체제랑 컴퓨터네트워크 중에 뭐가 더 빡세?",
+    "query: 출석 안 부르는 수업 있어?",
+    "query: 캡스톤디자인 팀 프로젝트 난이도",
+    "passage: 팀플이 없고 과제가 적당해서 좋았어요. 시험은 족보 위주로 나옵니다.",
+    "passage: 설명은 자세한데 진도가 너무 빨라서 따라가기 힘들었음",
+    "passage: 출석 체크를 매번 하고 지각도 감점이라 주의하세요",
+    "passage: 교수님이 열정적이시고 질문에 친절하게 답해주십니다. 학점은 짜요.",
+    "passage: 중간 기말 모두 서술형이라 암기할 게 많습니다",
+    "passage: 과제 양이 많지만 실력이 확실히 늘어요. 파이썬 기초가 있으면 편함",
+    "passage: Lecture is in English, weekly quizzes and one term project.",
+    "passage: 노팀플 노과제 꿀강",
+]
+
+
+def default_model_dir(model_name: str) -> str:
+    """모델명 → 기본 ONNX 디렉터리 (data/onnx/jhgan__ko-sroberta-multitask)"""
+    return os.path.join(DEFAULT_ONNX_ROOT, re.sub(r"[^A-Za-z0-9._-]+", "__", model_name))
+
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """두 임베딩 행렬의 행별 코사인 유사도 통계"""
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    reference = reference / np.maximum(np.linalg.norm(reference, axis=1, keepdims=True), 1e-12)
+    candidate = candidate / np.maximum(np.linalg.norm(candidate, axis=1, keepdims=True), 1e-12)
+    cosines = np.sum(reference * candidate, axis=1)
+    return {
+        "min": round(float(cosines.min()), 6),
+        "mean": round(float(cosines.mean()), 6),
+        "count": int(len(cosines)),
+    }
+
+
+class OnnxSentenceEncoder:
+    """ONNX Runtime으로 돌리는 SentenceTransformer 호환 인코더"""
+
+    def __init__(self, model_dir: str, quantized: bool = True, num_threads: Optional[int] = None,
+                 batch_size: int = 32):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, METADATA_FILE), encoding='utf-8') as f:
+            self.metadata: Dict[str, Any] = json.load(f)
+
+        model_file = INT8_FILE if quantized else FP32_FILE
+        model_path = os.path.join(model_dir, model_file)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"ONNX 모델 파일이 없습니다: {model_path}")
+
+        self.model_dir = model_dir
+        self.model_name = self.metadata["model_name"]
+        self.quantized = quantized
+        self.pooling = self.metadata.get("pooling", "mean")
+        self.max_seq_length = int(self.metadata.get("max_seq_length", 128))
+        self.batch_size = batch_size
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding(
+            pad_id=int(self.metadata.get("pad_token_id", 0)),
+            pad_token=self.metadata.get("pad_token", "[PAD]")
+        )
+        # InferenceSession.run은 스레드 안전하지만 tokenizer 설정 변경을 막기 위해 배치 단위로 직렬화
+        self._lock = threading.Lock()
+
+    @property
+    def backend_name(self) -> str:
+        return "onnx-int8" if self.quantized else "onnx"
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.metadata.get("dimension", 0))
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run(None, feeds)[0]
+
+        if self.pooling == "cls":
+            return hidden[:, 0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+    def encode(self, sentences, normalize_embeddings: bool = False, batch_size: Optional[int] = None,
+               convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        """
+        SentenceTransformer.encode와 같은 방식으로 인코딩
+
+        Args:
+            sentences: 문장 또는 문장 리스트
+            normalize_embeddings: True면 L2 정규화
+            batch_size: 배치 크기 (기본 생성자 값)
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        batch_size = batch_size or self.batch_size
+        # 길이순으로 묶어 padding 낭비를 줄이고 원래 순서로 복원
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        chunks = []
+        with self._lock:
+            for start in range(0, len(order), batch_size):
+                batch_indices = order[start:start + batch_size]
+                chunks.append(self._encode_batch([texts[i] for i in batch_indices]))
+        stacked = np.concatenate(chunks, axis=0).astype(np.float32)
+        outputs = np.empty_like(stacked)
+        outputs[order] = stacked
+
+        if normalize_embeddings:
+            outputs = outputs / np.maximum(np.linalg.norm(outputs, axis=1, keepdims=True), 1e-12)
+        return outputs[0] if single else outputs
+
+
+# ───────────────────────────────────────────────
+# 내보내기 / 검증 (scripts/export_onnx_embedder.py에서 사용, torch 필요)
+# ───────────────────────────────────────────────
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True, opset: int = 14) -> Dict[str, Any]:
+    """
+    SentenceTransformer 모델을 ONNX로 내보내기 (선택: 동적 int8 양자화)
+
+    Returns:
+        embedder.json에 기록한 metadata
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(output_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    auto_model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+
+    pooling = "mean"
+    for module in model:
+        if type(module).__name__ == "Pooling":
+            config = module.get_config_dict()
+            if config.get("pooling_mode_cls_token"):
+                pooling = "cls"
+            elif not config.get("pooling_mode_mean_tokens", True):
+                raise ValueError(f"지원하지 않는 pooling 방식입니다: {config}")
+
+    sample = tokenizer(["query: 샘플 문장"], return_tensors="pt")
+    input_names = ["input_ids", "attention_mask"]
+    if "token_type_ids" in sample:
+        input_names.append("token_type_ids")
+
+    class _Wrapper(torch.nn.Module):
+        """ONNX 출력은 last_hidden_state 하나로 고정"""
+
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *inputs):
+            return self.inner(**dict(zip(input_names, inputs)))[0]
+
+    fp32_path = os.path.join(output_dir, FP32_FILE)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            _Wrapper(auto_model),
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(fp32_path, os.path.join(output_dir, INT8_FILE), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(output_dir)
+    metadata = {
+        "model_name": model_name,
+        "pooling": pooling,
+        "max_seq_length": int(model.max_seq_length),
+        "dimension": int(model.get_sentence_embedding_dimension()),
+        "pad_token_id": int(tokenizer.pad_token_id or 0),
+        "pad_token": tokenizer.pad_token,
+        "quantized": quantize,
+        "agreement": {},
+    }
+    _write_metadata(output_dir, metadata)
+    return metadata
+
+
+def verify_agreement(model_name: str, model_dir: str, texts: Sequence[str] = AGREEMENT_FIXTURES,
+                     threshold: float = 0.99) -> Dict[str, Any]:
+    """
+    PyTorch 출력과 ONNX(fp32/int8) 출력의 코사인 일치도를 검증해 embedder.json에 기록
+
+    Args:
+        threshold: 이 값 이상이어야 통과 (최소 코사인 기준)
+
+    Returns:
+        {"onnx": {...}, "onnx-int8": {...}} 변형별 min/mean/count/passed
+    """
+    from sentence_transformers import SentenceTransformer
+
+    reference = SentenceTransformer(model_name, device="cpu").encode(list(texts), normalize_embeddings=True)
+    metadata = _read_metadata(model_dir)
+    agreement: Dict[str, Any] = {}
+    for quantized in (False, True):
+        if quantized and not os.path.exists(os.path.join(model_dir, INT8_FILE)):
+            continue
+        encoder = OnnxSentenceEncoder(model_dir, quantized=quantized)
+        result = cosine_agreement(reference, encoder.encode(list(texts), normalize_embeddings=True))
+        result["threshold"] = threshold
+        result["passed"] = result["min"] >= threshold
+        agreement[encoder.backend_name] = result
+
+    metadata["agreement"] = agreement
+    _write_metadata(model_dir, metadata)
+    return agreement
+
+
+def _read_metadata(model_dir: str) -> Dict[str, Any]:
+    with open(os.path.join(model_dir, METADATA_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_metadata(model_dir: str, metadata: Dict[str, Any]) -> None:
+    with open(os.path.join(model_dir, METADATA_FILE), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+
+# ───────────────────────────────────────────────
+# 백엔드 선택 (rag_api.py, vector_store.py 공유)
+# ───────────────────────────────────────────────
+def load_embedding_model(model_name: str, backend: Optional[str] = None) -> Any:
+    """
+    설정된 백엔드로 임베딩 모델 로드
+
+    Args:
+        model_name: HuggingFace 모델명
+        backend: "torch" | "onnx" (기본 EMBEDDING_BACKEND 환경변수)
+            onnx는 ONNX_QUANTIZE(기본 true)면 int8 모델 사용,
+            모델이 없거나 코사인 검증을 통과하지 못했으면 torch로 대체
+
+    Returns:
+        encode(texts, normalize_embeddings=True)를 지원하는 모델
+    """
+    backend = (backend or os.getenv('EMBEDDING_BACKEND', 'torch')).lower()
+    if backend == "onnx":
+        model_dir = os.getenv('ONNX_MODEL_DIR') or default_model_dir(model_name)
+        quantized = os.getenv('ONNX_QUANTIZE', 'true').lower() == 'true'
+        try:
+            metadata = _read_metadata(model_dir)
+            if metadata.get("model_name") != model_name:
+                raise ValueError(f"ONNX 모델이 다릅니다: {metadata.get('model_name')} ≠ {model_name}")
+            variant = "onnx-int8" if quantized else "onnx"
+            check = metadata.get("agreement", {}).get(variant)
+            if not check or not check.get("passed"):
+                raise ValueError(f"{variant} 코사인 일치도 검증을 통과하지 못했습니다: {check}")
+            encoder = OnnxSentenceEncoder(
+                model_dir,
+                quantized=quantized,
+                num_threads=int(os.getenv('ONNX_NUM_THREADS', 0)) or None
+            )
+            print(f"✅ ONNX 임베딩 백엔드 사용: {model_name} ({variant}, 최소 코사인 {check['min']})")
+            return encoder
+        except Exception as e:
+            print(f"⚠️ ONNX 임베딩 백엔드 로드 실패, PyTorch 사용: {e}")
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def embedding_cache_name(model_name: str, model: Any) -> str:
+    """임베딩 캐시 키용 모델명 (ONNX 결과는 PyTorch 결과와 섞이지 않도록 구분)"""
+    backend_name = getattr(model, "backend_name", None)
+    return f"{model_name}@{backend_name}" if backend_name else model_name
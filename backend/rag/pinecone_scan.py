@@ -0,0 +1,114 @@
+"""
+Pinecone 인덱스 전체 조회 유틸리티
+로컬 벡터 인덱스 스냅샷, 키워드(BM25) 인덱스 등 인덱스 전체 데이터가 필요한 곳에서 사용
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+FETCH_BATCH_SIZE = 100
+# 0 벡터 쿼리 한 번으로 받을 수 있는 최대 개수 (이만큼 받았으면 나머지는 잘렸다고 봐야 함)
+QUERY_SCAN_TOP_K = 10000
+
+
+class ListUnsupportedError(Exception):
+    """list()를 지원하지 않는 인덱스 (pod 기반, 구버전 클라이언트)"""
+
+
+def _is_list_unsupported(error: Exception) -> bool:
+    """일시적인 네트워크/서버 오류가 아니라 list() 자체를 쓸 수 없다는 응답인지"""
+    if isinstance(error, (AttributeError, NotImplementedError)):
+        return True
+    message = str(error).lower()
+    return getattr(error, "status", None) in (405, 501) or "not supported" in message or "pod" in message
+
+
+def list_all_ids(index, namespace: Optional[str] = None) -> List[str]:
+    """
+    인덱스의 모든 벡터 ID (list() 페이지를 이어 붙임)
+
+    Raises:
+        ListUnsupportedError: list()를 지원하지 않는 인덱스
+        그 밖의 Pinecone 예외(일시적 오류)는 그대로 전달
+    """
+    ids: List[str] = []
+    try:
+        for page in index.list(namespace=namespace or ""):
+            ids.extend(page)
+    except Exception as e:
+        if _is_list_unsupported(e):
+            raise ListUnsupportedError(str(e)) from e
+        raise
+    return ids
+
+
+def fetch_records(index, ids: Sequence[str], namespace: Optional[str] = None,
+                  include_values: bool = True) -> List[Dict[str, Any]]:
+    """ID 목록을 FETCH_BATCH_SIZE개씩 fetch()로 조회"""
+    records = []
+    for start in range(0, len(ids), FETCH_BATCH_SIZE):
+        batch = list(ids[start:start + FETCH_BATCH_SIZE])
+        response = index.fetch(ids=batch, namespace=namespace or "")
+        for vector_id, vector in response.vectors.items():
+            records.append({
+                "id": vector_id,
+                "values": list(vector.values) if include_values else None,
+                "metadata": dict(vector.metadata or {})
+            })
+    return records
+
+
+def fetch_all_records(index, namespace: Optional[str] = None, include_values: bool = True) -> List[Dict[str, Any]]:
+    """
+    인덱스의 모든 벡터(id, values, metadata) 가져오기
+    list()로 ID를 페이지 단위로 받아 fetch()로 조회하고,
+    list()를 지원하지 않는 인덱스(pod 기반)는 0 벡터 쿼리로 대신 조회
+
+    Args:
+        index: Pinecone Index
+        namespace: namespace (None이면 기본)
+        include_values: False면 values를 결과에 넣지 않음 (metadata만 필요할 때)
+    """
+    records = []
+    try:
+        for ids in index.list(namespace=namespace or ""):
+            records.extend(fetch_records(index, ids, namespace, include_values))
+            print(f"   ... {len(records)}개 조회")
+        return records
+    except Exception as e:
+        print(f"⚠️ list/fetch 조회 실패, 0 벡터 쿼리로 대체: {e}")
+
+    records, _ = query_scan(index, namespace, include_values)
+    return records
+
+
+def query_scan(index, namespace: Optional[str] = None,
+               include_values: bool = True) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    0 벡터 쿼리(top_k=QUERY_SCAN_TOP_K)로 전체 조회 (list()를 지원하지 않는 인덱스용 최후 수단)
+
+    Returns:
+        (records, 잘렸는지). 잘렸으면 받지 못한 벡터가 있으므로 결과에 없는 ID를 삭제로 보면 안 됨
+    """
+    stats = index.describe_index_stats()
+    query_kwargs = {
+        "vector": [0.0] * stats.dimension,
+        "top_k": QUERY_SCAN_TOP_K,
+        "include_values": include_values,
+        "include_metadata": True
+    }
+    if namespace:
+        query_kwargs["namespace"] = namespace
+    results = index.query(**query_kwargs)
+    records = [
+        {
+            "id": match.id,
+            "values": list(match.values) if include_values else None,
+            "metadata": dict(match.metadata or {})
+        }
+        for match in results.matches
+    ]
+    truncated = len(records) >= QUERY_SCAN_TOP_K
+    if truncated:
+        print(f"🚨 0 벡터 쿼리가 상한({QUERY_SCAN_TOP_K}개)에 걸림: 인덱스 전체를 받지 못했습니다 "
+              f"(전체 {getattr(stats, 'total_vector_count', '?')}개). list()를 지원하는 서버리스 인덱스로 옮기세요")
+    return records, truncated
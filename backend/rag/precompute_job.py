@@ -0,0 +1,266 @@
+"""
+재시작해도 이어서 실행되는 백그라운드 사전 계산 작업 (강의평 요약 미리 생성 등)
+- 대상 목록을 우선순위 순으로 받아 run_bounded()로 청크 단위 실행 (동시 실행 수 + RateLimiter 호출 속도 제한)
+- 청크가 끝날 때마다 MongoDB jobs 컬렉션에 체크포인트(처리한 키, 결과별 개수, 최근 오류) 저장
+  → 서버가 재시작되면 같은 실행(run_id)을 이어서 처리
+- 여러 API 워커 프로세스가 떠 있어도 lease(소유자 + 만료 시각)를 잡은 프로세스 하나만 실행
+  재시작 직후 이전 lease가 아직 유효하면, 같은 호스트의 죽은 프로세스 lease는 바로 넘겨받고
+  다른 호스트의 lease는 만료 시각에 다시 시도
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.rag.batch_runner import RateLimiter, chunked, run_bounded
+
+MAX_STORED_ERRORS = 20
+# lease 만료 후 재시도까지 여유
+LEASE_RETRY_MARGIN_SECONDS = 5.0
+
+
+def _process_alive(pid: int) -> bool:
+    """이 호스트에 pid 프로세스가 살아 있는지 (확인할 수 없으면 살아 있는 것으로 간주)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class PrecomputeJob:
+    """
+    Args:
+        name: 작업 이름 (jobs 컬렉션 _id)
+        list_targets: 대상 목록을 우선순위 순으로 반환하는 함수 ([{"key": ..., ...}])
+        process: 대상 하나 처리, 결과 종류 문자열 반환 ("generated", "skipped" 등). 예외는 재시도 후 failed
+        collection_getter: jobs 컬렉션을 돌려주는 함수
+        max_workers: 최대 동시 실행 수
+        rate_per_second: 초당 process 호출 수 제한 (0 이하면 제한 없음)
+        retries: 실패 시 재시도 횟수
+        lease_seconds: 체크포인트 없이 이 시간이 지나면 다른 프로세스가 작업을 가져갈 수 있음
+    """
+
+    def __init__(self, name: str, list_targets: Callable[[], List[Dict[str, Any]]],
+                 process: Callable[[Dict[str, Any]], str], collection_getter: Callable[[], Any],
+                 max_workers: int = 4, rate_per_second: float = 1.0, retries: int = 1,
+                 lease_seconds: float = 300.0):
+        self.name = name
+        self.list_targets = list_targets
+        self.process = process
+        self.collection_getter = collection_getter
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = RateLimiter(rate_per_second)
+        self.retries = retries
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # 이 프로세스에서 실행한 구간 (처리량 계산용)
+        self._session: Dict[str, Any] = {}
+        self._retry_timer: Optional[threading.Timer] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ───────────────────────────────────────────────
+    # 시작/중지
+    # ───────────────────────────────────────────────
+    def start(self, resume: bool = True) -> Dict[str, Any]:
+        """
+        백그라운드 실행 시작 (resume=True면 중단된 실행을 이어서, False면 처음부터)
+
+        Returns:
+            {"started": bool, "reason"?: ..., "run_id"?: ...}
+        """
+        with self._lock:
+            if self.running:
+                return {"started": False, "reason": "already_running"}
+            state = self._claim(resume)
+            if state is None:
+                return {"started": False, "reason": "running_elsewhere"}
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._safe_run, args=(state,), name=f"job-{self.name}",
+                                            daemon=True)
+            self._thread.start()
+            return {"started": True, "run_id": state["run_id"], "resumed": state["resumed"]}
+
+    def stop(self) -> bool:
+        """현재 청크가 끝나면 중지 (체크포인트가 남으므로 start()로 이어서 실행 가능)"""
+        if not self.running:
+            return False
+        self._stop.set()
+        return True
+
+    def resume_if_interrupted(self) -> bool:
+        """
+        재시작 전 실행 중이던 작업이 있으면 이어서 실행
+        다른 프로세스의 lease가 아직 유효하면 만료 시각에 다시 시도 (그 프로세스가 끝까지 실행하면 재시도 중단)
+        """
+        try:
+            doc = self.collection_getter().find_one({"_id": self.name}, {"status": 1, "lease_until": 1})
+        except Exception as e:
+            print(f"⚠️ 작업 상태 조회 실패 ({self.name}): {e}")
+            return False
+        if not doc or doc.get("status") != "running":
+            return False
+        if self.start(resume=True)["started"]:
+            return True
+        self._schedule_resume(doc.get("lease_until"))
+        return False
+
+    def _schedule_resume(self, lease_until: Optional[datetime]) -> None:
+        delay = LEASE_RETRY_MARGIN_SECONDS
+        if isinstance(lease_until, datetime):
+            delay += max(0.0, (lease_until - datetime.utcnow()).total_seconds())
+        if self._retry_timer is not None:
+            self._retry_timer.cancel()
+        self._retry_timer = threading.Timer(delay, self.resume_if_interrupted)
+        self._retry_timer.daemon = True
+        self._retry_timer.start()
+        print(f"⏳ 작업 lease 사용 중 ({self.name}), {delay:.0f}초 후 이어서 실행 재시도")
+
+    def _stale_local_owners(self, collection) -> List[str]:
+        """lease를 가진 소유자가 이 호스트의 이미 종료된 프로세스면 [소유자] (재시작 직후 바로 넘겨받기 위함)"""
+        doc = collection.find_one({"_id": self.name}, {"owner": 1}) or {}
+        owner = doc.get("owner") or ""
+        host, _, pid = owner.rpartition(":")
+        if host != socket.gethostname() or not pid.isdigit() or owner == self.owner:
+            return []
+        return [] if _process_alive(int(pid)) else [owner]
+
+    def _claim(self, resume: bool) -> Optional[Dict[str, Any]]:
+        """lease 획득 + 실행 상태 준비. 다른 프로세스가 실행 중이면 None"""
+        collection = self.collection_getter()
+        now = datetime.utcnow()
+        collection.update_one({"_id": self.name}, {"$setOnInsert": {"status": "idle"}}, upsert=True)
+        doc = collection.find_one_and_update(
+            {"_id": self.name, "$or": [
+                {"status": {"$ne": "running"}},
+                {"lease_until": {"$lt": now}},
+                {"owner": {"$in": [self.owner] + self._stale_local_owners(collection)}},
+            ]},
+            {"$set": {"status": "running", "owner": self.owner,
+                      "lease_until": now + timedelta(seconds=self.lease_seconds), "updated_at": now}},
+            return_document=True,
+        )
+        if doc is None:
+            return None
+
+        resumable = resume and doc.get("run_id") and doc.get("finished_at") is None
+        if resumable:
+            print(f"♻️ 작업 이어서 실행: {self.name} (run {doc['run_id']}, 처리 {len(doc.get('processed', []))}개)")
+            return {"run_id": doc["run_id"], "processed": set(doc.get("processed", [])), "resumed": True}
+
+        run_id = uuid.uuid4().hex[:12]
+        collection.update_one({"_id": self.name}, {
+            "$set": {"run_id": run_id, "started_at": now, "finished_at": None, "total": None,
+                     "processed": [], "counts": {}, "errors": []},
+        })
+        return {"run_id": run_id, "processed": set(), "resumed": False}
+
+    # ───────────────────────────────────────────────
+    # 실행
+    # ───────────────────────────────────────────────
+    def _safe_run(self, state: Dict[str, Any]) -> None:
+        try:
+            self._run(state)
+        except Exception as e:
+            print(f"❌ 작업 실패 ({self.name}): {e}")
+            self._update({"$set": {"status": "failed", "last_error": str(e)}})
+
+    def _run(self, state: Dict[str, Any]) -> None:
+        targets = self.list_targets()
+        pending = [target for target in targets if target["key"] not in state["processed"]]
+        self._session = {"started": time.time(), "done": 0, "counts": {}}
+        self._update({"$set": {"total": len(targets)}})
+        print(f"🚀 작업 시작: {self.name} (전체 {len(targets)}개, 남은 {len(pending)}개, "
+              f"동시 {self.max_workers}, {self.rate_limiter.rate}/s)")
+
+        for chunk in chunked(pending, self.max_workers * 4):
+            if self._stop.is_set():
+                self._update({"$set": {"status": "stopped"}})
+                print(f"⏸️ 작업 중지: {self.name} (체크포인트 저장됨)")
+                return
+            outcomes = run_bounded(chunk, self.process, max_workers=self.max_workers,
+                                   rate_limiter=self.rate_limiter, retries=self.retries)
+            self._checkpoint(chunk, outcomes)
+
+        self._update({"$set": {"status": "completed", "finished_at": datetime.utcnow()}})
+        print(f"✅ 작업 완료: {self.name} ({self._session['counts']})")
+
+    def _checkpoint(self, chunk: List[Dict[str, Any]], outcomes: List[Dict[str, Any]]) -> None:
+        counts: Dict[str, int] = {}
+        errors = []
+        for target, outcome in zip(chunk, outcomes):
+            kind = outcome["value"] if outcome["success"] else "failed"
+            counts[kind] = counts.get(kind, 0) + 1
+            if not outcome["success"]:
+                errors.append({"key": target["key"], "error": outcome["error"], "at": datetime.utcnow()})
+        session = self._session
+        session["done"] += len(chunk)
+        for kind, count in counts.items():
+            session["counts"][kind] = session["counts"].get(kind, 0) + count
+
+        update: Dict[str, Any] = {
+            "$addToSet": {"processed": {"$each": [target["key"] for target in chunk]}},
+            "$inc": {f"counts.{kind}": count for kind, count in counts.items()},
+        }
+        if errors:
+            update["$push"] = {"errors": {"$each": errors, "$slice": -MAX_STORED_ERRORS}}
+        self._update(update)
+
+    def _update(self, update: Dict[str, Any]) -> None:
+        """상태 갱신 + lease 연장"""
+        now = datetime.utcnow()
+        update.setdefault("$set", {}).update({
+            "updated_at": now, "lease_until": now + timedelta(seconds=self.lease_seconds),
+        })
+        self.collection_getter().update_one({"_id": self.name, "owner": self.owner}, update)
+
+    # ───────────────────────────────────────────────
+    # 진행 상황
+    # ───────────────────────────────────────────────
+    def status(self) -> Dict[str, Any]:
+        """진행률/처리량 (MongoDB 체크포인트 기준이라 어느 워커 프로세스에서 조회해도 같음)"""
+        doc = self.collection_getter().find_one({"_id": self.name}) or {}
+        total = doc.get("total")
+        done = len(doc.get("processed", []))
+        counts = doc.get("counts", {})
+        info: Dict[str, Any] = {
+            "name": self.name,
+            "status": doc.get("status", "idle"),
+            "run_id": doc.get("run_id"),
+            "owner": doc.get("owner"),
+            "running_here": self.running,
+            "total": total,
+            "done": done,
+            "remaining": max(0, total - done) if total is not None else None,
+            "progress": round(done / total, 4) if total else None,
+            "counts": counts,
+            "started_at": doc.get("started_at"),
+            "updated_at": doc.get("updated_at"),
+            "finished_at": doc.get("finished_at"),
+            "errors": doc.get("errors", [])[-5:],
+            "settings": {"max_workers": self.max_workers, "rate_per_second": self.rate_limiter.rate,
+                         "retries": self.retries},
+        }
+        session = self._session
+        if self.running and session:
+            elapsed = max(time.time() - session["started"], 1e-6)
+            per_minute = session["done"] / elapsed * 60
+            info["throughput"] = {
+                "elapsed_seconds": round(elapsed, 1),
+                "processed_per_minute": round(per_minute, 2),
+                "generated_per_minute": round(session["counts"].get("generated", 0) / elapsed * 60, 2),
+                "eta_seconds": round(info["remaining"] / per_minute * 60) if per_minute and info["remaining"] else None,
+            }
+        return info
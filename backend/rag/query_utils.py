@@ -0,0 +1,23 @@
+"""
+질문 텍스트 정규화/비교 유틸리티
+"""
+
+from difflib import SequenceMatcher
+
+
+def normalize_query(text: str) -> str:
+    """공백 제거 + 소문자화 (ai_api.py의 _normalize_query와 동일한 규칙)"""
+    if not isinstance(text, str):
+        return ''
+    return ''.join(text.split()).lower()
+
+
+def query_similarity(a: str, b: str) -> float:
+    """정규화된 두 질문의 문자 단위 유사도 (0.0 ~ 1.0)"""
+    norm_a = normalize_query(a)
+    norm_b = normalize_query(b)
+    if not norm_a or not norm_b:
+        return 0.0
+    if norm_a == norm_b:
+        return 1.0
+    return SequenceMatcher(None, norm_a, norm_b).ratio()
@@ -0,0 +1,179 @@
+"""
+무거운 리소스(임베딩 모델, 벡터 인덱스, 외부 클라이언트 등) 지연 로딩 레지스트리
+- get(name): 처음 사용할 때 한 번만 로드 (스레드 안전, 실패하면 다음 호출에서 재시도)
+- 로드 직후 warmup(더미 인코딩 등)을 실행해 첫 요청 지연 제거
+- 리소스별 상태/로드 시간을 기록해 /ready 엔드포인트에서 확인
+
+RESOURCE_PRELOAD 설정:
+- background(기본): import 직후 백그라운드 스레드에서 미리 로드 (서버는 바로 뜨고, 완료 전 /ready는 503)
+- eager: import 시점에 전부 로드 (gunicorn --preload처럼 마스터에서 로드 후 fork하면 워커가 메모리를 copy-on-write로 공유)
+- lazy: 실제로 쓰일 때 로드
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+try:
+    import resource as _resource  # Unix 전용
+except ImportError:
+    _resource = None
+
+PRELOAD_MODES = ("background", "eager", "lazy")
+
+
+def max_rss_mb() -> Optional[float]:
+    """프로세스 최대 상주 메모리(MB). 측정할 수 없으면 None"""
+    if _resource is None:
+        return None
+    rss = _resource.getrusage(_resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    divisor = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+    return round(rss / divisor, 1)
+
+
+class _Resource:
+    def __init__(self, name: str, loader: Callable[[], Any], warmup: Optional[Callable[[Any], Any]],
+                 required: bool, preload: bool):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.required = required
+        self.preload = preload
+        self.lock = threading.Lock()
+        self.value: Any = None
+        self.status = "pending"  # pending | loading | ready | failed
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+
+
+class ResourceRegistry:
+    """이름별 지연 로딩 리소스 모음"""
+
+    def __init__(self):
+        self._resources: "OrderedDict[str, _Resource]" = OrderedDict()
+        self._created_at = time.time()
+        self._ready_at: Optional[float] = None
+        self.mode = "lazy"
+
+    def register(self, name: str, loader: Callable[[], Any], warmup: Optional[Callable[[Any], Any]] = None,
+                 required: bool = True, preload: bool = True) -> None:
+        """
+        리소스 등록 (아직 로드하지 않음)
+
+        Args:
+            name: 리소스 이름
+            loader: 리소스를 만들어 반환하는 함수
+            warmup: 로드 직후 한 번 실행할 함수 (인자로 리소스 전달)
+            required: False면 준비되지 않아도 /ready 판정에 영향 없음 (보조 인덱스 등)
+            preload: False면 eager/background 모드에서도 미리 로드하지 않음
+                (fork 후 공유하면 안 되는 네트워크 클라이언트 등)
+        """
+        self._resources[name] = _Resource(name, loader, warmup, required, preload)
+
+    def get(self, name: str) -> Any:
+        """리소스 가져오기 (처음 호출 시 로드)"""
+        res = self._resources[name]
+        if res.status == "ready":
+            return res.value
+        with res.lock:
+            if res.status == "ready":
+                return res.value
+            res.status = "loading"
+            started = time.perf_counter()
+            try:
+                value = res.loader()
+                res.load_seconds = round(time.perf_counter() - started, 3)
+                if res.warmup is not None and value is not None:
+                    warmup_started = time.perf_counter()
+                    res.warmup(value)
+                    res.warmup_seconds = round(time.perf_counter() - warmup_started, 3)
+            except Exception as e:
+                res.status = "failed"
+                res.error = str(e)
+                print(f"❌ 리소스 로드 실패: {name} ({e})")
+                raise
+            res.value = value
+            res.error = None
+            res.loaded_at = time.time()
+            res.status = "ready"
+            print(f"✅ 리소스 로드 완료: {name} ({res.load_seconds}s)")
+            return value
+
+    def is_loaded(self, name: str) -> bool:
+        return self._resources[name].status == "ready"
+
+    def load_in_background(self, name: str) -> None:
+        """로드되지 않은 리소스를 백그라운드에서 로드 (이미 로드 중/완료면 무시)"""
+        res = self._resources[name]
+        if res.status in ("ready", "loading"):
+            return
+        threading.Thread(target=self._safe_get, args=(name,), name=f"resource-{name}", daemon=True).start()
+
+    def _safe_get(self, name: str) -> None:
+        try:
+            self.get(name)
+        except Exception:
+            pass  # 오류는 status()에 기록됨
+
+    def preload(self, names: Optional[Iterable[str]] = None) -> None:
+        """등록 순서대로 미리 로드 (실패한 리소스는 건너뜀)"""
+        for name in names or [name for name, res in self._resources.items() if res.preload]:
+            self._safe_get(name)
+        if self._ready_at is None and self.is_ready():
+            self._ready_at = time.time()
+
+    def start(self, mode: Optional[str] = None) -> None:
+        """RESOURCE_PRELOAD 모드에 따라 미리 로드 시작"""
+        mode = (mode or os.getenv('RESOURCE_PRELOAD', 'background')).lower()
+        if mode not in PRELOAD_MODES:
+            print(f"⚠️ 알 수 없는 RESOURCE_PRELOAD={mode}, background 사용")
+            mode = "background"
+        self.mode = mode
+        if mode == "eager":
+            self.preload()
+        elif mode == "background":
+            threading.Thread(target=self.preload, name="resource-preload", daemon=True).start()
+
+    def is_ready(self) -> bool:
+        """
+        요청을 받을 수 있는지
+        eager/background: 미리 로드하는 필수 리소스가 모두 로드됨
+        lazy(또는 preload=False 리소스): 요청 시 로드하므로 로드에 실패한 적만 없으면 준비된 것으로 판정
+        """
+        for res in self._resources.values():
+            if not res.required:
+                continue
+            if self.mode == "lazy" or not res.preload:
+                if res.status == "failed":
+                    return False
+            elif res.status != "ready":
+                return False
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        ready = self.is_ready()
+        if ready and self._ready_at is None:
+            self._ready_at = time.time()
+        return {
+            "ready": ready,
+            "mode": self.mode,
+            "ready_seconds": round(self._ready_at - self._created_at, 3) if self._ready_at else None,
+            "uptime_seconds": round(time.time() - self._created_at, 1),
+            "pid": os.getpid(),
+            "max_rss_mb": max_rss_mb(),
+            "resources": {
+                name: {
+                    "status": res.status,
+                    "required": res.required,
+                    "load_seconds": res.load_seconds,
+                    "warmup_seconds": res.warmup_seconds,
+                    "error": res.error,
+                }
+                for name, res in self._resources.items()
+            },
+        }
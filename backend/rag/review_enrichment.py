@@ -0,0 +1,163 @@
+"""
+강의평 업로드 시 한 번만 계산해 두는 분석 필드 (Review 모델 필드와 같은 이름)
+    sentiment_score: -1 ~ 1 (감정 어휘 + 평점)
+    has_team_project: True / False (팀플 언급이 있을 때만)
+    difficulty_level: 1(쉬움) ~ 5(어려움)
+    workload_level: 1(과제 없음) ~ 5(과제 많음)
+판단 근거가 없는 필드는 None (Pinecone metadata에는 null을 넣을 수 없으므로 enrichment_metadata()에서 제외)
+
+Pinecone metadata와 course_aggregate_reviews(강의평별 집계 기록)에 저장해 두고,
+강의 목록 태그/난이도/과제량과 RAG 강의평 감정은 본문을 다시 훑지 않고 이 필드를 읽음
+규칙을 바꾸면 ENRICHMENT_VERSION을 올리고 scripts/enrich_reviews.py로 기존 강의평 재계산
+"""
+
+import re
+from typing import Any, Dict, Iterable, Optional, Pattern, Sequence, Tuple
+
+ENRICHMENT_VERSION = 2
+ENRICHMENT_FIELDS = ("sentiment_score", "has_team_project", "difficulty_level", "workload_level")
+
+# ───────────────────────────────────────────────
+# 팀플 (pipeline/upsert_mock.py의 규칙 기반 추론과 같은 표현)
+# ───────────────────────────────────────────────
+_TEAM = r"(?:팀 ?플|팀 ?프로젝트|조별 ?(?:과제|활동))"
+TEAM_NEGATIVE = re.compile("|".join([
+    _TEAM + r".{0,12}(?:없|안 ?함|미포함)",
+    r"(?:없|안 ?함|미포함).{0,12}" + _TEAM,
+    r"[무노] ?팀플",
+    r"팀플\s*[xX✕×]",
+]))
+TEAM_POSITIVE = re.compile("|".join([
+    _TEAM + r".{0,12}(?:있|함|진행|필수)",
+    r"(?:있|함|진행|필수).{0,12}" + _TEAM,
+]))
+
+# ───────────────────────────────────────────────
+# 감정 어휘
+# ───────────────────────────────────────────────
+# 앞에 "안/못"이 붙은 긍정 어휘("안 좋아요", "못 만족")는 부정으로 셈
+_NOT_NEGATED = r"(?<!안)(?<!안 )(?<!못)(?<!못 )"
+POSITIVE_TERMS = re.compile(
+    _NOT_NEGATED + r"(?:좋(?!지 ?않)|만족|재미있|재밌)"
+    r"|(?<!비)추천(?!하지|안|하기 ?어렵)|최고|꿀강|명강|유익|친절(?!하지)|감사|도움이? ?(?:많이 ?)?(?:됐|되었|됩|돼)"
+    r"|잘 ?(?:가르|알려|설명)|열정"
+)
+NEGATIVE_TERMS = re.compile(
+    r"별로|비추|최악|지루|불친절|실망|후회|짜증|아쉽|아쉬[웠운워움울]|노잼|대충|추천(?:하지 ?않|안|하기 ?어렵)|좋지 ?않"
+    r"|(?:안|못) ?(?:좋|만족|재미있|재밌)|재미 ?없"
+)
+# 평점 근거와 본문 근거를 섞는 비율 (둘 다 있을 때 본문 쪽 가중치)
+TEXT_SENTIMENT_WEIGHT = 0.5
+
+# ───────────────────────────────────────────────
+# 난이도/과제량: (단계, 패턴), 맞은 단계들의 평균을 반올림
+# ───────────────────────────────────────────────
+# "쉽지 않다/쉽지는 않은", "어렵지도 않고"처럼 뒤에서 부정되는 표현은 반대 단계로 세지 않음
+_NOT_AFTER = r"(?!지 ?(?:는|도)? ?않)"
+_EASY = r"(?:쉬[움웠운워울]|쉽" + _NOT_AFTER + r")"
+_HARD = r"(?:어렵" + _NOT_AFTER + r"|어려[웠운워움울])"
+DIFFICULTY_RULES: Tuple[Tuple[int, Pattern[str]], ...] = (
+    (1, re.compile(r"꿀강|(?:너무|매우|엄청|완전) ?" + _EASY)),
+    (2, re.compile(_EASY + r"|널널|어렵지 ?(?:는|도)? ?않")),
+    (3, re.compile(r"난이도.{0,4}(?:적당|무난|보통|중간)|적당히 ?어렵")),
+    (4, re.compile(_HARD + r"|쉽지 ?(?:는|도)? ?않|빡세|빡셈|빡빡|난이도.{0,4}(?:높|상)|힘들")),
+    (5, re.compile(r"(?:너무|매우|엄청|진짜) ?(?:" + _HARD + r"|빡세)|극악|헬강")),
+)
+_ASSIGNMENT = r"(?:과제|레포트|리포트|숙제)"
+WORKLOAD_RULES: Tuple[Tuple[int, Pattern[str]], ...] = (
+    (1, re.compile(_ASSIGNMENT + r".{0,6}(?:없|x\b|X\b)|무과제|노과제")),
+    (2, re.compile(_ASSIGNMENT + r".{0,6}(?:적[고음은었다]|별로 ?없|거의 ?없|많지 ?않|널널)")),
+    (3, re.compile(_ASSIGNMENT + r".{0,6}(?:적당|무난|보통)")),
+    (4, re.compile(_ASSIGNMENT + r".{0,6}(?:많(?!지 ?않)|빡|매주)|매주 ?" + _ASSIGNMENT)),
+    (5, re.compile(_ASSIGNMENT + r".{0,6}(?:폭탄|(?:너무|엄청|진짜) ?많)")),
+)
+
+
+def infer_has_team_project(text: str) -> Optional[bool]:
+    """팀플이 없다는 표현만 있으면 False, 있다는 표현만 있으면 True, 둘 다/둘 다 없으면 None"""
+    negative = TEAM_NEGATIVE.search(text) is not None
+    positive = TEAM_POSITIVE.search(text) is not None
+    if negative != positive:
+        return positive
+    return None
+
+
+def _rating_score(rating: Any) -> Optional[float]:
+    """평점 1~5 → -1~1"""
+    try:
+        value = float(rating)
+    except (TypeError, ValueError):
+        return None
+    if not 1 <= value <= 5:
+        return None
+    return (value - 3) / 2
+
+
+def sentiment_score(text: str, rating: Any = None) -> Optional[float]:
+    """감정 점수 -1~1 (긍정/부정 어휘 수 비율, 평점이 있으면 함께 반영)"""
+    positive = len(POSITIVE_TERMS.findall(text))
+    negative = len(NEGATIVE_TERMS.findall(text))
+    text_score = (positive - negative) / (positive + negative) if positive + negative else None
+    rating_score = _rating_score(rating)
+    if text_score is None and rating_score is None:
+        return None
+    if text_score is None:
+        score = rating_score
+    elif rating_score is None:
+        score = text_score
+    else:
+        score = TEXT_SENTIMENT_WEIGHT * text_score + (1 - TEXT_SENTIMENT_WEIGHT) * rating_score
+    return round(max(-1.0, min(1.0, score)), 3)
+
+
+def _level(text: str, rules: Sequence[Tuple[int, Pattern[str]]]) -> Optional[int]:
+    """맞은 단계가 한쪽(3 이하/이상)이면 가장 강한 표현, 양쪽이 섞였으면 평균 반올림"""
+    levels = [level for level, pattern in rules if pattern.search(text)]
+    if not levels:
+        return None
+    if max(levels) <= 3 or min(levels) >= 3:
+        return max(levels, key=lambda level: abs(level - 3))
+    return int(sum(levels) / len(levels) + 0.5)
+
+
+def enrich_review(text: str, rating: Any = None) -> Dict[str, Any]:
+    """강의평 본문(+평점) → 분석 필드 (근거가 없는 필드는 None)"""
+    text = text or ""
+    return {
+        "sentiment_score": sentiment_score(text, rating),
+        "has_team_project": infer_has_team_project(text),
+        "difficulty_level": _level(text, DIFFICULTY_RULES),
+        "workload_level": _level(text, WORKLOAD_RULES),
+    }
+
+
+def enrichment_metadata(text: str, rating: Any = None) -> Dict[str, Any]:
+    """Pinecone metadata에 합칠 분석 필드 (None 제외 + enrichment_version)"""
+    fields = {name: value for name, value in enrich_review(text, rating).items() if value is not None}
+    fields["enrichment_version"] = ENRICHMENT_VERSION
+    return fields
+
+
+def needs_enrichment(metadata: Dict[str, Any]) -> bool:
+    """분석 필드가 없거나 이전 규칙 버전으로 계산된 강의평인지"""
+    return metadata.get("enrichment_version") != ENRICHMENT_VERSION
+
+
+def review_text(metadata: Dict[str, Any]) -> str:
+    """metadata의 강의평 본문 (업로드 스크립트마다 키 이름이 다름)"""
+    return metadata.get("text") or metadata.get("review_text") or ""
+
+
+def enrich_records(records: Iterable[Dict[str, Any]], force: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    [{"id", "metadata"}] 중 분석이 필요한 강의평 → {ID: 새로 설정할 metadata 필드}
+
+    Args:
+        force: True면 현재 버전으로 분석된 강의평도 다시 계산
+    """
+    updates = {}
+    for record in records:
+        meta = record.get("metadata") or {}
+        if force or needs_enrichment(meta):
+            updates[record["id"]] = enrichment_metadata(review_text(meta), meta.get("rating"))
+    return updates
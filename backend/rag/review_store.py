@@ -0,0 +1,533 @@
+"""
+강의평 로컬 미러 (Pinecone 강의평 metadata의 열 단위 복제본)
+강의평 목록/요약/강의 목록 API가 요청마다 0 벡터 쿼리(top_k=10000)로 인덱스 전체를 받아 파이썬에서 거르던 것을 대체
+
+- 저장: 강의명/교수명/학과/학기/출처는 사전 인코딩(카테고리 목록 + int32 코드), 평점/연도와
+  업로드 시 분석 필드(review_enrichment: 감정/팀플/난이도/과제량)는 숫자 배열,
+  본문/ID는 문자열 목록 → data/review_store/ (columns.npz + strings.json)
+  두 파일은 각각 임시 파일 + os.replace로 교체하고 같은 snapshot_id를 기록, 로드 시 짝이 맞지 않으면 거부
+- 색인: 강의명 코드 → 행 번호, 교수명 코드 → 행 번호
+  조회 비용은 (서로 다른 강의명 수 + 해당 강의의 강의평 수)에 비례, 전체 강의평 수와 무관
+- 동기화: list()로 ID만 받아 로컬에 없는 ID만 fetch(), Pinecone에서 사라진 ID는 삭제 (ID 기준 증분)
+  list()를 지원하지 않는 인덱스(pod 기반)만 0 벡터 쿼리 전체 조회로 대체 (잘렸으면 빠진 ID를 삭제로 보지 않음)
+  list/fetch가 일시적으로 실패하면 동기화를 중단하고 현재 스냅샷 유지
+- 공유: 다른 프로세스(다른 API 서버, scripts/enrich_reviews.py)가 스냅샷을 저장하면
+  maybe_sync()/sync() 전에 다시 읽어 교체 (오래된 메모리 테이블로 덮어쓰지 않도록)
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from backend.rag.pinecone_scan import ListUnsupportedError, fetch_records, list_all_ids, query_scan
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "review_store")
+
+# 사전 인코딩하는 문자열 열 (값 종류가 적음)
+CATEGORY_COLUMNS = ("course_name", "professor", "department", "semester", "source")
+# 그대로 저장하는 문자열 열
+TEXT_COLUMNS = ("text", "uploaded_at")
+# 업로드 시 분석 필드: 열 이름 → (dtype, 값 없음 표시). metadata에 없는 강의평은 표시값으로 저장
+ENRICHMENT_COLUMNS = {
+    "sentiment_score": (np.float32, np.nan),
+    "has_team_project": (np.int8, -1),
+    "difficulty_level": (np.int8, 0),
+    "workload_level": (np.int8, 0),
+    "enrichment_version": (np.int16, 0),
+}
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _to_year(value: Any) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _enrichment_value(column: str, value: Any) -> Any:
+    """metadata 값 → 배열 값 (없거나 잘못된 값은 표시값)"""
+    missing = ENRICHMENT_COLUMNS[column][1]
+    if value is None:
+        return missing
+    try:
+        return float(value) if column == "sentiment_score" else int(value)
+    except (TypeError, ValueError):
+        return missing
+
+
+def _matches(value: str, query: str, mode: str) -> bool:
+    """mode="mutual": 정확 일치 또는 서로 포함 / "contains": value가 query를 포함"""
+    if not value:
+        return False
+    if mode == "contains":
+        return query in value
+    return value == query or query in value or value in query
+
+
+class ReviewTable:
+    """강의평 열 묶음 (읽기 전용, 동기화하면 새 테이블로 교체)"""
+
+    def __init__(self, ids: List[str], categories: Dict[str, List[str]], codes: Dict[str, np.ndarray],
+                 texts: Dict[str, List[str]], rating: np.ndarray, year: np.ndarray,
+                 enrichment: Optional[Dict[str, np.ndarray]] = None):
+        self.ids = ids
+        self.categories = categories
+        self.codes = codes
+        self.texts = texts
+        self.rating = rating
+        self.year = year
+        # 분석 필드 열이 없는 스냅샷(이전 형식)은 전부 "값 없음"
+        enrichment = enrichment or {}
+        self.enrichment = {
+            column: enrichment[column] if column in enrichment else np.full(len(ids), missing, dtype=dtype)
+            for column, (dtype, missing) in ENRICHMENT_COLUMNS.items()
+        }
+        self.row_of = {review_id: row for row, review_id in enumerate(ids)}
+        self._course_rows = self._group("course_name")
+        self._professor_rows = self._group("professor")
+        self._lower = {column: [value.strip().lower() for value in self.categories[column]]
+                       for column in ("course_name", "professor")}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _group(self, column: str) -> List[np.ndarray]:
+        """카테고리 코드 → 행 번호 배열"""
+        codes = self.codes[column]
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(self.categories[column]) + 1))
+        return [order[bounds[code]:bounds[code + 1]] for code in range(len(self.categories[column]))]
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "ReviewTable":
+        """[{"id", "metadata"}] → 테이블"""
+        ids: List[str] = []
+        lookup: Dict[str, Dict[str, int]] = {column: {} for column in CATEGORY_COLUMNS}
+        categories: Dict[str, List[str]] = {column: [] for column in CATEGORY_COLUMNS}
+        codes: Dict[str, List[int]] = {column: [] for column in CATEGORY_COLUMNS}
+        texts: Dict[str, List[str]] = {column: [] for column in TEXT_COLUMNS}
+        rating: List[float] = []
+        year: List[int] = []
+        enrichment: Dict[str, List[Any]] = {column: [] for column in ENRICHMENT_COLUMNS}
+
+        for record in records:
+            meta = record.get("metadata") or {}
+            ids.append(str(record["id"]))
+            for column in CATEGORY_COLUMNS:
+                value = str(meta.get(column) or "").strip()
+                code = lookup[column].get(value)
+                if code is None:
+                    code = lookup[column][value] = len(categories[column])
+                    categories[column].append(value)
+                codes[column].append(code)
+            for column in TEXT_COLUMNS:
+                texts[column].append(str(meta.get(column) or ""))
+            rating.append(_to_float(meta.get("rating")))
+            year.append(_to_year(meta.get("year")))
+            for column, values in enrichment.items():
+                values.append(_enrichment_value(column, meta.get(column)))
+
+        return cls(ids, categories, {column: np.asarray(values, dtype=np.int32) for column, values in codes.items()},
+                   texts, np.asarray(rating, dtype=np.float64), np.asarray(year, dtype=np.int32),
+                   {column: np.asarray(values, dtype=ENRICHMENT_COLUMNS[column][0])
+                    for column, values in enrichment.items()})
+
+    def records(self, rows: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """행 → {"id", "metadata"} (Pinecone match와 같은 모양)"""
+        rows = range(len(self.ids)) if rows is None else rows
+        return [{"id": self.ids[row], "metadata": self.metadata(row)} for row in rows]
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        meta: Dict[str, Any] = {column: self.categories[column][self.codes[column][row]]
+                                for column in CATEGORY_COLUMNS}
+        for column in TEXT_COLUMNS:
+            meta[column] = self.texts[column][row]
+        rating = self.rating[row]
+        meta["rating"] = None if np.isnan(rating) else float(rating)
+        meta["year"] = int(self.year[row]) or None
+        # 분석 필드는 Pinecone metadata처럼 값이 있을 때만 포함
+        sentiment = self.enrichment["sentiment_score"][row]
+        if not np.isnan(sentiment):
+            meta["sentiment_score"] = round(float(sentiment), 3)
+        has_team_project = int(self.enrichment["has_team_project"][row])
+        if has_team_project >= 0:
+            meta["has_team_project"] = bool(has_team_project)
+        for column in ("difficulty_level", "workload_level", "enrichment_version"):
+            value = int(self.enrichment[column][row])
+            if value:
+                meta[column] = value
+        return meta
+
+    def find(self, course_name: Optional[str] = None, professor: Optional[str] = None,
+             mode: str = "mutual") -> np.ndarray:
+        """
+        강의명/교수명으로 강의평 행 찾기 (대소문자 무시)
+
+        Args:
+            mode: "mutual"(정확 일치 또는 서로 포함, 강의평 API 기존 동작) | "contains"(부분 일치)
+
+        Returns:
+            행 번호 배열 (저장 순서)
+        """
+        rows = None
+        course_key = (course_name or "").strip().lower()
+        if course_key:
+            matched = [code for code, value in enumerate(self._lower["course_name"])
+                       if _matches(value, course_key, mode)]
+            rows = (np.sort(np.concatenate([self._course_rows[code] for code in matched]))
+                    if matched else np.zeros(0, dtype=np.int64))
+
+        professor_key = (professor or "").strip().lower()
+        if professor_key:
+            matched = [code for code, value in enumerate(self._lower["professor"])
+                       if _matches(value, professor_key, mode)]
+            if rows is None:
+                rows = (np.sort(np.concatenate([self._professor_rows[code] for code in matched]))
+                        if matched else np.zeros(0, dtype=np.int64))
+            else:
+                rows = rows[np.isin(self.codes["professor"][rows], matched)]
+
+        return np.arange(len(self.ids)) if rows is None else rows
+
+    def groups(self) -> List[np.ndarray]:
+        """(강의명, 교수명) 조합별 행 번호 배열 (처음 등장한 순서)"""
+        keys = self.codes["course_name"].astype(np.int64) * max(1, len(self.categories["professor"])) \
+            + self.codes["professor"]
+        _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+        rows_by_group = np.split(np.argsort(inverse, kind="stable"), np.cumsum(counts)[:-1])
+        return [rows_by_group[group] for group in np.argsort(first, kind="stable")]
+
+    # ───────────────────────────────────────────────
+    # 저장/로드
+    # ───────────────────────────────────────────────
+    def save(self, path: str, synced_at: Optional[float] = None) -> None:
+        """
+        columns.npz → strings.json 순서로 각각 임시 파일에 쓰고 os.replace
+        중간에 죽어도 파일 하나는 온전한 이전/새 버전이고, snapshot_id가 어긋나므로 load()에서 걸러짐
+        """
+        os.makedirs(path, exist_ok=True)
+        snapshot_id = uuid.uuid4().hex
+        arrays = {f"codes_{column}": values for column, values in self.codes.items()}
+        arrays.update({f"enrichment_{column}": values for column, values in self.enrichment.items()})
+        # 여러 프로세스(서버 워커/스크립트)가 동시에 저장해도 서로의 임시 파일을 덮어쓰지 않도록 pid/스레드별 임시 파일
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        columns_path = os.path.join(path, "columns.npz")
+        with open(columns_path + suffix, "wb") as f:
+            np.savez(f, rating=self.rating, year=self.year, snapshot_id=np.array(snapshot_id), **arrays)
+        os.replace(columns_path + suffix, columns_path)
+        strings_path = os.path.join(path, "strings.json")
+        with open(strings_path + suffix, "w", encoding="utf-8") as f:
+            json.dump({
+                "ids": self.ids,
+                "categories": self.categories,
+                "texts": self.texts,
+                "synced_at": synced_at,
+                "snapshot_id": snapshot_id,
+                "created_at": datetime.now().isoformat(),
+            }, f, ensure_ascii=False)
+        os.replace(strings_path + suffix, strings_path)
+
+    @classmethod
+    def load(cls, path: str) -> "tuple[ReviewTable, Optional[float]]":
+        """스냅샷 로드. 두 파일의 snapshot_id나 행 수가 맞지 않으면 ValueError"""
+        with open(os.path.join(path, "strings.json"), "r", encoding="utf-8") as f:
+            strings = json.load(f)
+        with np.load(os.path.join(path, "columns.npz")) as columns:
+            # snapshot_id가 없는 이전 형식 스냅샷은 행 수만 확인
+            columns_id = str(columns["snapshot_id"]) if "snapshot_id" in columns.files else None
+            if columns_id != strings.get("snapshot_id"):
+                raise ValueError(f"columns.npz/strings.json 스냅샷 불일치 ({columns_id} != {strings.get('snapshot_id')})")
+            rows = len(strings["ids"])
+            arrays = [columns["rating"], columns["year"]] + [columns[name] for name in columns.files
+                                                             if name.startswith(("codes_", "enrichment_"))]
+            arrays += [strings["texts"][column] for column in TEXT_COLUMNS if column in strings["texts"]]
+            if any(len(values) != rows for values in arrays):
+                raise ValueError(f"스냅샷 행 수 불일치 (ID {rows}개)")
+            codes = {column: columns[f"codes_{column}"] for column in CATEGORY_COLUMNS}
+            enrichment = {column: columns[f"enrichment_{column}"] for column in ENRICHMENT_COLUMNS
+                          if f"enrichment_{column}" in columns.files}
+            table = cls(strings["ids"], strings["categories"], codes, strings["texts"],
+                        columns["rating"], columns["year"], enrichment)
+        return table, strings.get("synced_at")
+
+
+class ReviewStore:
+    """
+    동기화되는 강의평 미러
+
+    Args:
+        index_factory: Pinecone Index를 만들어 반환하는 함수 (동기화할 때만 호출)
+        path: 스냅샷 디렉터리
+        namespace: Pinecone namespace
+        sync_interval: 마지막 동기화 후 이 시간(초)이 지나면 maybe_sync()가 백그라운드 동기화 시작 (0이면 안 함)
+    """
+
+    def __init__(self, index_factory: Callable[[], Any], path: str = DEFAULT_STORE_PATH,
+                 namespace: Optional[str] = None, sync_interval: float = 600.0):
+        self.index_factory = index_factory
+        self.path = os.path.abspath(path)
+        self.namespace = namespace
+        self.sync_interval = sync_interval
+        self.table = ReviewTable.from_records([])
+        self.synced_at: Optional[float] = None
+        self.last_sync: Dict[str, Any] = {}
+        self._sync_lock = threading.Lock()
+        self._sync_thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[List[Dict[str, Any]], List[str]], Any]] = []
+        self._snapshot_stat: Optional[tuple] = None  # 마지막으로 읽거나 쓴 strings.json의 (mtime_ns, size)
+
+    def add_listener(self, listener: Callable[[List[Dict[str, Any]], List[str]], Any]) -> None:
+        """
+        동기화 후 호출할 함수 등록: listener(added_records, removed_ids)
+        added_records는 새로 받은 [{"id", "metadata"}] (full/scan 모드면 전체), removed_ids는 미러에서 빠진 ID
+        """
+        self._listeners.append(listener)
+
+    def load(self, sync_if_missing: bool = True) -> "ReviewStore":
+        """스냅샷 로드 (없거나 손상됐으면 sync_if_missing일 때 바로 동기화)"""
+        if os.path.exists(os.path.join(self.path, "strings.json")):
+            try:
+                stat = self._stat_snapshot()
+                self.table, self.synced_at = ReviewTable.load(self.path)
+                self._snapshot_stat = stat
+                print(f"✅ 강의평 미러 로드: {len(self.table)}개 ({self.path})")
+                return self
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ 강의평 미러 스냅샷 손상, 다시 동기화: {e}")
+        if sync_if_missing:
+            self.sync()
+        return self
+
+    def sync(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Pinecone과 동기화 (ID 기준 증분)
+
+        Args:
+            full: True면 기존 행도 모두 다시 fetch (metadata 수정 반영)
+
+        Returns:
+            {"added", "removed", "total", "mode", "seconds"} (scan 모드에서 잘렸으면 "truncated": True)
+
+        Raises:
+            list/fetch 일시 오류 → 현재 테이블/스냅샷은 그대로 (잘못 빠진 강의평을 삭제로 알리지 않도록)
+        """
+        with self._sync_lock:
+            self._reload_if_changed_locked()
+            started = time.perf_counter()
+            index = self.index_factory()
+            table = self.table
+            truncated = False
+            try:
+                remote_ids = list_all_ids(index, self.namespace)
+            except ListUnsupportedError as e:
+                print(f"⚠️ list() 미지원 인덱스, 0 벡터 쿼리 전체 조회로 대체: {e}")
+                fetched, truncated = query_scan(index, self.namespace, include_values=False)
+                records = fetched
+                if truncated:
+                    # 받지 못한 강의평은 지워진 것이 아님 → 기존 행을 유지하고 삭제로 알리지 않음
+                    scanned = {record["id"] for record in fetched}
+                    records = fetched + table.records(
+                        [row for row, review_id in enumerate(table.ids) if review_id not in scanned])
+                mode = "scan"
+            else:
+                # 여기서 fetch가 실패하면 예외를 그대로 올려 동기화 중단 (기존 스냅샷 유지)
+                remote_set = set(remote_ids)
+                keep_rows = [] if full else [row for row, review_id in enumerate(table.ids) if review_id in remote_set]
+                known = {table.ids[row] for row in keep_rows}
+                new_ids = [review_id for review_id in remote_ids if review_id not in known]
+                fetched = fetch_records(index, new_ids, self.namespace, include_values=False)
+                records = table.records(keep_rows) + fetched
+                mode = "full" if full else "incremental"
+
+            # Pinecone 조회 중에 다른 프로세스가 metadata를 고쳐 저장했으면 유지한 행에 반영하고 저장
+            changed = []
+            if self._stat_snapshot() != self._snapshot_stat:
+                records, changed = self._merge_saved_metadata(records, {record["id"] for record in fetched})
+
+            previous_ids = set(table.ids)
+            self.table = ReviewTable.from_records(records)
+            self.synced_at = time.time()
+            self._save()
+            removed_ids = sorted(previous_ids.difference(self.table.ids))
+            removed = len(removed_ids)
+            self.last_sync = {
+                "added": len(fetched),
+                "removed": removed,
+                "total": len(self.table),
+                "mode": mode,
+                "seconds": round(time.perf_counter() - started, 2),
+            }
+            if truncated:
+                self.last_sync["truncated"] = True
+            print(f"✅ 강의평 미러 동기화: +{len(fetched)} -{removed} → {len(self.table)}개 ({mode})")
+            self._notify(fetched + changed, removed_ids)
+            return self.last_sync
+
+    def update_metadata(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Pinecone에서 metadata를 수정한 강의평을 미러에도 반영 (ID 기준 증분 동기화는 기존 ID의 수정을 받지 않음)
+        리스너에는 수정된 강의평이 added_records로 전달됨
+
+        Args:
+            updates: {ID: 설정할 metadata 필드}
+
+        Returns:
+            반영한 강의평 수
+        """
+        with self._sync_lock:
+            self._reload_if_changed_locked()
+            table = self.table
+            records = table.records()
+            changed = []
+            for record in records:
+                fields = updates.get(record["id"])
+                if fields:
+                    record["metadata"].update(fields)
+                    changed.append(record)
+            if not changed:
+                return 0
+            self.table = ReviewTable.from_records(records)
+            self._save()
+            print(f"✅ 강의평 미러 metadata 반영: {len(changed)}개")
+            self._notify(changed, [])
+            return len(changed)
+
+    def _stat_snapshot(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(os.path.join(self.path, "strings.json"))
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _save(self) -> None:
+        self.table.save(self.path, self.synced_at)
+        self._snapshot_stat = self._stat_snapshot()
+
+    def reload_if_changed(self) -> bool:
+        """다른 프로세스가 스냅샷을 새로 저장했으면 다시 읽어 교체 (stat 1회). 교체했으면 True"""
+        stat = self._stat_snapshot()
+        if stat is None or stat == self._snapshot_stat:
+            return False
+        with self._sync_lock:
+            return self._reload_if_changed_locked()
+
+    def _reload_if_changed_locked(self) -> bool:
+        """
+        _sync_lock을 잡은 상태에서 호출
+        다시 읽은 스냅샷과 현재 테이블을 비교해 새로 생기거나 metadata가 바뀐 강의평/빠진 ID를 리스너에 전달
+        (저장한 프로세스에 리스너가 없었어도 이 프로세스의 집계가 따라가도록, 집계 반영은 강의평 단위로 멱등)
+        """
+        stat = self._stat_snapshot()
+        if stat is None or stat == self._snapshot_stat:
+            return False
+        try:
+            table, synced_at = ReviewTable.load(self.path)
+        except (OSError, ValueError, KeyError) as e:
+            # 다른 프로세스가 두 파일을 교체하는 중일 수 있음 → 다음 호출에서 다시 확인
+            print(f"⚠️ 강의평 미러 스냅샷 다시 읽기 실패: {e}")
+            return False
+        previous = {record["id"]: record["metadata"] for record in self.table.records()}
+        changed = [record for record in table.records() if previous.get(record["id"]) != record["metadata"]]
+        removed_ids = sorted(set(previous).difference(table.ids))
+        self.table = table
+        self.synced_at = max(filter(None, (self.synced_at, synced_at)), default=None)
+        self._snapshot_stat = stat
+        print(f"✅ 강의평 미러 스냅샷 다시 읽기: {len(table)}개 (변경 {len(changed)}개, 삭제 {len(removed_ids)}개)")
+        self._notify(changed, removed_ids)
+        return True
+
+    def _merge_saved_metadata(self, records: List[Dict[str, Any]],
+                              fresh_ids: set) -> "tuple[List[Dict[str, Any]], List[Dict[str, Any]]]":
+        """
+        디스크 스냅샷의 metadata를 fetch하지 않은(기존) 행에 덮어쓰기
+        Returns:
+            (합친 records, metadata가 바뀐 records)
+        """
+        try:
+            saved, _ = ReviewTable.load(self.path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ 강의평 미러 스냅샷 다시 읽기 실패: {e}")
+            return records, []
+        saved_metadata = {record["id"]: record["metadata"] for record in saved.records()}
+        merged, changed = [], []
+        for record in records:
+            metadata = saved_metadata.get(record["id"])
+            if record["id"] not in fresh_ids and metadata is not None and metadata != record["metadata"]:
+                record = {"id": record["id"], "metadata": metadata}
+                changed.append(record)
+            merged.append(record)
+        return merged, changed
+
+    def _notify(self, added_records: List[Dict[str, Any]], removed_ids: List[str]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(added_records, removed_ids)
+            except Exception as e:
+                print(f"⚠️ 강의평 동기화 후처리 실패: {e}")
+
+    def maybe_sync(self) -> bool:
+        """
+        다른 프로세스가 저장한 스냅샷이 있으면 먼저 다시 읽고,
+        sync_interval이 지났으면 백그라운드 동기화 시작. 동기화를 시작했으면 True
+        """
+        try:
+            self.reload_if_changed()
+        except Exception as e:
+            print(f"⚠️ 강의평 미러 스냅샷 확인 실패: {e}")
+        if self.sync_interval <= 0:
+            return False
+        if self.synced_at is not None and time.time() - self.synced_at < self.sync_interval:
+            return False
+        if self._sync_thread is not None and self._sync_thread.is_alive():
+            return False
+        self._sync_thread = threading.Thread(target=self._safe_sync, name="review-store-sync", daemon=True)
+        self._sync_thread.start()
+        return True
+
+    def _safe_sync(self) -> None:
+        try:
+            self.sync()
+        except Exception as e:
+            self.last_sync = {"error": str(e)}
+            # 실패해도 바로 재시도하지 않도록 시각 갱신
+            self.synced_at = time.time()
+            print(f"❌ 강의평 미러 동기화 실패: {e}")
+
+    def find(self, course_name: Optional[str] = None, professor: Optional[str] = None,
+             mode: str = "mutual") -> List[Dict[str, Any]]:
+        """강의명/교수명에 맞는 강의평 [{"id", "metadata"}]"""
+        table = self.table
+        return table.records(table.find(course_name, professor, mode).tolist())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "total": len(self.table),
+            "courses": len(self.table.categories["course_name"]),
+            "professors": len(self.table.categories["professor"]),
+            "synced_at": self.synced_at,
+            "last_sync": self.last_sync,
+            "path": self.path,
+        }
+
+
+def open_review_store(index_factory: Callable[[], Any], path: str = DEFAULT_STORE_PATH,
+                      namespace: Optional[str] = None, sync: bool = True) -> ReviewStore:
+    """스크립트용: 스냅샷을 로드하고 (sync=True면) 증분 동기화까지 마친 미러"""
+    store = ReviewStore(index_factory, path=path, namespace=namespace, sync_interval=0)
+    store.load(sync_if_missing=False)
+    if sync:
+        store.sync()
+    return store
@@ -0,0 +1,201 @@
+"""
+강의평 AI 요약 (/api/reviews/summary) 생성 + MongoDB 캐시 (review_summaries 컬렉션)
+같은 강의평으로 매번 Gemini를 다시 호출하지 않도록, 요약에 사용한 강의평 ID 해시와 함께 저장해 두고
+해시가 같으면 저장된 요약을 그대로 반환 (새 강의평이 들어와 해시가 바뀌었을 때만 다시 생성)
+
+review_summaries 문서:
+    _id: "<프롬프트 버전>:<강의명>:<교수명>" (소문자)
+    course_name, professor, prompt_version, reviews_hash, review_count, summary, model, generated_at
+프롬프트 템플릿이 바뀌면 버전 해시가 달라지므로 이전 요약은 조회되지 않으며, 최초 연결 시 삭제
+
+review_summary_traffic 문서 (강의별 요약 요청 수, 사전 생성 우선순위):
+    _id: "<강의명>:<교수명>" (소문자), hits, last_requested_at
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.rag.intent_cache import prompt_version
+
+# 앞의 모델이 실패하면 다음 모델로 재시도
+SUMMARY_MODELS = ("gemini-2.0-flash-exp", "gemini-1.5-flash")
+# 요약에 넣는 최대 강의평 수 (토큰 제한 고려, 최신 강의평 우선)
+SUMMARY_MAX_REVIEWS = 20
+
+SUMMARY_PROMPT_TEMPLATE = """다음은 "{course_name}" 강의의 실제 수강생 강의평입니다. {professor_line}
+
+강의평 목록:
+{reviews_text}
+
+위 강의평들을 바탕으로 다음 형식으로 자연스러운 한국어 문장으로 요약해주세요:
+
+1. 강의 특징 요약
+(강의의 주요 특징, 수업 방식, 커리큘럼 등을 요약)
+
+2. 교수님의 강의 스타일/특징 요약
+(교수님의 강의 방식, 설명 스타일, 학생 대응 등을 요약)
+
+3. 장점/단점 정리
+(강의평에서 언급된 장점과 단점을 정리)
+
+중요한 주의사항:
+- 존재하지 않는 정보는 절대 생성하지 마세요. 강의평에 없는 내용은 작성하지 마세요.
+- JSON 형식이 아닌 자연스러운 한국어 문장으로 작성해주세요.
+- 과도하게 비난적인 내용이나 부정적인 내용은 언급하지 마세요. 교수님이 볼 수도 있다고 생각하고, 객관적이고 건설적인 표현만 사용하세요.
+- 비판적인 내용이 있어도 그것을 건설적인 피드백이나 개선점으로 재구성하여 표현하세요.
+- 각 섹션은 명확하게 구분되어야 합니다.
+
+요약:"""
+
+SUMMARY_PROMPT_VERSION = prompt_version(SUMMARY_PROMPT_TEMPLATE)
+
+
+def select_summary_reviews(records: Sequence[Dict[str, Any]],
+                           limit: int = SUMMARY_MAX_REVIEWS) -> List[Tuple[str, str]]:
+    """
+    요약에 넣을 강의평 [(ID, 본문)] (본문이 있는 것만, 최신순으로 limit개)
+    새 강의평이 들어오면 사용 목록이 바뀌어 reviews_hash()도 바뀜
+    """
+    reviews = []
+    for record in records:
+        meta = record["metadata"]
+        text = (meta.get("text") or "").strip()
+        if text:
+            order = (meta.get("year") or 0, meta.get("semester") or "", meta.get("uploaded_at") or "", record["id"])
+            reviews.append((order, record["id"], text))
+    reviews.sort(key=lambda item: item[0], reverse=True)
+    return [(review_id, text) for _, review_id, text in reviews[:limit]]
+
+
+def reviews_hash(review_ids: Sequence[str]) -> str:
+    """요약에 사용한 강의평 ID 집합의 해시 (순서 무관)"""
+    return hashlib.sha1("\n".join(sorted(review_ids)).encode("utf-8")).hexdigest()[:16]
+
+
+def build_summary_prompt(course_name: str, professor: Optional[str], texts: Sequence[str]) -> str:
+    reviews_text = "\n\n".join(f"강의평 {i + 1}: {text}" for i, text in enumerate(texts))
+    return SUMMARY_PROMPT_TEMPLATE.format(
+        course_name=course_name,
+        professor_line=f"교수님은 {professor}입니다." if professor else "",
+        reviews_text=reviews_text,
+    )
+
+
+def generate_summary(prompt: str, api_key: str, models: Sequence[str] = SUMMARY_MODELS) -> Tuple[str, str]:
+    """
+    Gemini로 요약 생성
+
+    Returns:
+        (요약, 사용한 모델)
+
+    Raises:
+        RuntimeError: 모든 모델이 실패했거나 빈 요약
+    """
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    last_error: Optional[Exception] = None
+    for model_name in models:
+        try:
+            response = genai.GenerativeModel(model_name).generate_content(prompt)
+            summary = str(getattr(response, "text", None) or response).strip()
+        except Exception as e:
+            print(f"⚠️ Gemini 모델 {model_name} 요약 실패: {e}")
+            last_error = e
+            continue
+        if summary:
+            return summary, model_name
+        last_error = RuntimeError("요약이 생성되지 않았습니다.")
+    raise RuntimeError(f"AI 요약 생성 중 오류가 발생했습니다: {last_error}")
+
+
+class ReviewSummaryCache:
+    """
+    review_summaries 컬렉션 캐시
+
+    Args:
+        collection_getter: MongoDB 컬렉션을 돌려주는 함수
+        version: 프롬프트 버전
+    """
+
+    def __init__(self, collection_getter: Callable[[], Any], version: str = SUMMARY_PROMPT_VERSION):
+        self.collection_getter = collection_getter
+        self.version = version
+        self._indexes_ready = False
+
+    @staticmethod
+    def course_key(course_name: str, professor: Optional[str]) -> str:
+        """프롬프트 버전과 무관한 강의 키 (요청 수 집계, 사전 생성 작업 체크포인트용)"""
+        return f"{course_name.strip().lower()}:{(professor or '').strip().lower()}"
+
+    def make_id(self, course_name: str, professor: Optional[str]) -> str:
+        return f"{self.version}:{self.course_key(course_name, professor)}"
+
+    def _collection(self):
+        collection = self.collection_getter()
+        if not self._indexes_ready:
+            collection.create_index("prompt_version")
+            collection.create_index([("course_name", 1), ("professor", 1)])
+            self._indexes_ready = True
+            # 프롬프트 템플릿이 바뀌었으면 이전 버전 요약 정리
+            deleted = collection.delete_many({"prompt_version": {"$ne": self.version}}).deleted_count
+            if deleted:
+                print(f"🗑️ 이전 프롬프트 버전 강의평 요약 {deleted}개 삭제")
+        return collection
+
+    def get(self, course_name: str, professor: Optional[str]) -> Optional[Dict[str, Any]]:
+        return self._collection().find_one({"_id": self.make_id(course_name, professor)})
+
+    def put(self, course_name: str, professor: Optional[str], digest: str, review_count: int,
+            summary: str, model: str) -> Dict[str, Any]:
+        doc = {
+            "_id": self.make_id(course_name, professor),
+            "course_name": course_name,
+            "professor": professor or None,
+            "prompt_version": self.version,
+            "reviews_hash": digest,
+            "review_count": review_count,
+            "summary": summary,
+            "model": model,
+            "generated_at": datetime.utcnow(),
+        }
+        self._collection().replace_one({"_id": doc["_id"]}, doc, upsert=True)
+        return doc
+
+
+def summary_cache_info(doc: Dict[str, Any], status: str, review_count: int,
+                       regenerating: bool = False) -> Dict[str, Any]:
+    """
+    응답의 cache 필드 (프론트엔드가 캐시된 요약을 바로 보여주고 갱신 여부를 표시하는 데 사용)
+
+    Args:
+        doc: 반환하는 요약 문서
+        status: "fresh"(캐시 그대로) | "stale"(새 강의평 반영 전 요약) | "generated"(이번 요청에서 생성)
+        review_count: 현재 강의평 수
+        regenerating: 백그라운드에서 새 요약을 생성 중인지
+    """
+    generated_at = doc.get("generated_at")
+    return {
+        "status": status,
+        "generated_at": generated_at.isoformat() + "Z" if isinstance(generated_at, datetime) else generated_at,
+        "review_count": doc.get("review_count", 0),
+        "new_reviews": max(0, review_count - doc.get("review_count", 0)),
+        "regenerating": regenerating,
+        "prompt_version": doc.get("prompt_version"),
+        "model": doc.get("model"),
+    }
+
+
+def record_summary_request(collection: Any, course_name: str, professor: Optional[str]) -> None:
+    """요약 요청 수 집계 (사전 생성 작업이 요청이 많은 강의부터 처리하도록)"""
+    collection.update_one(
+        {"_id": ReviewSummaryCache.course_key(course_name, professor)},
+        {"$inc": {"hits": 1}, "$set": {"last_requested_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+
+def summary_request_counts(collection: Any) -> Dict[str, int]:
+    """강의 키 → 요약 요청 수"""
+    return {doc["_id"]: doc.get("hits", 0) for doc in collection.find({}, {"hits": 1})}
@@ -0,0 +1,184 @@
+"""
+RAG 파이프라인 단계 실행기
+서로 의존하지 않는 단계(MongoDB 필터, 비교 대상 검색, LLM 합성 등)를 스레드 풀에서 동시에 실행하고
+단계별 타임아웃과 소요 시간을 기록
+
+단계 안에서 다시 여러 작업을 동시에 실행할 때(필터별 Pinecone 검색, 키워드 검색 등)는 get_fanout_pool() 사용
+(같은 단계 풀에 제출하고 기다리면, 동시 요청이 많을 때 모든 워커가 대기열의 자식 작업을 기다리며 멈출 수 있음)
+다른 단계의 결과가 필요한 단계는 그 안에서 result()로 기다리지 말고 submit_after()로 등록
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+# 모든 요청이 공유하는 스레드 풀 (요청마다 풀을 만들지 않음)
+STAGE_MAX_WORKERS = int(os.getenv('RAG_STAGE_MAX_WORKERS', 16))
+# 단계 내부 동시 실행용 풀 (여기서 실행되는 작업은 다른 작업을 제출하고 기다리지 않음)
+FANOUT_MAX_WORKERS = int(os.getenv('RAG_FANOUT_MAX_WORKERS', 16))
+
+_pool: Optional[ThreadPoolExecutor] = None
+_fanout_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_stage_pool() -> ThreadPoolExecutor:
+    """공유 스레드 풀 가져오기 (최초 호출 시 생성)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=STAGE_MAX_WORKERS, thread_name_prefix="rag-stage")
+    return _pool
+
+
+def get_fanout_pool() -> ThreadPoolExecutor:
+    """단계 안에서 하위 작업을 동시에 실행할 공유 풀 (최초 호출 시 생성)"""
+    global _fanout_pool
+    if _fanout_pool is None:
+        with _pool_lock:
+            if _fanout_pool is None:
+                _fanout_pool = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="rag-fanout")
+    return _fanout_pool
+
+
+class StageExecutor:
+    """
+    요청 단위 단계 실행기
+
+    사용 예:
+        stages = StageExecutor()
+        stages.submit("mongo_filter", filter_from_mongodb, filters, timeout=3.0, default=None)
+        stages.submit("embed", embed_query, query)
+        mongo_candidates = stages.result("mongo_filter")
+        print(stages.timings)
+    """
+
+    def __init__(self, pool: Optional[ThreadPoolExecutor] = None):
+        self.pool = pool or get_stage_pool()
+        self._futures: Dict[str, Any] = {}
+        self._options: Dict[str, Dict[str, Any]] = {}
+        self._started_at: Dict[str, float] = {}
+        self._finished_at: Dict[str, float] = {}
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        self.created_at = time.perf_counter()
+
+    def _wrap(self, name: str, fn: Callable, args, kwargs):
+        def runner():
+            self._started_at[name] = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._finished_at[name] = time.perf_counter()
+        return runner
+
+    def submit(self, name: str, fn: Callable, *args, timeout: Optional[float] = None,
+               default: Any = None, **kwargs) -> None:
+        """
+        단계 실행 예약
+
+        Args:
+            name: 단계 이름 (result() 호출 시 사용)
+            fn: 실행할 함수
+            timeout: 결과 대기 최대 시간(초). None이면 무제한
+            default: 타임아웃/예외 발생 시 반환할 기본값
+        """
+        if name in self._futures:
+            raise ValueError(f"이미 등록된 단계입니다: {name}")
+        self._options[name] = {"timeout": timeout, "default": default}
+        self._futures[name] = self.pool.submit(self._wrap(name, fn, args, kwargs))
+
+    def submit_after(self, name: str, after: str, fn: Callable, *args, timeout: Optional[float] = None,
+                     default: Any = None, **kwargs) -> None:
+        """
+        after 단계가 끝나면 그 결과를 첫 번째 인자로 fn을 단계 풀에 제출
+        (단계 워커가 다른 단계를 기다리며 자리만 차지하지 않도록, 대기는 완료 콜백으로 대신함)
+
+        after 단계가 실패하면 그 단계의 default가 전달됨. timeout은 이 단계의 result() 대기 시간
+        """
+        if name in self._futures:
+            raise ValueError(f"이미 등록된 단계입니다: {name}")
+        if after not in self._futures:
+            raise ValueError(f"등록되지 않은 단계입니다: {after}")
+        self._options[name] = {"timeout": timeout, "default": default}
+        future: Future = Future()
+        self._futures[name] = future
+        parent_default = self._options[after]["default"]
+
+        def forward(child: Future) -> None:
+            error = child.exception()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(child.result())
+
+        def start(parent: Future) -> None:
+            try:
+                value = parent.result()
+            except Exception:
+                value = parent_default
+            try:
+                self.pool.submit(self._wrap(name, fn, (value,) + args, kwargs)).add_done_callback(forward)
+            except Exception as e:  # 종료 중인 풀 등
+                future.set_exception(e)
+
+        self._futures[after].add_done_callback(start)
+
+    def has(self, name: str) -> bool:
+        return name in self._futures
+
+    def result(self, name: str, default: Any = None) -> Any:
+        """
+        단계 결과 대기
+
+        등록되지 않은 단계는 default를 반환하고, 타임아웃/예외 발생 시 submit()에 지정한 기본값을 반환
+        (타임아웃된 작업은 백그라운드에서 끝까지 실행되지만 결과는 버려짐)
+        """
+        future = self._futures.get(name)
+        if future is None:
+            return default
+
+        options = self._options[name]
+        wait_started = time.perf_counter()
+        status = "ok"
+        try:
+            value = future.result(timeout=options["timeout"])
+        except FutureTimeoutError:
+            print(f"⏰ 단계 타임아웃: {name} ({options['timeout']}s)")
+            status = "timeout"
+            value = options["default"]
+        except Exception as e:
+            print(f"❌ 단계 실행 오류: {name} - {e}")
+            status = "error"
+            value = options["default"]
+
+        if name not in self.timings:
+            started = self._started_at.get(name, wait_started)
+            finished = self._finished_at.get(name, time.perf_counter())
+            self.timings[name] = {
+                "status": status,
+                "elapsed_ms": round((finished - started) * 1000, 1),
+                "waited_ms": round((time.perf_counter() - wait_started) * 1000, 1),
+            }
+        return value
+
+    def run(self, name: str, fn: Callable, *args, **kwargs) -> Any:
+        """현재 스레드에서 단계를 바로 실행하고 소요 시간만 기록"""
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self.timings[name] = {
+                "status": status,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                "waited_ms": 0.0,
+            }
+
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self.created_at) * 1000, 1)
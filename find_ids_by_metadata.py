@@ -27,6 +27,8 @@ from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 from pinecone import Pinecone
 
+from backend.rag.review_store import DEFAULT_STORE_PATH, open_review_store
+
 # 환경변수 로드
 load_dotenv()
 
@@ -159,8 +161,8 @@ def find_all_ids_by_metadata_scan(
     batch_size: int = 100
 ) -> List[Dict[str, Any]]:
     """
-    Pinecone에서 모든 벡터를 스캔하여 metadata로 id를 찾는 함수
-    (더 정확하지만 느림)
+    강의평 로컬 미러 전체를 스캔하여 metadata로 id를 찾는 함수
+    (Pinecone 필터는 정확한 일치만 가능하므로 부분 일치가 필요할 때 사용)
     
     Args:
         course_name: 검색할 강의명 (부분 일치)
@@ -197,52 +199,16 @@ def find_all_ids_by_metadata_scan(
     else:
         print(f"📦 Namespace: _default_")
     
-    found_ids = []
-    
-    # 더미 벡터로 모든 결과 가져오기
-    dimension = stats.dimension
-    dummy_vector = [0.0] * dimension
-    
-    # 큰 top_k로 모든 결과 가져오기 시도
-    max_top_k = min(10000, total_count)
-    
     try:
-        query_options = {
-            "vector": dummy_vector,
-            "top_k": max_top_k,
-            "include_metadata": True
-        }
-        
-        if namespace:
-            query_options["namespace"] = namespace
-        
-        results = index.query(**query_options)
-        
-        print(f"📥 {len(results.matches)}개의 결과를 가져왔습니다. 필터링 중...")
+        # 로컬 미러(data/review_store)에서 찾기: 새로 추가/삭제된 ID만 Pinecone에서 동기화
+        path = os.path.join(DEFAULT_STORE_PATH, namespace) if namespace else DEFAULT_STORE_PATH
+        store = open_review_store(lambda: index, path=path, namespace=namespace)
+        print(f"📥 로컬 미러 {len(store.table)}개 중 필터링 중...")
         
-        # 필터링
-        for match in results.matches:
-            metadata = match.metadata or {}
-            
-            match_course = True
-            match_professor = True
-            
-            if course_name:
-                course_val = metadata.get('course_name', '')
-                if course_name.lower() not in str(course_val).lower():
-                    match_course = False
-            
-            if professor:
-                prof_val = metadata.get('professor', '')
-                if professor.lower() not in str(prof_val).lower():
-                    match_professor = False
-            
-            if match_course and match_professor:
-                found_ids.append({
-                    "id": match.id,
-                    "score": match.score,
-                    "metadata": metadata
-                })
+        found_ids = [
+            {"id": record["id"], "score": None, "metadata": record["metadata"]}
+            for record in store.find(course_name, professor, mode="contains")
+        ]
         
         print(f"✅ {len(found_ids)}개의 ID를 찾았습니다.")
         return found_ids
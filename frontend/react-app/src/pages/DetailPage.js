@@ -36,16 +36,29 @@ const buildApiPath = (path = '') => {
   return base ? `${base}${path}` : path;
 };
 
+// 이전 요약(stale)을 받은 경우 백그라운드 재생성이 끝났는지 다시 확인하는 간격/횟수
+const SUMMARY_REFRESH_DELAY_MS = 8000;
+const SUMMARY_REFRESH_MAX_ATTEMPTS = 3;
+
+const formatSummaryDate = (value) => {
+  if (!value) return '';
+  const date = new Date(value);
+  return Number.isNaN(date.getTime()) ? '' : date.toLocaleDateString('ko-KR');
+};
+
 const DetailPage = ({ selectedCourse, mockCourses }) => {
   const course = selectedCourse || mockCourses[0];
   const [reviewSummary, setReviewSummary] = useState({
     text: null,
     isLoading: false,
     error: null,
+    cache: null,
   });
 
   useEffect(() => {
     let isMounted = true;
+    let refreshTimer = null;
+    let refreshAttempts = 0;
     const controller = new AbortController();
 
     const fetchReviewSummary = async () => {
@@ -55,6 +68,7 @@ const DetailPage = ({ selectedCourse, mockCourses }) => {
             text: null,
             isLoading: false,
             error: null,
+            cache: null,
           });
         }
         return;
@@ -76,6 +90,10 @@ const DetailPage = ({ selectedCourse, mockCourses }) => {
         if (course.professor) {
           params.append('professor', course.professor);
         }
+        // 자동 재조회는 조회수(사전 생성 우선순위)에 다시 집계하지 않도록 표시
+        if (refreshAttempts > 0) {
+          params.append('poll', '1');
+        }
 
         const fullUrl = `${apiUrl}?${params.toString()}`;
         console.log('📝 Fetching review summary from:', fullUrl);
@@ -123,16 +141,25 @@ const DetailPage = ({ selectedCourse, mockCourses }) => {
             text: null,
             isLoading: false,
             error: data.error || '강의평 요약을 생성하는 중 오류가 발생했습니다.',
+            cache: null,
           });
           return;
         }
 
         // 요약이 있으면 표시, 없으면 에러로 처리하지 않고 기본 요약 사용
+        // (캐시된 요약은 바로 표시하고, 새 강의평 반영 중이면 잠시 후 다시 조회)
         setReviewSummary({
           text: data.summary || null,
           isLoading: false,
           error: null,
+          cache: data.cache || null,
         });
+
+        if (data.cache?.status === 'stale' && data.cache.regenerating
+            && refreshAttempts < SUMMARY_REFRESH_MAX_ATTEMPTS) {
+          refreshAttempts += 1;
+          refreshTimer = setTimeout(fetchReviewSummary, SUMMARY_REFRESH_DELAY_MS);
+        }
       } catch (error) {
         if (error.name === 'AbortError') {
           return;
@@ -145,6 +172,7 @@ const DetailPage = ({ selectedCourse, mockCourses }) => {
             text: null,
             isLoading: false,
             error: error.message || '강의평 요약을 불러오는 중 오류가 발생했습니다.',
+            cache: null,
           });
         }
       }
@@ -154,6 +182,7 @@ const DetailPage = ({ selectedCourse, mockCourses }) => {
 
     return () => {
       isMounted = false;
+      clearTimeout(refreshTimer);
       controller.abort();
     };
   }, [course?.name, course?.professor]);
@@ -252,9 +281,17 @@ const DetailPage = ({ selectedCourse, mockCourses }) => {
             <div className="bg-white rounded-lg border border-slate-200 p-6">
               <div className="flex items-center justify-between mb-4">
                 <h3 className="text-base font-bold text-slate-900">수강생 평가 요약</h3>
-                {reviewSummary.isLoading && (
+                {reviewSummary.isLoading ? (
                   <span className="text-xs text-slate-500">요약 생성 중...</span>
-                )}
+                ) : reviewSummary.cache?.status === 'stale' ? (
+                  <span className="text-xs text-amber-600">
+                    새 강의평 {reviewSummary.cache.new_reviews}개 반영 중 · 이전 요약
+                  </span>
+                ) : reviewSummary.cache?.generated_at ? (
+                  <span className="text-xs text-slate-400">
+                    강의평 {reviewSummary.cache.review_count}개 기준 · {formatSummaryDate(reviewSummary.cache.generated_at)}
+                  </span>
+                ) : null}
               </div>
 
               {reviewSummary.error && (
@@ -7,17 +7,15 @@ from dotenv import load_dotenv
 from pinecone import Pinecone
 from collections import defaultdict
 
+from backend.rag.review_store import open_review_store
+
 load_dotenv()
 
 pc = Pinecone(api_key=os.getenv('PINECONE_API_KEY'))
 index = pc.Index(os.getenv('PINECONE_INDEX', 'courses-dev'))
 
-# 모든 강의평 벡터 가져오기
-results = index.query(
-    vector=[0.0] * 768,
-    top_k=10000,
-    include_metadata=True
-)
+# 강의평 로컬 미러 (data/review_store, 새로 추가/삭제된 ID만 Pinecone에서 동기화)
+store = open_review_store(lambda: index)
 
 # 강의별로 그룹화
 courses_dict = defaultdict(lambda: {
@@ -26,21 +24,19 @@ courses_dict = defaultdict(lambda: {
     'semesters': set(),
 })
 
-for match in results.matches:
-    meta = match.metadata
-    if not meta:
-        continue
+for match in store.find():
+    meta = match['metadata']
         
-    course_name = meta.get('course_name', 'Unknown')
-    professor = meta.get('professor', 'Unknown')
-    rating = meta.get('rating', 0)
+    course_name = meta.get('course_name') or 'Unknown'
+    professor = meta.get('professor') or 'Unknown'
+    rating = meta.get('rating') or 0
     semester = meta.get('semester', '')
     text = meta.get('text', '')
     
     key = f"{course_name}_{professor}"
     courses_dict[key]['course_name'] = course_name
     courses_dict[key]['professor'] = professor
-    courses_dict[key]['department'] = meta.get('department', '소프트웨어학과')
+    courses_dict[key]['department'] = meta.get('department') or '소프트웨어학과'
     courses_dict[key]['reviews'].append(text)
     courses_dict[key]['ratings'].append(float(rating))
     courses_dict[key]['semesters'].add(semester)
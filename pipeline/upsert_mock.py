@@ -1,7 +1,10 @@
-import os, json
+import os, sys, json
 from dotenv import load_dotenv
 from pinecone import Pinecone, ServerlessSpec
-import re
+
+# 강의평 분석 규칙은 업로드 스크립트와 공유 (backend/rag/review_enrichment.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from backend.rag.review_enrichment import enrichment_metadata
 
 EMBED_PROVIDER = os.getenv("EMBED_PROVIDER", "gemini")
 PROVIDER_DIM = {"openai": 1536, "gemini": 768}
@@ -17,26 +20,6 @@ def embed_local(text: str):
     emb = model.encode([f"passage: {text}"], normalize_embeddings=True)[0]  # 768-d
     return emb.tolist()
 
-def infer_has_team_project(text: str):
-    # 간단한 규칙 기반 추론: 한국어 표현 위주
-    neg_patterns = [
-        r"(팀 ?플|팀 ?프로젝트|조별(?:과제|활동)).{0,12}(없|안 ?함|안함|미포함)",
-        r"(없|안 ?함|안함|미포함).{0,12}(팀 ?플|팀 ?프로젝트|조별(?:과제|활동))",
-        r"무 ?팀플",
-        r"팀플\s*[xX✕×]",
-    ]
-    pos_patterns = [
-        r"(팀 ?플|팀 ?프로젝트|조별(?:과제|활동)).{0,12}(있|함|진행|필수)",
-        r"(있|함|진행|필수).{0,12}(팀 ?플|팀 ?프로젝트|조별(?:과제|활동))",
-    ]
-    neg = any(re.search(p, text) for p in neg_patterns)
-    pos = any(re.search(p, text) for p in pos_patterns)
-    if neg and not pos:
-        return False
-    if pos and not neg:
-        return True
-    return None
-
 def main():
     load_dotenv()
     pc = Pinecone(api_key=os.environ["PINECONE_API_KEY"])
@@ -62,9 +45,6 @@ def main():
     for r in items:
         e = embed_local(r["review_text"])
         assert len(e) == EXPECTED_DIM, f"Embedding dimension {len(e)} does not match index dimension {EXPECTED_DIM}. Check EMBED_PROVIDER and index settings."
-        has_tp = r.get("has_team_project")
-        if has_tp is None:
-            has_tp = infer_has_team_project(r.get("review_text", ""))
         # Build metadata without None values (Pinecone forbids nulls)
         md = {
             "course_id": r["course_id"],
@@ -77,8 +57,10 @@ def main():
             "ingested_at": os.getenv("NOW_ISO") or "2025-09-23T00:00:00Z",
             "source": r.get("source", "mock"),
         }
-        if has_tp is not None:
-            md["has_team_project"] = bool(has_tp)
+        # 감정/팀플/난이도/과제량 (mock 데이터에 팀플 여부가 있으면 그 값 우선)
+        md.update(enrichment_metadata(r.get("review_text", ""), r.get("rating")))
+        if r.get("has_team_project") is not None:
+            md["has_team_project"] = bool(r["has_team_project"])
 
         vectors.append({
             "id": r["review_id"],
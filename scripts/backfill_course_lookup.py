@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+courses 컬렉션에 구조적 필터용 lookup 필드를 채우고 인덱스를 만든 뒤,
+대표 필터의 실행 계획이 IXSCAN인지(COLLSCAN이 아닌지) 확인하는 스크립트
+
+사용법:
+    python scripts/backfill_course_lookup.py            # 백필 + 인덱스 + 실행 계획 확인
+    python scripts/backfill_course_lookup.py --check    # 실행 계획만 확인
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+from pymongo import UpdateOne
+
+# 프로젝트 루트 경로 추가
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from backend.api import get_mongo_db
+from backend.rag.course_lookup import (
+    LOOKUP_FIELD, build_course_query, build_lookup, ensure_lookup_indexes, explain_course_query
+)
+
+BATCH_SIZE = 500
+
+# intent 분석에서 자주 나오는 필터 조합
+SAMPLE_FILTERS = [
+    {"course_name": "데이터베이스"},
+    {"professor": "손경아"},
+    {"department": "소프트웨어학과", "course_type": "전필"},
+    {"course_type": "전선", "lecture_method": "비대면"},
+    {"lecture_time": "월"},
+    {"subject_type": "전공과목"},
+]
+
+SOURCE_FIELDS = {
+    "course_name": 1, "professor": 1, "department": 1, "subject_type": 1,
+    "course_type": 1, "lecture_method": 1, "lecture_time": 1,
+}
+
+
+def backfill(collection) -> int:
+    """모든 강의 문서의 lookup 필드 갱신"""
+    updated = 0
+    operations = []
+    for doc in collection.find({}, SOURCE_FIELDS):
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {LOOKUP_FIELD: build_lookup(doc)}}))
+        if len(operations) >= BATCH_SIZE:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += collection.bulk_write(operations, ordered=False).modified_count
+    return updated
+
+
+def check_plans(collection) -> bool:
+    """대표 필터 실행 계획 확인. COLLSCAN이 하나라도 있으면 False"""
+    ok = True
+    for filters in SAMPLE_FILTERS:
+        query = build_course_query(filters)
+        plan = explain_course_query(collection, query)
+        mark = "✅" if plan["uses_index"] and not plan["collscan"] else "❌"
+        ok = ok and mark == "✅"
+        print(f"   {mark} {filters} → {' > '.join(plan['stages'])} {plan['index_names']}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="courses lookup 필드 백필 및 실행 계획 확인")
+    parser.add_argument("--check", action="store_true", help="백필 없이 실행 계획만 확인")
+    args = parser.parse_args()
+
+    collection = get_mongo_db().courses
+
+    if not args.check:
+        print("🔄 lookup 필드 백필 중...")
+        updated = backfill(collection)
+        print(f"✅ {updated}개 강의 문서 갱신")
+
+        print("📊 lookup 인덱스 생성 중...")
+        ensure_lookup_indexes(collection)
+        print("✅ 인덱스 생성 완료")
+
+    print("🔎 실행 계획 확인 (IXSCAN이어야 함)")
+    if not check_plans(collection):
+        print("❌ COLLSCAN을 사용하는 필터가 있습니다. 인덱스를 확인하세요.")
+        sys.exit(1)
+    print("🎉 모든 필터가 인덱스를 사용합니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+강의평 미러(data/review_store) 전체로 course_aggregates(강의별 평점/개수/태그 집계)를 다시 만드는 스크립트
+평소에는 API 서버의 미러 동기화와 업로드 스크립트가 바뀐 강의평만 증분 반영하므로, 최초 구축/복구 때만 실행
+
+사용법:
+    python scripts/build_course_aggregates.py              # 미러 동기화 후 전체 재구축
+    python scripts/build_course_aggregates.py --no-sync    # 로컬 미러 그대로 재구축
+"""
+
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+# 프로젝트 루트 경로 추가
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(PROJECT_ROOT)
+
+from backend.api import get_mongo_db
+from backend.rag.course_aggregates import CourseAggregates
+from backend.rag.review_store import open_review_store
+
+load_dotenv()
+
+
+def pinecone_index():
+    from pinecone import Pinecone
+
+    pc = Pinecone(api_key=os.getenv('PINECONE_API_KEY'))
+    return pc.Index(os.getenv('PINECONE_INDEX', 'courses-dev'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="강의평 미러 → course_aggregates 재구축")
+    parser.add_argument("--no-sync", action="store_true", help="Pinecone과 동기화하지 않고 로컬 미러만 사용")
+    args = parser.parse_args()
+
+    store = open_review_store(pinecone_index, sync=not args.no_sync)
+    records = store.table.records()
+    print(f"📥 강의평 {len(records)}개")
+
+    count = CourseAggregates(get_mongo_db()).rebuild(records)
+    print(f"✅ course_aggregates 재구축 완료: 강의 {count}개")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Pinecone 강의평 벡터를 로컬 벡터 인덱스 스냅샷으로 내보내는 스크립트
+rag_api.py에서 VECTOR_BACKEND=local로 설정하면 이 스냅샷으로 검색 (Pinecone 네트워크 호출 없음)
+
+사용법:
+    python scripts/build_local_vector_index.py                 # data/vector_index에 저장
+    python scripts/build_local_vector_index.py --hnsw          # HNSW 그래프까지 생성
+    python scripts/build_local_vector_index.py --output /tmp/vector_index --namespace reviews
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+from dotenv import load_dotenv
+from pinecone import Pinecone
+
+# 프로젝트 루트 경로 추가
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(PROJECT_ROOT)
+
+from backend.rag.local_vector_index import save_snapshot
+from backend.rag.pinecone_scan import fetch_all_records
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pinecone → 로컬 벡터 인덱스 스냅샷")
+    parser.add_argument("--output", default=os.getenv('LOCAL_VECTOR_SNAPSHOT', os.path.join(PROJECT_ROOT, 'data', 'vector_index')),
+                        help="스냅샷 디렉터리 (기본: LOCAL_VECTOR_SNAPSHOT 또는 data/vector_index)")
+    parser.add_argument("--namespace", default=os.getenv('PINE_NS') or None, help="Pinecone namespace")
+    parser.add_argument("--hnsw", action="store_true", help="HNSW 그래프 생성 (벡터가 많을 때)")
+    args = parser.parse_args()
+
+    api_key = os.getenv('PINECONE_API_KEY')
+    if not api_key:
+        print("❌ PINECONE_API_KEY가 설정되지 않았습니다.")
+        sys.exit(1)
+
+    index_name = os.getenv('PINECONE_INDEX', 'courses-dev')
+    index = Pinecone(api_key=api_key).Index(index_name)
+
+    print(f"📥 Pinecone '{index_name}' 벡터 조회 중...")
+    records = fetch_all_records(index, args.namespace)
+    if not records:
+        print("❌ 가져온 벡터가 없습니다.")
+        sys.exit(1)
+
+    vectors = np.array([record["values"] for record in records], dtype=np.float32)
+    save_snapshot(
+        args.output,
+        [record["id"] for record in records],
+        [record["metadata"] for record in records],
+        vectors,
+        build_graph=args.hnsw
+    )
+    print(f"✅ 스냅샷 저장 완료: {args.output} ({len(records)}개, {vectors.shape[1]}차원)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+이미 Pinecone에 올라간 강의평에 업로드 시 분석 필드(감정/팀플/난이도/과제량)를 채우는 스크립트
+새 강의평은 업로드 스크립트가 올릴 때 계산하므로, 최초 1회와 분석 규칙(ENRICHMENT_VERSION)을 바꿨을 때만 실행
+
+- 강의평 미러(data/review_store)에서 분석 전/이전 버전 강의평만 골라 Pinecone metadata를 update
+- 성공한 강의평은 미러와 course_aggregates(강의평별 기록 + 강의별 합계)에도 바로 반영
+- 실행 중인 API 서버는 다음 요청(maybe_sync) 때 바뀐 미러 스냅샷을 다시 읽음 (서버 재시작 불필요)
+
+사용법:
+    python scripts/enrich_reviews.py              # 미러 동기화 후 분석 필요한 강의평만
+    python scripts/enrich_reviews.py --dry-run    # Pinecone 수정 없이 대상 수/분포만 출력
+    python scripts/enrich_reviews.py --force      # 현재 버전으로 분석된 강의평도 다시 계산
+"""
+
+import os
+import sys
+import argparse
+from collections import Counter
+from dotenv import load_dotenv
+
+# 프로젝트 루트 경로 추가
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(PROJECT_ROOT)
+
+from backend.rag.batch_runner import RateLimiter, run_bounded
+from backend.rag.review_enrichment import ENRICHMENT_FIELDS, ENRICHMENT_VERSION, enrich_records
+from backend.rag.review_store import open_review_store
+
+load_dotenv()
+
+
+def pinecone_index():
+    from pinecone import Pinecone
+
+    pc = Pinecone(api_key=os.getenv('PINECONE_API_KEY'))
+    return pc.Index(os.getenv('PINECONE_INDEX', 'courses-dev'))
+
+
+def print_distribution(updates):
+    """분석 결과 분포 (필드별로 값이 채워진 강의평 수 + 값 분포)"""
+    for field in ENRICHMENT_FIELDS:
+        values = [fields[field] for fields in updates.values() if field in fields]
+        if field == "sentiment_score":
+            values = ["긍정" if value > 0.2 else "부정" if value < -0.2 else "중립" for value in values]
+        counts = Counter(values)
+        print(f"   - {field}: {len(values)}/{len(updates)}개 {dict(sorted(counts.items(), key=str))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기존 강의평 분석 필드 채우기")
+    parser.add_argument("--dry-run", action="store_true", help="Pinecone/미러/집계를 수정하지 않고 결과만 출력")
+    parser.add_argument("--force", action="store_true", help="이미 현재 버전으로 분석된 강의평도 다시 계산")
+    parser.add_argument("--no-sync", action="store_true", help="Pinecone과 동기화하지 않고 로컬 미러만 사용")
+    parser.add_argument("--workers", type=int, default=4, help="동시 update 요청 수")
+    parser.add_argument("--rps", type=float, default=20.0, help="초당 update 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--namespace", default=None, help="Pinecone namespace")
+    args = parser.parse_args()
+
+    store = open_review_store(pinecone_index, namespace=args.namespace, sync=not args.no_sync)
+    updates = enrich_records(store.table.records(), force=args.force)
+    print(f"🔎 분석 대상 강의평: {len(updates)}/{len(store.table)}개 (규칙 버전 {ENRICHMENT_VERSION})")
+    if not updates:
+        return
+    print_distribution(updates)
+    if args.dry_run:
+        print("ℹ️ --dry-run: 수정하지 않음")
+        return
+
+    index = pinecone_index()
+
+    def update_one(review_id):
+        index.update(id=review_id, set_metadata=updates[review_id], namespace=args.namespace)
+        return review_id
+
+    review_ids = list(updates)
+    outcomes = run_bounded(review_ids, update_one, max_workers=args.workers,
+                           rate_limiter=RateLimiter(args.rps) if args.rps > 0 else None)
+    done = {outcome["value"]: updates[outcome["value"]] for outcome in outcomes if outcome["success"]}
+    failed = [(review_id, outcome["error"]) for review_id, outcome in zip(review_ids, outcomes)
+              if not outcome["success"]]
+    print(f"✅ Pinecone metadata 갱신: {len(done)}개 성공, {len(failed)}개 실패")
+    for review_id, error in failed[:5]:
+        print(f"   ❌ {review_id}: {error}")
+
+    # 미러/집계 반영 (ID 기준 증분 동기화로는 기존 강의평의 metadata 수정이 들어오지 않음)
+    try:
+        from backend.api import get_mongo_db
+        from backend.rag.course_aggregates import CourseAggregates
+
+        aggregates = CourseAggregates(get_mongo_db())
+
+        def apply_aggregates(records, removed_ids):
+            counts = aggregates.apply(records, removed_ids)
+            print(f"📊 강의 집계 갱신: 수정 {counts['updated']}개, 변경 없음 {counts['skipped']}개")
+
+        store.add_listener(apply_aggregates)
+    except Exception as e:
+        print(f"⚠️ MongoDB 연결 실패, 강의 집계는 갱신하지 않음 (build_course_aggregates.py로 재구축): {e}")
+    store.update_metadata(done)
+
+
+if __name__ == '__main__':
+    main()
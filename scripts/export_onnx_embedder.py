@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+임베딩 모델을 ONNX(+ 동적 int8 양자화)로 내보내고 PyTorch 출력과의 코사인 일치도를 검증하는 스크립트
+검증 결과는 embedder.json에 기록되며, EMBEDDING_BACKEND=onnx일 때 통과한 모델만 로드됨
+
+사용법:
+    python scripts/export_onnx_embedder.py                                   # rag_api.py 모델
+    python scripts/export_onnx_embedder.py --model intfloat/multilingual-e5-base
+    python scripts/export_onnx_embedder.py --no-quantize --threshold 0.995
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# 프로젝트 루트 경로 추가
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(PROJECT_ROOT)
+
+from backend.rag.onnx_embedder import (
+    AGREEMENT_FIXTURES, OnnxSentenceEncoder, default_model_dir, export_onnx, verify_agreement
+)
+
+
+def benchmark(encoder, texts, repeat: int = 20) -> float:
+    """단일 쿼리 평균 인코딩 시간 (ms)"""
+    encoder.encode(texts[:1], normalize_embeddings=True)  # 워밍업
+    started = time.perf_counter()
+    for i in range(repeat):
+        encoder.encode([texts[i % len(texts)]], normalize_embeddings=True)
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SentenceTransformer → ONNX 내보내기 및 검증")
+    parser.add_argument("--model", default="jhgan/ko-sroberta-multitask", help="HuggingFace 모델명")
+    parser.add_argument("--output", default=None, help="출력 디렉터리 (기본: data/onnx/<모델명>)")
+    parser.add_argument("--no-quantize", action="store_true", help="int8 양자화 생략")
+    parser.add_argument("--threshold", type=float, default=0.99, help="통과 기준 최소 코사인 (기본 0.99)")
+    args = parser.parse_args()
+
+    output_dir = args.output or default_model_dir(args.model)
+    print(f"📦 ONNX 내보내기: {args.model} → {output_dir}")
+    export_onnx(args.model, output_dir, quantize=not args.no_quantize)
+
+    print(f"🔍 PyTorch 출력과 코사인 일치도 검증 ({len(AGREEMENT_FIXTURES)}개 문장)")
+    agreement = verify_agreement(args.model, output_dir, threshold=args.threshold)
+    for variant, result in agreement.items():
+        mark = "✅" if result["passed"] else "❌"
+        print(f"   {mark} {variant}: 최소 {result['min']}, 평균 {result['mean']}")
+
+    from sentence_transformers import SentenceTransformer
+    print(f"⏱️ 단일 쿼리 인코딩 시간")
+    print(f"   torch: {benchmark(SentenceTransformer(args.model, device='cpu'), AGREEMENT_FIXTURES):.1f}ms")
+    for variant in agreement:
+        encoder = OnnxSentenceEncoder(output_dir, quantized=variant == "onnx-int8")
+        print(f"   {variant}: {benchmark(encoder, AGREEMENT_FIXTURES):.1f}ms")
+
+    if not any(result["passed"] for result in agreement.values()):
+        print("❌ 검증을 통과한 ONNX 모델이 없습니다. (EMBEDDING_BACKEND=onnx여도 PyTorch 사용)")
+        sys.exit(1)
+    print("✅ 완료: EMBEDDING_BACKEND=onnx로 설정하면 사용됩니다.")
+
+
+if __name__ == "__main__":
+    main()
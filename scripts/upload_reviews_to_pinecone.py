@@ -15,6 +15,10 @@ from pinecone import Pinecone
 from sentence_transformers import SentenceTransformer
 import hashlib
 
+# 프로젝트 루트 경로 추가 (backend 모듈 사용)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.rag.review_enrichment import enrichment_metadata
+
 # 환경변수 로드
 load_dotenv()
 
@@ -438,6 +442,9 @@ def create_review_items(api_response_data: dict, course_info: dict, vector_store
         if "department" in course_info:
             metadata["department"] = course_info["department"]
         
+        # 업로드 시 분석 필드 (감정/팀플/난이도/과제량, 조회 시 본문을 다시 훑지 않도록 한 번만 계산)
+        metadata.update(enrichment_metadata(text, rate))
+        
         # 리뷰 아이템 생성
         review_item = {
             "id": review_id,
@@ -452,6 +459,32 @@ def create_review_items(api_response_data: dict, course_info: dict, vector_store
     
     return review_items
 
+def invalidate_answer_cache(course_names: List[str]) -> None:
+    """강의평 재업로드 기록 → RAG 답변 캐시에서 해당 강의가 포함된 답변 무효화"""
+    try:
+        sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+        from backend.api import get_mongo_db
+        from backend.rag.answer_cache import record_review_upload
+        
+        deleted = record_review_upload(get_mongo_db(), course_names)
+        print(f"🗑️ RAG 답변 캐시 무효화: {deleted}개 삭제 ({', '.join(course_names)})")
+    except Exception as e:
+        print(f"⚠️ RAG 답변 캐시 무효화 실패 (캐시는 TTL 경과 후 만료됨): {e}")
+
+
+def update_course_aggregates(review_items: List[Dict[str, Any]]) -> None:
+    """업로드한 강의평만 course_aggregates(강의별 평점/개수/태그 집계)에 증분 반영"""
+    try:
+        sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+        from backend.api import get_mongo_db
+        from backend.rag.course_aggregates import CourseAggregates
+        
+        counts = CourseAggregates(get_mongo_db()).apply(review_items)
+        print(f"📊 강의 집계 갱신: 추가 {counts['added']}개, 수정 {counts['updated']}개")
+    except Exception as e:
+        print(f"⚠️ 강의 집계 갱신 실패 (API 서버의 강의평 미러 동기화 때 반영됨): {e}")
+
+
 def main():
     """메인 실행 함수"""
     print("🚀 강의평 데이터 Pinecone 업로드 시작")
@@ -516,6 +549,12 @@ def main():
             print("=" * 60)
             print("🎉 강의평 데이터 업로드 완료!")
             
+            # 이 강의가 포함된 RAG 답변 캐시 무효화
+            invalidate_answer_cache([course_info["course_name"]])
+            
+            # 강의별 집계 갱신
+            update_course_aggregates(review_items)
+            
             # 인덱스 통계 출력
             stats = vector_store.get_index_stats()
             if stats: